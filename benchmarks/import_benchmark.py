@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Import phase benchmark: copy (r.import) versus link (r.external)
+
+A synthetic band file is created with GRASS for each raster size. Then the
+band file is imported into a fresh mapset with r.import and linked with
+r.external, as done by the ephemeral processors in the copy and link import
+modes. The import time, the disk space that is used in the mapset and the
+time of a subsequent r.univar run that reads all pixels are reported as JSON.
+
+Usage:
+
+    python3 benchmarks/import_benchmark.py --sizes 1000 5000 --repeat 3
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+IMPORT_COMMANDS = {
+    "copy": ["r.import", "input={input}", "output=band", "--q"],
+    "link": ["r.external", "input={input}", "output=band", "--q"],
+}
+
+
+def run_grass(grass, mapset_path, *args):
+    """Run a GRASS module in a mapset and return the wall time in seconds"""
+    start = time.perf_counter()
+    subprocess.run(
+        [grass, mapset_path, "--exec"] + list(args),
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - start
+
+
+def directory_size(path):
+    """Compute the disk space in bytes that is used by a directory"""
+    size = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            file_path = os.path.join(root, name)
+            if not os.path.islink(file_path):
+                size += os.path.getsize(file_path)
+    return size
+
+
+def create_band_file(grass, permanent, size, file_path):
+    """Create a synthetic tiled UInt16 GeoTiff band with size x size pixels"""
+    run_grass(
+        grass,
+        permanent,
+        "g.region",
+        "n=%i" % (5500000 + size * 10),
+        "s=5500000",
+        "e=%i" % (500000 + size * 10),
+        "w=500000",
+        "res=10",
+    )
+    run_grass(
+        grass,
+        permanent,
+        "r.mapcalc",
+        "expression=synthetic = rand(0, 10000)",
+        "-s",
+    )
+    run_grass(
+        grass,
+        permanent,
+        "r.out.gdal",
+        "input=synthetic",
+        "output=%s" % file_path,
+        "format=GTiff",
+        "type=UInt16",
+        "createopt=TILED=YES,COMPRESS=DEFLATE",
+        "--q",
+    )
+
+
+def benchmark_import(grass, project, band_file, mode, repeat):
+    """Benchmark an import mode and return the median timings"""
+    import_times = []
+    read_times = []
+    mapset_size = 0
+    for i in range(repeat):
+        mapset = os.path.join(project, "bench_%s_%i" % (mode, i))
+        subprocess.run(
+            [grass, "-e", "-c", mapset],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        cmd = [arg.format(input=band_file) for arg in IMPORT_COMMANDS[mode]]
+        import_times.append(run_grass(grass, mapset, *cmd))
+        mapset_size = directory_size(mapset)
+        run_grass(grass, mapset, "g.region", "raster=band")
+        read_times.append(run_grass(grass, mapset, "r.univar", "map=band"))
+        shutil.rmtree(mapset)
+
+    import_times.sort()
+    read_times.sort()
+    return {
+        "mode": mode,
+        "import_seconds": import_times[len(import_times) // 2],
+        "read_seconds": read_times[len(read_times) // 2],
+        "mapset_bytes": mapset_size,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[4])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1000, 5000],
+        help="Raster sizes in pixels per side",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--grass", default="grass", help="GRASS executable")
+    parser.add_argument("--output", help="Write the JSON results to a file")
+    args = parser.parse_args(argv)
+
+    if shutil.which(args.grass) is None:
+        sys.stderr.write("GRASS executable <%s> not found\n" % args.grass)
+        return 1
+
+    results = []
+    work_dir = tempfile.mkdtemp(prefix="import_benchmark_")
+    try:
+        project = os.path.join(work_dir, "utm32n")
+        subprocess.run(
+            [args.grass, "-e", "-c", "EPSG:32632", project],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        permanent = os.path.join(project, "PERMANENT")
+        for size in args.sizes:
+            band_file = os.path.join(work_dir, "band_%i.tif" % size)
+            create_band_file(args.grass, permanent, size, band_file)
+            for mode in IMPORT_COMMANDS:
+                result = benchmark_import(
+                    args.grass, project, band_file, mode, args.repeat
+                )
+                result["size"] = size
+                result["file_bytes"] = os.path.getsize(band_file)
+                results.append(result)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
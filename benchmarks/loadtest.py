@@ -0,0 +1,500 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+HTTP load test of the satellite plugin endpoints
+
+The endpoints of create_endpoints() and create_project_endpoints() are
+requested with a weighted profile, either by a fixed number of concurrent
+clients (closed loop) or with Poisson distributed arrivals at a fixed rate
+(open loop). The scene ids are read from the SQLite catalog of the local
+backend, so that the test runs against the local stand-in backends. The
+jobs of the processing and import endpoints are polled until they finished
+to measure the queue wait and the saturation of the workers.
+
+The latency percentiles, the throughput and the error rate of each endpoint
+and the job statistics are reported as JSON. The exit code is 2 if the p95
+latency or the error rate exceed the given limits.
+
+Usage:
+
+    python3 benchmarks/loadtest.py --profile query --concurrency 8 \\
+        --duration 60
+    python3 benchmarks/loadtest.py --profile processing --rate 0.5 \\
+        --duration 300 --wait-jobs --max-p95 2.0 --max-error-rate 0.01
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+# The weights of the endpoints in each profile
+PROFILES = {
+    "query": {
+        "landsat_query": 1,
+        "sentinel2_query": 1,
+        "sentinel2a_aws_query": 1,
+    },
+    "processing": {
+        "landsat_process": 1,
+        "sentinel2_process": 1,
+        "sentinel2_process_gcs": 1,
+    },
+    "import": {
+        "landsat_import": 1,
+        "sentinel2_import": 1,
+    },
+    "mixed": {
+        "landsat_query": 4,
+        "sentinel2_query": 4,
+        "sentinel2a_aws_query": 2,
+        "landsat_process": 1,
+        "sentinel2_process": 1,
+        "sentinel2_process_gcs": 1,
+        "landsat_import": 1,
+        "sentinel2_import": 1,
+    },
+}
+
+# The status of actinia jobs that are finished
+FINAL_STATUS = ["finished", "error", "terminated"]
+
+
+def create_request(endpoint, scenes, args, index):
+    """Create the method, path and JSON body of an endpoint request
+
+    Args:
+        endpoint (str): The endpoint name
+        scenes (dict): The Landsat scene ids and Sentinel-2 product ids
+        args: The command line arguments
+        index (int): The number of the request, used for unique mapsets
+
+    Returns:
+        (tuple)
+        The method, the path with the query string and the JSON body
+
+    """
+    landsat = random.choice(scenes["landsat"])
+    sentinel2 = random.choice(scenes["sentinel2"])
+    mapset = "%s_%i_%i" % (args.mapset_prefix, int(time.time()), index)
+    if endpoint == "landsat_query":
+        return "GET", "/landsat_query?scene_id=%s" % landsat, None
+    if endpoint == "sentinel2_query":
+        return "GET", "/sentinel2_query?scene_id=%s" % sentinel2, None
+    if endpoint == "sentinel2a_aws_query":
+        return (
+            "POST",
+            "/sentinel2a_aws_query",
+            {"product_ids": [sentinel2], "bands": ["B04", "B08"]},
+        )
+    if endpoint == "landsat_process":
+        return "POST", "/landsat_process/%s/TOAR/NDVI" % landsat, None
+    if endpoint == "sentinel2_process":
+        return "POST", "/sentinel2_process/ndvi/%s" % sentinel2, None
+    if endpoint == "sentinel2_process_gcs":
+        return "POST", "/sentinel2_process_gcs/ndvi/%s" % sentinel2, None
+    if endpoint == "landsat_import":
+        return (
+            "POST",
+            "/projects/%s/mapsets/%s/landsat_import"
+            % (args.landsat_project, mapset),
+            {
+                "strds": "landsat",
+                "atcor_method": "TOAR",
+                "scene_ids": random.sample(
+                    scenes["landsat"],
+                    min(args.scenes_per_import, len(scenes["landsat"])),
+                ),
+            },
+        )
+    if endpoint == "sentinel2_import":
+        return (
+            "POST",
+            "/projects/%s/mapsets/%s/sentinel2_import"
+            % (args.sentinel2_project, mapset),
+            {
+                "bands": ["B04", "B08"],
+                "strds": ["sentinel_B04", "sentinel_B08"],
+                "product_ids": random.sample(
+                    scenes["sentinel2"],
+                    min(args.scenes_per_import, len(scenes["sentinel2"])),
+                ),
+            },
+        )
+    raise ValueError("Unknown endpoint <%s>" % endpoint)
+
+
+def read_catalog_scenes(path):
+    """Read the scene ids from the SQLite catalog of the local backend"""
+    connection = sqlite3.connect(path)
+    try:
+        return {
+            "landsat": [
+                row[0]
+                for row in connection.execute(
+                    "SELECT scene_id FROM landsat_index"
+                )
+            ],
+            "sentinel2": [
+                row[0]
+                for row in connection.execute(
+                    "SELECT product_id FROM sentinel_2_index"
+                )
+            ],
+        }
+    finally:
+        connection.close()
+
+
+def percentile(values, q):
+    """Return the nearest-rank percentile of a list of values"""
+    if not values:
+        return None
+    values = sorted(values)
+    rank = max(1, int(round(q / 100.0 * len(values) + 0.4999)))
+    return values[min(rank, len(values)) - 1]
+
+
+class LoadTest(object):
+    """Send the requests and collect the results"""
+
+    def __init__(self, args, scenes):
+        self.args = args
+        self.scenes = scenes
+        self.profile = PROFILES[args.profile]
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.results = []
+        self.jobs = []
+        self.running_jobs = 0
+        self.peak_running_jobs = 0
+        self.count = 0
+        self.poller = ThreadPoolExecutor(max_workers=args.max_jobs)
+
+    def _session(self):
+        if not hasattr(self.local, "session"):
+            self.local.session = requests.Session()
+            self.local.session.auth = (self.args.user, self.args.password)
+        return self.local.session
+
+    def _next_endpoint(self):
+        with self.lock:
+            self.count += 1
+            index = self.count
+        endpoint = random.choices(
+            list(self.profile), weights=list(self.profile.values())
+        )[0]
+        return endpoint, index
+
+    def request(self, scheduled=None):
+        """Send a single request of the profile
+
+        Args:
+            scheduled (float): The scheduled start time of open loop
+                               requests, to measure the client lag
+
+        """
+        endpoint, index = self._next_endpoint()
+        method, path, body = create_request(
+            endpoint, self.scenes, self.args, index
+        )
+        start = time.perf_counter()
+        result = {
+            "endpoint": endpoint,
+            "lag": start - scheduled if scheduled is not None else 0,
+        }
+        try:
+            response = self._session().request(
+                method,
+                self.args.url.rstrip("/") + path,
+                json=body,
+                timeout=self.args.timeout,
+            )
+            result["code"] = response.status_code
+            result["error"] = response.status_code >= 400
+            if not result["error"] and self.args.wait_jobs:
+                self._poll_job(endpoint, response)
+        except requests.RequestException as e:
+            result["code"] = None
+            result["error"] = True
+            result["message"] = str(e)
+        result["latency"] = time.perf_counter() - start
+        with self.lock:
+            self.results.append(result)
+
+    def _poll_job(self, endpoint, response):
+        try:
+            data = response.json()
+            status_url = data["urls"]["status"]
+        except (ValueError, KeyError, TypeError):
+            return
+        if data.get("status") in FINAL_STATUS:
+            return
+        self.poller.submit(self._wait_for_job, endpoint, status_url)
+
+    def _wait_for_job(self, endpoint, status_url):
+        """Poll the status of a job until it finished"""
+        start = time.perf_counter()
+        job = {"endpoint": endpoint, "queue_wait": None, "status": None}
+        started = False
+        while time.perf_counter() - start < self.args.job_timeout:
+            try:
+                status = self._session().get(
+                    status_url, timeout=self.args.timeout
+                ).json().get("status")
+            except (requests.RequestException, ValueError):
+                status = None
+            if status not in [None, "accepted"] and not started:
+                started = True
+                job["queue_wait"] = time.perf_counter() - start
+                with self.lock:
+                    self.running_jobs += 1
+                    self.peak_running_jobs = max(
+                        self.peak_running_jobs, self.running_jobs
+                    )
+            if status in FINAL_STATUS:
+                job["status"] = status
+                break
+            time.sleep(self.args.poll_interval)
+        job["duration"] = time.perf_counter() - start
+        with self.lock:
+            if started:
+                self.running_jobs -= 1
+            self.jobs.append(job)
+
+    def run_closed_loop(self):
+        """Send requests with a fixed number of concurrent clients"""
+        end = time.perf_counter() + self.args.duration
+
+        def client():
+            while time.perf_counter() < end:
+                self.request()
+
+        threads = [
+            threading.Thread(target=client)
+            for _ in range(self.args.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def run_open_loop(self):
+        """Send requests with Poisson distributed arrivals"""
+        end = time.perf_counter() + self.args.duration
+        with ThreadPoolExecutor(max_workers=self.args.concurrency) as pool:
+            scheduled = time.perf_counter()
+            while scheduled < end:
+                pool.submit(self.request, scheduled)
+                scheduled += random.expovariate(self.args.rate)
+                time.sleep(max(0, scheduled - time.perf_counter()))
+
+    def report(self, elapsed):
+        """Summarize the results
+
+        Args:
+            elapsed (float): The wall time of the test in seconds
+
+        Returns:
+            (dict)
+            The report
+
+        """
+
+        def summarize(results):
+            latencies = [result["latency"] for result in results]
+            errors = sum(1 for result in results if result["error"])
+            return {
+                "requests": len(results),
+                "errors": errors,
+                "error_rate": errors / len(results) if results else 0,
+                "throughput": len(results) / elapsed,
+                "p50": percentile(latencies, 50),
+                "p95": percentile(latencies, 95),
+                "p99": percentile(latencies, 99),
+                "max": max(latencies) if latencies else None,
+                "codes": {
+                    str(code): sum(
+                        1 for result in results if result["code"] == code
+                    )
+                    for code in set(result["code"] for result in results)
+                },
+            }
+
+        report = {
+            "profile": self.args.profile,
+            "mode": "open" if self.args.rate else "closed",
+            "concurrency": self.args.concurrency,
+            "rate": self.args.rate,
+            "duration": elapsed,
+            "total": summarize(self.results),
+            "endpoints": {
+                endpoint: summarize(
+                    [r for r in self.results if r["endpoint"] == endpoint]
+                )
+                for endpoint in self.profile
+            },
+        }
+        if self.args.rate:
+            # A growing lag means that the client could not keep the rate
+            lags = [result["lag"] for result in self.results]
+            report["client_lag_p95"] = percentile(lags, 95)
+        if self.args.wait_jobs:
+            queue_waits = [
+                job["queue_wait"]
+                for job in self.jobs
+                if job["queue_wait"] is not None
+            ]
+            durations = [job["duration"] for job in self.jobs]
+            report["jobs"] = {
+                "jobs": len(self.jobs),
+                "finished": sum(
+                    1 for job in self.jobs if job["status"] == "finished"
+                ),
+                "failed": sum(
+                    1
+                    for job in self.jobs
+                    if job["status"] in ["error", "terminated"]
+                ),
+                "timed_out": sum(
+                    1 for job in self.jobs if job["status"] is None
+                ),
+                "queue_wait_p50": percentile(queue_waits, 50),
+                "queue_wait_p95": percentile(queue_waits, 95),
+                "duration_p50": percentile(durations, 50),
+                "duration_p95": percentile(durations, 95),
+                "peak_running_jobs": self.peak_running_jobs,
+                # The share of the job time spent in the queue, close to 1
+                # if the workers are saturated
+                "saturation": sum(queue_waits) / sum(durations)
+                if durations and sum(durations) > 0
+                else 0,
+            }
+        return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[4])
+    parser.add_argument(
+        "--url",
+        default="http://127.0.0.1:8088/api/v3",
+        help="The base URL of the actinia API",
+    )
+    parser.add_argument("--user", default="actinia-gdi")
+    parser.add_argument("--password", default="actinia-gdi")
+    parser.add_argument(
+        "--profile", choices=sorted(PROFILES), default="query"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="The number of concurrent clients, the maximum number of "
+        "requests in flight in the open loop mode",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        help="The arrival rate in requests per second, enables the open "
+        "loop mode",
+    )
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument(
+        "--catalog",
+        default="/tmp/actinia_satellite/catalog.sqlite",
+        help="The SQLite catalog of the local backend",
+    )
+    parser.add_argument(
+        "--landsat-project",
+        default="utm32n",
+        help="The project of the Landsat imports",
+    )
+    parser.add_argument(
+        "--sentinel2-project",
+        default="utm32n",
+        help="The project of the Sentinel-2 imports",
+    )
+    parser.add_argument(
+        "--mapset-prefix",
+        default="loadtest",
+        help="The prefix of the import mapsets, each import uses a new one",
+    )
+    parser.add_argument("--scenes-per-import", type=int, default=2)
+    parser.add_argument(
+        "--wait-jobs",
+        action="store_true",
+        help="Poll the jobs until they finished",
+    )
+    parser.add_argument("--max-jobs", type=int, default=64)
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    parser.add_argument("--job-timeout", type=float, default=3600)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report to a file")
+    parser.add_argument(
+        "--max-p95", type=float, help="The maximum p95 latency in seconds"
+    )
+    parser.add_argument(
+        "--max-error-rate", type=float, help="The maximum error rate"
+    )
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    scenes = read_catalog_scenes(args.catalog)
+    if not scenes["landsat"] or not scenes["sentinel2"]:
+        sys.stderr.write(
+            "The catalog <%s> requires Landsat and Sentinel-2 scenes\n"
+            % args.catalog
+        )
+        return 1
+
+    test = LoadTest(args, scenes)
+    start = time.perf_counter()
+    if args.rate:
+        test.run_open_loop()
+    else:
+        test.run_closed_loop()
+    elapsed = time.perf_counter() - start
+    test.poller.shutdown(wait=True)
+    report = test.report(elapsed)
+
+    status = 0
+    violations = []
+    if args.max_p95 is not None and (report["total"]["p95"] or 0) > (
+        args.max_p95
+    ):
+        violations.append("p95 latency %.3f s" % report["total"]["p95"])
+    if (
+        args.max_error_rate is not None
+        and report["total"]["error_rate"] > args.max_error_rate
+    ):
+        violations.append("error rate %.3f" % report["total"]["error_rate"])
+    if violations:
+        report["violations"] = violations
+        status = 2
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
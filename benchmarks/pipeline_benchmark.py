@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Offline benchmark of the stages of the satellite processing pipeline
+
+A synthetic Landsat 8 scene and Sentinel-2 product are created for each
+raster size in the catalog of the local backend and served by its object
+server, see benchmarks/synthetic_archive.py. The stages of the ephemeral
+NDVI processing are run with the process lists of the processing libraries
+that the processors use: query (catalog lookup and URL checks), download,
+import, atcor (Landsat only), index, univar, preview and export. The median
+wall time of each stage is reported as JSON and compared against a stored
+baseline. No network access is required.
+
+Usage:
+
+    python3 benchmarks/pipeline_benchmark.py --sizes 500 2000 \\
+        --output results.json
+    python3 benchmarks/pipeline_benchmark.py --baseline results.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from actinia_core.core.common.config import global_config
+from actinia_core.core.common.process_object import Process
+from actinia_core.core.common.sentinel_processing_library import (
+    Sentinel2Processing,
+)
+from actinia_satellite_plugin.aoi import relocate_vrt_files
+from actinia_satellite_plugin.config import satellite_config
+from actinia_satellite_plugin.local_backend import (
+    LocalSatelliteCatalog,
+    create_landsat_processing,
+    create_object_server,
+)
+from synthetic_archive import create_synthetic_archive
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+# The EPSG code of the project, the synthetic scenes are in UTM zone 32N
+EPSG = "EPSG:32632"
+
+# The atmospheric correction and the processing method of the Landsat
+# processor and the bands of the Sentinel-2 processor
+ATCOR_METHOD = "TOAR"
+PROCESSING_METHOD = "NDVI"
+SENTINEL2_BANDS = ["B08", "B04"]
+
+SCENES = ["landsat", "sentinel2"]
+
+STAGES = [
+    "query",
+    "download",
+    "import",
+    "atcor",
+    "index",
+    "univar",
+    "preview",
+    "export",
+]
+
+message_logger = logging.getLogger("pipeline_benchmark")
+
+
+def send_resource_update(*args, **kwargs):
+    pass
+
+
+def run_process_list(grass, mapset, process_list, cwd, env=None):
+    """Run a process list of the processing libraries
+
+    The GRASS modules are run in the mapset, the executables in the
+    temporary file directory of the job.
+    """
+    for p in process_list:
+        if p.exec_type == "grass":
+            args = [grass, mapset, "--exec", p.executable]
+        else:
+            args = [p.executable]
+        subprocess.run(
+            args + list(p.executable_params),
+            check=True,
+            cwd=cwd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            env=env,
+        )
+
+
+def get_directory_size(path):
+    """Return the size of all files in a directory tree in bytes"""
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(path)
+        for name in names
+    )
+
+
+def create_mapset(grass, project, name):
+    mapset = os.path.join(project, name)
+    subprocess.run(
+        [grass, "-e", "-c", mapset],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return mapset
+
+
+def grass_process(executable, *params):
+    return Process(
+        exec_type="grass",
+        executable=executable,
+        executable_params=list(params),
+        skip_permission_check=True,
+    )
+
+
+def get_output_process_lists(raster_name, temp_file_path):
+    """Return the univar, preview and export process lists of a result
+
+    They match the process chains of _create_output_resources() of the
+    ephemeral processors.
+    """
+    univar = [grass_process("r.univar", "map=%s" % raster_name, "-g")]
+    preview = [
+        grass_process("d.rast", "map=%s" % raster_name, "-n"),
+        grass_process(
+            "d.legend", "raster=%s" % raster_name, "at=8,92,0,7", "-n"
+        ),
+    ]
+    export = [
+        grass_process(
+            "r.out.gdal",
+            "input=%s" % raster_name,
+            "output=%s" % os.path.join(temp_file_path, raster_name + ".tif"),
+            "format=GTiff",
+            "createopt=COMPRESS=LZW",
+            "--q",
+        )
+    ]
+    return univar, preview, export
+
+
+def get_render_environment(temp_file_path):
+    return dict(
+        os.environ,
+        GRASS_RENDER_IMMEDIATE="png",
+        GRASS_RENDER_WIDTH="1300",
+        GRASS_RENDER_HEIGHT="1000",
+        GRASS_RENDER_TRANSPARENT="TRUE",
+        GRASS_RENDER_TRUECOLOR="TRUE",
+        GRASS_RENDER_FILE=os.path.join(temp_file_path, "preview.png"),
+        GRASS_RENDER_FILE_READ="TRUE",
+    )
+
+
+class StageTimer(object):
+    """Collect the wall times of the pipeline stages"""
+
+    def __init__(self):
+        self.times = {}
+
+    def __call__(self, stage, function, *args, **kwargs):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        self.times.setdefault(stage, []).append(time.perf_counter() - start)
+        return result
+
+    def medians(self):
+        return {
+            stage: sorted(times)[len(times) // 2]
+            for stage, times in self.times.items()
+        }
+
+
+def run_landsat_pipeline(
+    grass, mapset, scene_id, temp_file_path, download_cache, timer
+):
+    """Run the stages of the Landsat NDVI processor"""
+    process_lib = create_landsat_processing(
+        config=global_config,
+        temp_file_path=temp_file_path,
+        scene_id=scene_id,
+        download_cache=download_cache,
+        message_logger=message_logger,
+        send_resource_update=send_resource_update,
+    )
+    download_pl, _ = timer("query", process_lib.get_download_process_list)
+    import_pl = process_lib.get_import_process_list()
+    toar_pl = process_lib.get_i_landsat_toar_process_list(ATCOR_METHOD)
+    ivi_pl = process_lib.get_i_vi_process_list(
+        atcor_method=ATCOR_METHOD, processing_method=PROCESSING_METHOD
+    )
+    # The project does not have the region of the scene, as a project
+    # that was created from a template
+    import_pl.append(
+        grass_process("g.region", "raster=%s" % process_lib.raster_names[0])
+    )
+
+    for stage, process_list in [
+        ("download", download_pl),
+        ("import", import_pl),
+        ("atcor", toar_pl),
+        ("index", ivi_pl),
+    ]:
+        timer(
+            stage, run_process_list, grass, mapset, process_list,
+            temp_file_path,
+        )
+    return process_lib.ndvi_name
+
+
+def run_sentinel2_pipeline(
+    grass, mapset, catalog, product_id, temp_file_path, download_cache, timer
+):
+    """Run the stages of the Sentinel-2 NDVI processor"""
+
+    def _query():
+        query_result = catalog.get_sentinel_urls(
+            [product_id], SENTINEL2_BANDS
+        )
+        process_lib = Sentinel2Processing(
+            config=global_config,
+            product_id=product_id,
+            query_result=query_result,
+            bands=SENTINEL2_BANDS,
+            temp_file_path=temp_file_path,
+            download_cache=download_cache,
+            send_resource_update=send_resource_update,
+            message_logger=message_logger,
+        )
+        download_pl, band_file_list = (
+            process_lib.get_sentinel2_download_process_list()
+        )
+        return process_lib, download_pl, band_file_list
+
+    process_lib, download_pl, band_file_list = timer("query", _query)
+    import_pl = process_lib.get_sentinel2_import_process_list()
+    relocate_vrt_files(import_pl, temp_file_path)
+    ndvi_pl = process_lib.get_ndvi_r_mapcalc_process_list(
+        band_file_list["B04"][1], band_file_list["B08"][1], "ndvi"
+    )
+
+    for stage, process_list in [
+        ("download", download_pl),
+        ("import", import_pl),
+        ("index", ndvi_pl),
+    ]:
+        timer(
+            stage, run_process_list, grass, mapset, process_list,
+            temp_file_path,
+        )
+    return "ndvi"
+
+
+def run_pipeline(
+    grass, project, catalog, scene, scene_id, work_dir, timer, index
+):
+    """Run all stages of the NDVI processing of a scene once"""
+    temp_file_path = tempfile.mkdtemp(dir=work_dir)
+    download_cache = tempfile.mkdtemp(dir=global_config.DOWNLOAD_CACHE)
+    mapset = create_mapset(grass, project, "bench_%s_%i" % (scene, index))
+    try:
+        if scene == "landsat":
+            raster_name = run_landsat_pipeline(
+                grass, mapset, scene_id, temp_file_path, download_cache, timer
+            )
+        else:
+            raster_name = run_sentinel2_pipeline(
+                grass, mapset, catalog, scene_id, temp_file_path,
+                download_cache, timer,
+            )
+
+        univar, preview, export = get_output_process_lists(
+            raster_name, temp_file_path
+        )
+        timer(
+            "univar", run_process_list, grass, mapset, univar, temp_file_path
+        )
+        timer(
+            "preview",
+            run_process_list,
+            grass,
+            mapset,
+            preview,
+            temp_file_path,
+            env=get_render_environment(temp_file_path),
+        )
+        timer(
+            "export", run_process_list, grass, mapset, export, temp_file_path
+        )
+    finally:
+        shutil.rmtree(mapset, ignore_errors=True)
+        shutil.rmtree(download_cache, ignore_errors=True)
+        shutil.rmtree(temp_file_path, ignore_errors=True)
+
+
+def compare_with_baseline(results, baseline, tolerance, min_seconds):
+    """Compare the stage timings with a baseline
+
+    A stage is a regression if it is more than tolerance (relative) and
+    min_seconds (absolute) slower than in the baseline.
+
+    Args:
+        results (list): The benchmark results
+        baseline (list): The baseline results
+        tolerance (float): The relative tolerance, e.g. 0.2
+        min_seconds (float): The absolute tolerance in seconds
+
+    Returns:
+        (list)
+        The regressions
+
+    """
+    reference = {
+        (entry["scene"], entry["size"], entry["stage"]): entry["seconds"]
+        for entry in baseline
+    }
+    regressions = []
+    for entry in results:
+        key = (entry["scene"], entry["size"], entry["stage"])
+        if key not in reference:
+            continue
+        base = reference[key]
+        if (
+            entry["seconds"] > base * (1 + tolerance)
+            and entry["seconds"] - base > min_seconds
+        ):
+            regressions.append(
+                dict(
+                    entry,
+                    baseline_seconds=base,
+                    slowdown=entry["seconds"] / base if base else None,
+                )
+            )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[4])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[500, 2000],
+        help="Raster sizes in pixels per side",
+    )
+    parser.add_argument(
+        "--scenes",
+        nargs="+",
+        choices=SCENES,
+        default=SCENES,
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--grass", default="grass", help="GRASS executable")
+    parser.add_argument("--output", help="Write the JSON results to a file")
+    parser.add_argument(
+        "--baseline", help="Compare the results with a stored JSON baseline"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Relative slowdown that is tolerated, default 0.25",
+    )
+    parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.2,
+        help="Absolute slowdown in seconds that is tolerated, default 0.2",
+    )
+    args = parser.parse_args(argv)
+
+    if shutil.which(args.grass) is None:
+        sys.stderr.write("GRASS executable <%s> not found\n" % args.grass)
+        return 1
+
+    results = []
+    work_dir = tempfile.mkdtemp(prefix="pipeline_benchmark_")
+    storage = os.path.join(work_dir, "storage")
+    os.makedirs(storage)
+    global_config.DOWNLOAD_CACHE = os.path.join(work_dir, "download_cache")
+    os.makedirs(global_config.DOWNLOAD_CACHE)
+    server = create_object_server(storage)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = "http://127.0.0.1:%i" % server.server_address[1]
+    # The processing libraries resolve the scenes with the local backend
+    satellite_config.BACKEND = "local"
+    satellite_config.LOCAL_OBJECT_STORE_URL = base_url
+    catalog = LocalSatelliteCatalog(
+        path=os.path.join(work_dir, "catalog.sqlite"),
+        object_store_url=base_url,
+    )
+    try:
+        project = os.path.join(work_dir, "utm32n")
+        subprocess.run(
+            [args.grass, "-e", "-c", EPSG, project],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        archive_count = 0
+        for scene in args.scenes:
+            for size in args.sizes:
+                # Each scene has another sensing year, so that the scene ids
+                # of the sizes differ
+                archive_count += 1
+                file_bytes = get_directory_size(storage)
+                scene_ids = create_synthetic_archive(
+                    catalog,
+                    storage,
+                    landsat=int(scene == "landsat"),
+                    sentinel2=int(scene == "sentinel2"),
+                    size=size,
+                    start_time="%i-06-01T10:00:00" % (2000 + archive_count),
+                )
+                file_bytes = get_directory_size(storage) - file_bytes
+                timer = StageTimer()
+                for index in range(args.repeat):
+                    run_pipeline(
+                        args.grass,
+                        project,
+                        catalog,
+                        scene,
+                        scene_ids[scene][0],
+                        work_dir,
+                        timer,
+                        index,
+                    )
+                medians = timer.medians()
+                for stage in STAGES:
+                    if stage not in medians:
+                        continue
+                    results.append(
+                        {
+                            "scene": scene,
+                            "size": size,
+                            "stage": stage,
+                            "seconds": medians[stage],
+                            "file_bytes": file_bytes,
+                        }
+                    )
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    status = 0
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        report["regressions"] = compare_with_baseline(
+            results, baseline["results"], args.tolerance, args.min_seconds
+        )
+        if report["regressions"]:
+            status = 2
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Benchmark of the JSON serializers and the response compression
+
+Synthetic payloads that resemble the responses of the plugin are created:
+scene lists of the Landsat and Sentinel-2 queries and processing responses
+with module results of many process steps. Each payload is serialized with
+each available serializer and compressed with each available content
+encoding. The median times and the response sizes are reported as JSON.
+
+Usage:
+
+    python3 benchmarks/serialization_benchmark.py --rows 1000 10000
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from actinia_satellite_plugin.serialization import (
+    SERIALIZERS,
+    brotli,
+    compress,
+)
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+RESOURCE_ID = "resource_id-6282c634-42e1-417c-a092-c9b21c3283cc"
+
+
+def create_scene_list(rows):
+    """A scene list like the response of the Sentinel-2 query"""
+    return [
+        {
+            "scene_id": "S2A_MSIL1C_20170212T104141_N0204_R008_T31TGJ_%08i"
+            % i,
+            "sensing_time": "2017-02-12T10:41:38.%06iZ" % i,
+            "cloud_cover": (i * 7) % 100 + 0.25,
+            "north": 41.5 + i * 1e-5,
+            "south": 41.2 + i * 1e-5,
+            "east": 24.7 - i * 1e-5,
+            "west": 24.6 - i * 1e-5,
+        }
+        for i in range(rows)
+    ]
+
+
+def create_processing_response(steps):
+    """A processing response with the module results of many steps"""
+    process_log = [
+        {
+            "executable": "r.univar",
+            "id": "univar_%i" % i,
+            "parameter": ["map=ndvi_%i" % i, "-g"],
+            "return_code": 0,
+            "run_time": 0.05 + i * 1e-4,
+            "stderr": ["100%"] * 4,
+            "stdout": "n=1000000\nmin=-1\nmax=1\nmean=0.4\nstddev=0.2\n",
+        }
+        for i in range(steps)
+    ]
+    return {
+        "accept_datetime": "2018-05-30 11:16:03.033305",
+        "api_info": {
+            "endpoint": "asyncephemerallandsatprocessingresource",
+            "method": "POST",
+            "path": "/api/v3/landsat_process/LC80440342016259LGN00/TOAR/NDVI",
+        },
+        "process_log": process_log,
+        "process_results": [
+            {
+                "name": "ndvi_%i" % i,
+                "cells": 1000000,
+                "min": -1.0,
+                "max": 1.0,
+                "mean": 0.4,
+                "stddev": 0.2,
+            }
+            for i in range(steps)
+        ],
+        "resource_id": RESOURCE_ID,
+        "status": "finished",
+        "urls": {"resources": ["/resources/%s/ndvi.tiff" % RESOURCE_ID]},
+        "user_id": "superadmin",
+    }
+
+
+def median_time(function, *args, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        times.append(time.perf_counter() - start)
+    return sorted(times)[len(times) // 2], result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[4])
+    parser.add_argument(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=[1000, 10000],
+        help="The number of scenes and of process steps of the payloads",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write the JSON results to a file")
+    args = parser.parse_args(argv)
+
+    encodings = ["gzip", "br"] if brotli is not None else ["gzip"]
+    results = []
+    for rows in args.rows:
+        payloads = {
+            "scene_list": create_scene_list(rows),
+            "processing_response": create_processing_response(rows),
+        }
+        for payload, data in payloads.items():
+            for name, serializer in sorted(SERIALIZERS.items()):
+                seconds, body = median_time(
+                    serializer, data, repeat=args.repeat
+                )
+                entry = {
+                    "payload": payload,
+                    "rows": rows,
+                    "serializer": name,
+                    "seconds": seconds,
+                    "bytes": len(body),
+                }
+                for encoding in encodings:
+                    seconds, compressed = median_time(
+                        compress, body, encoding, repeat=args.repeat
+                    )
+                    entry[encoding] = {
+                        "seconds": seconds,
+                        "bytes": len(compressed),
+                    }
+                results.append(entry)
+
+    report = {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
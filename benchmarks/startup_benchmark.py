@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Startup benchmark of the API server and the queue worker import graphs
+
+The modules that are loaded by an API server process (the endpoints and the
+resources that enqueue the jobs) and by a queue worker (additionally the
+processing classes) are imported in fresh Python interpreters. The import
+time reported by "python -X importtime", the wall time and the peak resident
+set size of each interpreter are reported as JSON. The "api" profile must
+not load the processing modules, this is checked as well.
+
+Usage:
+
+    python3 benchmarks/startup_benchmark.py --repeat 5
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+PACKAGE = "actinia_satellite_plugin"
+
+# The processing modules that are only required by the queue workers
+WORKER_MODULES = [
+    "actinia_processing_lib.ephemeral_processing_with_export",
+    "actinia_processing_lib.persistent_processing",
+    PACKAGE + ".ephemeral_landsat_ndvi_processing",
+    PACKAGE + ".ephemeral_sentinel2_ndvi_processing",
+    PACKAGE + ".persistent_landsat_timeseries_processing",
+    PACKAGE + ".persistent_sentinel2_timeseries_processing",
+]
+
+PROFILES = {
+    "api": [PACKAGE + ".endpoints"],
+    "worker": [PACKAGE + ".endpoints"] + WORKER_MODULES[2:],
+}
+
+# Print the peak RSS in kilobytes and the loaded worker modules after the
+# imports
+SCRIPT = """
+import resource, sys
+%s
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+print(",".join(m for m in %r if m in sys.modules))
+"""
+
+
+def parse_importtime(stderr):
+    """Sum the self import times of the -X importtime output
+
+    Returns:
+        (float)
+        The import time in seconds
+
+    """
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            total += int(fields[0])
+        except ValueError:
+            # The header line
+            continue
+    return total / 1000000.0
+
+
+def measure(modules, python):
+    """Import the modules in a fresh interpreter
+
+    Returns:
+        (dict)
+        The import time, the wall time, the peak RSS in MiB and the loaded
+        worker modules
+
+    """
+    script = SCRIPT % (
+        "\n".join("import %s" % module for module in modules),
+        WORKER_MODULES,
+    )
+    start = time.perf_counter()
+    process = subprocess.run(
+        [python, "-X", "importtime", "-c", script],
+        capture_output=True,
+        text=True,
+    )
+    wall_time = time.perf_counter() - start
+    if process.returncode != 0:
+        errors = [
+            line
+            for line in process.stderr.splitlines()
+            if not line.startswith("import time:")
+        ]
+        raise RuntimeError("\n".join(errors) or process.returncode)
+    rss, loaded = process.stdout.split("\n")[-3:-1]
+    return {
+        "import_seconds": parse_importtime(process.stderr),
+        "wall_seconds": wall_time,
+        # ru_maxrss is reported in bytes on macOS
+        "max_rss_mib": int(rss) / (1024.0 * 1024.0)
+        if sys.platform == "darwin"
+        else int(rss) / 1024.0,
+        "worker_modules": [m for m in loaded.split(",") if m],
+    }
+
+
+def median(values):
+    return sorted(values)[len(values) // 2]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[4])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--python", default=sys.executable, help="Python interpreter"
+    )
+    parser.add_argument("--output", help="Write the JSON results to a file")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for profile, modules in PROFILES.items():
+        runs = [measure(modules, args.python) for _ in range(args.repeat)]
+        results[profile] = {
+            key: median([run[key] for run in runs])
+            for key in ["import_seconds", "wall_seconds", "max_rss_mib"]
+        }
+        results[profile]["worker_modules"] = runs[0]["worker_modules"]
+
+    report = {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "repeat": args.repeat,
+        "results": results,
+        "saved_import_seconds": results["worker"]["import_seconds"]
+        - results["api"]["import_seconds"],
+        "saved_rss_mib": results["worker"]["max_rss_mib"]
+        - results["api"]["max_rss_mib"],
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+    # The API server must not load the processing modules
+    return 2 if results["api"]["worker_modules"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
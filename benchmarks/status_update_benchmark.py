@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Benchmark of the status writes of a time series import
+
+The running status updates of a time series import are simulated: a
+download update for each scene and an update for each process step of the
+scene import, separated by the given step time. The updates are sent through
+the status throttling with each minimum update interval and the writes to
+the resource database are counted. An interval of 0 writes each update, as
+without the throttling. The numbers and bytes of the writes are reported as
+JSON.
+
+Usage:
+
+    python3 benchmarks/status_update_benchmark.py --scenes 200 --steps 10
+"""
+
+import argparse
+import json
+import pickle
+import platform
+import sys
+import time
+from actinia_satellite_plugin.config import satellite_config
+from actinia_satellite_plugin.status_throttle import StatusUpdateThrottleMixin
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+RESOURCE_ID = "resource_id-6282c634-42e1-417c-a092-c9b21c3283cc"
+
+
+class Processing(object):
+    """Create the running status documents like the processing base class"""
+
+    def __init__(self, num_of_steps):
+        self.progress = {"step": 0, "num_of_steps": num_of_steps}
+        self.writes = 0
+        self.bytes = 0
+
+    def _create_document(self, status, message):
+        return pickle.dumps(
+            [
+                200,
+                {
+                    "accept_datetime": "2018-05-30 11:16:03.033305",
+                    "api_info": {
+                        "endpoint": "asyncsentinel2timeseriescreatorresource",
+                        "method": "POST",
+                        "path": "/api/v3/projects/ECAD/mapsets/s2/"
+                        "sentinel2_import",
+                    },
+                    "message": message,
+                    "progress": dict(self.progress),
+                    "resource_id": RESOURCE_ID,
+                    "status": status,
+                    "user_id": "superadmin",
+                },
+            ]
+        )
+
+    def _send_resource_update(self, message, results=None):
+        document = self._create_document("running", message)
+        self._send_to_database(document, final=False)
+
+    def _send_resource_finished(self, message):
+        document = self._create_document("finished", message)
+        self._send_to_database(document, final=True)
+
+    def _send_to_database(self, document, final=False):
+        self.writes += 1
+        self.bytes += len(document)
+
+
+class ThrottledProcessing(StatusUpdateThrottleMixin, Processing):
+    pass
+
+
+def run_import(scenes, steps, step_time):
+    processing = ThrottledProcessing(scenes * steps)
+    start = time.perf_counter()
+    for scene in range(scenes):
+        processing._send_resource_update(
+            "Download scene %i of %i" % (scene + 1, scenes)
+        )
+        for step in range(steps):
+            time.sleep(step_time)
+            processing.progress["step"] += 1
+            processing._send_resource_update(
+                "Running step %i of scene %i" % (step + 1, scene + 1)
+            )
+    processing._send_resource_finished("Finished")
+    return {
+        "seconds": time.perf_counter() - start,
+        "updates": scenes * (steps + 1),
+        "writes": processing.writes,
+        "bytes": processing.bytes,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[4])
+    parser.add_argument("--scenes", type=int, default=200)
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument(
+        "--step-time",
+        type=float,
+        default=0.002,
+        help="The duration of a process step in seconds",
+    )
+    parser.add_argument(
+        "--intervals",
+        type=float,
+        nargs="+",
+        default=[0, 0.1, 1.0],
+        help="The minimum update intervals in seconds",
+    )
+    parser.add_argument("--output", help="Write the JSON results to a file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for interval in args.intervals:
+        satellite_config.STATUS_UPDATE_MIN_INTERVAL = interval
+        entry = {"interval": interval}
+        entry.update(run_import(args.scenes, args.steps, args.step_time))
+        results.append(entry)
+
+    report = {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "scenes": args.scenes,
+        "steps": args.steps,
+        "step_time": args.step_time,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
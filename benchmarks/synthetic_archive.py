@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Synthetic satellite archive of the local stand-in backends
+
+Synthetic Landsat 8 and Sentinel-2 scenes are added to the SQLite catalog of
+the local backend and their band files are written into the directory of the
+local object server. The band files are uncompressed UInt16 GeoTiffs that
+are written in pure python, GRASS and GDAL are not required.
+
+Usage:
+
+    python3 benchmarks/synthetic_archive.py create \\
+        --landsat 10 --sentinel2 10 --size 1000
+    python3 benchmarks/synthetic_archive.py serve --port 8090
+"""
+
+import argparse
+import array
+import math
+import os
+import random
+import re
+import struct
+import sys
+from datetime import datetime, timedelta
+from dateutil import parser as dtparser
+from actinia_core.core.common.landsat_processing_library import (
+    SCENE_BANDS,
+    SCENE_SUFFIXES,
+    extract_sensor_id_from_scene_id,
+    scene_id_to_google_url,
+)
+from actinia_satellite_plugin.config import satellite_config
+from actinia_satellite_plugin.local_backend import (
+    SENTINEL2_BANDS,
+    LocalSatelliteCatalog,
+    create_object_server,
+)
+from actinia_satellite_plugin.project_templates import sentinel2_product_epsg
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+def latlon_to_utm(lat, lon, zone):
+    """Project WGS84 coordinates into a UTM zone (transverse Mercator)
+
+    Args:
+        lat (float): The latitude
+        lon (float): The longitude
+        zone (int): The UTM zone
+
+    Returns:
+        (tuple)
+        The easting and the northing, the northing is negative in the
+        southern hemisphere
+
+    """
+    a = 6378137.0
+    e2 = 0.00669438
+    k0 = 0.9996
+    ep2 = e2 / (1 - e2)
+    phi = math.radians(lat)
+    lam = math.radians(lon - (zone * 6 - 183))
+    n = a / math.sqrt(1 - e2 * math.sin(phi) ** 2)
+    t = math.tan(phi) ** 2
+    c = ep2 * math.cos(phi) ** 2
+    m_a = math.cos(phi) * lam
+    m = a * (
+        (1 - e2 / 4 - 3 * e2 ** 2 / 64 - 5 * e2 ** 3 / 256) * phi
+        - (3 * e2 / 8 + 3 * e2 ** 2 / 32 + 45 * e2 ** 3 / 1024)
+        * math.sin(2 * phi)
+        + (15 * e2 ** 2 / 256 + 45 * e2 ** 3 / 1024) * math.sin(4 * phi)
+        - (35 * e2 ** 3 / 3072) * math.sin(6 * phi)
+    )
+    easting = 500000 + k0 * n * (
+        m_a
+        + (1 - t + c) * m_a ** 3 / 6
+        + (5 - 18 * t + t ** 2 + 72 * c - 58 * ep2) * m_a ** 5 / 120
+    )
+    northing = k0 * (
+        m
+        + n
+        * math.tan(phi)
+        * (
+            m_a ** 2 / 2
+            + (5 - t + 9 * c + 4 * c ** 2) * m_a ** 4 / 24
+            + (61 - 58 * t + t ** 2 + 600 * c - 330 * ep2) * m_a ** 6 / 720
+        )
+    )
+    return easting, northing
+
+
+def write_synthetic_geotiff(path, size, epsg, west, north, res, seed=0):
+    """Write an uncompressed UInt16 GeoTiff with pseudo random values
+
+    Args:
+        path (str): The output file
+        size (int): The number of rows and columns
+        epsg (int): The EPSG code of the projected coordinate system
+        west (float): The western border
+        north (float): The northern border
+        res (float): The resolution
+        seed: The seed of the values
+
+    """
+    # A small set of random rows is repeated, a fully random raster of a
+    # few thousand pixels per side would take minutes in pure python
+    rng = random.Random(seed)
+    rows = [
+        array.array("H", (rng.randint(0, 10000) for _ in range(size)))
+        for _ in range(17)
+    ]
+    for row in rows:
+        if sys.byteorder != "little":
+            row.byteswap()
+    rows = [row.tobytes() for row in rows]
+
+    rows_per_strip = max(1, 65536 // (size * 2))
+    strip_count = (size + rows_per_strip - 1) // rows_per_strip
+    row_bytes = size * 2
+    strip_offsets = []
+    strip_byte_counts = []
+
+    # Header, image data, then the IFD with the out of line values
+    with open(path, "wb") as f:
+        f.write(b"II*\x00\x00\x00\x00\x00")
+        for strip in range(strip_count):
+            first = strip * rows_per_strip
+            last = min(size, first + rows_per_strip)
+            strip_offsets.append(f.tell())
+            strip_byte_counts.append((last - first) * row_bytes)
+            f.write(b"".join(rows[i % len(rows)] for i in range(first, last)))
+        if f.tell() % 2:
+            f.write(b"\x00")
+
+        # tag, type, values; type 3 is SHORT, 4 LONG and 12 DOUBLE
+        entries = [
+            (256, 4, [size]),
+            (257, 4, [size]),
+            (258, 3, [16]),
+            (259, 3, [1]),
+            (262, 3, [1]),
+            (273, 4, strip_offsets),
+            (277, 3, [1]),
+            (278, 4, [rows_per_strip]),
+            (279, 4, strip_byte_counts),
+            (284, 3, [1]),
+            (339, 3, [1]),
+            (33550, 12, [res, res, 0.0]),
+            (33922, 12, [0.0, 0.0, 0.0, west, north, 0.0]),
+            # Projected model, pixel is area and the EPSG code
+            (34735, 3, [1, 1, 0, 3, 1024, 0, 1, 1, 1025, 0, 1, 1, 3072, 0,
+                        1, epsg]),
+        ]
+        formats = {3: "H", 4: "I", 12: "d"}
+        ifd_offset = f.tell()
+        data_offset = ifd_offset + 2 + len(entries) * 12 + 4
+        ifd = struct.pack("<H", len(entries))
+        data = b""
+        for tag, type_, values in entries:
+            packed = struct.pack(
+                "<%i%s" % (len(values), formats[type_]), *values
+            )
+            if len(packed) <= 4:
+                value = packed.ljust(4, b"\x00")
+            else:
+                value = struct.pack("<I", data_offset + len(data))
+                data += packed
+            ifd += struct.pack("<HHI", tag, type_, len(values)) + value
+        f.write(ifd + struct.pack("<I", 0) + data)
+        f.seek(4)
+        f.write(struct.pack("<I", ifd_offset))
+
+
+def create_landsat_mtl(scene_id, sensing_time, bounds, zone):
+    """Create a minimal Landsat MTL metadata file for a synthetic scene
+
+    Args:
+        scene_id (str): The Landsat scene id
+        sensing_time (str): The sensing time as ISO string
+        bounds (tuple): The (north, south, east, west) lat/lon bounds
+        zone (int): The UTM zone
+
+    Returns:
+        (str)
+        The content of the MTL file
+
+    """
+    sensor_id = extract_sensor_id_from_scene_id(scene_id)
+    north, south, east, west = bounds
+    date, time_ = (
+        dtparser.parse(sensing_time).strftime("%Y-%m-%dT%H:%M:%S").split("T")
+    )
+    lines = [
+        "GROUP = L1_METADATA_FILE",
+        "  GROUP = METADATA_FILE_INFO",
+        '    LANDSAT_PRODUCT_ID = "%s"' % scene_id,
+        "  END_GROUP = METADATA_FILE_INFO",
+        "  GROUP = PRODUCT_METADATA",
+        '    SPACECRAFT_ID = "LANDSAT_%i"' % int(sensor_id[2:]),
+        "    DATE_ACQUIRED = %s" % date,
+        '    SCENE_CENTER_TIME = "%sZ"' % time_,
+        "    CORNER_UL_LAT_PRODUCT = %.5f" % north,
+        "    CORNER_UL_LON_PRODUCT = %.5f" % west,
+        "    CORNER_LR_LAT_PRODUCT = %.5f" % south,
+        "    CORNER_LR_LON_PRODUCT = %.5f" % east,
+        "  END_GROUP = PRODUCT_METADATA",
+        "  GROUP = IMAGE_ATTRIBUTES",
+        "    CLOUD_COVER = 0.00",
+        "    SUN_AZIMUTH = 150.0",
+        "    SUN_ELEVATION = 45.0",
+        "    EARTH_SUN_DISTANCE = 1.0",
+        "  END_GROUP = IMAGE_ATTRIBUTES",
+        "  GROUP = MIN_MAX_RADIANCE",
+    ]
+    band_numbers = [band[1:] for band in SCENE_BANDS[sensor_id][:-1]]
+    for number in band_numbers:
+        lines.append("    RADIANCE_MAXIMUM_BAND_%s = 600.0" % number)
+        lines.append("    RADIANCE_MINIMUM_BAND_%s = -50.0" % number)
+    lines.append("  END_GROUP = MIN_MAX_RADIANCE")
+    lines.append("  GROUP = MIN_MAX_REFLECTANCE")
+    for number in band_numbers:
+        lines.append("    REFLECTANCE_MAXIMUM_BAND_%s = 1.2" % number)
+        lines.append("    REFLECTANCE_MINIMUM_BAND_%s = -0.1" % number)
+    lines.append("  END_GROUP = MIN_MAX_REFLECTANCE")
+    lines.append("  GROUP = MIN_MAX_PIXEL_VALUE")
+    for number in band_numbers:
+        lines.append("    QUANTIZE_CAL_MAX_BAND_%s = 65535" % number)
+        lines.append("    QUANTIZE_CAL_MIN_BAND_%s = 1" % number)
+    lines.append("  END_GROUP = MIN_MAX_PIXEL_VALUE")
+    lines.append("  GROUP = RADIOMETRIC_RESCALING")
+    for number in band_numbers:
+        lines.append("    RADIANCE_MULT_BAND_%s = 0.01" % number)
+        lines.append("    RADIANCE_ADD_BAND_%s = -50.0" % number)
+        lines.append("    REFLECTANCE_MULT_BAND_%s = 0.00002" % number)
+        lines.append("    REFLECTANCE_ADD_BAND_%s = -0.1" % number)
+    lines += [
+        "  END_GROUP = RADIOMETRIC_RESCALING",
+        "  GROUP = PROJECTION_PARAMETERS",
+        '    MAP_PROJECTION = "UTM"',
+        '    DATUM = "WGS84"',
+        '    ELLIPSOID = "WGS84"',
+        "    UTM_ZONE = %i" % zone,
+        "  END_GROUP = PROJECTION_PARAMETERS",
+        "END_GROUP = L1_METADATA_FILE",
+        "END",
+    ]
+    return "\n".join(lines) + "\n"
+
+
+def _object_path(object_store_path, url):
+    """Return the local path of a gs:// or object server URL"""
+    path = re.sub(r"^(gs://|https?://[^/]+/)", "", url)
+    return os.path.join(object_store_path, *path.split("/"))
+
+
+def create_synthetic_archive(
+    catalog,
+    object_store_path,
+    landsat=0,
+    sentinel2=0,
+    size=1000,
+    start_time="2020-01-01T10:00:00",
+):
+    """Create synthetic Landsat 8 and Sentinel-2 scenes
+
+    The scenes are located in UTM zone 32 north and added to the catalog,
+    their band files are written into the object store directory.
+
+    Args:
+        catalog (LocalSatelliteCatalog): The catalog
+        object_store_path (str): The directory of the object server
+        landsat (int): The number of Landsat scenes
+        sentinel2 (int): The number of Sentinel-2 products
+        size (int): The number of rows and columns of the band files
+        start_time (str): The sensing time of the first scene, the scenes
+                          are one day apart
+
+    Returns:
+        (dict)
+        The Landsat scene ids and the Sentinel-2 product ids
+
+    """
+    zone = 32
+    # The center of the scenes is 9°E 50°N
+    center_e, center_n = latlon_to_utm(50.0, 9.0, zone)
+    start = datetime.strptime(start_time, "%Y-%m-%dT%H:%M:%S")
+    result = {"landsat": [], "sentinel2": []}
+
+    for satellite, count, res in [
+        ("landsat", landsat, 30),
+        ("sentinel2", sentinel2, 10),
+    ]:
+        extent = size * res
+        west = center_e - extent / 2
+        north = center_n + extent / 2
+        # Approximate lat/lon bounds of the raster
+        dlat = extent / 2 / 111320.0
+        dlon = dlat / math.cos(math.radians(50.0))
+        bounds = (50.0 + dlat, 50.0 - dlat, 9.0 + dlon, 9.0 - dlon)
+
+        for index in range(count):
+            sensing = start + timedelta(days=index)
+            sensing_time = sensing.strftime("%Y-%m-%dT%H:%M:%S.000000Z")
+            date = sensing.strftime("%Y%m%d")
+            if satellite == "landsat":
+                scene_id = "LC08_L1TP_195025_%s_%s_01_T1" % (date, date)
+                for suffix in SCENE_SUFFIXES["LC08"]:
+                    path = _object_path(
+                        object_store_path,
+                        scene_id_to_google_url(scene_id, suffix),
+                    )
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    if suffix.endswith(".txt"):
+                        with open(path, "w") as f:
+                            f.write(create_landsat_mtl(
+                                scene_id, sensing_time, bounds, zone
+                            ))
+                    else:
+                        write_synthetic_geotiff(
+                            path, size, 32600 + zone, west, north, res,
+                            seed="%s%s" % (scene_id, suffix),
+                        )
+                catalog.add_landsat_scene(scene_id, sensing_time, bounds)
+            else:
+                time_ = sensing.strftime("%Y%m%dT%H%M%S")
+                scene_id = "S2A_MSIL1C_%s_N0204_R108_T32UMA_%s" % (
+                    time_,
+                    time_,
+                )
+                epsg = sentinel2_product_epsg(scene_id)
+                catalog.add_sentinel2_scene(scene_id, sensing_time, bounds)
+                query_result = catalog.get_sentinel_urls(
+                    [scene_id], SENTINEL2_BANDS
+                )[scene_id]
+                for band in SENTINEL2_BANDS:
+                    path = _object_path(
+                        object_store_path, query_result[band]["gcs_url"]
+                    )
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    write_synthetic_geotiff(
+                        path, size, epsg, west, north, res,
+                        seed="%s%s" % (scene_id, band),
+                    )
+            result[satellite].append(scene_id)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Create and serve the local stand-in satellite archive"
+    )
+    parser.add_argument(
+        "--catalog",
+        default=satellite_config.LOCAL_CATALOG_PATH,
+        help="The SQLite catalog",
+    )
+    parser.add_argument(
+        "--path",
+        default=satellite_config.LOCAL_OBJECT_STORE_PATH,
+        help="The directory of the object server",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    create = commands.add_parser("create", help="Create synthetic scenes")
+    create.add_argument("--landsat", type=int, default=5)
+    create.add_argument("--sentinel2", type=int, default=5)
+    create.add_argument("--size", type=int, default=1000)
+    create.add_argument(
+        "--object-store-url", default=satellite_config.LOCAL_OBJECT_STORE_URL
+    )
+    serve = commands.add_parser("serve", help="Run the object server")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8090)
+    args = parser.parse_args(argv)
+
+    if args.command == "create":
+        catalog = LocalSatelliteCatalog(
+            path=args.catalog, object_store_url=args.object_store_url
+        )
+        result = create_synthetic_archive(
+            catalog, args.path, args.landsat, args.sentinel2, args.size
+        )
+        for scene_ids in result.values():
+            for scene_id in scene_ids:
+                print(scene_id)
+        return 0
+
+    server = create_object_server(args.path, args.host, args.port)
+    print("Serving %s on port %i" % (args.path, server.server_address[1]))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,361 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Area of interest (AOI) support for the ephemeral satellite processors
+"""
+
+import json
+import os
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+# The name of the vector map that stores the area of interest
+AOI_VECTOR_NAME = "aoi"
+
+SUPPORTED_GEOMETRY_TYPES = ["Polygon", "MultiPolygon"]
+
+
+def _check_coordinate(lon, lat):
+    if not isinstance(lon, (int, float)) or not isinstance(lat, (int, float)):
+        raise ValueError("Coordinates of the AOI must be numbers")
+    if lon < -180.0 or lon > 180.0 or lat < -90.0 or lat > 90.0:
+        raise ValueError(
+            "Coordinates of the AOI must be WGS84 longitude/latitude values"
+        )
+
+
+def _bbox_to_geometry(bbox):
+    """Convert a bbox dict with north, south, east and west into a polygon"""
+    try:
+        north = bbox["north"]
+        south = bbox["south"]
+        east = bbox["east"]
+        west = bbox["west"]
+    except (KeyError, TypeError):
+        raise ValueError(
+            "The AOI bbox requires the keys north, south, east and west"
+        )
+
+    _check_coordinate(west, south)
+    _check_coordinate(east, north)
+    if north <= south or east <= west:
+        raise ValueError(
+            "Wrong AOI bbox: north must be larger than south and east "
+            "must be larger than west"
+        )
+
+    return {
+        "type": "Polygon",
+        "coordinates": [
+            [
+                [west, south],
+                [east, south],
+                [east, north],
+                [west, north],
+                [west, south],
+            ]
+        ],
+    }
+
+
+def _check_geometry(geometry):
+    if not isinstance(geometry, dict):
+        raise ValueError("The AOI geometry must be a GeoJSON object")
+    if geometry.get("type") not in SUPPORTED_GEOMETRY_TYPES:
+        raise ValueError(
+            "Unsupported AOI geometry type <%s>. Supported types are: %s"
+            % (geometry.get("type"), ",".join(SUPPORTED_GEOMETRY_TYPES))
+        )
+
+    polygons = geometry.get("coordinates")
+    if geometry["type"] == "Polygon":
+        polygons = [polygons]
+    if not isinstance(polygons, list) or not polygons:
+        raise ValueError("The AOI geometry has no coordinates")
+
+    for polygon in polygons:
+        if not isinstance(polygon, list) or not polygon:
+            raise ValueError("The AOI geometry has an invalid polygon")
+        for ring in polygon:
+            if not isinstance(ring, list) or len(ring) < 4:
+                raise ValueError(
+                    "Each ring of an AOI polygon requires at least 4 "
+                    "coordinates"
+                )
+            for coordinate in ring:
+                if not isinstance(coordinate, list) or len(coordinate) < 2:
+                    raise ValueError(
+                        "The AOI geometry has invalid coordinates"
+                    )
+                _check_coordinate(coordinate[0], coordinate[1])
+            if ring[0][0:2] != ring[-1][0:2]:
+                raise ValueError("Rings of an AOI polygon must be closed")
+
+
+def _geojson_to_geometries(geojson):
+    """Extract all geometries from a GeoJSON geometry, feature or feature
+    collection
+    """
+    if not isinstance(geojson, dict):
+        raise ValueError("The AOI must be a GeoJSON object")
+
+    geojson_type = geojson.get("type")
+    if geojson_type == "FeatureCollection":
+        features = geojson.get("features")
+        if not isinstance(features, list) or not features:
+            raise ValueError("The AOI feature collection is empty")
+        geometries = []
+        for feature in features:
+            geometries.extend(_geojson_to_geometries(feature))
+        return geometries
+    if geojson_type == "Feature":
+        return [geojson.get("geometry")]
+    return [geojson]
+
+
+def create_aoi_feature_collection(request_data):
+    """Create a GeoJSON feature collection from the AOI of a request
+
+    The AOI can be provided either as bbox with the keys north, south, east
+    and west or as GeoJSON geometry, feature or feature collection
+    of (multi)polygons. All coordinates must be WGS84 longitude/latitude
+    values.
+
+    Args:
+        request_data (dict): The JSON body of the request, can be None
+
+    Returns:
+        (dict)
+        The AOI as GeoJSON feature collection or None if the request does
+        not define an AOI
+
+    Raises:
+        ValueError: If the AOI definition is invalid
+
+    """
+    if not request_data:
+        return None
+
+    bbox = request_data.get("bbox")
+    geojson = request_data.get("geojson")
+
+    if bbox is not None and geojson is not None:
+        raise ValueError("Only one of bbox or geojson can be used as AOI")
+
+    if bbox is not None:
+        geometries = [_bbox_to_geometry(bbox)]
+    elif geojson is not None:
+        geometries = _geojson_to_geometries(geojson)
+    else:
+        return None
+
+    for geometry in geometries:
+        _check_geometry(geometry)
+
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "properties": {"cat": cat}, "geometry": geom}
+            for cat, geom in enumerate(geometries, start=1)
+        ],
+    }
+
+
+def is_rectangular_aoi(request_data):
+    """Check if the AOI of a request is a simple bbox that needs no mask"""
+    return bool(request_data) and request_data.get("bbox") is not None
+
+
+def get_aoi_bbox(feature_collection):
+    """Compute the bounding box of an AOI feature collection
+
+    Args:
+        feature_collection (dict): The AOI created by
+                                   create_aoi_feature_collection()
+
+    Returns:
+        (tuple)
+        The bounding box as (west, south, east, north) tuple
+
+    """
+    lons = []
+    lats = []
+    for feature in feature_collection["features"]:
+        geometry = feature["geometry"]
+        polygons = geometry["coordinates"]
+        if geometry["type"] == "Polygon":
+            polygons = [polygons]
+        for polygon in polygons:
+            for ring in polygon:
+                for coordinate in ring:
+                    lons.append(coordinate[0])
+                    lats.append(coordinate[1])
+
+    return min(lons), min(lats), max(lons), max(lats)
+
+
+def write_aoi_file(feature_collection, file_path):
+    """Write the AOI as GeoJSON file that can be imported with v.import"""
+    with open(file_path, "w") as aoi_file:
+        json.dump(feature_collection, aoi_file)
+    return file_path
+
+
+def get_aoi_region_process_chain(aoi_file, resolution):
+    """Create the process chain that imports the AOI and sets the
+    computational region to it
+
+    Args:
+        aoi_file (str): The path of the GeoJSON AOI file
+        resolution (int): The resolution of the region in map units
+
+    Returns:
+        (dict)
+        The process chain
+
+    """
+    pc = dict()
+    pc["1"] = {
+        "module": "v.import",
+        "inputs": {"input": aoi_file},
+        "outputs": {"output": {"name": AOI_VECTOR_NAME}},
+    }
+    pc["2"] = {
+        "module": "g.region",
+        "inputs": {"vector": AOI_VECTOR_NAME, "res": str(resolution)},
+        "flags": "a",
+    }
+    return pc
+
+
+def get_aoi_align_process_chain(raster_name):
+    """Create the process chain that aligns the AOI region to the pixel
+    grid of an imported raster layer
+    """
+    pc = dict()
+    pc["1"] = {
+        "module": "g.region",
+        "inputs": {"vector": AOI_VECTOR_NAME, "align": raster_name},
+    }
+    return pc
+
+
+def get_aoi_mask_process_chain():
+    """Create the process chain that masks all pixels outside the AOI"""
+    pc = dict()
+    pc["1"] = {"module": "r.mask", "inputs": {"vector": AOI_VECTOR_NAME}}
+    return pc
+
+
+def _intersect_projwin(projwin, bbox):
+    """Intersect a gdal_translate projwin (ulx, uly, lrx, lry) with an
+    AOI bbox (west, south, east, north)
+    """
+    ulx, uly, lrx, lry = projwin
+    west, south, east, north = bbox
+    ulx = max(ulx, west)
+    uly = min(uly, north)
+    lrx = min(lrx, east)
+    lry = max(lry, south)
+    if ulx >= lrx or lry >= uly:
+        raise ValueError("The AOI does not intersect the scene")
+    return ulx, uly, lrx, lry
+
+
+def limit_import_process_list_to_aoi(process_list, bbox):
+    """Restrict the import processes of a satellite scene to the AOI
+
+    The import processes are modified in place:
+
+    - r.import reads only the current region (the AOI)
+    - r.in.gdal reads only the current region
+    - gdal_translate cuts the input files to the intersection of the
+      scene bounding box and the AOI
+    - g.region uses the AOI instead of the scene footprint
+
+    Args:
+        process_list (list): A list of Process objects
+        bbox (tuple): The AOI bounding box as (west, south, east, north)
+
+    Returns:
+        (list)
+        The modified process list
+
+    Raises:
+        ValueError: If the AOI does not intersect the scene
+
+    """
+    for process in process_list:
+        executable = os.path.basename(process.executable)
+        params = process.executable_params
+
+        if executable == "r.import":
+            if not any(p.startswith("extent=") for p in params):
+                params.append("extent=region")
+        elif executable == "r.in.gdal":
+            if "-r" not in params:
+                params.append("-r")
+        elif executable == "gdal_translate" and "-projwin" in params:
+            if "-projwin_srs" not in params or (
+                params[params.index("-projwin_srs") + 1] != "EPSG:4326"
+            ):
+                continue
+            idx = params.index("-projwin") + 1
+            projwin = [float(v) for v in params[idx:idx + 4]]
+            params[idx:idx + 4] = [
+                "%f" % v for v in _intersect_projwin(projwin, bbox)
+            ]
+        elif executable == "g.region":
+            for idx, param in enumerate(params):
+                if param.startswith("vector="):
+                    params[idx] = "vector=%s" % AOI_VECTOR_NAME
+
+    return process_list
+
+
+def relocate_vrt_files(process_list, path):
+    """Write the VRT files of the gdal_translate processes into a job
+    directory
+
+    The Sentinel-2 import writes the cropped VRT file of each band next to
+    the band file in the download cache of the user. The jobs of a user
+    share this cache, so a job with another AOI would overwrite the VRT
+    file while it is imported or linked. The VRT files are written into
+    the given directory instead and the processes that read them are
+    updated.
+
+    The processes are modified in place.
+
+    Args:
+        process_list (list): A list of Process objects
+        path (str): The temporary file directory of the job
+
+    Returns:
+        (list)
+        The modified process list
+
+    """
+    vrt_files = {}
+    for process in process_list:
+        executable = os.path.basename(process.executable)
+        params = process.executable_params
+        if (
+            executable == "gdal_translate"
+            and params
+            and params[-1].endswith(".vrt")
+        ):
+            vrt_file = os.path.join(path, os.path.basename(params[-1]))
+            vrt_files[params[-1]] = vrt_file
+            params[-1] = vrt_file
+            continue
+        for idx, param in enumerate(params):
+            key, sep, value = param.partition("=")
+            if sep and value in vrt_files:
+                params[idx] = "%s=%s" % (key, vrt_files[value])
+    return process_list
@@ -7,17 +7,16 @@ actinia AWS Sentinel-2 query
 """
 
 from actinia_core.core.common.config import global_config
-from flask import jsonify, make_response
 from actinia_core.core.common.app import auth
 from actinia_core.core.common.api_logger import log_api_call
 from actinia_core.models.response_models import SimpleResponseModel
-from actinia_core.core.common.aws_sentinel_interface import (
-    AWSSentinel2AInterface,
-)
 from actinia_rest_lib.resource_base import ResourceBase
-from flask_restful_swagger_2 import swagger, Schema
-from copy import deepcopy
+from flask_restful_swagger_2 import Schema
+from .local_backend import get_aws_interface
+from .metrics import lookup_timer
 
+from .swagger_docs import lazy_doc
+from .serialization import make_json_response
 
 __license__ = "GPL-3.0-or-later"
 __author__ = "Sören Gebbert"
@@ -297,23 +296,24 @@ class AWSSentinel2ADownloadLinkQuery(ResourceBase):
 
     decorators = [log_api_call, auth.login_required]
 
-    @swagger.doc(deepcopy(SCHEMA_DOC))
+    @lazy_doc(SCHEMA_DOC)
     def post(self):
         """Generate the download urls for a list of sentinel2A scenes and band
         numbers.
         """
 
         try:
-            iface = AWSSentinel2AInterface(global_config)
+            iface = get_aws_interface(global_config)
 
             rdc = self.preprocess(has_json=True, has_xml=False)
 
-            result = iface.get_sentinel_urls(
-                product_ids=rdc.request_data["product_ids"],
-                bands=rdc.request_data["bands"],
-            )
+            with lookup_timer("aws", "get_sentinel_urls"):
+                result = iface.get_sentinel_urls(
+                    product_ids=rdc.request_data["product_ids"],
+                    bands=rdc.request_data["bands"],
+                )
 
-            return make_response(jsonify(result), 200)
+            return make_json_response(result, 200)
         except Exception as e:
             result = {"status": "error", "message": str(e)}
-            return make_response(jsonify(result), 400)
+            return make_json_response(result, 400)
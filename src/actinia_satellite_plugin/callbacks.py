@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Completion callbacks of the satellite processing and import jobs
+
+A request can provide a callback_url. The final response model of the job
+(finished, error or terminated) is POSTed as JSON to this URL after it was
+written to the resource database. The delivery runs as a separate job, so
+that the retries do not block the worker of the finished job. Connection
+errors, timeouts and the status codes 429 and 5xx are retried with
+exponential backoff.
+
+Callback hosts that resolve to loopback, link-local, private or reserved
+addresses are rejected, unless they are listed in CALLBACK_ALLOWED_HOSTS,
+since the requests are sent from the workers inside the actinia network.
+"""
+
+import ipaddress
+import pickle
+import random
+import socket
+import time
+from urllib.parse import urlparse
+import requests
+from actinia_core.core.common.kvdb_interface import enqueue_job
+from actinia_core.core.logging_interface import log
+from .config import satellite_config
+from .metrics import metrics
+from .serialization import dumps
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+CALLBACK_URL_PROPERTY = {
+    "type": "string",
+    "description": "An HTTP(S) URL that receives the final response model "
+    "of the job as JSON POST request, when the job is finished, failed or "
+    "was terminated. The delivery is retried with exponential backoff.",
+}
+
+
+def is_public_address(address):
+    """Return True if an IP address is globally reachable"""
+    ip = ipaddress.ip_address(address.split("%")[0])
+    if getattr(ip, "ipv4_mapped", None) is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def check_callback_host(hostname):
+    """Check the host of a callback URL
+
+    The host must be listed in CALLBACK_ALLOWED_HOSTS, if the list is not
+    empty. A host that is not listed must resolve to public addresses only.
+
+    Returns:
+        (str)
+        The error message or None
+
+    """
+    hostname = hostname.lower()
+    allowed_hosts = [
+        host.strip().lower()
+        for host in satellite_config.CALLBACK_ALLOWED_HOSTS.split(",")
+        if host.strip()
+    ]
+    if hostname in allowed_hosts:
+        return None
+    if allowed_hosts:
+        return "The host of the callback_url is not allowed"
+    try:
+        addresses = [
+            info[4][0] for info in socket.getaddrinfo(hostname, None)
+        ]
+    except (socket.gaierror, UnicodeError):
+        return "The host of the callback_url can not be resolved"
+    if not addresses or not all(map(is_public_address, addresses)):
+        return "The host of the callback_url is not a public address"
+    return None
+
+
+def check_callback_url(request_data):
+    """Check the callback URL of a request
+
+    Returns:
+        (str)
+        The error message or None
+
+    """
+    if not isinstance(request_data, dict):
+        return None
+    url = request_data.get("callback_url")
+    if url is None:
+        return None
+    if not isinstance(url, str):
+        return "The callback_url must be a string"
+    parsed = urlparse(url)
+    if parsed.scheme not in ["http", "https"] or not parsed.hostname:
+        return "The callback_url must be an HTTP or HTTPS URL"
+    return check_callback_host(parsed.hostname)
+
+
+def get_backoff_delay(attempt, response=None):
+    """Return the delay in seconds before the next delivery attempt
+
+    The delay is doubled with each attempt, capped by CALLBACK_MAX_BACKOFF
+    and randomized by up to 50 percent, so that the callbacks of jobs that
+    failed together are spread. A Retry-After header in seconds is honored.
+
+    Args:
+        attempt (int): The number of the failed attempt, starting with 0
+        response (requests.Response): The response of the failed attempt
+
+    """
+    delay = min(
+        satellite_config.CALLBACK_BACKOFF * 2 ** attempt,
+        satellite_config.CALLBACK_MAX_BACKOFF,
+    )
+    delay *= 0.5 + random.random() / 2
+    if response is not None:
+        try:
+            retry_after = float(response.headers.get("Retry-After", ""))
+        except ValueError:
+            retry_after = 0
+        delay = max(
+            delay, min(retry_after, satellite_config.CALLBACK_MAX_BACKOFF)
+        )
+    return delay
+
+
+def deliver_callback(url, payload, sleep=time.sleep):
+    """POST a payload as JSON to a callback URL
+
+    The host is checked again before the delivery, since its addresses may
+    have changed since the request was accepted. Redirects are not
+    followed.
+
+    Args:
+        url (str): The callback URL
+        payload: The JSON serializable payload
+        sleep: The function that waits between the attempts
+
+    Returns:
+        (tuple)
+        True if the callback was delivered and the error message of the
+        last attempt
+
+    """
+    error = check_callback_host(urlparse(url).hostname)
+    if error is not None:
+        return False, error
+
+    body = dumps(payload)
+    response = None
+    for attempt in range(max(satellite_config.CALLBACK_RETRIES, 0) + 1):
+        if attempt > 0:
+            sleep(get_backoff_delay(attempt - 1, response))
+        response = None
+        try:
+            response = requests.post(
+                url,
+                data=body,
+                headers={"Content-Type": "application/json"},
+                timeout=satellite_config.CALLBACK_TIMEOUT,
+                allow_redirects=False,
+            )
+        except requests.RequestException as e:
+            error = str(e)
+            continue
+        if response.status_code < 300:
+            return True, None
+        error = "HTTP status code %i" % response.status_code
+        if response.status_code != 429 and response.status_code < 500:
+            # The receiver rejected the callback, a retry will not help
+            break
+    return False, error
+
+
+def get_callback_job_timeout():
+    """Return the timeout of a callback job, that covers all retries"""
+    retries = max(satellite_config.CALLBACK_RETRIES, 0)
+    return int(
+        (retries + 1) * satellite_config.CALLBACK_TIMEOUT
+        + retries * satellite_config.CALLBACK_MAX_BACKOFF
+        + 60
+    )
+
+
+def start_callback_job(rdc, url, payload, processor):
+    """Deliver a completion callback in a separate job
+
+    Args:
+        rdc (ResourceDataContainer): The data container of the finished job
+        url (str): The callback URL
+        payload: The final response model of the job
+        processor (str): The name of the processing class
+
+    """
+    delivered, error = deliver_callback(url, payload)
+    metrics.inc(
+        "actinia_satellite_callbacks_total",
+        help="The completion callbacks of the jobs",
+        processor=processor,
+        delivered=str(delivered).lower(),
+    )
+    if not delivered:
+        log.error(
+            "Unable to deliver the callback of %s to %s: %s"
+            % (rdc.resource_id, url, error)
+        )
+    try:
+        metrics.flush()
+    except OSError as e:
+        log.error("Unable to write the metrics: %s" % str(e))
+
+
+class CompletionCallbackMixin(object):
+    """POST the final response model of a job to the callback URL
+
+    The callback job is enqueued once by the worker after the final status
+    was committed, the job resource is final at that time. The callback is
+    delivered directly, if the job can not be enqueued.
+    """
+
+    callback_sent = False
+
+    def _send_to_database(self, document, final=False):
+        super()._send_to_database(document, final)
+        request_data = self.rdc.request_data
+        if final is not True or not isinstance(request_data, dict):
+            return
+        url = request_data.get("callback_url")
+        if not url or self.callback_sent:
+            return
+        self.callback_sent = True
+
+        _, response_model = pickle.loads(document)
+        args = (self.rdc, url, response_model, self.__class__.__name__)
+        try:
+            enqueue_job(get_callback_job_timeout(), start_callback_job, *args)
+        except Exception as e:
+            self.message_logger.error(
+                "Unable to enqueue the callback job: %s" % str(e)
+            )
+            start_callback_job(*args)
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Per-scene checkpoints of the persistent time series creators
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from .config import satellite_config
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+# The processing stages of a scene, in processing order
+CHECKPOINT_STAGES = ["downloaded", "imported", "atcor", "registered"]
+
+# The stages after which the raster maps of a scene are saved
+DATA_STAGES = ["imported", "atcor"]
+
+# The instrumentation stage of each processing stage
+INSTRUMENTATION_STAGES = {
+    "downloaded": "download",
+    "imported": "import",
+    "atcor": "atcor",
+}
+
+# The mapset elements of raster maps
+RASTER_ELEMENTS = [
+    "cell",
+    "fcell",
+    "cellhd",
+    "cats",
+    "colr",
+    "hist",
+    "cell_misc",
+]
+
+
+def get_checkpoint_key(*args):
+    """Create a checkpoint key from the arguments of a request
+
+    The same request results in the same key, so a resubmitted job finds
+    the checkpoints of a previous run.
+
+    Returns:
+        (str)
+        The checkpoint key
+
+    """
+    content = json.dumps(args, sort_keys=True)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:32]
+
+
+def _copy_file(source, dest):
+    """Copy a file, replacing an existing file"""
+    if os.path.lexists(dest):
+        os.remove(dest)
+    shutil.copy2(source, dest)
+    return dest
+
+
+def transfer_raster_maps(source_mapset, dest_mapset, prefix=""):
+    """Copy the raster elements, whose names start with prefix
+
+    The files are copied and not hardlinked, since GRASS modules like
+    r.colors, r.timestamp or r.support rewrite the support files of a
+    raster map in place, which would change the saved checkpoint as well.
+    """
+    for element in RASTER_ELEMENTS:
+        source_path = os.path.join(source_mapset, element)
+        if not os.path.isdir(source_path):
+            continue
+        dest_path = os.path.join(dest_mapset, element)
+        os.makedirs(dest_path, exist_ok=True)
+        for name in os.listdir(source_path):
+            if not name.startswith(prefix):
+                continue
+            source = os.path.join(source_path, name)
+            dest = os.path.join(dest_path, name)
+            if os.path.isdir(source):
+                shutil.copytree(
+                    source,
+                    dest,
+                    copy_function=_copy_file,
+                    dirs_exist_ok=True,
+                )
+            else:
+                _copy_file(source, dest)
+
+
+def remove_expired_checkpoints(checkpoint_path, max_age, keep=None):
+    """Remove the checkpoint directories that were not updated recently
+
+    Checkpoints are only removed by a successful job. A request that fails
+    and is never resubmitted, or is resubmitted with another checkpoint
+    key, would leave its checkpoints on disk forever.
+
+    Args:
+        checkpoint_path (str): The directory of all checkpoints of a user
+        max_age (float): The maximum age in seconds, 0 disables the removal
+        keep (str): The name of a checkpoint directory that is kept
+
+    Returns:
+        (list)
+        The names of the removed checkpoint directories
+
+    """
+    if max_age <= 0 or not os.path.isdir(checkpoint_path):
+        return []
+    removed = []
+    now = time.time()
+    for name in os.listdir(checkpoint_path):
+        path = os.path.join(checkpoint_path, name)
+        if name == keep or not os.path.isdir(path):
+            continue
+        # The state file is replaced after each completed stage
+        state_file = os.path.join(path, "state.json")
+        try:
+            if os.path.isfile(state_file):
+                mtime = os.stat(state_file).st_mtime
+            else:
+                mtime = os.stat(path).st_mtime
+        except OSError:
+            continue
+        if now - mtime > max_age:
+            shutil.rmtree(path, ignore_errors=True)
+            removed.append(name)
+    return removed
+
+
+class SceneCheckpoints(object):
+    """The checkpoints of a time series import
+
+    The completed processing stages of each scene are stored in a state
+    file. The raster maps of a scene are saved in a checkpoint mapset
+    directory after the import and the atmospheric correction, so a
+    resubmitted job restores them instead of processing the scene again.
+    """
+
+    def __init__(self, checkpoint_path):
+        """
+        Args:
+            checkpoint_path (str): The checkpoint directory of a job
+
+        """
+        self.checkpoint_path = checkpoint_path
+        self.state_file = os.path.join(checkpoint_path, "state.json")
+        self.mapset_path = os.path.join(checkpoint_path, "mapset")
+        self.state = {}
+        if os.path.isfile(self.state_file):
+            with open(self.state_file, "r") as f:
+                self.state = json.load(f)
+
+    def get_stages(self, scene_id):
+        """Return the completed stages of a scene"""
+        return self.state.get(scene_id, [])
+
+    def is_done(self, scene_id, stage):
+        """Check if a stage of a scene was completed"""
+        return stage in self.get_stages(scene_id)
+
+    def set_done(self, scene_id, stage):
+        """Record a completed stage of a scene
+
+        The state file is replaced atomically, so it is never broken if the
+        job is terminated.
+        """
+        if stage not in CHECKPOINT_STAGES:
+            raise ValueError("Unknown checkpoint stage <%s>" % stage)
+        if self.is_done(scene_id, stage):
+            return
+        self.state.setdefault(scene_id, []).append(stage)
+        os.makedirs(self.checkpoint_path, exist_ok=True)
+        with open(self.state_file + ".new", "w") as f:
+            json.dump(self.state, f)
+        os.rename(self.state_file + ".new", self.state_file)
+
+    def save_scene(self, scene_id, mapset_path):
+        """Save the raster maps of a scene in the checkpoint mapset
+
+        Args:
+            scene_id (str): The scene id, the prefix of all its raster maps
+            mapset_path (str): The path of the mapset with the raster maps
+
+        """
+        transfer_raster_maps(mapset_path, self.mapset_path, prefix=scene_id)
+
+    def restore(self, mapset_path):
+        """Restore all saved raster maps into a mapset
+
+        Args:
+            mapset_path (str): The path of the target mapset
+
+        Returns:
+            (list)
+            The ids of scenes with completed stages
+
+        """
+        if os.path.isdir(self.mapset_path):
+            transfer_raster_maps(self.mapset_path, mapset_path)
+        return sorted(self.state)
+
+    def remove(self):
+        """Remove the checkpoint directory"""
+        shutil.rmtree(self.checkpoint_path, ignore_errors=True)
+
+
+class SceneCheckpointMixin(object):
+    """Resume the persistent time series creators from checkpoints
+
+    Each scene is processed stage by stage and every completed stage is
+    recorded. If a job dies, a resubmission with the same request or the
+    same checkpoint_key restores the completed scenes and continues with
+    the remaining stages. The checkpoints are removed when the time series
+    was successfully copied into the target mapset, or when they expire.
+    """
+
+    checkpoints = None
+
+    def _setup_checkpoints(self, *key_args):
+        """Open the checkpoints of the job
+
+        Args:
+            *key_args: The request arguments, that define the default
+                       checkpoint key
+
+        """
+        if not satellite_config.CHECKPOINTS:
+            return
+        # The key is used as directory name
+        key = "".join(
+            c
+            for c in str(self.rdc.request_data.get("checkpoint_key") or "")
+            if c.isalnum() or c in "-_"
+        )
+        if not key:
+            key = get_checkpoint_key(
+                self.user_id,
+                self.project_name,
+                self.mapset_name,
+                *key_args,
+            )
+        checkpoint_path = satellite_config.CHECKPOINT_PATH or os.path.join(
+            self.config.DOWNLOAD_CACHE, self.user_id, "checkpoints"
+        )
+        remove_expired_checkpoints(
+            checkpoint_path, satellite_config.CHECKPOINT_MAX_AGE, keep=key
+        )
+        self.checkpoints = SceneCheckpoints(
+            os.path.join(checkpoint_path, key)
+        )
+
+    def _restore_checkpoints(self):
+        """Restore the saved raster maps into the temporary mapset"""
+        if self.checkpoints is None:
+            return
+        scene_ids = self.checkpoints.restore(self.temp_mapset_path)
+        if scene_ids:
+            self._send_resource_update(
+                "Resume from checkpoints of %i scenes" % len(scene_ids)
+            )
+
+    def _execute_scene_stages(self, stage_list):
+        """Execute the process lists of all scenes stage by stage
+
+        The process lists are measured as instrumentation stages.
+
+        Args:
+            stage_list (list): A list of (scene_id, stage, process_list)
+                               tuples in processing order
+
+        """
+        stage_list = [
+            (scene_id, stage, process_list or [])
+            for scene_id, stage, process_list in stage_list
+            if self.checkpoints is None
+            or not self.checkpoints.is_done(scene_id, stage)
+        ]
+
+        self._update_num_of_steps(
+            sum(len(process_list) for _, _, process_list in stage_list)
+        )
+
+        for scene_id, stage, process_list in stage_list:
+            if process_list:
+                with self._stage(INSTRUMENTATION_STAGES[stage]):
+                    self._execute_process_list(process_list=process_list)
+            if self.checkpoints is not None:
+                if stage in DATA_STAGES:
+                    self.checkpoints.save_scene(
+                        scene_id, self.temp_mapset_path
+                    )
+                self.checkpoints.set_done(scene_id, stage)
+
+    def _set_scenes_registered(self, scene_ids):
+        """Record the registration of the scenes in the STRDS"""
+        if self.checkpoints is None:
+            return
+        for scene_id in scene_ids:
+            self.checkpoints.set_done(scene_id, "registered")
+
+    def _remove_checkpoints(self):
+        """Remove the checkpoints after the job finished successfully"""
+        if self.checkpoints is not None:
+            self.checkpoints.remove()
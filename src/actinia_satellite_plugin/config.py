@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Configuration of the satellite plugin
+"""
+
+import configparser
+import os
+from actinia_core.core.common.config import DEFAULT_CONFIG_PATH
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+CONFIG_SECTION = "SATELLITE"
+ENV_PREFIX = "SATELLITE_"
+
+
+def _convert(value, default):
+    """Convert a configuration string into the type of the default value"""
+    if isinstance(default, bool):
+        return value.strip().lower() in ["1", "true", "yes", "on"]
+    if isinstance(default, int):
+        return int(value)
+    if isinstance(default, float):
+        return float(value)
+    return value
+
+
+class SatelliteConfiguration(object):
+    """Configuration of the satellite plugin
+
+    The options are read from the [SATELLITE] section of the actinia
+    configuration file. Each option can be overwritten with an environment
+    variable that has the option name with the prefix SATELLITE_, e.g.
+    SATELLITE_PROJECT_TEMPLATE_PATH.
+    """
+
+    def __init__(self):
+        # Use GRASS project templates instead of creating a new project
+        # for each ephemeral processing job. The templates are disabled by
+        # default.
+        self.PROJECT_TEMPLATES = False
+        # The directory that stores the project templates, one for each
+        # EPSG code
+        self.PROJECT_TEMPLATE_PATH = "/tmp/actinia_satellite/project_templates"
+        # Lease initialized GRASS projects from a warm pool, requires the
+        # project templates. The pool is disabled by default.
+        self.WARM_POOL = False
+        # The directory of the warm pool, it must be located on the same
+        # file system as the temporary GRASS database. Default is a
+        # directory in the temporary GRASS database.
+        self.WARM_POOL_PATH = ""
+        # The number of warm projects for each EPSG code
+        self.WARM_POOL_SIZE = 2
+        # Record per-scene checkpoints of the time series imports, so that
+        # resubmitted jobs resume from the last completed scene. The
+        # checkpoints are disabled by default.
+        self.CHECKPOINTS = False
+        # The directory of the checkpoints. Default is a directory in the
+        # user specific download cache.
+        self.CHECKPOINT_PATH = ""
+        # The checkpoints of a user that were not updated for this number of
+        # seconds are removed when a job of the user starts, 0 keeps them
+        self.CHECKPOINT_MAX_AGE = 604800
+        # The assumed download rate in bytes per second and the assumed
+        # duration of a process step in seconds of the dry-run estimates
+        self.DRY_RUN_DOWNLOAD_RATE = 20000000
+        self.DRY_RUN_SECONDS_PER_STEP = 5.0
+        # Record Prometheus-style metrics of the processing stages
+        self.METRICS = True
+        # The directory that stores the metrics of all actinia processes, it
+        # must be shared by the API server and the workers
+        self.METRICS_PATH = "/tmp/actinia_satellite/metrics"
+        # The minimum interval in seconds between two metrics flushes of the
+        # API server processes
+        self.METRICS_FLUSH_INTERVAL = 10.0
+        # The satellite archive backend: "google" for Google BigQuery, GCS
+        # and AWS or "local" for the SQLite catalog and the local object
+        # server of the module local_backend
+        self.BACKEND = "google"
+        # The SQLite catalog of the local backend
+        self.LOCAL_CATALOG_PATH = "/tmp/actinia_satellite/catalog.sqlite"
+        # The directory and the base URL of the local object server
+        self.LOCAL_OBJECT_STORE_PATH = "/tmp/actinia_satellite/object_store"
+        self.LOCAL_OBJECT_STORE_URL = "http://127.0.0.1:8090"
+        # The JSON serializer of the responses: "auto" uses orjson if it is
+        # installed, "orjson" or "json" for the standard library
+        self.JSON_SERIALIZER = "auto"
+        # Compress the responses with brotli or gzip, if the client accepts
+        # it and the response is larger than the minimum size in bytes
+        self.RESPONSE_COMPRESSION = True
+        self.RESPONSE_COMPRESSION_MIN_SIZE = 1024
+        # The max-age in seconds of the Cache-Control header of the scene
+        # query responses, 0 disables the ETag and Cache-Control headers
+        self.QUERY_CACHE_MAX_AGE = 300
+        # Allow shared caches, e.g. a reverse proxy, to store the query
+        # responses for each Authorization header
+        self.QUERY_CACHE_PUBLIC = False
+        # The Google archives are assumed to change at most once in this
+        # interval in seconds, it defines the catalog version of the ETags
+        self.QUERY_CATALOG_VERSION_INTERVAL = 3600
+        # The maximum duration in seconds of a status stream and of a long
+        # poll, the default waiting time of a long poll, the interval of the
+        # heartbeat events and the reconnection delay of the clients
+        self.STATUS_STREAM_TIMEOUT = 300
+        self.STATUS_LONG_POLL_TIMEOUT = 30
+        self.STATUS_STREAM_HEARTBEAT = 15
+        self.STATUS_STREAM_RETRY = 3
+        # The number of retries of a completion callback, the initial and
+        # the maximum backoff delay and the request timeout in seconds
+        self.CALLBACK_RETRIES = 5
+        self.CALLBACK_BACKOFF = 1.0
+        self.CALLBACK_MAX_BACKOFF = 60.0
+        self.CALLBACK_TIMEOUT = 10.0
+        # A comma separated list of the host names that are allowed in the
+        # callback URLs, all hosts with public addresses are allowed if it
+        # is empty
+        self.CALLBACK_ALLOWED_HOSTS = ""
+        # The minimum interval in seconds between two running status
+        # updates of a job in the resource database, 0 writes each update
+        self.STATUS_UPDATE_MIN_INTERVAL = 1.0
+        # The number of jobs that the fair scheduler passes to the actinia
+        # job queue at the same time, usually the number of workers. The
+        # scheduler is disabled if it is 0.
+        self.SCHEDULER_SLOTS = 0
+        # The number of slots that are reserved for the interactive jobs
+        self.SCHEDULER_RESERVED_SLOTS = 1
+        # The share of the slots of the interactive jobs (ephemeral
+        # processing) and the bulk jobs (time series import)
+        self.SCHEDULER_INTERACTIVE_WEIGHT = 4
+        self.SCHEDULER_BULK_WEIGHT = 1
+        # The time in seconds that a passed job may wait in the actinia job
+        # queue, before its slot is released
+        self.SCHEDULER_START_TIMEOUT = 86400
+        # The interval in seconds in which the API server processes and the
+        # workers release the slots of the timed out jobs, 0 disables it
+        self.SCHEDULER_SWEEP_INTERVAL = 60
+
+    def __str__(self):
+        return "\n".join(
+            "%s: %s" % (key, value) for key, value in vars(self).items()
+        )
+
+    def read(self, path=DEFAULT_CONFIG_PATH):
+        """Read the configuration from a file and the environment
+
+        Args:
+            path (str): The path to the actinia configuration file
+
+        """
+        config = configparser.ConfigParser()
+        # Keep the case of the option names
+        config.optionxform = str
+        if os.path.isfile(path):
+            with open(path, "r") as configfile:
+                config.read_file(configfile)
+
+        for key, default in vars(self).items():
+            if config.has_option(CONFIG_SECTION, key):
+                setattr(
+                    self,
+                    key,
+                    _convert(config.get(CONFIG_SECTION, key), default),
+                )
+            if os.environ.get(ENV_PREFIX + key):
+                setattr(
+                    self,
+                    key,
+                    _convert(os.environ[ENV_PREFIX + key], default),
+                )
+
+
+satellite_config = SatelliteConfiguration()
+satellite_config.read()
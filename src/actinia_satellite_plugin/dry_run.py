@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Dry-run plans of the satellite import and processing resources
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from flask import request
+from actinia_core.core.common.landsat_processing_library import (
+    SCENE_SUFFIXES,
+    extract_sensor_id_from_scene_id,
+)
+from .config import satellite_config
+from .local_backend import get_landsat_file_url
+from .serialization import make_json_response
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+# The processes that download a file: the download and the move into the
+# download cache
+DOWNLOAD_STEPS_PER_FILE = 2
+# The processes that import a Sentinel-2 band: gdal_translate, r.import,
+# g.region, r.mask, r.mapcalc, r.timestamp, g.remove and r.mask -r
+SENTINEL2_STEPS_PER_BAND = 8
+# The import of the footprint and its timestamp
+SENTINEL2_FOOTPRINT_STEPS = 2
+# The statistics, the preview image and the export of an ephemeral result
+OUTPUT_STEPS = 3
+# The maximum number of parallel HEAD requests
+MAX_SIZE_REQUESTS = 16
+
+DRY_RUN_PARAMETER_DOC = {
+    "name": "dry_run",
+    "description": "Do not start the job. Resolve the download URLs, check "
+    "the download cache and return a plan with the number of bytes to "
+    "download, the cache hits, the estimated number of processing steps "
+    "and a rough estimate of the processing time.",
+    "required": False,
+    "in": "query",
+    "type": "boolean",
+    "default": False,
+}
+
+
+def is_dry_run():
+    """Check if the current request asks for a dry-run"""
+    value = request.args.get("dry_run", "false")
+    return value.strip().lower() in ["1", "true", "yes"]
+
+
+def make_dry_run_response(plan):
+    """Return the dry-run plan as HTTP response"""
+    return make_json_response(plan, 200)
+
+
+def get_remote_file_size(url, timeout=10):
+    """Request the size of a remote file with a HEAD request
+
+    Args:
+        url (str): The URL of the remote file
+        timeout (int): The timeout of the request in seconds
+
+    Returns:
+        (int)
+        The size of the file in bytes or None if the file is not available
+        or the server does not provide the size
+
+    """
+    try:
+        response = requests.head(url, allow_redirects=True, timeout=timeout)
+    except requests.RequestException:
+        return None
+    if response.status_code != 200:
+        return None
+    try:
+        return int(response.headers["Content-Length"])
+    except (KeyError, ValueError):
+        return None
+
+
+def get_landsat_scene_files(scene_id, download_cache):
+    """Return the download URLs and cache files of a Landsat scene
+
+    Args:
+        scene_id (str): The Landsat scene id
+        download_cache (str): The user specific download cache
+
+    Returns:
+        (list)
+        A list of (url, cache file) tuples
+
+    """
+    sensor_id = extract_sensor_id_from_scene_id(scene_id)
+    return [
+        (
+            get_landsat_file_url(scene_id, suffix),
+            os.path.join(download_cache, scene_id + suffix),
+        )
+        for suffix in SCENE_SUFFIXES[sensor_id]
+    ]
+
+
+def create_dry_run_plan(scenes, extra_steps=0, unresolved_scenes=()):
+    """Create the dry-run plan of a list of scenes
+
+    The cache files are checked locally, the sizes of the missing files are
+    requested in parallel from the remote servers. The plan is an upper
+    bound, checkpoints and already registered scenes are not considered.
+
+    Args:
+        scenes (list): A list of (scene id, file list, process steps)
+                       tuples. The file list contains (url, cache file)
+                       tuples, the process steps are the steps of the
+                       scene without the downloads.
+        extra_steps (int): The process steps of the job, that do not
+                           depend on the scenes
+        unresolved_scenes (list): The scene ids whose URLs can not be
+                                  resolved
+
+    Returns:
+        (dict)
+        The plan
+
+    """
+    missing_urls = [
+        url
+        for _, file_list, _ in scenes
+        for url, cache_file in file_list
+        if not os.path.isfile(cache_file)
+    ]
+    with ThreadPoolExecutor(max_workers=MAX_SIZE_REQUESTS) as executor:
+        sizes = dict(
+            zip(missing_urls, executor.map(get_remote_file_size, missing_urls))
+        )
+
+    plan = {
+        "scenes": len(scenes),
+        "files": 0,
+        "cache_hits": 0,
+        "cache_misses": 0,
+        "cached_bytes": 0,
+        "download_bytes": 0,
+        "process_steps": extra_steps,
+        "estimated_seconds": 0,
+        "unresolved_scenes": list(unresolved_scenes),
+        "unresolved_files": [],
+        "scene_plans": [],
+    }
+
+    for scene_id, file_list, steps in scenes:
+        scene_plan = {
+            "scene_id": scene_id,
+            "files": len(file_list),
+            "cache_hits": 0,
+            "download_bytes": 0,
+            "process_steps": steps,
+        }
+        for url, cache_file in file_list:
+            if url not in sizes:
+                scene_plan["cache_hits"] += 1
+                plan["cached_bytes"] += os.path.getsize(cache_file)
+                continue
+            scene_plan["process_steps"] += DOWNLOAD_STEPS_PER_FILE
+            if sizes[url] is None:
+                plan["unresolved_files"].append(url)
+            else:
+                scene_plan["download_bytes"] += sizes[url]
+
+        plan["files"] += scene_plan["files"]
+        plan["cache_hits"] += scene_plan["cache_hits"]
+        plan["download_bytes"] += scene_plan["download_bytes"]
+        plan["process_steps"] += scene_plan["process_steps"]
+        plan["scene_plans"].append(scene_plan)
+
+    plan["cache_misses"] = plan["files"] - plan["cache_hits"]
+    plan["estimated_seconds"] = int(
+        plan["download_bytes"] / satellite_config.DRY_RUN_DOWNLOAD_RATE
+        + plan["process_steps"] * satellite_config.DRY_RUN_SECONDS_PER_STEP
+    )
+    return plan
+
+
+def create_landsat_dry_run_plan(
+    scene_ids, download_cache, scene_steps=0, extra_steps=0
+):
+    """Create the dry-run plan of a Landsat import
+
+    Each scene has an import step for every band and the atmospheric
+    correction.
+
+    Args:
+        scene_ids (list): The normalized Landsat scene ids
+        download_cache (str): The user specific download cache
+        scene_steps (int): Additional process steps of each scene
+        extra_steps (int): The process steps of the job, that do not
+                           depend on the scenes
+
+    Returns:
+        (dict)
+        The plan
+
+    """
+    scenes = []
+    for scene_id in scene_ids:
+        file_list = get_landsat_scene_files(scene_id, download_cache)
+        # One import for each band file and the atmospheric correction
+        # with the metadata file
+        steps = len(file_list) + scene_steps
+        scenes.append((scene_id, file_list, steps))
+    return create_dry_run_plan(scenes, extra_steps)
+
+
+def create_sentinel2_dry_run_plan(
+    product_ids,
+    bands,
+    query_result,
+    download_cache,
+    scene_steps=0,
+    extra_steps=0,
+):
+    """Create the dry-run plan of a Sentinel-2 import
+
+    Args:
+        product_ids (list): The Sentinel-2 product ids
+        bands (list): The names of the bands to import
+        query_result (dict): The result of the Google BigQuery URL query
+        download_cache (str): The user specific download cache
+        scene_steps (int): Additional process steps of each scene
+        extra_steps (int): The process steps of the job, that do not
+                           depend on the scenes
+
+    Returns:
+        (dict)
+        The plan
+
+    """
+    scenes = []
+    unresolved_scenes = []
+    for product_id in product_ids:
+        if product_id not in query_result:
+            unresolved_scenes.append(product_id)
+            continue
+        file_list = [
+            (
+                query_result[product_id][band]["public_url"],
+                os.path.join(
+                    download_cache, query_result[product_id][band]["file"]
+                ),
+            )
+            for band in bands
+        ]
+        steps = (
+            SENTINEL2_FOOTPRINT_STEPS
+            + SENTINEL2_STEPS_PER_BAND * len(bands)
+            + scene_steps
+        )
+        scenes.append((product_id, file_list, steps))
+    return create_dry_run_plan(scenes, extra_steps, unresolved_scenes)
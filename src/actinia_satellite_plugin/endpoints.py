@@ -24,6 +24,9 @@ from .persistent_sentinel2_timeseries_creator import (
     AsyncSentinel2TimeSeriesCreatorResource,
 )
 from .aws_sentinel2a_query import AWSSentinel2ADownloadLinkQuery
+from .metrics_resource import SatelliteMetricsResource, instrument_resource
+from .status_stream_resource import SatelliteStatusStreamResource
+from .swagger_docs import add_resource
 
 __license__ = "GPL-3.0-or-later"
 __author__ = "Sören Gebbert"
@@ -55,16 +58,18 @@ def create_project_endpoints(flask_api, projects_url_part="projects"):
                                  it to "locations"
     """
 
-    flask_api.add_resource(
-        AsyncLandsatTimeSeriesCreatorResource,
+    add_resource(
+        flask_api,
+        instrument_resource(AsyncLandsatTimeSeriesCreatorResource),
         f"/{projects_url_part}/<string:project_name>/mapsets/"
         "<string:mapset_name>/landsat_import",
         endpoint=get_endpoint_class_name(
             AsyncLandsatTimeSeriesCreatorResource, projects_url_part
         ),
     )
-    flask_api.add_resource(
-        AsyncSentinel2TimeSeriesCreatorResource,
+    add_resource(
+        flask_api,
+        instrument_resource(AsyncSentinel2TimeSeriesCreatorResource),
         f"/{projects_url_part}/<string:project_name>/mapsets/"
         "<string:mapset_name>/sentinel2_import",
         endpoint=get_endpoint_class_name(
@@ -74,24 +79,39 @@ def create_project_endpoints(flask_api, projects_url_part="projects"):
 
 
 def create_endpoints(flask_api):
-    flask_api.add_resource(LandsatQuery, "/landsat_query")
-    flask_api.add_resource(Sentinel2Query, "/sentinel2_query")
-    flask_api.add_resource(
-        AsyncEphemeralLandsatProcessingResource,
+    add_resource(
+        flask_api, instrument_resource(LandsatQuery), "/landsat_query"
+    )
+    add_resource(
+        flask_api, instrument_resource(Sentinel2Query), "/sentinel2_query"
+    )
+    add_resource(
+        flask_api,
+        instrument_resource(AsyncEphemeralLandsatProcessingResource),
         "/landsat_process/<string:landsat_id>/"
         "<string:atcor_method>/"
         "<string:processing_method>",
     )
-    flask_api.add_resource(
-        AsyncEphemeralSentinel2ProcessingResourceGCS,
+    add_resource(
+        flask_api,
+        instrument_resource(AsyncEphemeralSentinel2ProcessingResourceGCS),
         "/sentinel2_process_gcs/ndvi/<string:product_id>",
     )
-    flask_api.add_resource(
-        AsyncEphemeralSentinel2ProcessingResource,
+    add_resource(
+        flask_api,
+        instrument_resource(AsyncEphemeralSentinel2ProcessingResource),
         "/sentinel2_process/ndvi/<string:product_id>",
     )
-    flask_api.add_resource(
-        AWSSentinel2ADownloadLinkQuery, "/sentinel2a_aws_query"
+    add_resource(
+        flask_api,
+        instrument_resource(AWSSentinel2ADownloadLinkQuery),
+        "/sentinel2a_aws_query",
+    )
+    add_resource(flask_api, SatelliteMetricsResource, "/satellite_metrics")
+    add_resource(
+        flask_api,
+        SatelliteStatusStreamResource,
+        "/satellite_status/<string:user_id>/<string:resource_id>",
     )
     # add deprecated location and project endpoints
     create_project_endpoints(flask_api)
@@ -0,0 +1,484 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+actinia Landsat NDVI processing of the queue workers
+"""
+
+import os
+import shutil
+import tempfile
+from actinia_core.core.common.process_object import Process
+from actinia_processing_lib.ephemeral_processing_with_export import (
+    EphemeralProcessingWithExport
+)
+from actinia_processing_lib.exceptions import AsyncProcessError
+from actinia_core.models.response_models import UnivarResultModel
+from .aoi import (
+    create_aoi_feature_collection,
+    get_aoi_align_process_chain,
+    get_aoi_bbox,
+    get_aoi_mask_process_chain,
+    get_aoi_region_process_chain,
+    is_rectangular_aoi,
+    limit_import_process_list_to_aoi,
+    write_aoi_file,
+)
+from .import_mode import link_import_process_list
+from .config import satellite_config
+from .local_backend import create_landsat_processing
+from .project_templates import ProjectTemplates, landsat_mtl_epsg
+from .warm_pool import WarmProjectPoolMixin
+from .instrumentation import StageInstrumentationMixin
+from .status_stream import StatusNotificationMixin
+from .callbacks import CompletionCallbackMixin
+from .status_throttle import StatusUpdateThrottleMixin
+from .remote_read import (
+    filter_download_process_list,
+    replace_remote_inputs,
+    set_remote_read_environment,
+    supports_range_requests,
+    to_vsicurl_path,
+)
+from .ephemeral_landsat_ndvi_processor import (
+    LandsatNDVIResponseModel,
+    extract_sensor_id_from_scene_id,
+)
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+class EphemeralLandsatProcessing(StatusNotificationMixin,
+                                 StageInstrumentationMixin,
+                                 CompletionCallbackMixin,
+                                 WarmProjectPoolMixin,
+                                 StatusUpdateThrottleMixin,
+                                 EphemeralProcessingWithExport):
+    """
+    """
+
+    def __init__(self, rdc):
+        """
+        Setup the variables of this class
+
+        Args:
+            rdc (ResourceDataContainer): The data container that contains all
+                                         required variables for processing
+
+        """
+        EphemeralProcessingWithExport.__init__(self, rdc)
+
+        self.landsat_scene_id, self.atcor_method, self.processing_method = \
+            self.rdc.user_data
+        self.landsat_sensor_id = extract_sensor_id_from_scene_id(
+            self.landsat_scene_id)
+        self.landsat_band_file_list = []
+        self.user_download_cache_path = os.path.join(
+            self.config.DOWNLOAD_CACHE, self.user_id)
+        # The raster layer names which must be exported, stats computed
+        # and preview image created
+        self.raster_result_list = []
+        # A list of r.univar output classes for each vegetation index
+        self.module_results = []
+        # The class that is used to create the response
+        self.response_model_class = LandsatNDVIResponseModel
+        # The EPSG code of the project template that was used
+        self.project_epsg = None
+        # True if the project was created from a template or the warm pool
+        self.project_from_template = False
+        # The optional area of interest as GeoJSON feature collection
+        self.aoi = create_aoi_feature_collection(self.request_data)
+        self.aoi_needs_mask = not is_rectangular_aoi(self.request_data)
+        # Read only the AOI windows of the band files from the remote storage
+        self.remote_read = self.aoi is not None and bool(
+            self.request_data.get("remote_read", False))
+        # Mapping of local band file paths to remote virtual file paths
+        self.remote_inputs = {}
+        # Link the band files with r.external instead of importing them
+        self.link_import = bool(
+            self.request_data
+            and self.request_data.get("import_mode") == "link")
+
+    def _copy_project_template(self, epsg):
+        """Copy a prebuilt project with the CRS of the scene into the
+        temporary database, to avoid a GRASS startup for the project creation
+
+        The template is created once, if it does not exist yet.
+
+        Args:
+            epsg (int): The EPSG code of the scene, can be None
+
+        Returns:
+            (bool)
+            True if the project was created from a template, False otherwise
+
+        """
+        if not satellite_config.PROJECT_TEMPLATES or epsg is None:
+            return False
+
+        templates = ProjectTemplates(satellite_config.PROJECT_TEMPLATE_PATH)
+        project_path = os.path.join(
+            self.temp_grass_data_base, self.project_name)
+        try:
+            # Lease an initialized project from the warm pool
+            self.project_epsg = epsg
+            pool = self._get_warm_project_pool()
+            if pool is not None and self._lease_warm_project(
+                    pool, epsg, project_path):
+                self.project_from_template = True
+                return True
+            if not templates.has_template(epsg):
+                p, template_path = templates.get_create_template_process(
+                    self.config.GRASS_GIS_START_SCRIPT, epsg)
+                self._update_num_of_steps(1)
+                self._run_process(p)
+                templates.add_template(epsg, template_path)
+            templates.copy_template(epsg, project_path)
+        except Exception as e:
+            self.message_logger.info(
+                "Unable to use the project template for EPSG:%i, "
+                "Exception: %s" % (epsg, str(e)))
+            shutil.rmtree(project_path, ignore_errors=True)
+            return False
+        self.project_from_template = True
+        return True
+
+    def _create_temp_database(self, mapsets=[]):
+        """Create a temporary gis database and project with a PERMANENT mapset
+        for processing
+
+        Raises:
+            This function raises AsyncProcessError in case of an error.
+
+        """
+        if not self.landsat_band_file_list:
+            raise AsyncProcessError(
+                "Unable to create a temporary GIS database, no data is "
+                "available")
+
+        try:
+            geofile = self.landsat_band_file_list[0]
+            geofile = self.remote_inputs.get(geofile, geofile)
+            # We have to set the home directory to create the grass project
+            os.putenv("HOME", "/tmp")
+
+            # Switch into the GRASS temporary database directory
+            os.chdir(self.temp_grass_data_base)
+
+            # Use a prebuilt project with the CRS of the scene if possible
+            mtl_files = [f for f in self.landsat_band_file_list
+                         if f.upper().endswith("_MTL.TXT")]
+            if mtl_files and self._copy_project_template(
+                    landsat_mtl_epsg(mtl_files[0])):
+                return
+
+            executable_params = list()
+            executable_params.append(self.config.GRASS_GIS_START_SCRIPT)
+            executable_params.append("-e")
+            executable_params.append("-c")
+            executable_params.append(geofile)
+            executable_params.append(os.path.join(
+                self.temp_grass_data_base, self.project_name))
+
+            self.message_logger.info(
+                f"{self.config.GRASS_GIS_START_SCRIPT} {executable_params}")
+
+            self._update_num_of_steps(1)
+
+            p = Process(exec_type="exec",
+                        executable="python3",
+                        executable_params=executable_params)
+
+            # Create the GRASS project, this will create the project and
+            # mapset paths
+            self._run_process(p)
+        except Exception as e:
+            raise AsyncProcessError(
+                "Unable to create a temporary GIS database and project at "
+                "<%s>, Exception: %s"
+                % (
+                    os.path.join(
+                        self.temp_grass_data_base,
+                        self.project_name,
+                        "PERMANENT",
+                    ),
+                    str(e),
+                )
+            )
+
+    def _setup_remote_read(self, process_lib, download_pl):
+        """Switch the band files to remote reads and remove their downloads
+
+        The metadata file is always downloaded, since it is required for the
+        atmospheric correction. Band files that are already in the download
+        cache are read locally and band files of servers that do not support
+        range requests are downloaded as usual.
+
+        Args:
+            process_lib (LandsatProcessing): The Landsat processing library
+            download_pl (list): The download process list
+
+        Returns:
+            (list)
+            The download process list without the remotely read band files
+
+        """
+        skip_list = []
+        for url, file_path in zip(process_lib.url_list, process_lib.file_list):
+            if "_MTL.TXT" in file_path.upper() or os.path.isfile(file_path):
+                continue
+            if not supports_range_requests(url):
+                self.message_logger.info(
+                    "Range requests are not supported for <%s>, the file "
+                    "will be downloaded" % url)
+                continue
+            self.remote_inputs[file_path] = to_vsicurl_path(url)
+            skip_list.extend([url, file_path])
+
+        if self.remote_inputs:
+            set_remote_read_environment()
+
+        return filter_download_process_list(download_pl, skip_list)
+
+    def _run_process_chain(self, pc):
+        """Run a process chain of region and mask settings"""
+        self.request_data = pc
+        process_list = self._validate_process_chain(skip_permission_check=True)
+        self._update_num_of_steps(len(process_list))
+        self._execute_process_list(process_list=process_list)
+
+    def _set_aoi_region(self, resolution):
+        """Import the area of interest and set the computational region to
+        its extent, so that only the AOI pixels are imported and processed
+
+        Args:
+            resolution (int): The resolution of the computational region
+
+        """
+        aoi_file = write_aoi_file(
+            self.aoi, os.path.join(self.temp_file_path, "aoi.geojson"))
+        self._run_process_chain(
+            get_aoi_region_process_chain(aoi_file, resolution))
+
+    def _run_r_univar_command(self, raster_name):
+        """Compute the univariate statistics for a raster layer
+        and put the result as dict in the module_result dict
+
+        Args:
+            raster_name:
+
+        """
+        result_file = tempfile.mktemp(
+            suffix=".univar", dir=self.temp_file_path)
+        univar_command = dict()
+        univar_command["1"] = {"module": "r.univar",
+                               "inputs": {"map": raster_name},
+                               "outputs": {"output": {"name": result_file}},
+                               "flags": "g"}
+
+        self.request_data = univar_command
+        process_list = self._validate_process_chain(skip_permission_check=True)
+        self._execute_process_list(process_list=process_list)
+
+        result_list = open(result_file, "r").readlines()
+        results = {"name": raster_name}
+
+        for line in result_list:
+            if "=" in line:
+                key, value = line.split("=")
+                results[key] = float(value.strip())
+
+        self.module_results.append(UnivarResultModel(**results))
+
+    def _render_preview_image(self, raster_name):
+        """Setup the render environment and create a g.region
+         process chain entry to setup the extent from the options.
+
+        Args:
+            options: The parser options that contain n, s, e and w entries for
+                     region settings
+            result_file: The resulting PNG file name
+
+        Returns:
+            A process chain entry of g.region
+
+        """
+        result_file = tempfile.mktemp(suffix=".png", dir=self.temp_file_path)
+
+        os.putenv("GRASS_RENDER_IMMEDIATE", "png")
+        os.putenv("GRASS_RENDER_WIDTH", "1300")
+        os.putenv("GRASS_RENDER_HEIGHT", "1000")
+        os.putenv("GRASS_RENDER_TRANSPARENT", "TRUE")
+        os.putenv("GRASS_RENDER_TRUECOLOR", "TRUE")
+        os.putenv("GRASS_RENDER_FILE", result_file)
+        os.putenv("GRASS_RENDER_FILE_READ", "TRUE")
+
+        pc = {}
+        pc["1"] = {"module": "d.rast", "inputs": {"map": raster_name},
+                   "flags": "n"}
+
+        pc["2"] = {"module": "d.legend", "inputs": {"raster": raster_name,
+                                                    "at": "8,92,0,7"},
+                   "flags": "n"}
+
+        self.request_data = pc
+
+        # Run the selected modules
+        process_list = self._validate_process_chain(skip_permission_check=True)
+        self._execute_process_list(process_list)
+
+        # Attach the png preview image to the resource URL list
+        # Generate the resource URL's from the url base and the file name
+        # Copy the png file to the resource directory
+        # file_name = "%s_preview.png"%(raster_name)
+        # resource_url = self.resource_url_base.replace("__None__", file_name)
+        # self.storage_interface.
+        # self.resource_url_list.append(resource_url)
+        # export_path = os.path.join(self.resource_export_path, file_name)
+        # shutil.move(result_file, export_path)
+
+        # Store the temporary file in the resource storage
+        # and receive the resource URL
+        resource_url = self.storage_interface.store_resource(result_file)
+        self.resource_url_list.append(resource_url)
+
+    def _create_output_resources(self, raster_result_list):
+        """Create the output resources from the raster layer that are the
+        result of the processing
+
+        The following resources will be computed
+
+        - Univariate statistics as result dictionary for each raster layer
+        - A PNG preview image for each raster layer
+        - A gzipped GeoTiff file
+
+        """
+
+        for raster_name in raster_result_list:
+            with self._stage("univar"):
+                self._run_r_univar_command(raster_name)
+            # Render a preview image for this raster layer
+            with self._stage("preview"):
+                self._render_preview_image(raster_name)
+            export_dict = {"name": raster_name,
+                           "export": {"format": "GTiff",
+                                      "type": "raster"}}
+            # Add the raster layer to the export list
+            self.resource_export_list.append(export_dict)
+
+        self._update_num_of_steps(len(raster_result_list))
+
+        # Export all resources and generate the finish response
+        with self._stage("export"):
+            self._export_resources(use_raster_region=True)
+
+    def _execute(self):
+        """Overwrite this function in subclasses
+
+            - Setup user credentials and working paths
+            - Create the resource directory
+            - Download and store the landsat scene files
+            - Initialize and create the temporal database and project
+            - Analyse the process chains
+            - Run the modules
+            - Export the results
+            - Cleanup
+
+        """
+        # Setup the user credentials and logger
+        self._setup()
+
+        # Create and check the resource directory
+        self.storage_interface.setup()
+        process_lib = create_landsat_processing(
+            config=self.config,
+            temp_file_path=self.temp_file_path,
+            scene_id=self.landsat_scene_id,
+            download_cache=self.user_download_cache_path,
+            message_logger=self.message_logger,
+            send_resource_update=self._send_resource_update)
+        # Generate the download, import and processing command lists
+        download_pl, file_infos = process_lib.get_download_process_list()
+        if self.remote_read:
+            download_pl = self._setup_remote_read(process_lib, download_pl)
+        self._update_num_of_steps(len(download_pl))
+        import_pl = process_lib.get_import_process_list()
+        if self.remote_inputs:
+            replace_remote_inputs(import_pl, self.remote_inputs)
+        if self.link_import:
+            link_import_process_list(import_pl)
+        self._update_num_of_steps(len(import_pl))
+        toar_pl = process_lib.get_i_landsat_toar_process_list(
+            self.atcor_method)
+        self._update_num_of_steps(len(toar_pl))
+        ivi_pl = process_lib.get_i_vi_process_list(
+            atcor_method=self.atcor_method,
+            processing_method=self.processing_method)
+        self._update_num_of_steps(len(ivi_pl))
+
+        # Download all bands from the scene
+        if download_pl:
+            with self._stage("download"):
+                self._execute_process_list(download_pl)
+        self.landsat_band_file_list = process_lib.file_list
+
+        self._create_temporary_grass_environment(
+            source_mapset_name="PERMANENT")
+
+        # Restrict the computational region to the area of interest
+        if self.aoi is not None:
+            self._set_aoi_region(resolution=30)
+            try:
+                limit_import_process_list_to_aoi(
+                    import_pl, get_aoi_bbox(self.aoi))
+            except ValueError as e:
+                raise AsyncProcessError(
+                    "Unable to process Landsat scene <%s>: %s"
+                    % (self.landsat_scene_id, str(e)))
+
+        # Run the import, TOAR and i.vi
+        with self._stage("import"):
+            self._execute_process_list(import_pl)
+        if self.aoi is None and self.project_from_template:
+            # Set the region to the imported bands, the default region of
+            # the project template does not match the scene
+            self._run_process_chain(
+                {"1": {"module": "g.region",
+                       "inputs": {"raster": process_lib.raster_names[0]}}})
+        elif self.aoi is not None:
+            # Align the AOI region to the pixel grid of the imported bands
+            self._run_process_chain(
+                get_aoi_align_process_chain(process_lib.raster_names[0]))
+            if self.aoi_needs_mask:
+                self._run_process_chain(get_aoi_mask_process_chain())
+        with self._stage("atcor"):
+            self._execute_process_list(toar_pl)
+        with self._stage("index"):
+            self._execute_process_list(ivi_pl)
+        # The ndvi result is an internal variable of the landsat process
+        # library
+        self.raster_result_list.append(process_lib.ndvi_name)
+
+        # Create the output resources: stats, preview and geotiff
+        self._create_output_resources(self.raster_result_list)
+
+    def _final_cleanup(self):
+        """Overwrite this function in subclasses to perform the final cleanup
+        """
+        # Clean up and remove the temporary gisdbase
+        self._cleanup()
+        # Refill the warm project pool for the next jobs
+        if self.project_epsg is not None:
+            self._refill_warm_project_pool(
+                self.project_epsg,
+                ProjectTemplates(
+                    satellite_config.PROJECT_TEMPLATE_PATH
+                ).get_template_path(self.project_epsg))
+        # Remove resource directories
+        if "error" in self.run_state or "terminated" in self.run_state:
+            self.storage_interface.remove_resources()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Conditional requests and cache headers of the scene query responses
+
+The ETag of a query response is derived from the query parameters and the
+version of the scene catalog, so it is known before the catalog is queried.
+A request with a matching If-None-Match header is answered with 304 Not
+Modified without a catalog lookup. The version of the SQLite catalog of the
+local backend changes with each modification of the catalog file. The
+Google archives provide no version, they are assumed to change at most once
+per QUERY_CATALOG_VERSION_INTERVAL seconds.
+"""
+
+import hashlib
+import json
+import os
+import time
+from flask import Response, request
+from .config import satellite_config
+from .local_backend import is_local_backend
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+def get_catalog_version():
+    """Return the version of the scene catalog
+
+    Returns:
+        (str)
+        The modification time and size of the SQLite catalog of the local
+        backend, otherwise the index of the current version interval
+
+    """
+    if is_local_backend():
+        try:
+            stat = os.stat(satellite_config.LOCAL_CATALOG_PATH)
+        except OSError:
+            return "local-missing"
+        return "local-%i-%i" % (stat.st_mtime_ns, stat.st_size)
+    interval = max(satellite_config.QUERY_CATALOG_VERSION_INTERVAL, 1)
+    return "%s-%i" % (satellite_config.BACKEND, time.time() // interval)
+
+
+def get_query_etag(satellite, args):
+    """Create the ETag of a scene query
+
+    Args:
+        satellite (str): The name of the archive, landsat or sentinel2
+        args (dict): The query parameters
+
+    Returns:
+        (str)
+        The ETag or None if the caching of query responses is disabled
+
+    """
+    if satellite_config.QUERY_CACHE_MAX_AGE <= 0:
+        return None
+    key = json.dumps(
+        [
+            satellite,
+            get_catalog_version(),
+            sorted(
+                (name, value)
+                for name, value in args.items()
+                if value is not None
+            ),
+        ]
+    )
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+
+def is_not_modified(etag):
+    """Check the If-None-Match header of the current request"""
+    return etag is not None and request.if_none_match.contains_weak(etag)
+
+
+def set_cache_headers(response, etag):
+    """Set the ETag and the Cache-Control headers of a query response
+
+    The ETag is weak, since the body depends on the content encoding. The
+    responses may only be stored by shared caches if QUERY_CACHE_PUBLIC is
+    set. In that case they vary by the Authorization header, so that a
+    reverse proxy does not serve them to unauthenticated clients.
+
+    Args:
+        response (flask.Response): The response
+        etag (str): The ETag of the query
+
+    Returns:
+        (flask.Response)
+
+    """
+    if etag is None:
+        return response
+    response.set_etag(etag, weak=True)
+    response.cache_control.max_age = satellite_config.QUERY_CACHE_MAX_AGE
+    if satellite_config.QUERY_CACHE_PUBLIC:
+        response.cache_control.public = True
+        response.vary.add("Authorization")
+    else:
+        response.cache_control.private = True
+    return response
+
+
+def make_not_modified_response(etag):
+    """Create the 304 Not Modified response of a query"""
+    return set_cache_headers(Response(status=304), etag)
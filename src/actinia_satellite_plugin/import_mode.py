@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Import modes of the ephemeral satellite processors
+"""
+
+import re
+from actinia_core.core.common.process_object import Process
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+# copy: The band files are imported into the GRASS database with r.import
+# link: The band files are registered in place with r.external
+IMPORT_MODES = ["copy", "link"]
+
+# The r.import and r.in.gdal options that are supported by r.external
+LINK_IMPORT_OPTIONS = ["input", "output", "band", "title"]
+
+# The r.mapcalc expression that copies an imported band into a cropped
+# floating point map
+FLOAT_COPY_EXPRESSION = re.compile(r"^expression=(\S+) = float\((\S+)\)$")
+
+
+def link_import_process_list(process_list):
+    """Convert the raster import processes into r.external processes
+
+    The band files are then registered in place as GRASS raster layers,
+    instead of copying their data into the GRASS database. The project
+    must have the coordinate reference system of the band files, since
+    r.external does not reproject. Options of r.import or r.in.gdal that
+    are not supported by r.external (like extent or resample) are removed,
+    since r.external reads only the current region of the linked file
+    anyway.
+
+    The processes are modified in place.
+
+    Args:
+        process_list (list): A list of Process objects
+
+    Returns:
+        (list)
+        The modified process list
+
+    """
+    for p in process_list:
+        if p.executable not in ["r.import", "r.in.gdal"]:
+            continue
+
+        params = []
+        for param in p.executable_params:
+            if param.startswith("--"):
+                params.append(param)
+            elif "=" in param:
+                if param.split("=", 1)[0] in LINK_IMPORT_OPTIONS:
+                    params.append(param)
+        p.executable = "r.external"
+        p.executable_params = params
+
+    return process_list
+
+
+def link_cropped_import_process_list(process_list, footprint, footprint_map):
+    """Link the band files of a scene import that crops the bands with a
+    mask
+
+    The Sentinel-2 import copies each band with r.mapcalc into a floating
+    point map under the mask of the scene footprint. In link mode this
+    copy is removed: the band files are linked with the names of the
+    cropped maps and the footprint is rasterized once into footprint_map.
+    The footprint must then be applied in the processing of the bands, see
+    mask_r_mapcalc_process_list().
+
+    r.external keeps reading the linked files for the whole processing,
+    so the VRT files of the bands must be written into the job directory
+    with relocate_vrt_files() before, and not into the shared download
+    cache where another job may rewrite them.
+
+    The list is modified in place.
+
+    Args:
+        process_list (list): A list of Process objects
+        footprint (str): The name of the footprint vector map
+        footprint_map (str): The name of the footprint raster map
+
+    Returns:
+        (list)
+        The modified process list
+
+    """
+    link_import_process_list(process_list)
+
+    cropped_names = {}
+    for p in process_list:
+        if p.executable == "r.mapcalc" and len(p.executable_params) == 1:
+            match = FLOAT_COPY_EXPRESSION.match(p.executable_params[0])
+            if match is not None:
+                cropped_names[match.group(2)] = match.group(1)
+
+    def is_copy_step(p):
+        # The float copy, the removal of the linked band and the footprint
+        # mask of each band
+        if p.executable == "r.mapcalc":
+            return any(
+                FLOAT_COPY_EXPRESSION.match(param) is not None
+                for param in p.executable_params
+            )
+        if p.executable == "g.remove":
+            return any(
+                param[5:] in cropped_names
+                for param in p.executable_params
+                if param.startswith("name=")
+            )
+        return p.executable == "r.mask"
+
+    linked = []
+    for p in process_list:
+        if is_copy_step(p):
+            continue
+        params = []
+        for param in p.executable_params:
+            key, _, value = param.partition("=")
+            if key in ["output", "align"] and value in cropped_names:
+                param = "%s=%s" % (key, cropped_names[value])
+            params.append(param)
+        p.executable_params = params
+        linked.append(p)
+
+    linked.append(
+        Process(
+            exec_type="grass",
+            executable="v.to.rast",
+            executable_params=[
+                "input=%s" % footprint,
+                "output=%s" % footprint_map,
+                "use=val",
+                "value=1",
+                "--q",
+            ],
+            id="rasterize_footprint_%s" % footprint,
+            skip_permission_check=True,
+        )
+    )
+    process_list[:] = linked
+    return process_list
+
+
+def mask_r_mapcalc_process_list(process_list, mask_map):
+    """Set the results of the r.mapcalc processes to null outside of a mask
+    map
+
+    The list is modified in place.
+
+    Args:
+        process_list (list): A list of Process objects
+        mask_map (str): The raster map that is null outside of the mask
+
+    Returns:
+        (list)
+        The modified process list
+
+    """
+    for p in process_list:
+        if p.executable != "r.mapcalc":
+            continue
+        params = []
+        for param in p.executable_params:
+            if param.startswith("expression="):
+                result, _, expression = param[11:].partition(" = ")
+                param = "expression=%s = if(isnull(%s), null(), %s)" % (
+                    result,
+                    mask_map,
+                    expression,
+                )
+            params.append(param)
+        p.executable_params = params
+    return process_list
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Per-stage timing and resource instrumentation of the satellite processing
+"""
+
+import os
+import pickle
+import resource
+import time
+from contextlib import contextmanager
+from flask_restful_swagger_2 import Schema
+from .metrics import metrics
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+# The histogram buckets of the download throughput in bytes per second
+THROUGHPUT_BUCKETS = (1e5, 1e6, 5e6, 1e7, 2.5e7, 5e7, 1e8, 2.5e8, 1e9)
+
+
+class StageModel(Schema):
+    """The timing and resource usage of a processing stage"""
+
+    type = "object"
+    properties = {
+        "stage": {
+            "type": "string",
+            "description": "The name of the stage, e.g. query, download, "
+            "import, atcor, index, univar, preview or export",
+        },
+        "count": {
+            "type": "integer",
+            "description": "The number of times the stage was run",
+        },
+        "wall_time": {
+            "type": "number",
+            "format": "double",
+            "description": "The wall time of the stage in seconds",
+        },
+        "cpu_time": {
+            "type": "number",
+            "format": "double",
+            "description": "The CPU time of the job process and its "
+            "finished child processes in seconds",
+        },
+        "bytes_read": {
+            "type": "integer",
+            "description": "The bytes read from the storage",
+        },
+        "bytes_written": {
+            "type": "integer",
+            "description": "The bytes written to the storage",
+        },
+        "peak_rss": {
+            "type": "integer",
+            "description": "The peak resident set size in bytes of the job "
+            "process or its largest child process until the end of the stage",
+        },
+    }
+    example = {
+        "stage": "import",
+        "count": 1,
+        "wall_time": 12.4,
+        "cpu_time": 10.9,
+        "bytes_read": 231735296,
+        "bytes_written": 120684544,
+        "peak_rss": 311328768,
+    }
+
+
+def _read_io_counters():
+    """Return the bytes read and written by this process and its children
+
+    The I/O accounting of /proc includes the finished child processes,
+    like the GRASS modules. The block counters of getrusage() are used
+    if /proc is not available.
+    """
+    try:
+        counters = {}
+        with open("/proc/self/io", "r") as f:
+            for line in f:
+                key, value = line.split(":")
+                counters[key] = int(value)
+        return counters["read_bytes"], counters["write_bytes"]
+    except (OSError, KeyError, ValueError):
+        blocks = [
+            resource.getrusage(who)
+            for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN)
+        ]
+        return (
+            sum(usage.ru_inblock for usage in blocks) * 512,
+            sum(usage.ru_oublock for usage in blocks) * 512,
+        )
+
+
+def get_resource_usage():
+    """Return the resource usage of this process and its children
+
+    Returns:
+        (dict)
+        The wall time, the CPU time, the bytes read and written and the peak
+        resident set size
+
+    """
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    bytes_read, bytes_written = _read_io_counters()
+    return {
+        "wall_time": time.perf_counter(),
+        "cpu_time": own.ru_utime
+        + own.ru_stime
+        + children.ru_utime
+        + children.ru_stime,
+        "bytes_read": bytes_read,
+        "bytes_written": bytes_written,
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss": max(own.ru_maxrss, children.ru_maxrss) * 1024,
+    }
+
+
+class StageInstrumentationMixin(object):
+    """Per-stage instrumentation of the satellite processing classes
+
+    The stages of a job are measured with the _stage() context manager.
+    Repeated stages, e.g. the import of each scene of a time series, are
+    summed up. The stages are added to every status document of the job
+    and recorded as metrics when the job finished. In addition the queue
+    wait time of the job and the duration of each executed module are
+    recorded.
+    """
+
+    stages = None
+
+    @contextmanager
+    def _stage(self, name):
+        """Measure the wall time and resource usage of a stage
+
+        Args:
+            name (str): The name of the stage
+
+        """
+        start = get_resource_usage()
+        try:
+            yield
+        finally:
+            end = get_resource_usage()
+            self._add_stage(
+                name,
+                {
+                    key: end[key] - start[key]
+                    for key in [
+                        "wall_time",
+                        "cpu_time",
+                        "bytes_read",
+                        "bytes_written",
+                    ]
+                },
+                end["peak_rss"],
+            )
+
+    def _add_stage(self, name, usage, peak_rss):
+        if self.stages is None:
+            self.stages = []
+        for stage in self.stages:
+            if stage["stage"] == name:
+                break
+        else:
+            stage = {
+                "stage": name,
+                "count": 0,
+                "wall_time": 0,
+                "cpu_time": 0,
+                "bytes_read": 0,
+                "bytes_written": 0,
+                "peak_rss": 0,
+            }
+            self.stages.append(stage)
+        stage["count"] += 1
+        for key, value in usage.items():
+            stage[key] += value
+        stage["peak_rss"] = max(stage["peak_rss"], peak_rss)
+
+    def run(self):
+        # The time between the acceptance of the request and the job start
+        metrics.observe(
+            "actinia_satellite_queue_wait_seconds",
+            max(0, time.time() - self.orig_time),
+            help="The time the jobs waited in the queue",
+            processor=self.__class__.__name__,
+        )
+        super().run()
+
+    def _run_executable(self, process, poll_time=0.005):
+        with metrics.timer(
+            "actinia_satellite_module_seconds",
+            help="The duration of the GRASS modules and executables",
+            processor=self.__class__.__name__,
+            module=os.path.basename(str(process.executable)),
+        ):
+            return super()._run_executable(process, poll_time)
+
+    def _record_stage_metrics(self):
+        """Record the stages of the job as metrics"""
+        processor = self.__class__.__name__
+        for stage in self.stages or []:
+            labels = dict(processor=processor, stage=stage["stage"])
+            metrics.observe(
+                "actinia_satellite_stage_seconds",
+                stage["wall_time"],
+                help="The wall time of the processing stages",
+                **labels
+            )
+            metrics.inc(
+                "actinia_satellite_stage_cpu_seconds_total",
+                stage["cpu_time"],
+                help="The CPU time of the processing stages",
+                **labels
+            )
+            metrics.inc(
+                "actinia_satellite_stage_read_bytes_total",
+                stage["bytes_read"],
+                help="The bytes read by the processing stages",
+                **labels
+            )
+            metrics.inc(
+                "actinia_satellite_stage_written_bytes_total",
+                stage["bytes_written"],
+                help="The bytes written by the processing stages",
+                **labels
+            )
+            metrics.set_max(
+                "actinia_satellite_stage_peak_rss_bytes",
+                stage["peak_rss"],
+                help="The peak resident set size of the processing stages",
+                **labels
+            )
+            if (
+                stage["stage"] == "download"
+                and stage["bytes_written"] > 0
+                and stage["wall_time"] > 0
+            ):
+                metrics.observe(
+                    "actinia_satellite_download_throughput_bytes_per_second",
+                    stage["bytes_written"] / stage["wall_time"],
+                    buckets=THROUGHPUT_BUCKETS,
+                    help="The download throughput of the jobs",
+                    processor=processor,
+                )
+        try:
+            metrics.flush()
+        except OSError as e:
+            self.message_logger.error(
+                "Unable to write the metrics: %s" % str(e)
+            )
+
+    def _send_to_database(self, document, final=False):
+        if self.stages:
+            http_code, response_model = pickle.loads(document)
+            response_model["stages"] = [
+                dict(stage) for stage in self.stages
+            ]
+            document = pickle.dumps([http_code, response_model])
+        if final is True:
+            self._record_stage_metrics()
+        super()._send_to_database(document, final)
@@ -0,0 +1,590 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Local stand-in backends of the satellite archives
+
+The Google BigQuery catalog is replaced by a SQLite database and the Google
+Cloud Storage and AWS buckets by a local HTTP object server that serves
+synthetic band files. The stand-ins are selected with the configuration
+option BACKEND = local, so that the plugin can be load tested and profiled
+without network access.
+
+The synthetic archive is created and served with the script
+benchmarks/synthetic_archive.py.
+"""
+
+import functools
+import os
+import re
+import sqlite3
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from dateutil import parser as dtparser
+from actinia_core.core.common.aws_sentinel_interface import (
+    AWSSentinel2AInterface,
+)
+from actinia_core.core.common.google_satellite_bigquery_interface import (
+    GML_BODY,
+    GoogleSatelliteBigQueryInterface,
+)
+from actinia_core.core.common.landsat_processing_library import (
+    LandsatProcessing,
+    RASTER_SUFFIXES,
+    SCENE_BANDS,
+    extract_sensor_id_from_scene_id,
+    scene_id_to_google_url,
+)
+from .config import satellite_config
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+GCS_URL = "https://storage.googleapis.com/"
+SENTINEL2_BANDS = [
+    "B01",
+    "B02",
+    "B03",
+    "B04",
+    "B05",
+    "B06",
+    "B07",
+    "B08",
+    "B8A",
+    "B09",
+    "B10",
+    "B11",
+    "B12",
+]
+
+# The columns of the BigQuery tables that are used by the plugin
+CATALOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS landsat_index (
+    scene_id TEXT PRIMARY KEY,
+    spacecraft_id TEXT,
+    sensing_time TEXT,
+    north_lat REAL,
+    south_lat REAL,
+    east_lon REAL,
+    west_lon REAL,
+    cloud_cover REAL,
+    total_size INTEGER
+);
+CREATE TABLE IF NOT EXISTS sentinel_2_index (
+    product_id TEXT PRIMARY KEY,
+    granule_id TEXT,
+    datatake_identifier TEXT,
+    sensing_time TEXT,
+    north_lat REAL,
+    south_lat REAL,
+    east_lon REAL,
+    west_lon REAL,
+    cloud_cover REAL,
+    total_size INTEGER,
+    base_url TEXT
+);
+"""
+
+SCENE_COLUMNS = (
+    "scene_id,sensing_time,north_lat,south_lat,east_lon,west_lon,"
+    "cloud_cover,total_size"
+)
+
+
+def is_local_backend():
+    """Return True if the local stand-in backends are configured"""
+    return satellite_config.BACKEND == "local"
+
+
+def to_object_store_url(url):
+    """Map a public Google Cloud Storage URL to the local object server
+
+    Args:
+        url (str): The public download URL
+
+    Returns:
+        (str)
+        The URL of the local object server if the local backend is
+        configured, otherwise the unchanged URL
+
+    """
+    if is_local_backend() and url.startswith(GCS_URL):
+        return "%s/%s" % (
+            satellite_config.LOCAL_OBJECT_STORE_URL.rstrip("/"),
+            url[len(GCS_URL):],
+        )
+    return url
+
+
+def get_landsat_file_url(scene_id, suffix):
+    """Return the download URL of a Landsat scene file
+
+    Args:
+        scene_id (str): The Landsat scene id
+        suffix (str): The file suffix, e.g. "_B4.TIF" or "_MTL.txt"
+
+    Returns:
+        (str)
+        The download URL
+
+    """
+    return to_object_store_url(scene_id_to_google_url(scene_id, suffix))
+
+
+def _sentinel2_tile(product_id):
+    """Return the MGRS tile of a Sentinel-2 product id"""
+    match = re.search(r"_T(\d{2}[C-X][A-Z]{2})(_|$)", product_id)
+    if match is None:
+        raise ValueError("Invalid Sentinel-2 product id <%s>" % product_id)
+    return match.group(1)
+
+
+def _iso_time(value):
+    """Convert a time string into an ISO string without fraction and time
+    zone, that can be compared with the sensing times of the catalog
+    """
+    return dtparser.parse(value).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+class LocalSatelliteCatalog(object):
+    """SQLite stand-in of the Google BigQuery satellite catalog
+
+    The query methods return the same structures as the methods of
+    GoogleSatelliteBigQueryInterface. The download URLs point to the local
+    object server.
+    """
+
+    def __init__(self, config=None, path=None, object_store_url=None):
+        """
+        Args:
+            config: The actinia core configuration, unused
+            path (str): The path of the SQLite database, default is the
+                        option LOCAL_CATALOG_PATH
+            object_store_url (str): The base URL of the object server,
+                                    default is LOCAL_OBJECT_STORE_URL
+
+        """
+        self.config = config
+        self.path = path or satellite_config.LOCAL_CATALOG_PATH
+        self.object_store_url = (
+            object_store_url or satellite_config.LOCAL_OBJECT_STORE_URL
+        ).rstrip("/")
+        self.sentinel_xml_metadata_file = "MTD_MSIL1C.xml"
+        self.sentinel_bands = SENTINEL2_BANDS
+
+    def _connect(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        connection.executescript(CATALOG_SCHEMA)
+        return connection
+
+    def _query(self, query, parameters=()):
+        connection = self._connect()
+        try:
+            return connection.execute(query, parameters).fetchall()
+        finally:
+            connection.close()
+
+    def _public_url(self, gs_url):
+        return "%s/%s" % (self.object_store_url, gs_url[5:])
+
+    def add_landsat_scene(
+        self, scene_id, sensing_time, bounds, cloud_cover=0, total_size=0
+    ):
+        """Add a Landsat scene to the catalog
+
+        Args:
+            scene_id (str): The Landsat scene id
+            sensing_time (str): The sensing time as ISO string
+            bounds (tuple): The (north, south, east, west) lat/lon bounds
+            cloud_cover (float): The cloud cover 0-100
+            total_size (int): The size of all scene files in bytes
+
+        """
+        sensor_id = extract_sensor_id_from_scene_id(scene_id)
+        spacecraft_id = "LANDSAT_%i" % int(sensor_id[2:])
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO landsat_index VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (scene_id, spacecraft_id, sensing_time)
+                + tuple(bounds)
+                + (cloud_cover, total_size),
+            )
+        connection.close()
+
+    def add_sentinel2_scene(
+        self, product_id, sensing_time, bounds, cloud_cover=0, total_size=0
+    ):
+        """Add a Sentinel-2 product to the catalog
+
+        The granule id, the datatake identifier and the storage path are
+        derived from the product id.
+
+        Args:
+            product_id (str): The Sentinel-2 product id
+            sensing_time (str): The sensing time as ISO string
+            bounds (tuple): The (north, south, east, west) lat/lon bounds
+            cloud_cover (float): The cloud cover 0-100
+            total_size (int): The size of all product files in bytes
+
+        """
+        tile = _sentinel2_tile(product_id)
+        parts = product_id.split("_")
+        granule_id = "L1C_T%s_A000000_%s" % (tile, parts[-1])
+        datatake_identifier = "G%s_%s_000000_N%s.%s" % (
+            parts[0],
+            parts[2],
+            parts[3][1:3],
+            parts[3][3:],
+        )
+        base_url = "gs://gcp-public-data-sentinel-2/tiles/%s/%s/%s/%s.SAFE" % (
+            tile[:2],
+            tile[2],
+            tile[3:],
+            product_id,
+        )
+        connection = self._connect()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO sentinel_2_index VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (product_id, granule_id, datatake_identifier, sensing_time)
+                + tuple(bounds)
+                + (cloud_cover, total_size, base_url),
+            )
+        connection.close()
+
+    def query_landsat_archive(
+        self,
+        start_time,
+        end_time,
+        lat=None,
+        lon=None,
+        cloud_cover=None,
+        scene_id=None,
+        spacecraft_id=None,
+    ):
+        return self._query_satellite_archive(
+            "landsat",
+            start_time,
+            end_time,
+            lat=lat,
+            lon=lon,
+            cloud_cover=cloud_cover,
+            scene_id=scene_id,
+            spacecraft_id=spacecraft_id,
+        )
+
+    def query_sentinel2_archive(
+        self,
+        start_time,
+        end_time,
+        lat=None,
+        lon=None,
+        cloud_cover=None,
+        scene_id=None,
+    ):
+        return self._query_satellite_archive(
+            "sentinel2",
+            start_time,
+            end_time,
+            lat=lat,
+            lon=lon,
+            cloud_cover=cloud_cover,
+            scene_id=scene_id,
+        )
+
+    def _query_satellite_archive(
+        self,
+        satellite,
+        start_time,
+        end_time,
+        lat=None,
+        lon=None,
+        cloud_cover=None,
+        scene_id=None,
+        spacecraft_id=None,
+    ):
+        """Query the catalog by time interval, coordinates, cloud cover and
+        scene id, see GoogleSatelliteBigQueryInterface
+        """
+        if satellite == "landsat":
+            query = "SELECT %s FROM landsat_index" % SCENE_COLUMNS
+        else:
+            query = "SELECT %s FROM sentinel_2_index" % SCENE_COLUMNS.replace(
+                "scene_id", "product_id"
+            )
+        where = []
+        parameters = []
+        if scene_id:
+            where.append(
+                "scene_id = ?" if satellite == "landsat" else "product_id = ?"
+            )
+            parameters.append(scene_id)
+        if spacecraft_id and satellite == "landsat":
+            where.append("spacecraft_id = ?")
+            parameters.append(spacecraft_id)
+        if start_time and end_time:
+            where.append("sensing_time >= ? AND sensing_time <= ?")
+            parameters.extend([_iso_time(start_time), _iso_time(end_time)])
+        if lon and lat:
+            where.append(
+                "west_lon <= ? AND east_lon >= ? AND "
+                "north_lat >= ? AND south_lat <= ?"
+            )
+            parameters.extend([float(lon), float(lon), float(lat), float(lat)])
+        if cloud_cover:
+            where.append("cloud_cover <= ?")
+            parameters.append(float(cloud_cover))
+        if where:
+            query += " WHERE " + " AND ".join(where)
+
+        keys = SCENE_COLUMNS.split(",")
+        return [dict(zip(keys, row)) for row in self._query(query, parameters)]
+
+    def get_landsat_urls(self, scene_ids, bands=None):
+        """Return the download URLs of Landsat scenes, see
+        GoogleSatelliteBigQueryInterface.get_landsat_urls()
+        """
+        if bands is None:
+            bands = ["B1", "B2"]
+        for scene_id in scene_ids:
+            sensor_id = extract_sensor_id_from_scene_id(scene_id)
+            for band in bands:
+                if band not in SCENE_BANDS[sensor_id]:
+                    raise Exception("Unknown landsat band name <%s>" % band)
+
+        rows = self._query(
+            "SELECT scene_id, sensing_time FROM landsat_index "
+            "WHERE scene_id IN (%s)" % ",".join("?" * len(scene_ids)),
+            scene_ids,
+        )
+        result = {}
+        for scene_id, sensing_time in rows:
+            sensor_id = extract_sensor_id_from_scene_id(scene_id)
+            result[scene_id] = {"timestamp": sensing_time}
+            for band in bands:
+                suffix = "_%s.%s" % (band, "txt" if band == "MTL" else "TIF")
+                map_name = "%s_%s" % (scene_id, band)
+                if band != "MTL":
+                    index = SCENE_BANDS[sensor_id].index(band)
+                    map_name = scene_id + RASTER_SUFFIXES[sensor_id][index]
+                gcs_url = scene_id_to_google_url(scene_id, suffix)
+                result[scene_id][band] = {
+                    "file": scene_id + suffix,
+                    "map": map_name,
+                    "public_url": "%s/%s"
+                    % (self.object_store_url, gcs_url[len(GCS_URL):]),
+                    "gcs_url": "gs://" + gcs_url[len(GCS_URL):],
+                }
+        return result
+
+    def get_sentinel_urls(self, product_ids, bands=None):
+        """Return the download URLs and footprints of Sentinel-2 products,
+        see GoogleSatelliteBigQueryInterface.get_sentinel_urls()
+        """
+        if bands is None:
+            bands = ["B04", "B08"]
+        for band in bands:
+            if band not in self.sentinel_bands:
+                raise Exception("Unknown Sentinel-2 band name <%s>" % band)
+
+        rows = self._query(
+            "SELECT product_id, granule_id, datatake_identifier, "
+            "sensing_time, north_lat, south_lat, east_lon, west_lon, "
+            "base_url FROM sentinel_2_index WHERE product_id IN (%s)"
+            % ",".join("?" * len(product_ids)),
+            product_ids,
+        )
+        result = {}
+        for row in rows:
+            product_id, granule_id, datatake_identifier, sensing_time = row[:4]
+            north, south, east, west, base_url = row[4:]
+            tile_base_name = granule_id[4:10] + datatake_identifier[4:20]
+            gcs_url = base_url + "/GRANULE/" + granule_id + "/IMG_DATA/"
+            coordinates = [
+                (west, north),
+                (east, north),
+                (east, south),
+                (west, south),
+                (west, north),
+            ]
+            result[product_id] = {
+                "timestamp": sensing_time,
+                "public_xml_metadata_url": self._public_url(
+                    base_url + "/" + self.sentinel_xml_metadata_file
+                ),
+                "gcs_xml_metadata_url": base_url
+                + "/"
+                + self.sentinel_xml_metadata_file,
+                "gml_footprint": GML_BODY
+                % " ".join("%s,%s" % point for point in coordinates),
+                "bbox": (west, north, east, south),
+            }
+            for band in bands:
+                tile_name = "%s_%s.jp2" % (tile_base_name, band)
+                result[product_id][band] = {
+                    "tile": tile_name,
+                    "file": "%s_%s" % (product_id, band),
+                    "public_url": self._public_url(gcs_url + tile_name),
+                    "gcs_url": gcs_url + tile_name,
+                }
+        return result
+
+
+class LocalAWSSentinel2Interface(LocalSatelliteCatalog):
+    """Stand-in of the AWS Sentinel-2 interface that returns the download
+    URLs of the local object server in the AWS result format
+    """
+
+    def get_sentinel_urls(self, product_ids, bands=None):
+        """Return the download URLs of Sentinel-2 products, see
+        AWSSentinel2AInterface.get_sentinel_urls()
+        """
+        query_result = LocalSatelliteCatalog.get_sentinel_urls(
+            self, [pid.replace(".SAFE", "") for pid in product_ids], bands
+        )
+        result = []
+        for product_id, entry in query_result.items():
+            base_url = entry["public_xml_metadata_url"].rsplit("/", 1)[0]
+            tile = {
+                "info": base_url + "/tileInfo.json",
+                "metadata": entry["public_xml_metadata_url"],
+                "preview": base_url + "/preview.jpg",
+                "timestamp": entry["timestamp"],
+                "url": base_url + "/",
+            }
+            for band in bands or ["B04", "B08"]:
+                tile[band] = {
+                    "file_name": "%s_tile_1_band_%s.jp2"
+                    % (product_id, band),
+                    "map_name": "%s_tile_1_band_%s" % (product_id, band),
+                    "public_url": entry[band]["public_url"],
+                }
+            result.append({"product_id": product_id, "tiles": [tile]})
+        return result
+
+
+class LocalLandsatProcessing(LandsatProcessing):
+    """Landsat processing library that downloads the scene files from the
+    local object server
+    """
+
+    def _setup(self):
+        LandsatProcessing._setup(self)
+        self.url_list = [to_object_store_url(url) for url in self.url_list]
+
+
+def get_query_interface(config):
+    """Return the configured satellite catalog interface
+
+    Args:
+        config: The actinia core configuration
+
+    Returns:
+        The Google BigQuery interface or the local catalog
+
+    """
+    if is_local_backend():
+        return LocalSatelliteCatalog(config)
+    return GoogleSatelliteBigQueryInterface(config)
+
+
+def get_aws_interface(config):
+    """Return the configured AWS Sentinel-2 interface
+
+    Args:
+        config: The actinia core configuration
+
+    Returns:
+        The AWS interface or the local stand-in
+
+    """
+    if is_local_backend():
+        return LocalAWSSentinel2Interface(config)
+    return AWSSentinel2AInterface(config)
+
+
+def create_landsat_processing(**kwargs):
+    """Create the configured Landsat processing library
+
+    Args:
+        kwargs: The arguments of LandsatProcessing
+
+    Returns:
+        (LandsatProcessing)
+
+    """
+    if is_local_backend():
+        return LocalLandsatProcessing(**kwargs)
+    return LandsatProcessing(**kwargs)
+
+
+class ObjectStoreRequestHandler(SimpleHTTPRequestHandler):
+    """HTTP request handler of the object server that supports single byte
+    range requests, which are required for the remote reads with /vsicurl/
+    """
+
+    def send_head(self):
+        range_header = self.headers.get("Range")
+        path = self.translate_path(self.path)
+        if not range_header or not os.path.isfile(path):
+            return SimpleHTTPRequestHandler.send_head(self)
+
+        match = re.match(r"bytes=(\d*)-(\d*)$", range_header.strip())
+        size = os.path.getsize(path)
+        if match is None or match.group(1) == "":
+            self.send_error(416, "Unsupported range")
+            return None
+        start = int(match.group(1))
+        end = int(match.group(2)) if match.group(2) else size - 1
+        end = min(end, size - 1)
+        if start > end:
+            self.send_error(416, "Requested range not satisfiable")
+            return None
+
+        f = open(path, "rb")
+        f.seek(start)
+        self.range_length = end - start + 1
+        self.send_response(206)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header(
+            "Content-Range", "bytes %i-%i/%i" % (start, end, size)
+        )
+        self.send_header("Content-Length", str(self.range_length))
+        self.end_headers()
+        return f
+
+    def copyfile(self, source, outputfile):
+        length = getattr(self, "range_length", None)
+        if length is None:
+            return SimpleHTTPRequestHandler.copyfile(self, source, outputfile)
+        outputfile.write(source.read(length))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_object_server(object_store_path, host="127.0.0.1", port=0):
+    """Create the HTTP object server of a directory
+
+    Args:
+        object_store_path (str): The directory that is served
+        host (str): The host name
+        port (int): The port, 0 selects a free port
+
+    Returns:
+        (ThreadingHTTPServer)
+
+    """
+    handler = functools.partial(
+        ObjectStoreRequestHandler, directory=str(object_store_path)
+    )
+    return ThreadingHTTPServer((host, port), handler)
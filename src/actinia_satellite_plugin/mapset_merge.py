@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Move the temporary mapset of the time series creators into the project
+"""
+
+import os
+import shutil
+import subprocess
+from actinia_processing_lib.exceptions import AsyncProcessError
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+def is_same_file_system(path, other_path):
+    """Check if two paths are located on the same file system
+
+    Paths that do not exist yet are checked with their nearest existing
+    parent directory.
+
+    Returns:
+        (bool)
+        True if a rename between the paths is possible
+
+    """
+
+    def _device(p):
+        p = os.path.abspath(p)
+        while not os.path.exists(p):
+            p = os.path.dirname(p)
+        return os.stat(p).st_dev
+
+    return _device(path) == _device(other_path)
+
+
+def copy_and_remove(source, target):
+    """Copy a file or directory with cp and remove the source
+
+    Args:
+        source (str): The source file or directory
+        target (str): The target path
+
+    """
+    p = subprocess.Popen(
+        ["/bin/cp", "-fr", source, target],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    (stdout_buff, stderr_buff) = p.communicate()
+    if p.returncode != 0:
+        raise AsyncProcessError(
+            "Unable to copy <%s> to <%s>. Copy error stdout: %s stderr: %s "
+            "returncode: %i"
+            % (source, target, stdout_buff, stderr_buff, p.returncode)
+        )
+    if os.path.isdir(source) and not os.path.islink(source):
+        shutil.rmtree(source)
+    else:
+        os.remove(source)
+
+
+def move_directory_content(source_path, target_path):
+    """Move the content of a directory into another directory
+
+    Files and directories that do not exist in the target are renamed,
+    existing files are replaced and existing directories are merged.
+    Entries that can not be renamed, e.g. across the mount points of bind
+    mounts or overlay file systems, are copied instead.
+
+    Args:
+        source_path (str): The source directory
+        target_path (str): The target directory
+
+    """
+    os.makedirs(target_path, exist_ok=True)
+    for name in os.listdir(source_path):
+        source = os.path.join(source_path, name)
+        target = os.path.join(target_path, name)
+        if os.path.isdir(source) and os.path.isdir(target):
+            move_directory_content(source, target)
+            shutil.rmtree(source, ignore_errors=True)
+            continue
+        try:
+            os.replace(source, target)
+        except OSError:
+            copy_and_remove(source, target)
+
+
+class MapsetMoveMixin(object):
+    """Zero-copy merge of the temporary mapset into the user project
+
+    If the temporary database and the user database are located on the
+    same file system, the temporary mapset is renamed into the project
+    instead of copying all raster maps. Otherwise, or if the rename fails,
+    the mapset is copied by the persistent processing.
+    """
+
+    def _extend_mapset_locks(self):
+        """Extend the mapset locks for an hour, like the copy does"""
+        locks = [
+            (
+                self.target_mapset_lock_set,
+                self.target_mapset_lock_id,
+                "mapset <%s>" % self.target_mapset_name,
+            ),
+            (
+                self.temp_mapset_lock_set,
+                self.temp_mapset_lock_id,
+                "temporary mapset <%s>" % self.temp_mapset_name,
+            ),
+        ]
+        for lock_set, lock_id, name in locks:
+            if lock_set is not True:
+                continue
+            ret = self.lock_interface.extend(
+                resource_id=lock_id, expiration=3600
+            )
+            if ret == 0:
+                raise AsyncProcessError("Unable to extend lock for %s" % name)
+
+    def _copy_merge_tmp_mapset_to_target_mapset(self):
+        if self.target_mapset_exists is True or not is_same_file_system(
+            self.temp_mapset_path, self.user_project_path
+        ):
+            return super()._copy_merge_tmp_mapset_to_target_mapset()
+
+        self._extend_mapset_locks()
+        self._send_resource_update(
+            "Move temporary mapset <%s> to target project <%s>"
+            % (self.target_mapset_name, self.project_name)
+        )
+        try:
+            os.rename(
+                self.temp_mapset_path,
+                os.path.join(self.user_project_path, self.target_mapset_name),
+            )
+        except OSError as e:
+            # E.g. EXDEV on overlay file systems or a concurrently created
+            # target, the copy handles both
+            self.message_logger.info(
+                "Unable to move the temporary mapset, copy it instead: %s"
+                % str(e)
+            )
+            return super()._copy_merge_tmp_mapset_to_target_mapset()
@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Prometheus-style metrics of the satellite plugin
+"""
+
+import bisect
+import fcntl
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from .config import satellite_config
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+# The default histogram buckets in seconds
+DEFAULT_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600)
+
+# The file with the merged samples of all processes
+METRICS_FILE = "metrics.json"
+# The files of a process of earlier versions of the plugin
+PROCESS_FILE_PATTERN = re.compile(r"^metrics_(\d+)\.json$")
+
+
+def _label_key(labels):
+    return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+
+
+class MetricsRegistry(object):
+    """Process local registry of counters, gauges and histograms
+
+    An update is a dictionary operation under a lock, so the metrics can
+    be recorded on hot paths. The API server and the workers are separate
+    processes, hence flush() adds the samples of a process to the metrics
+    file of the metrics directory under a lock of the directory, and the
+    counters and histograms of the process start again at zero. The metrics
+    file holds the totals of all processes, that are read with
+    read_metrics().
+    """
+
+    def __init__(self, path=None):
+        """
+        Args:
+            path (str): The metrics directory, None disables the flush
+
+        """
+        self.path = path
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._help = {}
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._last_flush = 0
+
+    def _check_pid(self):
+        # A forked worker process must not report the samples of its parent
+        if self._pid != os.getpid():
+            self._reset()
+
+    def inc(self, name, value=1, help="", **labels):
+        """Increment a counter"""
+        self._check_pid()
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._help.setdefault(name, help)
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_max(self, name, value, help="", **labels):
+        """Set a gauge to a value, if it is larger than the current value"""
+        self._check_pid()
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._help.setdefault(name, help)
+            self._gauges[key] = max(self._gauges.get(key, value), value)
+
+    def observe(self, name, value, buckets=DEFAULT_BUCKETS, help="", **labels):
+        """Observe a value in a histogram"""
+        self._check_pid()
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._help.setdefault(name, help)
+            if key not in self._histograms:
+                self._histograms[key] = {
+                    "buckets": list(buckets),
+                    "counts": [0] * len(buckets),
+                    "sum": 0,
+                    "count": 0,
+                }
+            histogram = self._histograms[key]
+            index = bisect.bisect_left(histogram["buckets"], value)
+            if index < len(histogram["counts"]):
+                histogram["counts"][index] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    @contextmanager
+    def timer(self, name, buckets=DEFAULT_BUCKETS, help="", **labels):
+        """Observe the duration of a block in a histogram"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(
+                name,
+                time.perf_counter() - start,
+                buckets=buckets,
+                help=help,
+                **labels
+            )
+
+    def snapshot(self):
+        """Return a JSON serializable copy of all samples"""
+        with self._lock:
+            return {
+                "help": dict(self._help),
+                "counters": [
+                    [name, dict(labels), value]
+                    for (name, labels), value in self._counters.items()
+                ],
+                "gauges": [
+                    [name, dict(labels), value]
+                    for (name, labels), value in self._gauges.items()
+                ],
+                "histograms": [
+                    [
+                        name,
+                        dict(labels),
+                        dict(histogram, counts=list(histogram["counts"])),
+                    ]
+                    for (name, labels), histogram in self._histograms.items()
+                ],
+            }
+
+    def _take_snapshot(self):
+        """Return a snapshot and reset the counters and histograms"""
+        snapshot = self.snapshot()
+        with self._lock:
+            self._counters = {}
+            self._histograms = {}
+        return snapshot
+
+    def _restore_snapshot(self, snapshot):
+        """Add the samples of a snapshot, that were not written"""
+        merged = merge_snapshots([snapshot, self.snapshot()])
+        with self._lock:
+            self._counters = merged._counters
+            self._histograms = merged._histograms
+
+    def flush(self, interval=0):
+        """Add the samples of this process to the metrics file
+
+        Args:
+            interval (float): Skip the flush if the last flush is less than
+                              interval seconds ago
+
+        """
+        if not self.path or time.time() - self._last_flush < interval:
+            return
+        self._check_pid()
+        self._last_flush = time.time()
+        os.makedirs(self.path, exist_ok=True)
+        snapshot = self._take_snapshot()
+        try:
+            _add_to_metrics_file(self.path, snapshot)
+        except (OSError, ValueError):
+            self._restore_snapshot(snapshot)
+            raise
+
+
+def _is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def _read_snapshot(file_name):
+    with open(file_name, "r") as f:
+        return json.load(f)
+
+
+def _add_to_metrics_file(path, snapshot):
+    """Merge a snapshot into the metrics file under a lock of the directory
+
+    The process files of earlier versions are merged as well and removed,
+    if their process is not running anymore.
+    """
+    file_name = os.path.join(path, METRICS_FILE)
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        snapshots = [snapshot]
+        if os.path.isfile(file_name):
+            snapshots.append(_read_snapshot(file_name))
+
+        process_files = []
+        for name in os.listdir(path):
+            match = PROCESS_FILE_PATTERN.match(name)
+            if match is None or _is_running(int(match.group(1))):
+                continue
+            try:
+                snapshots.append(_read_snapshot(os.path.join(path, name)))
+            except (OSError, ValueError):
+                pass
+            process_files.append(os.path.join(path, name))
+
+        with open(file_name + ".new", "w") as f:
+            json.dump(merge_snapshots(snapshots).snapshot(), f)
+        os.replace(file_name + ".new", file_name)
+        for process_file in process_files:
+            os.remove(process_file)
+    finally:
+        os.close(fd)
+
+
+def merge_snapshots(snapshots):
+    """Merge the snapshots of several processes
+
+    Counters and histograms are summed, gauges are merged with the maximum.
+
+    Returns:
+        (MetricsRegistry)
+        A registry with the merged samples
+
+    """
+    merged = MetricsRegistry()
+    for snapshot in snapshots:
+        merged._help.update(
+            (k, v) for k, v in snapshot["help"].items() if v
+        )
+        for name, labels, value in snapshot["counters"]:
+            key = (name, _label_key(labels))
+            merged._counters[key] = merged._counters.get(key, 0) + value
+        for name, labels, value in snapshot["gauges"]:
+            key = (name, _label_key(labels))
+            merged._gauges[key] = max(merged._gauges.get(key, value), value)
+        for name, labels, histogram in snapshot["histograms"]:
+            key = (name, _label_key(labels))
+            target = merged._histograms.get(key)
+            if target is None or target["buckets"] != histogram["buckets"]:
+                merged._histograms[key] = dict(
+                    histogram, counts=list(histogram["counts"])
+                )
+                continue
+            for index, count in enumerate(histogram["counts"]):
+                target["counts"][index] += count
+            target["sum"] += histogram["sum"]
+            target["count"] += histogram["count"]
+    return merged
+
+
+def read_metrics(path):
+    """Read the metrics file and the process files of earlier versions
+
+    Args:
+        path (str): The metrics directory
+
+    Returns:
+        (MetricsRegistry)
+        A registry with the merged samples
+
+    """
+    snapshots = []
+    if os.path.isdir(path):
+        for file_name in sorted(os.listdir(path)):
+            if not file_name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(path, file_name), "r") as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    return merge_snapshots(snapshots)
+
+
+def _format_labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{%s}" % ",".join(
+        '%s="%s"' % (k, v.replace("\\", "\\\\").replace('"', '\\"'))
+        for k, v in items
+    )
+
+
+def render_prometheus(registry):
+    """Render the samples of a registry in the Prometheus text format
+
+    Args:
+        registry (MetricsRegistry): The registry
+
+    Returns:
+        (str)
+        The metrics in the Prometheus text exposition format
+
+    """
+    lines = []
+    families = {}
+    for kind, samples in [
+        ("counter", registry._counters),
+        ("gauge", registry._gauges),
+        ("histogram", registry._histograms),
+    ]:
+        for (name, labels), value in samples.items():
+            families.setdefault((name, kind), []).append((labels, value))
+
+    for (name, kind), samples in sorted(families.items()):
+        if registry._help.get(name):
+            lines.append("# HELP %s %s" % (name, registry._help[name]))
+        lines.append("# TYPE %s %s" % (name, kind))
+        for labels, value in sorted(samples):
+            if kind != "histogram":
+                lines.append("%s%s %s" % (name, _format_labels(labels), value))
+                continue
+            cumulative = 0
+            for bucket, count in zip(value["buckets"], value["counts"]):
+                cumulative += count
+                lines.append(
+                    "%s_bucket%s %i"
+                    % (
+                        name,
+                        _format_labels(labels, [("le", str(bucket))]),
+                        cumulative,
+                    )
+                )
+            lines.append(
+                "%s_bucket%s %i"
+                % (
+                    name,
+                    _format_labels(labels, [("le", "+Inf")]),
+                    value["count"],
+                )
+            )
+            lines.append(
+                "%s_sum%s %s" % (name, _format_labels(labels), value["sum"])
+            )
+            lines.append(
+                "%s_count%s %i"
+                % (name, _format_labels(labels), value["count"])
+            )
+    return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry(
+    satellite_config.METRICS_PATH if satellite_config.METRICS else None
+)
+
+
+def lookup_timer(service, operation):
+    """Measure the latency of a lookup in a satellite archive
+
+    Args:
+        service (str): The archive service, "bigquery" or "aws"
+        operation (str): The name of the lookup
+
+    """
+    return metrics.timer(
+        "actinia_satellite_lookup_seconds",
+        help="The latency of the Google BigQuery and AWS lookups",
+        service=service,
+        operation=operation,
+    )
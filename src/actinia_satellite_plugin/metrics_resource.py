@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Metrics endpoint and request instrumentation of the satellite plugin
+"""
+
+import functools
+import time
+from flask import make_response
+from flask_restful_swagger_2 import Resource
+from actinia_core.core.common.app import auth
+from .config import satellite_config
+from .metrics import metrics, read_metrics, render_prometheus
+from .swagger_docs import lazy_doc
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+# The content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+SCHEMA_DOC = {
+    "tags": ["Satellite Image Algorithms"],
+    "description": "Return the metrics of the satellite plugin in the "
+    "Prometheus text format: the request latency of the satellite resources, "
+    "the latency of the Google BigQuery and AWS lookups, the download "
+    "throughput, the duration of the processing stages and GRASS modules "
+    "and the queue wait time of the jobs. The metrics of the API server and "
+    "all workers are merged. Minimum required user role: user.",
+    "produces": ["text/plain"],
+    "responses": {
+        "200": {
+            "description": "The metrics in the Prometheus text format",
+        },
+    },
+}
+
+
+def _observe_request_latency(resource_name, view):
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        response = None
+        try:
+            response = view(*args, **kwargs)
+            return response
+        finally:
+            metrics.observe(
+                "actinia_satellite_request_seconds",
+                time.perf_counter() - start,
+                help="The latency of the requests to the satellite resources",
+                resource=resource_name,
+                code=getattr(response, "status_code", 500),
+            )
+            try:
+                metrics.flush(
+                    interval=satellite_config.METRICS_FLUSH_INTERVAL
+                )
+            except OSError:
+                pass
+
+    return wrapper
+
+
+def instrument_resource(resource_class):
+    """Measure the request latency of a resource class
+
+    The measurement is added as outermost view decorator, so that the
+    latency includes the authentication.
+
+    Args:
+        resource_class: The flask restful resource class
+
+    Returns:
+        The resource class
+
+    """
+    if not satellite_config.METRICS or resource_class.__dict__.get(
+        "_instrumented", False
+    ):
+        return resource_class
+    resource_class.decorators = list(resource_class.decorators) + [
+        functools.partial(_observe_request_latency, resource_class.__name__)
+    ]
+    resource_class._instrumented = True
+    return resource_class
+
+
+class SatelliteMetricsResource(Resource):
+    """Expose the metrics of the satellite plugin"""
+
+    decorators = [auth.login_required]
+
+    @lazy_doc(SCHEMA_DOC)
+    def get(self):
+        """Return the metrics in the Prometheus text format."""
+        if satellite_config.METRICS:
+            # Write the samples of this process before all files are merged
+            metrics.flush()
+            registry = read_metrics(satellite_config.METRICS_PATH)
+        else:
+            registry = metrics
+        response = make_response(render_prometheus(registry), 200)
+        response.headers["Content-Type"] = PROMETHEUS_CONTENT_TYPE
+        return response
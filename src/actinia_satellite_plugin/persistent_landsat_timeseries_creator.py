@@ -7,29 +7,25 @@ Persistent Landsat time series creator
 """
 
 import pickle
-import os
-from flask import jsonify, make_response
-import dateutil.parser as dtparser
-from datetime import timedelta
-from copy import deepcopy
-from flask_restful_swagger_2 import swagger, Schema
+from flask import request
+from flask_restful_swagger_2 import Schema
 from actinia_core.models.response_models import (
     ProcessingResponseModel,
     ProcessingErrorResponseModel,
 )
-from actinia_processing_lib.persistent_processing import PersistentProcessing
 from actinia_rest_lib.resource_base import ResourceBase
-from actinia_core.core.common.kvdb_interface import enqueue_job
-from actinia_core.core.common.google_satellite_bigquery_interface import (
-    GoogleSatelliteBigQueryInterface,
+from .scene_plan import group_scenes_by_sensor, normalize_scene_ids
+from .dry_run import (
+    DRY_RUN_PARAMETER_DOC,
+    create_landsat_dry_run_plan,
+    is_dry_run,
+    make_dry_run_response,
 )
-from actinia_core.core.common.landsat_processing_library import (
-    LandsatProcessing,
-    SCENE_BANDS,
-    extract_sensor_id_from_scene_id,
-    RASTER_SUFFIXES,
-)
-from actinia_processing_lib.exceptions import AsyncProcessError
+from .callbacks import CALLBACK_URL_PROPERTY, check_callback_url
+from .sharding import check_shard_options, enqueue_shard_jobs, run_shard_job
+from .swagger_docs import lazy_doc
+from .serialization import make_json_response
+from .scheduling import BULK, schedule_job
 
 __license__ = "GPL-3.0-or-later"
 __author__ = "Sören Gebbert"
@@ -62,12 +58,37 @@ class LandsatSceneListModel(Schema):
             "type": "array",
             "items": {"type": "string"},
             "description": "A list of Landsat scene names that should be"
-            " downloaded and imported. Only scenes from a "
-            "specific satelleite can be imported and represented as strds. "
-            "Mixing of different satellites is not permitted. All bands will "
+            " downloaded and imported. Duplicated scenes are imported once. "
+            "Scenes of different satellites are imported into separate "
+            "strds for each satellite, the strds base name will be extended "
+            "by the sensor id, e.g. LC08, and the band name. All bands will "
             "be imported "
             "and atmospherically corrected",
         },
+        "append": {
+            "type": "boolean",
+            "description": "Append the scenes to the space-time raster "
+            "datasets of an existing mapset. Only scenes that are not "
+            "already registered in the datasets will be imported.",
+            "default": False,
+        },
+        "checkpoint_key": {
+            "type": "string",
+            "description": "The key of the per-scene checkpoints. A "
+            "resubmitted job with the same key resumes from the completed "
+            "scenes of a failed job. Default is a key derived from the "
+            "request.",
+        },
+        "shards": {
+            "type": "integer",
+            "description": "Split the scenes into this number of shards, "
+            "that are imported in parallel by different workers. The "
+            "shards are merged into the mapset, before the maps are "
+            "registered in the space-time raster datasets.",
+            "minimum": 1,
+            "default": 1,
+        },
+        "callback_url": CALLBACK_URL_PROPERTY,
     }
     example = {
         "strds": "Landsat_4",
@@ -90,7 +111,9 @@ SCHEMA_DOC = {
     "for each imported band. "
     "The resulting data will be located in a persistent user database. "
     "The project name is part of the path and must exist. The mapset will "
-    "be created while importing and should not already exist in the project. "
+    "be created while importing and should not already exist in the project, "
+    "unless append is set to add new scenes to the existing space-time "
+    "raster datasets of the mapset. "
     "The names of the"
     "Landsat scenes that should be downloaded must be specified "
     "in the HTTP body as application/json content. In addition, the basename"
@@ -126,6 +149,7 @@ SCHEMA_DOC = {
             "in": "body",
             "schema": LandsatSceneListModel,
         },
+        DRY_RUN_PARAMETER_DOC,
     ],
     "responses": {
         "200": {
@@ -145,7 +169,7 @@ class AsyncLandsatTimeSeriesCreatorResource(ResourceBase):
     def __init__(self):
         ResourceBase.__init__(self)
 
-    @swagger.doc(deepcopy(SCHEMA_DOC))
+    @lazy_doc(SCHEMA_DOC)
     def post(self, project_name, mapset_name):
         """
         Download and import Landsat scenes into a new mapset and create a
@@ -187,299 +211,86 @@ class AsyncLandsatTimeSeriesCreatorResource(ResourceBase):
 
 
         """
+        if is_dry_run():
+            return self._get_dry_run_response()
+
         # Preprocess the post call
         rdc = self.preprocess(
             has_json=True, project_name=project_name, mapset_name=mapset_name
         )
+        if rdc is None:
+            # The error response of a request without a JSON document
+            html_code, response_model = pickle.loads(self.response_data)
+            return make_json_response(response_model, html_code)
+
+        error = check_shard_options(rdc.request_data)
+        if error is None:
+            error = check_callback_url(rdc.request_data)
+        if error:
+            return self.get_error_response(message=error)
+
+        if not isinstance(rdc.request_data.get("scene_ids"), list):
+            return self.get_error_response(
+                message="A list of scene_ids is required"
+            )
 
-        # KvdbQueue approach
-        enqueue_job(self.job_timeout, start_job, rdc)
-
-        html_code, response_model = pickle.loads(self.response_data)
-        return make_response(jsonify(response_model), html_code)
-
-
-def start_job(*args):
-    processing = LandsatTimeSeriesCreator(*args)
-    processing.run()
-
-
-class LandsatTimeSeriesCreator(PersistentProcessing):
-    """
-    Create a space time raster dataset from all provided scene_ids for each
-    Landsat band in a new mapset.
-
-    The Landsat scenes are downloaded, imported and pre-processed before
-    they are registered in the band specific space time datasets.
-    """
-
-    def __init__(self, rdc):
-        """Constructor
-
-        Args:
-            rdc (ResourceDataContainer): The data container that contains all
-                                         required variables for processing
-
-        """
-        PersistentProcessing.__init__(self, rdc)
-
-        # This works only if the mapset snot already exists
-        self.temp_mapset_name = self.mapset_name
-
-        self.query_interface = GoogleSatelliteBigQueryInterface(self.config)
-        self.scene_ids = self.rdc.request_data["scene_ids"]
-        self.strds_basename = self.rdc.request_data["strds"]
-        self.atcor_method = self.rdc.request_data["atcor_method"]
-        self.user_download_cache_path = os.path.join(
-            self.config.DOWNLOAD_CACHE, self.user_id
+        # Plan the scenes once, before the job is enqueued
+        rdc.request_data["scene_ids"] = normalize_scene_ids(
+            rdc.request_data["scene_ids"]
         )
-        self.query_result = None
-        self.required_bands = None
-        self.sensor_id = None
-
-    def _prepare_download(self):
-        """
-        Check the download cache if the file already exists, to avoid redundant
-        downloads.
-        The downloaded files will be stored in a temporary directory.
-        After the download of all files completes, the downloaded files will
-        be moved to the download cache. This avoids broken
-        files in case a download was interrupted or stopped by termination.
-
-        """
-        # Create the download cache directory if it does not exists
-        if os.path.exists(self.config.DOWNLOAD_CACHE):
-            pass
-        else:
-            os.mkdir(self.config.DOWNLOAD_CACHE)
-
-        # Create the user specific download cache directory to put the
-        # downloaded files into it
-        if os.path.exists(self.user_download_cache_path):
-            pass
-        else:
-            os.mkdir(self.user_download_cache_path)
-
-        # Switch into the tempfile directory
-        os.chdir(self.temp_file_path)
-
-        # We have to set the home directory to create the grass project
-        os.putenv("HOME", "/tmp")
-
-        sensor_ids = {}
-        for scene_id in self.scene_ids:
-
-            # Check if the the list of scenes contains scenes from different
-            # satellites
-            self.sensor_id = extract_sensor_id_from_scene_id(scene_id=scene_id)
-            sensor_ids[self.sensor_id] = self.sensor_id
-
-            if len(sensor_ids) > 2:
-                raise AsyncProcessError(
-                    "Different satellites are in the list of scenes to be "
-                    "imported. Only scenes from a single satellite an be "
-                    "imported at once."
-                )
-
-        # All bands are imported, except the MTL file
-        self.required_bands = SCENE_BANDS[self.sensor_id][0:-1]
-
-        self._send_resource_update("Sending Google BigQuery request.")
-
         try:
-            self.query_result = self.query_interface.get_landsat_urls(
-                self.scene_ids, self.required_bands
-            )
-        except Exception as e:
-            raise AsyncProcessError(
-                "Error in querying Landsat product <%s> "
-                "in Google BigQuery Landsat database. "
-                "Error: %s" % (self.scene_ids, str(e))
-            )
-
-        if not self.query_result:
-            raise AsyncProcessError(
-                "Unable to find Landsat product <%s> "
-                "in Google BigQuery Landsat database" % self.scene_ids
-            )
-
-    def _import_scenes(self):
-        """
-        Import all found Landsat scenes with their bands and create the
-        space time raster datasets to register the maps in.
-
-        Raises:
-            AsyncProcessError: In case something went wrong
-
-        """
-
-        all_commands = []
-        counter = 0
-
-        for scene_id in self.query_result:
-
-            process_lib = LandsatProcessing(
-                config=self.config,
-                scene_id=scene_id,
-                temp_file_path=self.temp_file_path,
-                download_cache=self.user_download_cache_path,
-                send_resource_update=self._send_resource_update,
-                message_logger=self.message_logger,
-            )
-
-            (
-                download_commands,
-                self.landsat_band_file_list,
-            ) = process_lib.get_download_process_list()
-
-            # Download the Landsat scene if it is not in the download cache
-            if download_commands:
-                all_commands.extend(download_commands)
-
-            # Import and atmospheric correction
-            import_commands = process_lib.get_import_process_list()
-            all_commands.extend(import_commands)
-            atcor_method_commands = (
-                process_lib.get_i_landsat_toar_process_list(
-                    atcor_method=self.atcor_method
-                )
-            )
-            all_commands.extend(atcor_method_commands)
-
-        # Run the commands
-        self._update_num_of_steps(len(all_commands))
-        self._execute_process_list(process_list=all_commands)
-
-        # IMPORTANT:
-        # The registration must be performed in the temporary mapset with the
-        # same name as the target mapset,
-        # since the temporal database will contain the mapset name.
-
-        register_commands = {}
-        result_dict = {}
-
-        for i in range(len(self.required_bands)):
-            band = self.required_bands[i]
-            strds = self.strds_basename + "_%s" % band
-
-            result_dict[band] = []
-
-            create_strds = {
-                "module": "t.create",
-                "inputs": {
-                    "output": strds,
-                    "title": "Landsat time series for band %s" % band,
-                    "description": "Landsat time series for band %s" % band,
-                    "temporaltype": "absolute",
-                    "type": "strds",
-                },
-            }
-
-            register_commands[str(counter)] = create_strds
-            counter += 1
+            group_scenes_by_sensor(rdc.request_data["scene_ids"])
+        except ValueError as e:
+            return self.get_error_response(message=str(e))
 
-            # Create the input file
-            map_list_file_name = os.path.join(
-                self.user_download_cache_path, strds
+        # KvdbQueue approach
+        if rdc.request_data.get("shards", 1) > 1:
+            error = enqueue_shard_jobs(
+                self.job_timeout, start_shard_job, start_job, rdc, "scene_ids"
             )
-            map_list_file = open(map_list_file_name, "w")
-
-            # Use only the product ids that were found in the big query
-            for scene_id in self.query_result:
-
-                # We need to create a time interval, otherwise the temporal
-                # algebra will not work :/
-                start_time = dtparser.parse(
-                    self.query_result[scene_id]["timestamp"].split(".")[0]
-                )
-                end_time = start_time + timedelta(seconds=1)
-
-                index = SCENE_BANDS[self.sensor_id].index(band)
-                raster_suffix = RASTER_SUFFIXES[self.sensor_id][index]
-                map_name = "%s_%s%s" % (
-                    scene_id,
-                    self.atcor_method,
-                    raster_suffix,
-                )
-
-                result_dict[band].append(
-                    [map_name, str(start_time), str(end_time)]
-                )
-
-                map_list_file.write(
-                    "%s|%s|%s\n" % (map_name, str(start_time), str(end_time))
-                )
-            map_list_file.close()
-
-            register_maps = {
-                "module": "t.register",
-                "inputs": {
-                    "input": strds,
-                    "file": map_list_file_name,
-                    "type": "raster",
-                },
-            }
-
-            register_commands[str(counter)] = register_maps
-            counter += 1
-
-        process_list = self._validate_process_chain(
-            process_chain=register_commands, skip_permission_check=True
-        )
-        self._execute_process_list(process_list=process_list)
-
-        self.module_results = result_dict
-
-    def _execute(self):
-
-        # Setup the user credentials and logger
-        self._setup()
-
-        # Check and lock the target and temp mapsets
-        self._check_lock_target_mapset()
+            if error:
+                return self.get_error_response(message=error)
+        else:
+            schedule_job(BULK, self.job_timeout, start_job, rdc)
 
-        if self.target_mapset_exists is True:
-            raise AsyncProcessError(
-                "Landsat time series can only be create in a new mapset. "
-                "Mapset <%s> already exists." % self.target_mapset_name
+        html_code, response_model = pickle.loads(self.response_data)
+        return make_json_response(response_model, html_code)
+
+    def _get_dry_run_response(self):
+        """Return the download and processing plan without starting a job"""
+        request_data = request.get_json(silent=True)
+        if not isinstance(request_data, dict) or not isinstance(
+            request_data.get("scene_ids"), list
+        ):
+            return self.get_error_response(
+                message="A list of scene_ids is required"
             )
 
-        # Init GRASS environment and create the temporary mapset with the same
-        # name as the target mapset
-        # This is required to register the raster maps in the temporary
-        # directory, but use them in persistent directory
-
-        # Create the temp database and link the
-        # required mapsets into it
-        self._create_temp_database(self.required_mapsets)
+        scene_ids = normalize_scene_ids(request_data["scene_ids"])
+        try:
+            group_scenes_by_sensor(scene_ids)
+        except ValueError as e:
+            return self.get_error_response(message=str(e))
 
-        # Initialize the GRASS environment and switch into PERMANENT
-        # mapset, which is always linked
-        self._create_grass_environment(
-            grass_data_base=self.temp_grass_data_base, mapset_name="PERMANENT"
+        # The registration of all maps is a single process
+        plan = create_landsat_dry_run_plan(
+            scene_ids, self.download_cache, extra_steps=1
         )
+        return make_dry_run_response(plan)
 
-        # Create the temporary mapset and switch into it
-        self._create_temporary_mapset(temp_mapset_name=self.target_mapset_name)
 
-        # Setup the download cache and query the BigQuery database of google
-        # for scene_ids
-        self._prepare_download()
+def start_job(*args):
+    from .persistent_landsat_timeseries_processing import (
+        LandsatTimeSeriesCreator,
+    )
 
-        # Check if all product ids were found
-        missing_scene_ids = []
-        for scene_id in self.scene_ids:
-            if scene_id not in self.query_result:
-                missing_scene_ids.append(scene_id)
+    processing = LandsatTimeSeriesCreator(*args)
+    processing.run()
 
-        # Abort if a single scene is missing
-        if len(missing_scene_ids) > 0:
-            raise AsyncProcessError(
-                "Unable to find product ids <%s> in the "
-                "Google BigQuery database" % str(missing_scene_ids)
-            )
 
-        self._import_scenes()
+def start_shard_job(*args):
+    from .persistent_landsat_timeseries_processing import (
+        LandsatTimeSeriesCreator,
+    )
 
-        # Copy local mapset to original project
-        self._copy_merge_tmp_mapset_to_target_mapset()
+    run_shard_job(LandsatTimeSeriesCreator, *args)
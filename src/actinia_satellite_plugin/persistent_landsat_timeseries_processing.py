@@ -0,0 +1,418 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Persistent Landsat time series processing of the queue workers
+"""
+
+import os
+from actinia_processing_lib.persistent_processing import PersistentProcessing
+from actinia_core.core.common.landsat_processing_library import (
+    SCENE_BANDS,
+    extract_sensor_id_from_scene_id,
+    RASTER_SUFFIXES,
+)
+from actinia_processing_lib.exceptions import AsyncProcessError
+from .temporal_registration import (
+    get_registration_process,
+    get_scene_time_intervals,
+    write_registration_spec,
+)
+from .timeseries_append import TimeSeriesAppendMixin
+from .checkpoints import SceneCheckpointMixin
+from .mapset_merge import MapsetMoveMixin
+from .instrumentation import StageInstrumentationMixin
+from .status_stream import StatusNotificationMixin
+from .callbacks import CompletionCallbackMixin
+from .status_throttle import StatusUpdateThrottleMixin
+from .local_backend import create_landsat_processing, get_query_interface
+from .metrics import lookup_timer
+from .scene_plan import (
+    get_band_key,
+    group_scenes_by_sensor,
+    normalize_scene_ids,
+)
+from .sharding import ShardMergeMixin
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+class LandsatTimeSeriesCreator(
+    StatusNotificationMixin,
+    StageInstrumentationMixin,
+    CompletionCallbackMixin,
+    ShardMergeMixin,
+    SceneCheckpointMixin,
+    TimeSeriesAppendMixin,
+    MapsetMoveMixin,
+    StatusUpdateThrottleMixin,
+    PersistentProcessing,
+):
+    """
+    Create a space time raster dataset from all provided scene_ids for each
+    Landsat band in a new mapset.
+
+    The Landsat scenes are downloaded, imported and pre-processed before
+    they are registered in the band specific space time datasets.
+    """
+
+    def __init__(self, rdc):
+        """Constructor
+
+        Args:
+            rdc (ResourceDataContainer): The data container that contains all
+                                         required variables for processing
+
+        """
+        PersistentProcessing.__init__(self, rdc)
+
+        # This works only if the mapset snot already exists
+        self.temp_mapset_name = self.mapset_name
+
+        self.query_interface = get_query_interface(self.config)
+        self.scene_ids = normalize_scene_ids(
+            self.rdc.request_data["scene_ids"]
+        )
+        self.strds_basename = self.rdc.request_data["strds"]
+        self.atcor_method = self.rdc.request_data["atcor_method"]
+        self.append = self.rdc.request_data.get("append", False)
+        self.user_download_cache_path = os.path.join(
+            self.config.DOWNLOAD_CACHE, self.user_id
+        )
+        self.query_result = None
+        self.sensor_scene_ids = None
+        self.required_bands = None
+        self.multi_sensor = False
+        self._setup_shards()
+
+    def _plan_scenes(self):
+        """Group the scenes by sensor and set the required bands of each
+        sensor
+
+        Raises:
+            AsyncProcessError: If a sensor is not supported
+
+        """
+        try:
+            self.sensor_scene_ids = group_scenes_by_sensor(self.scene_ids)
+        except ValueError as e:
+            raise AsyncProcessError(str(e))
+
+        # The STRDS names of a shard depend on the sensors of all scenes
+        all_scene_ids = self.scene_ids
+        if self.shard is not None:
+            all_scene_ids = self.shard.get("scene_ids", self.scene_ids)
+        self.multi_sensor = (
+            len(group_scenes_by_sensor(normalize_scene_ids(all_scene_ids)))
+            > 1
+        )
+
+        # All bands are imported, except the MTL file
+        self.required_bands = {}
+        for sensor_id in self.sensor_scene_ids:
+            self.required_bands[sensor_id] = SCENE_BANDS[sensor_id][0:-1]
+
+    def _get_scene_maps(self, scene_id):
+        """Return the band key and the name of the corrected raster map of
+        each band of a scene
+        """
+        sensor_id = extract_sensor_id_from_scene_id(scene_id=scene_id)
+        scene_maps = []
+        for band in self.required_bands[sensor_id]:
+            index = SCENE_BANDS[sensor_id].index(band)
+            raster_suffix = RASTER_SUFFIXES[sensor_id][index]
+            scene_maps.append(
+                (
+                    get_band_key(sensor_id, band, self.multi_sensor),
+                    "%s_%s%s" % (scene_id, self.atcor_method, raster_suffix),
+                )
+            )
+        return scene_maps
+
+    def _prepare_download(self):
+        """
+        Check the download cache if the file already exists, to avoid redundant
+        downloads.
+        The downloaded files will be stored in a temporary directory.
+        After the download of all files completes, the downloaded files will
+        be moved to the download cache. This avoids broken
+        files in case a download was interrupted or stopped by termination.
+
+        """
+        # Create the download cache directory if it does not exists
+        if os.path.exists(self.config.DOWNLOAD_CACHE):
+            pass
+        else:
+            os.mkdir(self.config.DOWNLOAD_CACHE)
+
+        # Create the user specific download cache directory to put the
+        # downloaded files into it
+        if os.path.exists(self.user_download_cache_path):
+            pass
+        else:
+            os.mkdir(self.user_download_cache_path)
+
+        # Switch into the tempfile directory
+        os.chdir(self.temp_file_path)
+
+        # We have to set the home directory to create the grass project
+        os.putenv("HOME", "/tmp")
+
+        self._send_resource_update("Sending Google BigQuery request.")
+
+        # A single request for the scenes of each sensor
+        self.query_result = {}
+        for sensor_id, scene_ids in self.sensor_scene_ids.items():
+            try:
+                with self._stage("query"), lookup_timer(
+                    "bigquery", "get_landsat_urls"
+                ):
+                    query_result = self.query_interface.get_landsat_urls(
+                        scene_ids, self.required_bands[sensor_id]
+                    )
+            except Exception as e:
+                raise AsyncProcessError(
+                    "Error in querying Landsat product <%s> "
+                    "in Google BigQuery Landsat database. "
+                    "Error: %s" % (scene_ids, str(e))
+                )
+            if query_result:
+                self.query_result.update(query_result)
+
+        if not self.query_result:
+            raise AsyncProcessError(
+                "Unable to find Landsat product <%s> "
+                "in Google BigQuery Landsat database" % self.scene_ids
+            )
+
+    def _remove_registered_scenes(self):
+        """Remove the scenes from the query result that are already
+        registered in all band specific space time raster datasets of the
+        target mapset
+        """
+        registered_maps = {}
+        for scene_id in list(self.query_result):
+            registered = True
+            for key, map_name in self._get_scene_maps(scene_id):
+                if key not in registered_maps:
+                    registered_maps[key] = self._get_registered_maps(
+                        self.strds_basename + "_%s" % key
+                    )
+                if map_name not in registered_maps[key]:
+                    registered = False
+                    break
+            if registered is True:
+                del self.query_result[scene_id]
+
+    def _import_scenes(self):
+        """
+        Import all found Landsat scenes with their bands.
+
+        Returns:
+            (dict)
+            The list of [map_name, start_time, end_time] for each band
+
+        Raises:
+            AsyncProcessError: In case something went wrong
+
+        """
+
+        stage_list = []
+
+        for scene_id in self.query_result:
+
+            process_lib = create_landsat_processing(
+                config=self.config,
+                scene_id=scene_id,
+                temp_file_path=self.temp_file_path,
+                download_cache=self.user_download_cache_path,
+                send_resource_update=self._send_resource_update,
+                message_logger=self.message_logger,
+            )
+
+            (
+                download_commands,
+                self.landsat_band_file_list,
+            ) = process_lib.get_download_process_list()
+
+            # Download the Landsat scene if it is not in the download cache
+            stage_list.append((scene_id, "downloaded", download_commands))
+
+            # Import and atmospheric correction
+            import_commands = process_lib.get_import_process_list()
+            stage_list.append((scene_id, "imported", import_commands))
+            atcor_method_commands = (
+                process_lib.get_i_landsat_toar_process_list(
+                    atcor_method=self.atcor_method
+                )
+            )
+            stage_list.append((scene_id, "atcor", atcor_method_commands))
+
+        # Run the commands scene by scene and record the checkpoints
+        self._execute_scene_stages(stage_list)
+
+        # Parse the acquisition time of each scene only once
+        time_intervals = get_scene_time_intervals(self.query_result)
+
+        result_dict = {}
+
+        # Use only the product ids that were found in the big query
+        for scene_id, (start_time, end_time) in time_intervals.items():
+            for key, map_name in self._get_scene_maps(scene_id):
+                result_dict.setdefault(key, []).append(
+                    [map_name, start_time, end_time]
+                )
+
+        return result_dict
+
+    def _register_scenes(self, result_dict):
+        """
+        Create the space time raster datasets and register the maps of all
+        bands in them.
+
+        Args:
+            result_dict (dict): The list of [map_name, start_time, end_time]
+                                for each band
+
+        """
+        # IMPORTANT:
+        # The registration must be performed in the temporary mapset with the
+        # same name as the target mapset,
+        # since the temporal database will contain the mapset name.
+        strds_list = []
+        for band, map_list in result_dict.items():
+            strds_list.append(
+                {
+                    "name": self.strds_basename + "_%s" % band,
+                    "title": "Landsat time series for band %s" % band,
+                    "description": "Landsat time series for band %s" % band,
+                    "maps": map_list,
+                }
+            )
+
+        # Create all STRDS and register all maps in a single process
+        spec_file = write_registration_spec(
+            strds_list,
+            os.path.join(self.temp_file_path, "temporal_registration.json"),
+        )
+        self._update_num_of_steps(1)
+        with self._stage("register"):
+            self._execute_process_list(
+                process_list=[get_registration_process(spec_file)]
+            )
+        if self.query_result:
+            self._set_scenes_registered(self.query_result)
+
+    def _import_target_scenes(self):
+        """
+        Import the requested scenes, that are not yet registered in the
+        target mapset, and resume from the checkpoints of a previous run.
+
+        Returns:
+            (dict)
+            The list of [map_name, start_time, end_time] for each band or
+            None if all scenes are already registered
+
+        """
+        if self.target_mapset_exists is True:
+            self._copy_target_temporal_database()
+
+        # Restore the scenes of a previous run of the same job
+        self._setup_checkpoints(
+            self.strds_basename, self.atcor_method, sorted(self.scene_ids)
+        )
+        self._restore_checkpoints()
+
+        # Setup the download cache and query the BigQuery database of google
+        # for scene_ids
+        self._prepare_download()
+
+        # Check if all product ids were found
+        missing_scene_ids = []
+        for scene_id in self.scene_ids:
+            if scene_id not in self.query_result:
+                missing_scene_ids.append(scene_id)
+
+        # Abort if a single scene is missing
+        if len(missing_scene_ids) > 0:
+            raise AsyncProcessError(
+                "Unable to find product ids <%s> in the "
+                "Google BigQuery database" % str(missing_scene_ids)
+            )
+
+        if self.target_mapset_exists is True:
+            # Import only the scenes that are not yet registered
+            self._remove_registered_scenes()
+            if not self.query_result:
+                self._send_resource_update(
+                    "All scenes are already registered in mapset <%s>"
+                    % self.target_mapset_name
+                )
+                self.module_results = {}
+                return None
+
+        return self._import_scenes()
+
+    def _execute(self):
+
+        # Setup the user credentials and logger
+        self._setup()
+
+        # Deduplicated scenes grouped by sensor, before any download starts
+        self._plan_scenes()
+
+        # Check and lock the target and temp mapsets
+        self._check_lock_target_mapset()
+
+        if self.target_mapset_exists is True and self.append is False:
+            raise AsyncProcessError(
+                "Landsat time series can only be create in a new mapset. "
+                "Mapset <%s> already exists. Use append to add scenes to "
+                "its time series." % self.target_mapset_name
+            )
+
+        # Init GRASS environment and create the temporary mapset with the same
+        # name as the target mapset
+        # This is required to register the raster maps in the temporary
+        # directory, but use them in persistent directory
+
+        # Create the temp database and link the
+        # required mapsets into it
+        self._create_temp_database(self.required_mapsets)
+
+        # Initialize the GRASS environment and switch into PERMANENT
+        # mapset, which is always linked
+        self._create_grass_environment(
+            grass_data_base=self.temp_grass_data_base, mapset_name="PERMANENT"
+        )
+
+        # Create the temporary mapset and switch into it
+        self._create_temporary_mapset(temp_mapset_name=self.target_mapset_name)
+
+        if self.shard_mapsets:
+            # Gather the maps that were imported by the shard jobs
+            result_dict = self._gather_shards()
+        else:
+            result_dict = self._import_target_scenes()
+            if result_dict is None:
+                return
+
+        # The maps of a shard are registered by the merge job
+        if self.shard is None:
+            self._register_scenes(result_dict)
+
+        self.module_results = result_dict
+
+        # Copy local mapset to original project
+        with self._stage("merge"):
+            if self.target_mapset_exists is True:
+                self._append_tmp_mapset_to_target_mapset()
+            else:
+                self._copy_merge_tmp_mapset_to_target_mapset()
+
+        self._remove_checkpoints()
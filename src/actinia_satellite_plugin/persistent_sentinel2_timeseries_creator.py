@@ -7,26 +7,27 @@ Persistent Sentinel-2 time series creator
 """
 
 import pickle
-import os
-from flask import jsonify, make_response
-import dateutil.parser as dtparser
-from datetime import timedelta
-from copy import deepcopy
-from flask_restful_swagger_2 import swagger, Schema
+from flask import request
+from flask_restful_swagger_2 import Schema
 from actinia_core.models.response_models import (
     ProcessingResponseModel,
     ProcessingErrorResponseModel,
 )
-from actinia_processing_lib.persistent_processing import PersistentProcessing
 from actinia_rest_lib.resource_base import ResourceBase
-from actinia_core.core.common.kvdb_interface import enqueue_job
-from actinia_core.core.common.google_satellite_bigquery_interface import (
-    GoogleSatelliteBigQueryInterface,
+from actinia_core.core.common.config import global_config
+from .local_backend import get_query_interface
+from .metrics import lookup_timer
+from .dry_run import (
+    DRY_RUN_PARAMETER_DOC,
+    create_sentinel2_dry_run_plan,
+    is_dry_run,
+    make_dry_run_response,
 )
-from actinia_core.core.common.sentinel_processing_library import (
-    Sentinel2Processing,
-)
-from actinia_processing_lib.exceptions import AsyncProcessError
+from .callbacks import CALLBACK_URL_PROPERTY, check_callback_url
+from .sharding import check_shard_options, enqueue_shard_jobs, run_shard_job
+from .swagger_docs import lazy_doc
+from .serialization import make_json_response
+from .scheduling import BULK, schedule_job
 
 __license__ = "GPL-3.0-or-later"
 __author__ = "Sören Gebbert"
@@ -64,6 +65,30 @@ class Sentinel2ASceneListModel(Schema):
             "description": "A list of Sentinel-2 scene names that should be "
                            "downloaded and imported",
         },
+        "append": {
+            "type": "boolean",
+            "description": "Append the scenes to the space-time raster "
+            "datasets of an existing mapset. Only scenes that are not "
+            "already registered in the datasets will be imported.",
+            "default": False,
+        },
+        "checkpoint_key": {
+            "type": "string",
+            "description": "The key of the per-scene checkpoints. A "
+            "resubmitted job with the same key resumes from the completed "
+            "scenes of a failed job. Default is a key derived from the "
+            "request.",
+        },
+        "shards": {
+            "type": "integer",
+            "description": "Split the scenes into this number of shards, "
+            "that are imported in parallel by different workers. The "
+            "shards are merged into the mapset, before the maps are "
+            "registered in the space-time raster datasets.",
+            "minimum": 1,
+            "default": 1,
+        },
+        "callback_url": CALLBACK_URL_PROPERTY,
     }
     example = {
         "bands": ["B04", "B08"],
@@ -85,7 +110,9 @@ SCHEMA_DOC = {
     "for each imported band. "
     "The resulting data will be located in a persistent user database. "
     "The project name is part of the path and must exist. The mapset will "
-    "be created while importing and should not already exist in the project. "
+    "be created while importing and should not already exist in the project, "
+    "unless append is set to add new scenes to the existing space-time "
+    "raster datasets of the mapset. "
     "The names of the Sentinel-2 scenes and the band names that should"
     " be downloaded must be specified in the HTTP body as"
     " application/json content. In addition, the names of the "
@@ -122,6 +149,7 @@ SCHEMA_DOC = {
             "in": "body",
             "schema": Sentinel2ASceneListModel,
         },
+        DRY_RUN_PARAMETER_DOC,
     ],
     "responses": {
         "200": {
@@ -141,7 +169,7 @@ class AsyncSentinel2TimeSeriesCreatorResource(ResourceBase):
     def __init__(self):
         ResourceBase.__init__(self)
 
-    @swagger.doc(deepcopy(SCHEMA_DOC))
+    @lazy_doc(SCHEMA_DOC)
     def post(self, project_name, mapset_name):
         """
         Download and import Sentinel2A scenes into a new mapset and create
@@ -186,290 +214,89 @@ class AsyncSentinel2TimeSeriesCreatorResource(ResourceBase):
 
 
         """
+        if is_dry_run():
+            return self._get_dry_run_response()
+
         # Preprocess the post call
         rdc = self.preprocess(
             has_json=True, project_name=project_name, mapset_name=mapset_name
         )
+        if rdc is None:
+            # The error response of a request without a JSON document
+            html_code, response_model = pickle.loads(self.response_data)
+            return make_json_response(response_model, html_code)
 
-        # KvdbQueue approach
-        enqueue_job(self.job_timeout, start_job, rdc)
-
-        html_code, response_model = pickle.loads(self.response_data)
-        return make_response(jsonify(response_model), html_code)
+        error = check_shard_options(rdc.request_data)
+        if error is None:
+            error = check_callback_url(rdc.request_data)
+        if error:
+            return self.get_error_response(message=error)
 
-
-def start_job(*args):
-    processing = AsyncSentinel2TimeSeriesCreator(*args)
-    processing.run()
-
-
-class AsyncSentinel2TimeSeriesCreator(PersistentProcessing):
-    """
-    Create a space time raster dataset from all provided product_ids for
-    each Sentinel2A band in a new mapset.
-
-    The Sentiel2A scenes are downloaded , imported and pre-processed before
-    they are registered in the band specific space time datasets.
-    """
-
-    def __init__(self, rdc):
-        """Constructor
-
-        Args:
-            rdc (ResourceDataContainer): The data container that contains all
-                                         required variables for processing
-
-        """
-        PersistentProcessing.__init__(self, rdc)
-
-        # This works only if the mapset snot already exists
-        self.temp_mapset_name = self.mapset_name
-
-        self.query_interface = GoogleSatelliteBigQueryInterface(self.config)
-        self.product_ids = self.rdc.request_data["product_ids"]
-        self.strds_ids = self.rdc.request_data["strds"]
-        self.required_bands = self.rdc.request_data["bands"]
-        self.user_download_cache_path = os.path.join(
-            self.config.DOWNLOAD_CACHE, self.user_id
-        )
-        self.query_result = None
-
-    def _prepare_sentinel2_download(self):
-        """
-        Check the download cache if the file already exists, to avoid redundant
-        downloads.
-        The downloaded files will be stored in a temporary directory.
-        After the download of all files completes, the downloaded files will
-        be moved to the download cache. This avoids broken files in case a
-        download was interrupted or stopped by termination.
-
-        """
-        # Create the download cache directory if it does not exists
-        if os.path.exists(self.config.DOWNLOAD_CACHE):
-            pass
-        else:
-            os.mkdir(self.config.DOWNLOAD_CACHE)
-
-        # Create the user specific download cache directory to put the
-        # downloaded files into it
-        if os.path.exists(self.user_download_cache_path):
-            pass
+        # KvdbQueue approach
+        if rdc.request_data.get("shards", 1) > 1:
+            error = enqueue_shard_jobs(
+                self.job_timeout,
+                start_shard_job,
+                start_job,
+                rdc,
+                "product_ids",
+            )
+            if error:
+                return self.get_error_response(message=error)
         else:
-            os.mkdir(self.user_download_cache_path)
-
-        # Switch into the tempfile directory
-        os.chdir(self.temp_file_path)
-
-        # We have to set the home directory to create the grass project
-        os.putenv("HOME", "/tmp")
+            schedule_job(BULK, self.job_timeout, start_job, rdc)
 
-        self._send_resource_update("Sending Google BigQuery request.")
+        html_code, response_model = pickle.loads(self.response_data)
+        return make_json_response(response_model, html_code)
+
+    def _get_dry_run_response(self):
+        """Return the download and processing plan without starting a job"""
+        request_data = request.get_json(silent=True)
+        if not isinstance(request_data, dict) or not all(
+            isinstance(request_data.get(key), list)
+            for key in ["product_ids", "bands"]
+        ):
+            return self.get_error_response(
+                message="The lists of product_ids and bands are required"
+            )
 
+        product_ids = request_data["product_ids"]
+        bands = request_data["bands"]
         try:
-            self.query_result = self.query_interface.get_sentinel_urls(
-                self.product_ids, self.required_bands
-            )
+            with lookup_timer("bigquery", "get_sentinel_urls"):
+                query_result = get_query_interface(
+                    global_config
+                ).get_sentinel_urls(product_ids, bands)
         except Exception as e:
-            raise AsyncProcessError(
-                "Error in querying Sentinel-2 product <%s> "
-                "in Google BigQuery Sentinel-2 database. "
-                "Error: %s" % (self.product_ids, str(e))
-            )
-
-        if not self.query_result:
-            raise AsyncProcessError(
-                "Unable to find Sentinel-2 product <%s> "
-                "in Google BigQuery Sentinel-2 database" % self.product_ids
+            return self.get_error_response(
+                message="Error in querying Sentinel-2 products <%s> in "
+                "Google BigQuery Sentinel-2 database. Error: %s"
+                % (product_ids, str(e))
             )
 
-    def _import_sentinel2_scenes(self):
-        """
-        Import all found Sentinel2 scenes with their bands and create the
-        space time raster datasets to register the maps in.
-
-        Raises:
-            AsyncProcessError: In case something went wrong
-
-        """
-
-        all_commands = []
-        counter = 0
-
-        # Use only the product ids that were found in the big query
-        for product_id in self.query_result:
-
-            process_lib = Sentinel2Processing(
-                self.config,
-                product_id,
-                self.query_result,
-                self.required_bands,
-                self.temp_file_path,
-                self.user_download_cache_path,
-                self._send_resource_update,
-                self.message_logger,
-            )
-
-            (
-                download_commands,
-                self.sentinel2_band_file_list,
-            ) = process_lib.get_sentinel2_download_process_list()
-
-            # Download the sentinel scene if not in the download cache
-            if download_commands:
-                all_commands.extend(download_commands)
-
-            # Import and prepare the sentinel scenes
-            import_commands = process_lib.get_sentinel2_import_process_list()
-            all_commands.extend(import_commands)
-
-        self._update_num_of_steps(len(all_commands))
-        self._execute_process_list(process_list=all_commands)
-
-        # IMPORTANT:
-        # The registration must be performed in the temporary mapset with the
-        # same name as the target mapset,
-        # since the temporal database will contain the mapset name.
-
-        register_commands = {}
-
-        result_dict = {}
-
-        for i in range(len(self.required_bands)):
-            band = self.required_bands[i]
-            strds = self.strds_ids[i]
-
-            result_dict[band] = []
-
-            create_strds = {
-                "module": "t.create",
-                "inputs": {
-                    "output": strds,
-                    "title": "Sentinel2A time series for band %s" % band,
-                    "description": "Sentinel2A time series for band %s" % band,
-                    "temporaltype": "absolute",
-                    "type": "strds",
-                },
-            }
-
-            register_commands[str(counter)] = create_strds
-            counter += 1
-
-            # Create the input file
-            map_list_file_name = os.path.join(
-                self.user_download_cache_path, strds
-            )
-            map_list_file = open(map_list_file_name, "w")
-
-            # Use only the product ids that were found in the big query
-            for product_id in self.query_result:
-
-                # We need to create a time interval, otherwise the temporal
-                # algebra will not work :/
-                start_time = dtparser.parse(
-                    self.query_result[product_id]["timestamp"].split(".")[0]
-                )
-                end_time = start_time + timedelta(seconds=1)
-
-                result_dict[band].append(
-                    [
-                        self.query_result[product_id][band]["file"],
-                        str(start_time),
-                        str(end_time),
-                    ]
-                )
-
-                map_list_file.write(
-                    "%s|%s|%s\n"
-                    % (
-                        self.query_result[product_id][band]["file"],
-                        str(start_time),
-                        str(end_time),
-                    )
-                )
-            map_list_file.close()
-
-            register_maps = {
-                "module": "t.register",
-                "inputs": {
-                    "input": strds,
-                    "file": map_list_file_name,
-                    "type": "raster",
-                },
-            }
-
-            register_commands[str(counter)] = register_maps
-            counter += 1
-
-        process_list = self._validate_process_chain(
-            process_chain=register_commands, skip_permission_check=True
-        )
-        self._execute_process_list(process_list=process_list)
-
-        self.module_results = result_dict
-
-    def _execute(self):
-
-        # Setup the user credentials and logger
-        self._setup()
-
-        if len(self.required_bands) != len(self.strds_ids):
-            raise AsyncProcessError(
-                "The number of bands and the number of strds must be equal"
-            )
-
-        for band in self.required_bands:
-            if self.required_bands.count(band) > 2:
-                raise AsyncProcessError("The band names must be unique")
-
-        for strds in self.strds_ids:
-            if self.strds_ids.count(strds) > 2:
-                raise AsyncProcessError("The strds names must be unique")
-
-        # Check and lock the target and temp mapsets
-        self._check_lock_target_mapset()
-
-        if self.target_mapset_exists is True:
-            raise AsyncProcessError(
-                "Sentinel time series can only be create in a new mapset. "
-                "Mapset <%s> already exists." % self.target_mapset_name
-            )
-
-        # Init GRASS environment and create the temporary mapset with the same
-        # name as the target mapset
-        # This is required to register the raster maps in the temporary
-        # directory, but use them in persistent directory
-
-        # Create the temp database and link the
-        # required mapsets into it
-        self._create_temp_database(self.required_mapsets)
-
-        # Initialize the GRASS environment and switch into PERMANENT
-        # mapset, which is always linked
-        self._create_grass_environment(
-            grass_data_base=self.temp_grass_data_base, mapset_name="PERMANENT"
+        # The registration of all maps is a single process
+        plan = create_sentinel2_dry_run_plan(
+            product_ids,
+            bands,
+            query_result,
+            self.download_cache,
+            extra_steps=1,
         )
+        return make_dry_run_response(plan)
 
-        # Create the temporary mapset and switch into it
-        self._create_temporary_mapset(temp_mapset_name=self.target_mapset_name)
 
-        # Setup the download cache and query the BigQuery database of google
-        # for product_ids
-        self._prepare_sentinel2_download()
+def start_job(*args):
+    from .persistent_sentinel2_timeseries_processing import (
+        AsyncSentinel2TimeSeriesCreator,
+    )
 
-        # Check if all product ids were found
-        missing_product_ids = []
-        for product_id in self.product_ids:
-            if product_id not in self.query_result:
-                missing_product_ids.append(product_id)
+    processing = AsyncSentinel2TimeSeriesCreator(*args)
+    processing.run()
 
-        # Abort if a single scene is missing
-        if len(missing_product_ids) > 0:
-            raise AsyncProcessError(
-                "Unable to find product ids <%s> in the "
-                "Google BigQuery database" % str(missing_product_ids)
-            )
 
-        self._import_sentinel2_scenes()
+def start_shard_job(*args):
+    from .persistent_sentinel2_timeseries_processing import (
+        AsyncSentinel2TimeSeriesCreator,
+    )
 
-        # Copy local mapset to original project
-        self._copy_merge_tmp_mapset_to_target_mapset()
+    run_shard_job(AsyncSentinel2TimeSeriesCreator, *args)
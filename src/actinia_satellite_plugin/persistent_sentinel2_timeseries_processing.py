@@ -0,0 +1,374 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Persistent Sentinel-2 time series processing of the queue
+workers
+"""
+
+import os
+from actinia_processing_lib.persistent_processing import PersistentProcessing
+from actinia_core.core.common.sentinel_processing_library import (
+    Sentinel2Processing,
+)
+from actinia_processing_lib.exceptions import AsyncProcessError
+from .temporal_registration import (
+    get_registration_process,
+    get_scene_time_intervals,
+    write_registration_spec,
+)
+from .aoi import relocate_vrt_files
+from .timeseries_append import TimeSeriesAppendMixin
+from .checkpoints import SceneCheckpointMixin
+from .mapset_merge import MapsetMoveMixin
+from .instrumentation import StageInstrumentationMixin
+from .status_stream import StatusNotificationMixin
+from .callbacks import CompletionCallbackMixin
+from .status_throttle import StatusUpdateThrottleMixin
+from .local_backend import get_query_interface
+from .metrics import lookup_timer
+from .sharding import ShardMergeMixin
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+class AsyncSentinel2TimeSeriesCreator(
+    StatusNotificationMixin,
+    StageInstrumentationMixin,
+    CompletionCallbackMixin,
+    ShardMergeMixin,
+    SceneCheckpointMixin,
+    TimeSeriesAppendMixin,
+    MapsetMoveMixin,
+    StatusUpdateThrottleMixin,
+    PersistentProcessing,
+):
+    """
+    Create a space time raster dataset from all provided product_ids for
+    each Sentinel2A band in a new mapset.
+
+    The Sentiel2A scenes are downloaded , imported and pre-processed before
+    they are registered in the band specific space time datasets.
+    """
+
+    def __init__(self, rdc):
+        """Constructor
+
+        Args:
+            rdc (ResourceDataContainer): The data container that contains all
+                                         required variables for processing
+
+        """
+        PersistentProcessing.__init__(self, rdc)
+
+        # This works only if the mapset snot already exists
+        self.temp_mapset_name = self.mapset_name
+
+        self.query_interface = get_query_interface(self.config)
+        self.product_ids = self.rdc.request_data["product_ids"]
+        self.strds_ids = self.rdc.request_data["strds"]
+        self.required_bands = self.rdc.request_data["bands"]
+        self.append = self.rdc.request_data.get("append", False)
+        self.user_download_cache_path = os.path.join(
+            self.config.DOWNLOAD_CACHE, self.user_id
+        )
+        self.query_result = None
+        self._setup_shards()
+
+    def _prepare_sentinel2_download(self):
+        """
+        Check the download cache if the file already exists, to avoid redundant
+        downloads.
+        The downloaded files will be stored in a temporary directory.
+        After the download of all files completes, the downloaded files will
+        be moved to the download cache. This avoids broken files in case a
+        download was interrupted or stopped by termination.
+
+        """
+        # Create the download cache directory if it does not exists
+        if os.path.exists(self.config.DOWNLOAD_CACHE):
+            pass
+        else:
+            os.mkdir(self.config.DOWNLOAD_CACHE)
+
+        # Create the user specific download cache directory to put the
+        # downloaded files into it
+        if os.path.exists(self.user_download_cache_path):
+            pass
+        else:
+            os.mkdir(self.user_download_cache_path)
+
+        # Switch into the tempfile directory
+        os.chdir(self.temp_file_path)
+
+        # We have to set the home directory to create the grass project
+        os.putenv("HOME", "/tmp")
+
+        self._send_resource_update("Sending Google BigQuery request.")
+
+        try:
+            with self._stage("query"), lookup_timer(
+                "bigquery", "get_sentinel_urls"
+            ):
+                self.query_result = self.query_interface.get_sentinel_urls(
+                    self.product_ids, self.required_bands
+                )
+        except Exception as e:
+            raise AsyncProcessError(
+                "Error in querying Sentinel-2 product <%s> "
+                "in Google BigQuery Sentinel-2 database. "
+                "Error: %s" % (self.product_ids, str(e))
+            )
+
+        if not self.query_result:
+            raise AsyncProcessError(
+                "Unable to find Sentinel-2 product <%s> "
+                "in Google BigQuery Sentinel-2 database" % self.product_ids
+            )
+
+    def _remove_registered_scenes(self):
+        """Remove the scenes from the query result that are already
+        registered in all band specific space time raster datasets of the
+        target mapset
+        """
+        registered_maps = {}
+        for band, strds in zip(self.required_bands, self.strds_ids):
+            registered_maps[band] = self._get_registered_maps(strds)
+
+        for product_id in list(self.query_result):
+            registered = True
+            for band in self.required_bands:
+                map_name = self.query_result[product_id][band]["file"]
+                if map_name not in registered_maps[band]:
+                    registered = False
+                    break
+            if registered is True:
+                del self.query_result[product_id]
+
+    def _import_sentinel2_scenes(self):
+        """
+        Import all found Sentinel2 scenes with their bands.
+
+        Returns:
+            (dict)
+            The list of [map_name, start_time, end_time] for each band
+
+        Raises:
+            AsyncProcessError: In case something went wrong
+
+        """
+
+        stage_list = []
+
+        # Use only the product ids that were found in the big query
+        for product_id in self.query_result:
+
+            process_lib = Sentinel2Processing(
+                self.config,
+                product_id,
+                self.query_result,
+                self.required_bands,
+                self.temp_file_path,
+                self.user_download_cache_path,
+                self._send_resource_update,
+                self.message_logger,
+            )
+
+            (
+                download_commands,
+                self.sentinel2_band_file_list,
+            ) = process_lib.get_sentinel2_download_process_list()
+
+            # Download the sentinel scene if not in the download cache
+            stage_list.append((product_id, "downloaded", download_commands))
+
+            # Import and prepare the sentinel scenes
+            import_commands = process_lib.get_sentinel2_import_process_list()
+            relocate_vrt_files(import_commands, self.temp_file_path)
+            stage_list.append((product_id, "imported", import_commands))
+
+        # Run the commands scene by scene and record the checkpoints
+        self._execute_scene_stages(stage_list)
+
+        # Parse the acquisition time of each scene only once
+        time_intervals = get_scene_time_intervals(self.query_result)
+
+        result_dict = {}
+
+        for band in self.required_bands:
+            # Use only the product ids that were found in the big query
+            result_dict[band] = [
+                [
+                    self.query_result[product_id][band]["file"],
+                    start_time,
+                    end_time,
+                ]
+                for product_id, (start_time, end_time) in (
+                    time_intervals.items()
+                )
+            ]
+
+        return result_dict
+
+    def _register_scenes(self, result_dict):
+        """
+        Create the space time raster datasets and register the maps of all
+        bands in them.
+
+        Args:
+            result_dict (dict): The list of [map_name, start_time, end_time]
+                                for each band
+
+        """
+        # IMPORTANT:
+        # The registration must be performed in the temporary mapset with the
+        # same name as the target mapset,
+        # since the temporal database will contain the mapset name.
+        strds_list = []
+        for band, strds in zip(self.required_bands, self.strds_ids):
+            strds_list.append(
+                {
+                    "name": strds,
+                    "title": "Sentinel2A time series for band %s" % band,
+                    "description": "Sentinel2A time series for band %s"
+                    % band,
+                    "maps": result_dict[band],
+                }
+            )
+
+        # Create all STRDS and register all maps in a single process
+        spec_file = write_registration_spec(
+            strds_list,
+            os.path.join(self.temp_file_path, "temporal_registration.json"),
+        )
+        self._update_num_of_steps(1)
+        with self._stage("register"):
+            self._execute_process_list(
+                process_list=[get_registration_process(spec_file)]
+            )
+        if self.query_result:
+            self._set_scenes_registered(self.query_result)
+
+    def _import_target_scenes(self):
+        """
+        Import the requested scenes, that are not yet registered in the
+        target mapset, and resume from the checkpoints of a previous run.
+
+        Returns:
+            (dict)
+            The list of [map_name, start_time, end_time] for each band or
+            None if all scenes are already registered
+
+        """
+        if self.target_mapset_exists is True:
+            self._copy_target_temporal_database()
+
+        # Restore the scenes of a previous run of the same job
+        self._setup_checkpoints(
+            self.strds_ids, self.required_bands, sorted(self.product_ids)
+        )
+        self._restore_checkpoints()
+
+        # Setup the download cache and query the BigQuery database of google
+        # for product_ids
+        self._prepare_sentinel2_download()
+
+        # Check if all product ids were found
+        missing_product_ids = []
+        for product_id in self.product_ids:
+            if product_id not in self.query_result:
+                missing_product_ids.append(product_id)
+
+        # Abort if a single scene is missing
+        if len(missing_product_ids) > 0:
+            raise AsyncProcessError(
+                "Unable to find product ids <%s> in the "
+                "Google BigQuery database" % str(missing_product_ids)
+            )
+
+        if self.target_mapset_exists is True:
+            # Import only the scenes that are not yet registered
+            self._remove_registered_scenes()
+            if not self.query_result:
+                self._send_resource_update(
+                    "All scenes are already registered in mapset <%s>"
+                    % self.target_mapset_name
+                )
+                self.module_results = {}
+                return None
+
+        return self._import_sentinel2_scenes()
+
+    def _execute(self):
+
+        # Setup the user credentials and logger
+        self._setup()
+
+        if len(self.required_bands) != len(self.strds_ids):
+            raise AsyncProcessError(
+                "The number of bands and the number of strds must be equal"
+            )
+
+        for band in self.required_bands:
+            if self.required_bands.count(band) > 1:
+                raise AsyncProcessError("The band names must be unique")
+
+        for strds in self.strds_ids:
+            if self.strds_ids.count(strds) > 1:
+                raise AsyncProcessError("The strds names must be unique")
+
+        # Check and lock the target and temp mapsets
+        self._check_lock_target_mapset()
+
+        if self.target_mapset_exists is True and self.append is False:
+            raise AsyncProcessError(
+                "Sentinel time series can only be create in a new mapset. "
+                "Mapset <%s> already exists. Use append to add scenes to "
+                "its time series." % self.target_mapset_name
+            )
+
+        # Init GRASS environment and create the temporary mapset with the same
+        # name as the target mapset
+        # This is required to register the raster maps in the temporary
+        # directory, but use them in persistent directory
+
+        # Create the temp database and link the
+        # required mapsets into it
+        self._create_temp_database(self.required_mapsets)
+
+        # Initialize the GRASS environment and switch into PERMANENT
+        # mapset, which is always linked
+        self._create_grass_environment(
+            grass_data_base=self.temp_grass_data_base, mapset_name="PERMANENT"
+        )
+
+        # Create the temporary mapset and switch into it
+        self._create_temporary_mapset(temp_mapset_name=self.target_mapset_name)
+
+        if self.shard_mapsets:
+            # Gather the maps that were imported by the shard jobs
+            result_dict = self._gather_shards()
+        else:
+            result_dict = self._import_target_scenes()
+            if result_dict is None:
+                return
+
+        # The maps of a shard are registered by the merge job
+        if self.shard is None:
+            self._register_scenes(result_dict)
+
+        self.module_results = result_dict
+
+        # Copy local mapset to original project
+        with self._stage("merge"):
+            if self.target_mapset_exists is True:
+                self._append_tmp_mapset_to_target_mapset()
+            else:
+                self._copy_merge_tmp_mapset_to_target_mapset()
+
+        self._remove_checkpoints()
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Optional JSON options of the ephemeral satellite processing resources
+"""
+
+from flask import request
+from flask_restful_swagger_2 import Schema
+from .aoi import create_aoi_feature_collection
+from .callbacks import CALLBACK_URL_PROPERTY, check_callback_url
+from .import_mode import IMPORT_MODES
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+class EphemeralProcessingOptionsModel(Schema):
+    """
+    This schema defines the optional JSON input of the ephemeral satellite
+    processing resources
+    """
+
+    type = "object"
+    properties = {
+        "bbox": {
+            "type": "object",
+            "description": "The area of interest as WGS84 bounding box. "
+            "Only the pixels inside the bounding box are imported, processed "
+            "and exported.",
+            "properties": {
+                "north": {"type": "number", "format": "double"},
+                "south": {"type": "number", "format": "double"},
+                "east": {"type": "number", "format": "double"},
+                "west": {"type": "number", "format": "double"},
+            },
+            "required": ["north", "south", "east", "west"],
+        },
+        "geojson": {
+            "type": "object",
+            "description": "The area of interest as GeoJSON (multi)polygon "
+            "geometry, feature or feature collection with WGS84 coordinates. "
+            "Only the pixels inside the polygons are imported, processed and "
+            "exported. Can not be used together with bbox.",
+        },
+        "remote_read": {
+            "type": "boolean",
+            "description": "Read only the required byte ranges of the band "
+            "files from the remote storage via HTTP range requests, instead "
+            "of downloading the whole files. Requires an area of interest. "
+            "Files of servers that do not support range requests are "
+            "downloaded.",
+            "default": False,
+        },
+        "import_mode": {
+            "type": "string",
+            "description": "The import mode of the band files. copy imports "
+            "the band data into the GRASS database, link registers the band "
+            "files of the download cache in place (r.external) and avoids "
+            "copying the band data.",
+            "enum": IMPORT_MODES,
+            "default": "copy",
+        },
+        "callback_url": CALLBACK_URL_PROPERTY,
+    }
+    example = {
+        "bbox": {
+            "north": 50.4,
+            "south": 50.3,
+            "east": 7.2,
+            "west": 7.0,
+        },
+        "remote_read": True,
+        "import_mode": "link",
+    }
+
+
+OPTIONS_PARAMETER_DOC = {
+    "name": "options",
+    "description": "Optional processing options like an area of interest",
+    "required": False,
+    "in": "body",
+    "schema": EphemeralProcessingOptionsModel,
+}
+
+
+def get_request_options():
+    """Read and validate the optional JSON options of the current request
+
+    Returns:
+        (tuple)
+        The options dict (empty if no JSON body was provided) and an error
+        message that is None if the options are valid
+
+    """
+    if not request.is_json or not request.get_data():
+        return {}, None
+
+    options = request.get_json(silent=True)
+    if not isinstance(options, dict):
+        return {}, "The processing options must be a JSON object"
+
+    try:
+        aoi = create_aoi_feature_collection(options)
+    except ValueError as e:
+        return options, "Invalid area of interest: %s" % str(e)
+
+    remote_read = options.get("remote_read", False)
+    if not isinstance(remote_read, bool):
+        return options, "The remote_read option must be a boolean"
+    if remote_read and aoi is None:
+        return options, "The remote_read option requires an area of interest"
+
+    if options.get("import_mode", "copy") not in IMPORT_MODES:
+        return options, "Wrong import mode. Available modes are: %s" % (
+            ",".join(IMPORT_MODES)
+        )
+
+    error = check_callback_url(options)
+    if error:
+        return options, error
+
+    return options, None
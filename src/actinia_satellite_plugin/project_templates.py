@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Cache of prebuilt GRASS project templates, one for each EPSG code
+"""
+
+import os
+import re
+import shutil
+import uuid
+from actinia_core.core.common.process_object import Process
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+def sentinel2_product_epsg(product_id):
+    """Derive the EPSG code of a Sentinel-2 product from its MGRS tile
+
+    Sentinel-2 L1C products are delivered in the WGS84 UTM zone of the
+    tile, i.e. the product S2A_MSIL1C_20170212T104141_N0204_R008_T31TGJ_...
+    is located in UTM zone 31 north (EPSG:32631).
+
+    Args:
+        product_id (str): The Sentinel-2 product id
+
+    Returns:
+        (int)
+        The EPSG code or None if the product id has no tile information
+
+    """
+    match = re.search(r"_T(\d{2})([C-X])[A-Z]{2}(_|$)", product_id)
+    if match is None:
+        return None
+    zone = int(match.group(1))
+    # The latitude bands N to X are located in the northern hemisphere
+    if match.group(2) >= "N":
+        return 32600 + zone
+    return 32700 + zone
+
+
+def landsat_mtl_epsg(mtl_file):
+    """Derive the EPSG code of a Landsat scene from its MTL metadata file
+
+    Landsat scenes are delivered in WGS84 UTM north zones, also in the
+    southern hemisphere, or in the antarctic polar stereographic projection.
+
+    Args:
+        mtl_file (str): The path to the MTL metadata file
+
+    Returns:
+        (int)
+        The EPSG code or None if the projection can not be derived
+
+    """
+    if not os.path.isfile(mtl_file):
+        return None
+
+    metadata = {}
+    with open(mtl_file, "r") as f:
+        for line in f:
+            if "=" in line:
+                key, value = line.split("=", 1)
+                metadata[key.strip()] = value.strip().strip('"')
+
+    if metadata.get("DATUM", "WGS84") != "WGS84":
+        return None
+    if metadata.get("MAP_PROJECTION") == "UTM" and "UTM_ZONE" in metadata:
+        return 32600 + int(metadata["UTM_ZONE"])
+    if metadata.get("MAP_PROJECTION") == "PS":
+        return 3031
+    return None
+
+
+class ProjectTemplates(object):
+    """Prebuilt GRASS projects that are copied into the temporary database
+    of a job, instead of creating the project with a GRASS startup
+
+    A template is created once per EPSG code. The templates are copied and
+    not hardlinked, since GRASS rewrites the region files of a project.
+    """
+
+    def __init__(self, template_path):
+        """
+        Args:
+            template_path (str): The directory that stores the templates
+
+        """
+        self.template_path = template_path
+
+    def get_template_path(self, epsg):
+        return os.path.join(self.template_path, "epsg_%i" % epsg)
+
+    def has_template(self, epsg):
+        return os.path.isfile(
+            os.path.join(self.get_template_path(epsg), "PERMANENT", "WIND")
+        )
+
+    def get_create_template_process(self, grass_start_script, epsg):
+        """Create the process that builds a new template
+
+        The template is created in a unique temporary directory and must be
+        added to the cache with add_template() after the process finished.
+
+        Args:
+            grass_start_script (str): The GRASS start script
+            epsg (int): The EPSG code of the template
+
+        Returns:
+            (tuple)
+            The Process and the path of the new project
+
+        """
+        os.makedirs(self.template_path, exist_ok=True)
+        project_path = os.path.join(
+            self.template_path, ".epsg_%i_%s" % (epsg, uuid.uuid4().hex)
+        )
+        p = Process(
+            exec_type="exec",
+            executable="python3",
+            executable_params=[
+                grass_start_script,
+                "-e",
+                "-c",
+                "EPSG:%i" % epsg,
+                project_path,
+            ],
+            id="create_project_template_epsg_%i" % epsg,
+            skip_permission_check=True,
+        )
+        return p, project_path
+
+    def add_template(self, epsg, project_path):
+        """Move a newly created project into the cache
+
+        The rename is atomic, so concurrent jobs never see an incomplete
+        template. If another job added the template in the meantime, the
+        new project is removed.
+
+        Args:
+            epsg (int): The EPSG code of the template
+            project_path (str): The path of the new project
+
+        """
+        try:
+            os.rename(project_path, self.get_template_path(epsg))
+        except OSError:
+            shutil.rmtree(project_path, ignore_errors=True)
+            if not self.has_template(epsg):
+                raise
+
+    def copy_template(self, epsg, project_path):
+        """Copy a template into the temporary database of a job
+
+        Args:
+            epsg (int): The EPSG code of the template
+            project_path (str): The path of the project that should be
+                                created
+
+        """
+        shutil.copytree(self.get_template_path(epsg), project_path)
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Windowed remote reads of satellite band files via HTTP range requests
+"""
+
+import os
+import requests
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+# GDAL configuration that avoids directory listings of the remote server
+# and merges neighbouring range requests
+REMOTE_READ_GDAL_ENV = {
+    "GDAL_DISABLE_READDIR_ON_OPEN": "EMPTY_DIR",
+    "GDAL_HTTP_MULTIRANGE": "YES",
+    "GDAL_HTTP_MERGE_CONSECUTIVE_RANGES": "YES",
+    "GDAL_HTTP_MAX_RETRY": "5",
+    "GDAL_HTTP_RETRY_DELAY": "1",
+    "VSI_CACHE": "TRUE",
+    "CPL_VSIL_CURL_ALLOWED_EXTENSIONS": ".TIF,.tif,.jp2,.vrt",
+}
+
+
+def to_vsicurl_path(url):
+    """Convert a http(s) URL into a GDAL virtual file path
+
+    GDAL reads only the byte ranges of a /vsicurl/ file that are required
+    for the current window, which is very efficient for cloud optimized
+    GeoTiff and tiled JPEG2000 files.
+
+    Args:
+        url (str): The URL of the remote file
+
+    Returns:
+        (str)
+        The virtual file path
+
+    """
+    if url.startswith("/vsicurl/"):
+        return url
+    return "/vsicurl/%s" % url
+
+
+def supports_range_requests(url, timeout=10):
+    """Check if a remote server supports HTTP range requests for an URL
+
+    A single byte of the file is requested. Servers that support range
+    requests answer with 206 Partial Content.
+
+    Args:
+        url (str): The URL of the remote file
+        timeout (int): The timeout of the request in seconds
+
+    Returns:
+        (bool)
+        True if range requests are supported, False otherwise
+
+    """
+    try:
+        response = requests.get(
+            url, headers={"Range": "bytes=0-0"}, timeout=timeout, stream=True
+        )
+        response.close()
+    except requests.RequestException:
+        return False
+    return response.status_code == 206
+
+
+def set_remote_read_environment():
+    """Set the GDAL environment variables for efficient remote reads"""
+    for key, value in REMOTE_READ_GDAL_ENV.items():
+        os.putenv(key, value)
+
+
+def filter_download_process_list(process_list, skip_list):
+    """Remove the download processes of files that are read remotely
+
+    The download of a file consists of a wget and a move process, that
+    contain either the URL or the local file path as parameter.
+
+    Args:
+        process_list (list): The list of download Process objects
+        skip_list (list): The URLs and local file paths of files that should
+                          not be downloaded
+
+    Returns:
+        (list)
+        The filtered process list
+
+    """
+    skip = set(skip_list)
+    return [
+        p
+        for p in process_list
+        if not any(param in skip for param in p.executable_params)
+    ]
+
+
+def replace_remote_inputs(process_list, remote_inputs):
+    """Replace local input files of import processes by remote virtual files
+
+    Parameters that are equal to a local file path are replaced, as well as
+    the file path of the *input* option of GRASS modules.
+
+    Args:
+        process_list (list): The list of import Process objects
+        remote_inputs (dict): A mapping of local file paths to /vsicurl/
+                              file paths
+
+    Returns:
+        (list)
+        The modified process list
+
+    """
+    for p in process_list:
+        params = p.executable_params
+        for idx, param in enumerate(params):
+            if param in remote_inputs:
+                params[idx] = remote_inputs[param]
+            elif param.startswith("input="):
+                file_path = param.split("=", 1)[1]
+                if file_path in remote_inputs:
+                    params[idx] = "input=%s" % remote_inputs[file_path]
+    return process_list
@@ -6,18 +6,23 @@ SPDX-License-Identifier: GPL-3.0-or-later
 This module is responsible to answer requests for file based resources.
 """
 
-from flask import jsonify, make_response
 from flask_restful import Resource
-from flask_restful_swagger_2 import swagger, Schema
-from copy import deepcopy
+from flask_restful_swagger_2 import Schema
 from flask_restful import reqparse
 from actinia_core.core.common.config import global_config
-from actinia_core.core.common.google_satellite_bigquery_interface import (
-    GoogleSatelliteBigQueryInterface,
-)
 from actinia_core.core.common.app import auth
 from actinia_core.core.common.api_logger import log_api_call
 from actinia_core.models.response_models import SimpleResponseModel
+from .local_backend import get_query_interface
+from .metrics import lookup_timer
+from .swagger_docs import lazy_doc
+from .serialization import make_json_response
+from .http_cache import (
+    get_query_etag,
+    is_not_modified,
+    make_not_modified_response,
+    set_cache_headers,
+)
 
 __license__ = "GPL-3.0-or-later"
 __author__ = "Sören Gebbert"
@@ -352,38 +357,45 @@ class SatelliteQuery(Resource):
         if "spacecraft_id" in args:
             spacecraft_id = args["spacecraft_id"]
 
+        # Answer repeated queries of an unchanged catalog without a lookup
+        etag = get_query_etag(satellite, args)
+        if is_not_modified(etag):
+            return make_not_modified_response(etag)
+
         try:
-            iface = GoogleSatelliteBigQueryInterface(global_config)
+            iface = get_query_interface(global_config)
 
             if satellite == "landsat":
-                result = iface.query_landsat_archive(
-                    start_time=start_time,
-                    end_time=end_time,
-                    lon=lon,
-                    lat=lat,
-                    cloud_cover=cloud_cover,
-                    scene_id=scene_id,
-                    spacecraft_id=spacecraft_id,
-                )
+                with lookup_timer("bigquery", "query_landsat_archive"):
+                    result = iface.query_landsat_archive(
+                        start_time=start_time,
+                        end_time=end_time,
+                        lon=lon,
+                        lat=lat,
+                        cloud_cover=cloud_cover,
+                        scene_id=scene_id,
+                        spacecraft_id=spacecraft_id,
+                    )
             else:
-                result = iface.query_sentinel2_archive(
-                    start_time=start_time,
-                    end_time=end_time,
-                    lon=lon,
-                    lat=lat,
-                    cloud_cover=cloud_cover,
-                    scene_id=scene_id,
-                )
-            return make_response(jsonify(result), 200)
+                with lookup_timer("bigquery", "query_sentinel2_archive"):
+                    result = iface.query_sentinel2_archive(
+                        start_time=start_time,
+                        end_time=end_time,
+                        lon=lon,
+                        lat=lat,
+                        cloud_cover=cloud_cover,
+                        scene_id=scene_id,
+                    )
+            return set_cache_headers(make_json_response(result, 200), etag)
         except Exception as e:
             result = {"status": "error", "message": str(e)}
-            return make_response(jsonify(result), 400)
+            return make_json_response(result, 400)
 
 
 class LandsatQuery(SatelliteQuery):
     """Query the Landsat4-8 archives"""
 
-    @swagger.doc(deepcopy(SCHEMA_LAND_DOC))
+    @lazy_doc(SCHEMA_LAND_DOC)
     def get(self):
         """
         Query the Google Landsat archives using time interval, lat/lon
@@ -395,7 +407,7 @@ class LandsatQuery(SatelliteQuery):
 class Sentinel2Query(SatelliteQuery):
     """Query the Sentinel2A archives"""
 
-    @swagger.doc(deepcopy(SCHEMA_SENT_DOC))
+    @lazy_doc(SCHEMA_SENT_DOC)
     def get(self):
         """
         Query the Google Sentinel2 archives using time interval, lat/lon
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Planning of the Landsat scenes of a time series import
+"""
+
+from actinia_core.core.common.landsat_processing_library import (
+    SCENE_BANDS,
+    extract_sensor_id_from_scene_id,
+)
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+def normalize_scene_ids(scene_ids):
+    """Normalize the scene ids and remove duplicates
+
+    Args:
+        scene_ids (list): The list of Landsat scene ids
+
+    Returns:
+        (list)
+        The upper case scene ids without surrounding whitespace, each
+        scene only once in the order of the request
+
+    """
+    result = []
+    for scene_id in scene_ids:
+        scene_id = str(scene_id).strip().upper()
+        if scene_id and scene_id not in result:
+            result.append(scene_id)
+    return result
+
+
+def group_scenes_by_sensor(scene_ids):
+    """Group the scene ids by the Landsat sensor
+
+    Args:
+        scene_ids (list): The list of normalized Landsat scene ids
+
+    Returns:
+        (dict)
+        The scene ids of each sensor id, in the order of the request
+
+    Raises:
+        ValueError: If the sensor of a scene is not supported
+
+    """
+    groups = {}
+    for scene_id in scene_ids:
+        sensor_id = extract_sensor_id_from_scene_id(scene_id)
+        if sensor_id not in SCENE_BANDS:
+            raise ValueError(
+                "Unsupported Landsat sensor <%s> of scene <%s>. Supported "
+                "sensors are: %s"
+                % (sensor_id, scene_id, ", ".join(sorted(SCENE_BANDS)))
+            )
+        groups.setdefault(sensor_id, []).append(scene_id)
+    return groups
+
+
+def get_band_key(sensor_id, band, multi_sensor):
+    """Return the band key of a STRDS family
+
+    The key is appended to the STRDS basename. The sensor id is only part
+    of the key if scenes of different sensors are imported, so single
+    sensor time series keep their names.
+
+    Args:
+        sensor_id (str): The Landsat sensor id, e.g. "LC08"
+        band (str): The band name, e.g. "B1"
+        multi_sensor (bool): True if the job imports several sensors
+
+    Returns:
+        (str)
+        The band key
+
+    """
+    if multi_sensor is True:
+        return "%s_%s" % (sensor_id, band)
+    return band
@@ -0,0 +1,408 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Fair scheduling of the satellite jobs
+
+The actinia job queues are FIFO queues, a user that enqueues many time
+series imports delays the jobs of all other users. The fair scheduler keeps
+the submitted jobs in a queue for each job class and user and passes at
+most SCHEDULER_SLOTS jobs to the actinia job queue at the same time. When a
+job is finished, its worker passes the next jobs. The slots are shared by
+the job classes according to their weights and by the users of a job class
+in equal parts (stride scheduling). SCHEDULER_RESERVED_SLOTS are never used
+by bulk jobs, so that interactive jobs do not wait for a time series import.
+
+The slot of a job whose worker was killed is released after the job timeout,
+counted from the start of the job. The API server processes and the workers
+of the running jobs check the timeouts every SCHEDULER_SWEEP_INTERVAL
+seconds, so the slots are released even if no job is submitted or finished.
+"""
+
+import json
+import os
+import pickle
+import threading
+import time
+from actinia_core.core.common.kvdb_interface import enqueue_job
+from actinia_core.core.logging_interface import log
+from valkey import Valkey
+from .config import satellite_config
+from .metrics import metrics
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+# The ephemeral processing jobs
+INTERACTIVE = "interactive"
+# The time series import jobs
+BULK = "bulk"
+JOB_CLASSES = [INTERACTIVE, BULK]
+
+SCHEDULER_STATE_KEY = "SATELLITE-SCHEDULER::state"
+SCHEDULER_LOCK_KEY = "SATELLITE-SCHEDULER::lock"
+SCHEDULER_JOB_PREFIX = "SATELLITE-SCHEDULER::job::"
+
+# The queue wait buckets in seconds
+QUEUE_WAIT_BUCKETS = (1, 5, 15, 30, 60, 300, 900, 1800, 3600, 14400)
+
+_kvdb_servers = {}
+_sweepers = {}
+
+
+def get_kvdb_server(config):
+    """Return the KVDB client of the scheduler for the current process
+
+    Args:
+        config: The actinia configuration
+
+    """
+    pid = os.getpid()
+    if pid not in _kvdb_servers:
+        kwargs = dict()
+        kwargs["host"] = config.KVDB_SERVER_URL
+        kwargs["port"] = config.KVDB_SERVER_PORT
+        if config.KVDB_SERVER_PW:
+            kwargs["password"] = config.KVDB_SERVER_PW
+        # A forked worker process must not use the connection of its parent
+        _kvdb_servers.clear()
+        _kvdb_servers[pid] = Valkey(**kwargs)
+    return _kvdb_servers[pid]
+
+
+def get_class_weight(job_class):
+    if job_class == INTERACTIVE:
+        return max(satellite_config.SCHEDULER_INTERACTIVE_WEIGHT, 1)
+    return max(satellite_config.SCHEDULER_BULK_WEIGHT, 1)
+
+
+def get_class_slots(job_class, slots):
+    """Return the number of slots that a job class can use"""
+    if job_class == INTERACTIVE:
+        return slots
+    return max(slots - satellite_config.SCHEDULER_RESERVED_SLOTS, 1)
+
+
+def create_state():
+    return {"queues": {}, "passes": {}, "user_passes": {}, "running": {}}
+
+
+def _activate(passes, key):
+    # A class or user that has no waiting jobs gets no credit for the time
+    # it was idle, it starts with the smallest pass of the active ones
+    if key not in passes:
+        passes[key] = min(passes.values(), default=0.0)
+
+
+def add_job(state, job):
+    """Add a job to the queue of its class and user
+
+    Args:
+        state (dict): The scheduler state
+        job (dict): The job with the keys job_id, job_class, user_id,
+                    timeout and submitted
+
+    """
+    job_class, user_id = job["job_class"], job["user_id"]
+    _activate(state["passes"], job_class)
+    user_passes = state["user_passes"].setdefault(job_class, {})
+    _activate(user_passes, user_id)
+    users = state["queues"].setdefault(job_class, {})
+    users.setdefault(user_id, []).append(job)
+
+
+def start_job(state, job, now=None):
+    """Mark a running job as started and set its deadline
+
+    A job that was released, since it waited longer than
+    SCHEDULER_START_TIMEOUT in the job queue, occupies a slot again.
+
+    Args:
+        state (dict): The scheduler state
+        job (dict): The job that is started by a worker
+        now (float): The current time
+
+    """
+    now = time.time() if now is None else now
+    state["running"][job["job_id"]] = {
+        "job_class": job["job_class"],
+        "user_id": job["user_id"],
+        "started": True,
+        "deadline": now + job["timeout"],
+    }
+
+
+def select_jobs(state, slots, now=None):
+    """Select the jobs that can be passed to the job queue
+
+    The job class with the smallest pass and a free slot is selected and
+    its pass is increased by the inverse of its weight. Within the class,
+    the user with the fewest running jobs and then the smallest pass is
+    selected. The selected jobs are moved to the running jobs of the state.
+    Running jobs that exceeded their timeout since their start are
+    released, since their worker was killed. Jobs that did not start
+    within SCHEDULER_START_TIMEOUT are released as well.
+
+    Args:
+        state (dict): The scheduler state
+        slots (int): The number of slots
+        now (float): The current time
+
+    Returns:
+        (list)
+        The selected jobs
+
+    """
+    now = time.time() if now is None else now
+    running = state["running"]
+    for job_id in list(running):
+        if running[job_id]["deadline"] < now:
+            del running[job_id]
+
+    selected = []
+    while len(running) < slots:
+        counts, user_counts = {}, {}
+        for job in running.values():
+            counts[job["job_class"]] = counts.get(job["job_class"], 0) + 1
+            key = (job["job_class"], job["user_id"])
+            user_counts[key] = user_counts.get(key, 0) + 1
+        candidates = [
+            job_class
+            for job_class, users in state["queues"].items()
+            if users
+            and counts.get(job_class, 0) < get_class_slots(job_class, slots)
+        ]
+        if not candidates:
+            break
+        job_class = min(
+            candidates,
+            key=lambda c: (state["passes"][c], JOB_CLASSES.index(c)),
+        )
+        users = state["queues"][job_class]
+        user_passes = state["user_passes"][job_class]
+        user_id = min(
+            users,
+            key=lambda u: (
+                user_counts.get((job_class, u), 0),
+                user_passes[u],
+                u,
+            ),
+        )
+
+        job = users[user_id].pop(0)
+        state["passes"][job_class] += 1.0 / get_class_weight(job_class)
+        user_passes[user_id] += 1.0
+        if not users[user_id]:
+            del users[user_id]
+            del user_passes[user_id]
+        if not users:
+            del state["passes"][job_class]
+
+        # The deadline of the job timeout is set when the job starts
+        running[job["job_id"]] = {
+            "job_class": job_class,
+            "user_id": job["user_id"],
+            "started": False,
+            "deadline": now + satellite_config.SCHEDULER_START_TIMEOUT,
+        }
+        selected.append(job)
+    return selected
+
+
+class FairScheduler(object):
+    """The fair scheduler state in the KVDB
+
+    The state is a JSON document that is read and written under a KVDB
+    lock, since the API server processes submit the jobs and the workers
+    finish them concurrently. The pickled job arguments are stored in
+    separate keys.
+    """
+
+    def __init__(self, kvdb_server, slots=None):
+        """
+        Args:
+            kvdb_server: The KVDB client, e.g. valkey.Valkey
+            slots (int): The number of slots, SCHEDULER_SLOTS by default
+
+        """
+        self.kvdb_server = kvdb_server
+        if slots is None:
+            slots = satellite_config.SCHEDULER_SLOTS
+        self.slots = slots
+
+    def _read(self):
+        state = self.kvdb_server.get(SCHEDULER_STATE_KEY)
+        return json.loads(state) if state is not None else create_state()
+
+    def _write(self, state):
+        self.kvdb_server.set(SCHEDULER_STATE_KEY, json.dumps(state))
+
+    def _update(self, function):
+        with self.kvdb_server.lock(SCHEDULER_LOCK_KEY, timeout=10):
+            state = self._read()
+            function(state)
+            jobs = select_jobs(state, self.slots)
+            self._write(state)
+        for job in jobs:
+            self._enqueue(job)
+        return jobs
+
+    def _enqueue(self, job):
+        key = SCHEDULER_JOB_PREFIX + job["job_id"]
+        payload = self.kvdb_server.get(key)
+        if payload is None:
+            log.error("The scheduled job %s has expired" % job["job_id"])
+            self.finish(job["job_id"])
+            return
+        self.kvdb_server.delete(key)
+        func, args = pickle.loads(payload)
+        enqueue_job(
+            job["timeout"], run_scheduled_job, args[0], func, job, *args[1:]
+        )
+
+    def submit(self, job_class, job_timeout, func, rdc, *args):
+        """Submit a job and pass the jobs that have a free slot
+
+        Args:
+            job_class (str): The job class, interactive or bulk
+            job_timeout (int): The timeout of the job
+            func (function): The job function
+            rdc (ResourceDataContainer): The data container of the job
+            *args: The further arguments of the job function
+
+        """
+        job = {
+            "job_id": rdc.resource_id,
+            "job_class": job_class,
+            "user_id": rdc.user_id,
+            "timeout": job_timeout,
+            "submitted": time.time(),
+        }
+        self.kvdb_server.set(
+            SCHEDULER_JOB_PREFIX + job["job_id"],
+            pickle.dumps((func, (rdc,) + args)),
+            ex=rdc.config.KVDB_RESOURCE_EXPIRE_TIME,
+        )
+        metrics.inc(
+            "actinia_satellite_scheduled_jobs_total",
+            help="The jobs that were submitted to the fair scheduler",
+            job_class=job_class,
+        )
+        self._update(lambda state: add_job(state, job))
+
+    def start(self, job):
+        """Set the deadline of a job that is started by a worker"""
+        self._update(lambda state: start_job(state, job))
+
+    def finish(self, job_id):
+        """Release the slot of a job and pass the next jobs"""
+        self._update(lambda state: state["running"].pop(job_id, None))
+
+    def sweep(self):
+        """Release the slots of the timed out jobs and pass the next jobs"""
+        return self._update(lambda state: None)
+
+
+def _sweep_periodically(kvdb_server, stop):
+    while not stop.wait(satellite_config.SCHEDULER_SWEEP_INTERVAL):
+        try:
+            FairScheduler(kvdb_server).sweep()
+        except Exception as e:
+            log.error("Unable to sweep the scheduler state: %s" % str(e))
+
+
+def start_sweeper(kvdb_server, stop=None):
+    """Sweep the scheduler state in a daemon thread
+
+    Args:
+        kvdb_server: The KVDB client
+        stop (threading.Event): The event that stops the thread
+
+    Returns:
+        (threading.Thread)
+        The thread or None if the sweep is disabled
+
+    """
+    if satellite_config.SCHEDULER_SWEEP_INTERVAL <= 0:
+        return None
+    thread = threading.Thread(
+        target=_sweep_periodically,
+        args=(kvdb_server, stop or threading.Event()),
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
+def _start_process_sweeper(kvdb_server):
+    # A single sweeper for each API server process
+    pid = os.getpid()
+    if pid not in _sweepers:
+        _sweepers.clear()
+        _sweepers[pid] = start_sweeper(kvdb_server)
+
+
+def schedule_job(job_class, job_timeout, func, rdc, *args):
+    """Enqueue a job through the fair scheduler
+
+    The job is enqueued directly in the actinia job queue if the scheduler
+    is disabled.
+
+    Args:
+        job_class (str): The job class, interactive or bulk
+        job_timeout (int): The timeout of the job
+        func (function): The job function
+        rdc (ResourceDataContainer): The data container of the job
+        *args: The further arguments of the job function
+
+    """
+    if satellite_config.SCHEDULER_SLOTS <= 0:
+        enqueue_job(job_timeout, func, rdc, *args)
+        return
+    kvdb_server = get_kvdb_server(rdc.config)
+    _start_process_sweeper(kvdb_server)
+    FairScheduler(kvdb_server).submit(
+        job_class, job_timeout, func, rdc, *args
+    )
+
+
+def run_scheduled_job(rdc, func, job, *args):
+    """Run a scheduled job in the worker and release its slot
+
+    The job timeout starts when the worker starts the job. The state is
+    swept while the job is running.
+
+    Args:
+        rdc (ResourceDataContainer): The data container of the job
+        func (function): The job function
+        job (dict): The scheduled job
+        *args: The further arguments of the job function
+
+    """
+    metrics.observe(
+        "actinia_satellite_scheduler_queue_wait_seconds",
+        time.time() - job["submitted"],
+        buckets=QUEUE_WAIT_BUCKETS,
+        help="The time between the submission and the start of the jobs",
+        job_class=job["job_class"],
+    )
+    kvdb_server = get_kvdb_server(rdc.config)
+    try:
+        FairScheduler(kvdb_server).start(job)
+    except Exception as e:
+        log.error("Unable to start the scheduled job: %s" % str(e))
+
+    stop = threading.Event()
+    start_sweeper(kvdb_server, stop)
+    try:
+        func(rdc, *args)
+    finally:
+        stop.set()
+        try:
+            FairScheduler(kvdb_server).finish(job["job_id"])
+        except Exception as e:
+            log.error("Unable to release the scheduler slot: %s" % str(e))
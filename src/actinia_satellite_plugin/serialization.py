@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+JSON serialization and compression of the responses
+
+The responses of the satellite resources are serialized with orjson if it
+is installed and with the json module of the standard library otherwise.
+Further serializers can be added with register_serializer(). Responses that
+are larger than RESPONSE_COMPRESSION_MIN_SIZE are compressed with brotli
+(if installed) or gzip, negotiated from the Accept-Encoding header of the
+request.
+"""
+
+import dataclasses
+import datetime
+import decimal
+import gzip
+import json
+import uuid
+from flask import Response, request
+from .config import satellite_config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+JSON_CONTENT_TYPE = "application/json"
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def _default(obj):
+    """Serialize the types that are not supported by the JSON encoders"""
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if dataclasses.is_dataclass(obj):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(
+        "Object of type %s is not JSON serializable" % type(obj).__name__
+    )
+
+
+def _dumps_json(data):
+    return json.dumps(data, separators=(",", ":"), default=_default).encode(
+        "utf-8"
+    )
+
+
+def _dumps_orjson(data):
+    try:
+        return orjson.dumps(
+            data,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+    except TypeError:
+        # E.g. integers that exceed 64 bit
+        return _dumps_json(data)
+
+
+SERIALIZERS = {"json": _dumps_json}
+if orjson is not None:
+    SERIALIZERS["orjson"] = _dumps_orjson
+
+
+def register_serializer(name, function):
+    """Register a JSON serializer
+
+    Args:
+        name (str): The name that is used in the JSON_SERIALIZER option
+        function: A function that converts an object into JSON bytes
+
+    """
+    SERIALIZERS[name] = function
+
+
+def get_serializer(name=None):
+    """Return the configured JSON serializer
+
+    Args:
+        name (str): The name of the serializer, default is the
+                    JSON_SERIALIZER option. "auto" selects orjson if it is
+                    installed.
+
+    Returns:
+        A function that converts an object into JSON bytes
+
+    """
+    name = name or satellite_config.JSON_SERIALIZER
+    if name == "auto":
+        name = "orjson" if "orjson" in SERIALIZERS else "json"
+    if name not in SERIALIZERS:
+        raise ValueError("Unknown JSON serializer <%s>" % name)
+    return SERIALIZERS[name]
+
+
+def dumps(data, name=None):
+    """Serialize an object into JSON bytes"""
+    return get_serializer(name)(data)
+
+
+def get_accepted_encodings(header):
+    """Parse an Accept-Encoding header
+
+    Args:
+        header (str): The header value, e.g. "gzip, br;q=0.9, *;q=0"
+
+    Returns:
+        (dict)
+        The quality of each accepted encoding
+
+    """
+    encodings = {}
+    for part in (header or "").split(","):
+        fields = part.strip().split(";")
+        encoding = fields[0].strip().lower()
+        if not encoding:
+            continue
+        quality = 1.0
+        for field in fields[1:]:
+            key, _, value = field.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        encodings[encoding] = quality
+    return encodings
+
+
+def choose_encoding(header):
+    """Choose the content encoding of a response
+
+    Brotli is preferred to gzip with the same quality.
+
+    Returns:
+        (str)
+        "br", "gzip" or None
+
+    """
+    encodings = get_accepted_encodings(header)
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best, best_quality = None, 0.0
+    for encoding in candidates:
+        quality = encodings.get(encoding, encodings.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body, encoding):
+    """Compress a response body with the content encoding"""
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def make_json_response(data, status=200):
+    """Create a JSON response of the current request
+
+    This replaces make_response(jsonify(data), status).
+
+    Args:
+        data: The object that should be serialized
+        status (int): The HTTP status code
+
+    Returns:
+        (flask.Response)
+
+    """
+    body = dumps(data)
+    response = Response(body, status=status, mimetype=JSON_CONTENT_TYPE)
+    if not satellite_config.RESPONSE_COMPRESSION:
+        return response
+    response.vary.add("Accept-Encoding")
+    if len(body) < satellite_config.RESPONSE_COMPRESSION_MIN_SIZE:
+        return response
+    encoding = choose_encoding(request.headers.get("Accept-Encoding"))
+    if encoding is not None:
+        response.set_data(compress(body, encoding))
+        response.headers["Content-Encoding"] = encoding
+    return response
@@ -0,0 +1,490 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Sharded time series creation over multiple actinia workers
+"""
+
+import fcntl
+import glob
+import json
+import os
+import pickle
+import shutil
+import time
+from contextlib import contextmanager
+from copy import deepcopy
+from actinia_core.core.kvdb_lock import KvdbLockingInterface
+from actinia_core.core.logging_interface import log
+from actinia_processing_lib.exceptions import AsyncProcessError
+from .checkpoints import transfer_raster_maps
+from .scheduling import BULK, schedule_job
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+def split_into_shards(items, num_shards):
+    """Split a list into contiguous shards of nearly equal size
+
+    Args:
+        items (list): The list of scene ids
+        num_shards (int): The requested number of shards
+
+    Returns:
+        (list)
+        The list of shards, never more shards than items
+
+    """
+    num_shards = max(1, min(num_shards, len(items)))
+    size, rest = divmod(len(items), num_shards)
+    shards = []
+    start = 0
+    for index in range(num_shards):
+        end = start + size + (1 if index < rest else 0)
+        shards.append(items[start:end])
+        start = end
+    return shards
+
+
+def get_shard_mapset_name(mapset_name, index):
+    """Return the name of the mapset a shard is imported in"""
+    return "%s_shard_%i" % (mapset_name, index)
+
+
+def get_shard_state_path(rdc):
+    """Return the path of the shard state of a sharded job
+
+    The state must be located on a file system that is shared by all
+    workers, like the download cache.
+    """
+    return os.path.join(
+        rdc.config.DOWNLOAD_CACHE, rdc.user_id, "shards", rdc.resource_id
+    )
+
+
+def get_target_mapset_lock_id(rdc):
+    """Return the lock id of the target mapset of a sharded job
+
+    The id is the same as the one of the persistent processing, so the
+    merge job takes over the lock that was set for the shard phase.
+    """
+    return "%s/%s/%s" % (rdc.user_group, rdc.project_name, rdc.mapset_name)
+
+
+def get_lock_interface(config):
+    """Return a KVDB locking interface connected with the actinia KVDB"""
+    kwargs = dict()
+    kwargs["host"] = config.KVDB_SERVER_URL
+    kwargs["port"] = config.KVDB_SERVER_PORT
+    if config.KVDB_SERVER_PW:
+        kwargs["password"] = config.KVDB_SERVER_PW
+    lock_interface = KvdbLockingInterface()
+    lock_interface.connect(**kwargs)
+    return lock_interface
+
+
+def check_shard_options(request_data):
+    """Check the shard options of a time series request
+
+    Returns:
+        (str)
+        The error message or None
+
+    """
+    if not isinstance(request_data, dict):
+        return "The request body must be a JSON object"
+    shards = request_data.get("shards", 1)
+    if not isinstance(shards, int) or isinstance(shards, bool) or shards < 1:
+        return "The number of shards must be a positive integer"
+    if shards > 1 and request_data.get("append", False) is True:
+        return "Sharding can not be combined with the append mode"
+    return None
+
+
+class ShardCoordinator(object):
+    """The gather state of the shards of a sharded job
+
+    Every shard job reports its result or error. The job that reports the
+    last shard gets True from report() exactly once and enqueues the merge
+    job. The state file is protected with a file lock, since the shard
+    jobs run concurrently in different worker processes.
+
+    A shard job that is killed never reports. Hence the state has a
+    deadline, that is extended by the job timeout whenever a shard starts.
+    When the deadline has passed, expire() reports the missing shards as
+    failed and the merge job is enqueued, which fails the parent request
+    and removes the shard mapsets, the state and the mapset lock.
+    """
+
+    def __init__(self, state_path):
+        """
+        Args:
+            state_path (str): The state directory of the sharded job
+
+        """
+        self.state_path = state_path
+        self.state_file = os.path.join(state_path, "state.json")
+        self.merge_file = os.path.join(state_path, "merge.pickle")
+
+    def _read(self):
+        with open(self.state_file, "r") as f:
+            return json.load(f)
+
+    def _write(self, state):
+        with open(self.state_file + ".new", "w") as f:
+            json.dump(state, f)
+        os.rename(self.state_file + ".new", self.state_file)
+
+    @contextmanager
+    def _locked(self):
+        """Read the state under the file lock and write it back"""
+        with open(self.state_file + ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            state = self._read()
+            yield state
+            self._write(state)
+
+    def start(self, num_shards, deadline, merge_job):
+        """Initialize the state for a number of shards
+
+        Args:
+            num_shards (int): The number of shards
+            deadline (float): The time at which the missing shards fail
+            merge_job (tuple): The job function, the timeout and the data
+                               container of the merge job
+
+        """
+        os.makedirs(self.state_path, exist_ok=True)
+        with open(self.merge_file, "wb") as f:
+            pickle.dump(merge_job, f)
+        self._write(
+            {
+                "count": num_shards,
+                "reports": {},
+                "merging": False,
+                "deadline": deadline,
+            }
+        )
+
+    def exists(self):
+        return os.path.isfile(self.state_file)
+
+    def start_shard(self, job_timeout, now=None):
+        """Extend the deadline for a shard job that starts now"""
+        now = time.time() if now is None else now
+        with self._locked() as state:
+            state["deadline"] = max(state["deadline"], now + job_timeout)
+
+    def report(self, index, results=None, error=None):
+        """Report the result or the error of a shard
+
+        Args:
+            index (int): The index of the shard
+            results (dict): The module results of the shard
+            error (str): The error message if the shard failed
+
+        Returns:
+            (bool)
+            True if this was the last shard and the merge must be started
+
+        """
+        if not self.exists():
+            # The sharded job has expired and was already merged
+            return False
+        with self._locked() as state:
+            state["reports"][str(index)] = {
+                "results": results,
+                "error": error,
+            }
+            merge = (
+                len(state["reports"]) >= state["count"]
+                and state["merging"] is False
+            )
+            if merge is True:
+                state["merging"] = True
+        return merge
+
+    def expire(self, now=None):
+        """Report the missing shards as failed if the deadline has passed
+
+        Returns:
+            (bool)
+            True if the deadline has passed and the merge must be started
+
+        """
+        now = time.time() if now is None else now
+        if not self.exists():
+            return False
+        with self._locked() as state:
+            merge = state["merging"] is False and state["deadline"] < now
+            if merge is True:
+                state["merging"] = True
+                for index in range(state["count"]):
+                    state["reports"].setdefault(
+                        str(index),
+                        {
+                            "results": None,
+                            "error": "The shard job did not finish "
+                            "before the deadline",
+                        },
+                    )
+        return merge
+
+    def enqueue_merge(self):
+        """Enqueue the merge job of the parent request"""
+        with open(self.merge_file, "rb") as f:
+            start_job, job_timeout, rdc = pickle.load(f)
+        schedule_job(BULK, job_timeout, start_job, rdc)
+
+    def get_reports(self):
+        """Return the reports of all shards ordered by the shard index"""
+        reports = self._read()["reports"]
+        return [
+            dict(index=int(index), **reports[index])
+            for index in sorted(reports, key=int)
+        ]
+
+    def remove(self):
+        """Remove the state directory"""
+        shutil.rmtree(self.state_path, ignore_errors=True)
+
+
+def fail_expired_shard_jobs(download_cache, now=None):
+    """Enqueue the merge job of all sharded jobs whose deadline has passed
+
+    The check runs whenever a sharded job is submitted and a shard job
+    starts or finishes.
+
+    Args:
+        download_cache (str): The download cache with the shard states
+        now (float): The current time
+
+    """
+    pattern = os.path.join(download_cache, "*", "shards", "*", "state.json")
+    for state_file in glob.glob(pattern):
+        coordinator = ShardCoordinator(os.path.dirname(state_file))
+        try:
+            if coordinator.expire(now):
+                coordinator.enqueue_merge()
+        except Exception as e:
+            log.error(
+                "Unable to expire the sharded job %s: %s"
+                % (coordinator.state_path, str(e))
+            )
+
+
+def enqueue_shard_jobs(
+    job_timeout, start_shard_job, start_job, rdc, scene_key
+):
+    """Split the scenes of a request and enqueue one job for each shard
+
+    Each shard job gets its own resource id and imports its scenes into a
+    shard mapset. The parent resource id is kept for the merge job, so the
+    user polls the status of the parent resource. The target mapset is
+    locked before the shard jobs are enqueued, the merge job takes over
+    the lock.
+
+    Args:
+        job_timeout (int): The timeout of the shard jobs and the merge job
+        start_shard_job (function): The job function, that is called with
+                                    the shard and the parent data container
+        start_job (function): The job function of the merge job, that is
+                              called with the parent data container
+        rdc (ResourceDataContainer): The data container of the request
+        scene_key (str): The request key of the scene id list
+
+    Returns:
+        (str)
+        The error message or None
+
+    """
+    fail_expired_shard_jobs(rdc.config.DOWNLOAD_CACHE)
+
+    shards = split_into_shards(
+        rdc.request_data[scene_key], rdc.request_data["shards"]
+    )
+    # The shards may run one after another, the merge job has its own
+    # timeout
+    deadline = time.time() + job_timeout * len(shards)
+
+    lock_interface = get_lock_interface(rdc.config)
+    ret = lock_interface.lock(
+        resource_id=get_target_mapset_lock_id(rdc),
+        expiration=job_timeout * (len(shards) + 1),
+    )
+    if ret == 0:
+        return (
+            "Unable to lock project/mapset <%s/%s>, resource is already "
+            "locked" % (rdc.project_name, rdc.mapset_name)
+        )
+
+    ShardCoordinator(get_shard_state_path(rdc)).start(
+        len(shards), deadline, (start_job, job_timeout, rdc)
+    )
+
+    for index, scene_ids in enumerate(shards):
+        request_data = deepcopy(rdc.request_data)
+        del request_data["shards"]
+        # The callback is delivered by the merge job of the parent request
+        request_data.pop("callback_url", None)
+        request_data[scene_key] = scene_ids
+        request_data["shard"] = {
+            "index": index,
+            "count": len(shards),
+            "scene_ids": rdc.request_data[scene_key],
+        }
+
+        shard_rdc = deepcopy(rdc)
+        shard_rdc.set_request_data(request_data)
+        shard_rdc.resource_id = "%s_shard_%i" % (rdc.resource_id, index)
+        shard_rdc.mapset_name = get_shard_mapset_name(rdc.mapset_name, index)
+        schedule_job(
+            BULK, job_timeout, start_shard_job, shard_rdc, rdc, job_timeout
+        )
+    return None
+
+
+def run_shard_job(processing_class, shard_rdc, parent_rdc, job_timeout):
+    """Run a shard job and enqueue the merge job if it was the last shard
+
+    Args:
+        processing_class: The time series creator class
+        shard_rdc (ResourceDataContainer): The data container of the shard
+        parent_rdc (ResourceDataContainer): The data container of the
+                                            sharded request
+        job_timeout (int): The timeout of the shard job
+
+    """
+    download_cache = parent_rdc.config.DOWNLOAD_CACHE
+    fail_expired_shard_jobs(download_cache)
+    coordinator = ShardCoordinator(get_shard_state_path(parent_rdc))
+    if not coordinator.exists():
+        # The sharded job has already failed
+        return
+    coordinator.start_shard(job_timeout)
+
+    results, error = None, None
+    try:
+        processing = processing_class(shard_rdc)
+        processing.run()
+
+        if "success" in processing.run_state:
+            results = processing.module_results
+        else:
+            error = "; ".join(
+                "%s: %s" % (key, value)
+                for key, value in processing.run_state.items()
+                if key != "exception"
+            )
+    except Exception as e:
+        # The job timeout of the worker is raised as exception
+        error = str(e) or e.__class__.__name__
+        raise
+    finally:
+        if coordinator.report(
+            shard_rdc.request_data["shard"]["index"], results, error
+        ):
+            coordinator.enqueue_merge()
+        fail_expired_shard_jobs(download_cache)
+
+
+class ShardMergeMixin(object):
+    """Shard and merge mode of the persistent time series creators
+
+    A shard job imports its scenes into a shard mapset without registering
+    them. The merge job runs with the parent request, links the raster maps
+    of all shard mapsets into its temporary mapset and registers all maps
+    in the STRDS of the target mapset. It takes over the lock of the target
+    mapset, that was set when the shard jobs were enqueued, and releases it
+    in any case.
+    """
+
+    shard = None
+    shard_mapsets = []
+    shard_lock_checked = False
+
+    def _setup_shards(self):
+        """Set the shard mode of the job from the request"""
+        self.shard = self.rdc.request_data.get("shard")
+        shards = self.rdc.request_data.get("shards", 1)
+        if self.shard is None and shards > 1:
+            self.shard_mapsets = [
+                get_shard_mapset_name(self.mapset_name, index)
+                for index in range(shards)
+            ]
+
+    def _lock_target_mapset(self):
+        if not self.shard_mapsets:
+            return super()._lock_target_mapset()
+        self.shard_lock_checked = True
+        ret = self.lock_interface.extend(
+            resource_id=self.target_mapset_lock_id,
+            expiration=self.process_time_limit * self.process_num_limit,
+        )
+        if ret == 0:
+            # The lock of the shard phase has expired
+            return super()._lock_target_mapset()
+        self.target_mapset_lock_set = True
+
+    def _gather_shards(self):
+        """Link the raster maps of all shards into the temporary mapset
+
+        Returns:
+            (dict)
+            The merged module results of all shards
+
+        Raises:
+            AsyncProcessError: If a shard failed
+
+        """
+        coordinator = ShardCoordinator(get_shard_state_path(self.rdc))
+        reports = coordinator.get_reports()
+
+        errors = [
+            "shard %i: %s" % (report["index"], report["error"])
+            for report in reports
+            if report["error"] is not None
+        ]
+        if errors:
+            raise AsyncProcessError(
+                "Unable to import all shards of the time series. %s"
+                % " ".join(errors)
+            )
+
+        self._send_resource_update("Merge %i shards" % len(reports))
+
+        result_dict = {}
+        for report in reports:
+            shard_mapset = get_shard_mapset_name(
+                self.mapset_name, report["index"]
+            )
+            transfer_raster_maps(
+                os.path.join(self.user_project_path, shard_mapset),
+                self.temp_mapset_path,
+            )
+            for band, map_list in report["results"].items():
+                result_dict.setdefault(band, []).extend(map_list)
+        return result_dict
+
+    def _remove_shards(self):
+        """Remove the shard mapsets and the shard state of the merge job"""
+        if self.user_project_path is not None:
+            for shard_mapset in self.shard_mapsets:
+                shutil.rmtree(
+                    os.path.join(self.user_project_path, shard_mapset),
+                    ignore_errors=True,
+                )
+        ShardCoordinator(get_shard_state_path(self.rdc)).remove()
+
+    def _final_cleanup(self):
+        super()._final_cleanup()
+        if self.shard_mapsets:
+            if self.shard_lock_checked is False:
+                # The merge job failed before it took over the lock
+                self.lock_interface.unlock(self.target_mapset_lock_id)
+            self._remove_shards()
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Status versions and notifications of the satellite jobs
+
+Each status update that a processing class writes to the resource database
+increments a version counter of the resource in the KVDB and publishes the
+new version on a channel of the resource. The status stream resource waits
+for these notifications instead of letting the clients poll the status.
+"""
+
+import time
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+STATUS_VERSION_PREFIX = "SATELLITE-STATUS-VERSION::"
+STATUS_CHANNEL_PREFIX = "SATELLITE-STATUS::"
+
+# The status of a resource that will not change anymore
+FINAL_STATUS = ["finished", "error", "terminated"]
+
+
+def _resource_key(user_id, resource_id):
+    return "%s/%s" % (user_id, resource_id)
+
+
+def publish_status_version(kvdb_server, user_id, resource_id, expiration):
+    """Increment the status version of a resource and publish it
+
+    Args:
+        kvdb_server: The KVDB client, e.g. valkey.StrictValkey
+        user_id (str): The user id
+        resource_id (str): The resource id
+        expiration (int): The expiration time of the version in seconds
+
+    Returns:
+        (int)
+        The new status version
+
+    """
+    key = _resource_key(user_id, resource_id)
+    pipeline = kvdb_server.pipeline()
+    pipeline.incr(STATUS_VERSION_PREFIX + key)
+    pipeline.expire(STATUS_VERSION_PREFIX + key, expiration)
+    version = pipeline.execute()[0]
+    kvdb_server.publish(STATUS_CHANNEL_PREFIX + key, version)
+    return version
+
+
+def get_status_version(kvdb_server, user_id, resource_id):
+    """Return the status version of a resource, 0 if it was not updated"""
+    version = kvdb_server.get(
+        STATUS_VERSION_PREFIX + _resource_key(user_id, resource_id)
+    )
+    return int(version) if version is not None else 0
+
+
+def wait_for_status_version(kvdb_server, user_id, resource_id, since, timeout):
+    """Wait until the status version of a resource is newer than a version
+
+    The channel of the resource is subscribed before the version is read,
+    so that no update is missed.
+
+    Args:
+        kvdb_server: The KVDB client
+        user_id (str): The user id
+        resource_id (str): The resource id
+        since (int): The status version that the client knows
+        timeout (float): The maximum waiting time in seconds
+
+    Returns:
+        (int)
+        The current status version, it is not newer than since if the
+        timeout was reached
+
+    """
+    pubsub = kvdb_server.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(
+        STATUS_CHANNEL_PREFIX + _resource_key(user_id, resource_id)
+    )
+    try:
+        deadline = time.monotonic() + timeout
+        version = get_status_version(kvdb_server, user_id, resource_id)
+        while version <= since:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            message = pubsub.get_message(timeout=remaining)
+            if message is not None:
+                version = get_status_version(
+                    kvdb_server, user_id, resource_id
+                )
+        return version
+    finally:
+        pubsub.close()
+
+
+class StatusNotificationMixin(object):
+    """Publish each status update of a satellite processing job
+
+    The version counter of the resource expires with the resource entry.
+    A failing notification does not fail the job, the clients of the status
+    stream receive the update with the next notification or at the end of
+    their waiting time.
+    """
+
+    def _send_to_database(self, document, final=False):
+        super()._send_to_database(document, final)
+        try:
+            publish_status_version(
+                self.resource_logger.db.kvdb_server,
+                self.user_id,
+                self.resource_id,
+                self.config.KVDB_RESOURCE_EXPIRE_TIME,
+            )
+        except Exception as e:
+            self.message_logger.error(
+                "Unable to publish the status update: %s" % str(e)
+            )
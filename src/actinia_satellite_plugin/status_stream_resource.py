@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Status stream of the satellite jobs
+
+The status of a resource is delivered as server-sent events or as long
+poll, each time a satellite processing job updates it. The status version
+is the cursor of the clients: the event id of the server-sent events and
+the X-Status-Version header of the long poll responses.
+"""
+
+import pickle
+import time
+from flask import Response, request
+from actinia_core.models.response_models import SimpleResponseModel
+from actinia_core.rest.resource_management import ResourceManagerBase
+from .config import satellite_config
+from .serialization import dumps, make_json_response
+from .status_stream import (
+    FINAL_STATUS,
+    get_status_version,
+    wait_for_status_version,
+)
+from .swagger_docs import lazy_doc
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+EVENT_STREAM_CONTENT_TYPE = "text/event-stream"
+STATUS_VERSION_HEADER = "X-Status-Version"
+
+SCHEMA_DOC = {
+    "tags": ["Satellite Image Algorithms"],
+    "description": "Wait for the status updates of a resource of the "
+    "satellite processing and import endpoints instead of polling the "
+    "status URL. With the Accept header text/event-stream the status is "
+    "sent as server-sent event after each update, until the resource is "
+    "finished or STATUS_STREAM_TIMEOUT is reached. The event id is the "
+    "status version, reconnecting clients send it in the Last-Event-ID "
+    "header. Otherwise the request is a long poll: the status is returned "
+    "as soon as its version is newer than the 'since' parameter or when the "
+    "timeout is reached. The version is returned in the X-Status-Version "
+    "header. Minimum required user role: user.",
+    "parameters": [
+        {
+            "name": "user_id",
+            "description": "The unique user name/id",
+            "required": True,
+            "in": "path",
+            "type": "string",
+        },
+        {
+            "name": "resource_id",
+            "description": "The id of the resource",
+            "required": True,
+            "in": "path",
+            "type": "string",
+        },
+        {
+            "name": "since",
+            "description": "The status version that the client knows. "
+            "The status is returned immediately if it is omitted.",
+            "required": False,
+            "in": "query",
+            "type": "integer",
+        },
+        {
+            "name": "timeout",
+            "description": "The maximum waiting time of a long poll in "
+            "seconds",
+            "required": False,
+            "in": "query",
+            "type": "number",
+        },
+    ],
+    "produces": ["application/json", EVENT_STREAM_CONTENT_TYPE],
+    "responses": {
+        "200": {
+            "description": "The status of the resource",
+        },
+        "400": {
+            "description": "The error message",
+            "schema": SimpleResponseModel,
+        },
+    },
+}
+
+
+def format_event(version, http_code, response_model):
+    """Format a status update as server-sent event"""
+    data = dumps({"http_code": http_code, "status": response_model})
+    return "id: %i\nevent: status\ndata: %s\n\n" % (
+        version,
+        data.decode("utf-8"),
+    )
+
+
+class SatelliteStatusStreamResource(ResourceManagerBase):
+    """Stream the status updates of the satellite jobs"""
+
+    def _get_status(self, user_id, resource_id):
+        """Return the HTTP code and the response model of a resource"""
+        _, response_data = self.resource_logger.get_latest_iteration(
+            user_id, resource_id
+        )
+        if response_data is None:
+            return None, None
+        return pickle.loads(response_data)
+
+    def _stream(self, user_id, resource_id, since):
+        """Yield server-sent events until the resource is finished"""
+        kvdb_server = self.resource_logger.db.kvdb_server
+        deadline = time.monotonic() + satellite_config.STATUS_STREAM_TIMEOUT
+        yield "retry: %i\n\n" % (satellite_config.STATUS_STREAM_RETRY * 1000)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            version = wait_for_status_version(
+                kvdb_server,
+                user_id,
+                resource_id,
+                since,
+                min(remaining, satellite_config.STATUS_STREAM_HEARTBEAT),
+            )
+            if version <= since:
+                # Keep the connection alive through proxies
+                yield ": heartbeat\n\n"
+                continue
+            since = version
+            http_code, response_model = self._get_status(user_id, resource_id)
+            if response_model is None:
+                return
+            yield format_event(version, http_code, response_model)
+            if response_model.get("status") in FINAL_STATUS:
+                return
+
+    @lazy_doc(SCHEMA_DOC)
+    def get(self, user_id, resource_id):
+        """Wait for the status updates of a resource."""
+        ret = self.check_permissions(user_id=user_id)
+        if ret:
+            return ret
+        if not resource_id.startswith("resource_id-"):
+            resource_id = "resource_id-%s" % resource_id
+
+        try:
+            since = request.headers.get("Last-Event-ID")
+            if since is None:
+                since = request.args.get("since", -1)
+            since = int(since)
+            timeout = min(
+                float(
+                    request.args.get(
+                        "timeout", satellite_config.STATUS_LONG_POLL_TIMEOUT
+                    )
+                ),
+                satellite_config.STATUS_STREAM_TIMEOUT,
+            )
+        except ValueError as e:
+            return make_json_response(
+                SimpleResponseModel(status="error", message=str(e)), 400
+            )
+
+        if request.accept_mimetypes.best == EVENT_STREAM_CONTENT_TYPE:
+            response = Response(
+                self._stream(user_id, resource_id, since),
+                mimetype=EVENT_STREAM_CONTENT_TYPE,
+            )
+            response.headers["Cache-Control"] = "no-cache"
+            # Disable the response buffering of nginx
+            response.headers["X-Accel-Buffering"] = "no"
+            return response
+
+        kvdb_server = self.resource_logger.db.kvdb_server
+        if since < 0:
+            version = get_status_version(kvdb_server, user_id, resource_id)
+        else:
+            version = wait_for_status_version(
+                kvdb_server, user_id, resource_id, since, max(timeout, 0)
+            )
+        http_code, response_model = self._get_status(user_id, resource_id)
+        if response_model is None:
+            return make_json_response(
+                SimpleResponseModel(
+                    status="error", message="Resource does not exist"
+                ),
+                400,
+            )
+        response = make_json_response(response_model, http_code)
+        response.headers[STATUS_VERSION_HEADER] = str(version)
+        response.headers["Cache-Control"] = "no-store"
+        return response
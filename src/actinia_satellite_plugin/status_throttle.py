@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Throttling of the running status updates of the satellite jobs
+
+The processing classes send a running status update for each download, each
+process step and each catalog request. Each update serializes the complete
+response model and writes it to the resource database. The updates are
+coalesced: at most one running update is written per
+STATUS_UPDATE_MIN_INTERVAL seconds, an update that is equal to the last
+written one is skipped and the latest coalesced update is written at the end
+of the interval. The final status is always written immediately.
+"""
+
+import threading
+import time
+from .config import satellite_config
+from .metrics import metrics
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+class StatusUpdateThrottleMixin(object):
+    """Coalesce the running status updates of a satellite processing job
+
+    The mixin must be the last mixin before the processing base class, so
+    that it measures the documents that are written to the resource
+    database. The coalesced update is written by a timer thread, a lock
+    serializes it with the updates of the job, so that it can never
+    overwrite the final status.
+    """
+
+    _status_lock = None
+    _status_timer = None
+    _status_final = False
+    _pending_update = None
+    _last_update = None
+    _last_update_time = None
+
+    def _get_status_lock(self):
+        if self._status_lock is None:
+            self._status_lock = threading.RLock()
+        return self._status_lock
+
+    def _cancel_status_timer(self):
+        if self._status_timer is not None:
+            self._status_timer.cancel()
+            self._status_timer = None
+        self._pending_update = None
+
+    def _send_resource_update(self, message, results=None):
+        metrics.inc(
+            "actinia_satellite_status_updates_total",
+            help="The running status updates of the jobs",
+            processor=self.__class__.__name__,
+        )
+        interval = satellite_config.STATUS_UPDATE_MIN_INTERVAL
+        if interval <= 0:
+            super()._send_resource_update(message, results)
+            return
+
+        with self._get_status_lock():
+            if self._status_final:
+                return
+            update = repr((message, results, self.progress))
+            if update == self._last_update:
+                # The written status is current again
+                self._cancel_status_timer()
+                return
+            now = time.monotonic()
+            if (
+                self._last_update_time is not None
+                and now - self._last_update_time < interval
+            ):
+                self._pending_update = (message, results, update)
+                if self._status_timer is None:
+                    self._status_timer = threading.Timer(
+                        self._last_update_time + interval - now,
+                        self._flush_status_update,
+                    )
+                    self._status_timer.daemon = True
+                    self._status_timer.start()
+                return
+            self._write_status_update(message, results, update)
+
+    def _write_status_update(self, message, results, update):
+        self._cancel_status_timer()
+        self._last_update = update
+        self._last_update_time = time.monotonic()
+        super()._send_resource_update(message, results)
+
+    def _flush_status_update(self):
+        """Write the latest coalesced update at the end of the interval"""
+        try:
+            with self._get_status_lock():
+                self._status_timer = None
+                if self._status_final or self._pending_update is None:
+                    return
+                self._write_status_update(*self._pending_update)
+        except Exception as e:
+            self.message_logger.error(
+                "Unable to send the status update: %s" % str(e)
+            )
+
+    def _send_to_database(self, document, final=False):
+        with self._get_status_lock():
+            if final is True:
+                # Coalesced updates are superseded by the final status
+                self._status_final = True
+                self._cancel_status_timer()
+            super()._send_to_database(document, final)
+
+        processor = self.__class__.__name__
+        metrics.inc(
+            "actinia_satellite_status_writes_total",
+            help="The status writes of the jobs to the resource database",
+            processor=processor,
+            final=str(final is True).lower(),
+        )
+        metrics.inc(
+            "actinia_satellite_status_write_bytes_total",
+            len(document),
+            help="The bytes of the status writes to the resource database",
+            processor=processor,
+        )
+        if final is True:
+            try:
+                metrics.flush()
+            except OSError as e:
+                self.message_logger.error(
+                    "Unable to write the metrics: %s" % str(e)
+                )
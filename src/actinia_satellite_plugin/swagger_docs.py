@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Deferred swagger documentation of the satellite resources
+
+swagger.doc() deep copies the operation object of a resource method when
+the module is imported, in every process that imports a resource. The
+decorators of this module only store a reference to the operation object
+and to the name of a schema example. Both are resolved once, when the
+resource is registered at the flask api with add_resource(), so that queue
+workers and scripts never build the documentation.
+"""
+
+import functools
+from copy import deepcopy
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+# The attribute that flask_restful_swagger_2 reads in Api.add_resource()
+SWAGGER_OPERATION_ATTRIBUTE = "__swagger_operation_object"
+LAZY_OPERATION_ATTRIBUTE = "_lazy_swagger_operation"
+
+# The schema classes with a deferred example and the name of the example
+# in the swagger_examples module
+_lazy_examples = {}
+
+
+def lazy_doc(operation):
+    """Document a resource method like swagger.doc() without copying
+
+    Args:
+        operation (dict): The swagger operation object
+
+    Returns:
+        The decorator
+
+    """
+
+    def decorated(f):
+        setattr(f, LAZY_OPERATION_ATTRIBUTE, operation)
+        return f
+
+    return decorated
+
+
+def lazy_example(name):
+    """Set the example of a schema class when the documentation is built
+
+    Args:
+        name (str): The name of the example in the swagger_examples module
+
+    Returns:
+        The class decorator
+
+    """
+
+    def decorated(cls):
+        _lazy_examples[cls] = name
+        return cls
+
+    return decorated
+
+
+@functools.lru_cache(maxsize=None)
+def load_example(name):
+    """Import the swagger examples on first access and return one"""
+    from . import swagger_examples
+
+    return getattr(swagger_examples, name)
+
+
+def resolve_examples():
+    """Set the deferred examples of all schema classes"""
+    for cls, name in _lazy_examples.items():
+        if "example" not in cls.__dict__:
+            cls.example = load_example(name)
+
+
+def resolve_operations(resource):
+    """Set the operation objects of the documented methods of a resource
+
+    The operation object is copied, since flask_restful_swagger_2 replaces
+    the schema classes in it by references.
+
+    Args:
+        resource: The flask restful resource class
+
+    """
+    for method in resource.methods or []:
+        f = resource.__dict__.get(method.lower())
+        if f is None or SWAGGER_OPERATION_ATTRIBUTE in f.__dict__:
+            continue
+        operation = getattr(f, LAZY_OPERATION_ATTRIBUTE, None)
+        if operation is not None:
+            setattr(f, SWAGGER_OPERATION_ATTRIBUTE, deepcopy(operation))
+
+
+def add_resource(flask_api, resource, *urls, **kwargs):
+    """Add a resource with its resolved documentation to the flask api
+
+    Args:
+        flask_api (flask_restful_swagger_2.Api): Flask api
+        resource: The flask restful resource class
+        *urls: The URLs of the resource
+        **kwargs: The keyword arguments of Api.add_resource()
+
+    """
+    resolve_examples()
+    resolve_operations(resource)
+    flask_api.add_resource(resource, *urls, **kwargs)
@@ -0,0 +1,1291 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Response examples of the swagger documentation
+
+This module is only imported when the resources are registered at the flask
+api, see swagger_docs.py.
+"""
+
+from actinia_api import URL_PREFIX
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+# The example of the LandsatNDVIResponseModel
+LANDSAT_NDVI_RESPONSE_EXAMPLE = {
+  "accept_datetime": "2018-05-30 11:16:03.033305",
+  "accept_timestamp": 1527678963.033304,
+  "api_info": {
+    "endpoint": "asyncephemerallandsatprocessingresource",
+    "method": "POST",
+    "path": f"{URL_PREFIX}/landsat_process/LC80440342016259LGN00/TOAR/"
+            "NDVI",
+    "request_url": f"http://localhost:5000{URL_PREFIX}/landsat_process/"
+                   "LC80440342016259LGN00/TOAR/NDVI"
+  },
+  "datetime": "2018-05-30 11:22:58.315162",
+  "http_code": 200,
+  "message": "Processing successfully finished",
+  "process_chain_list": [
+    {
+      "1": {
+        "flags": "g",
+        "inputs": {
+          "map": "LC80440342016259LGN00_TOAR_NDVI"
+        },
+        "module": "r.univar",
+        "outputs": {
+          "output": {
+            "name": "/actinia/workspace/temp_db/gisdbase_4e879f3951334a559"
+                    "612abab4352b069/.tmp/tmpkiv0uv6z.univar"
+          }
+        }
+      }
+    },
+    {
+      "1": {
+        "flags": "n",
+        "inputs": {
+          "map": "LC80440342016259LGN00_TOAR_NDVI"
+        },
+        "module": "d.rast"
+      },
+      "2": {
+        "flags": "n",
+        "inputs": {
+          "at": "8,92,0,7",
+          "raster": "LC80440342016259LGN00_TOAR_NDVI"
+        },
+        "module": "d.legend"
+      }
+    }
+  ],
+  "process_log": [
+    {
+      "executable": "/usr/bin/wget",
+      "parameter": [
+        "-t5",
+        "-c",
+        "-q",
+        "-O",
+        "/actinia/workspace/temp_db/gisdbase_4e879f3951334a559612abab4352"
+        "b069/.tmp/LC80440342016259LGN00_B6.TIF",
+        "https://storage.googleapis.com/gcp-public-data-landsat/LC08/PRE/"
+        "044/034/LC80440342016259LGN00/LC80440342016259LGN00_B6.TIF"
+      ],
+      "return_code": 0,
+      "run_time": 23.63347291946411,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "/bin/mv",
+      "parameter": [
+        "/actinia/workspace/temp_db/gisdbase_4e879f3951334a559612abab4352"
+        "b069/.tmp/LC80440342016259LGN00_B6.TIF",
+        "/actinia/workspace/download_cache/superadmin/LC80440342016259L"
+        "GN00_B6.TIF"
+      ],
+      "return_code": 0,
+      "run_time": 0.05022144317626953,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "/usr/bin/wget",
+      "parameter": [
+        "-t5",
+        "-c",
+        "-q",
+        "-O",
+        "/actinia/workspace/temp_db/gisdbase_4e879f3951334a559612abab435"
+        "2b069/.tmp/LC80440342016259LGN00_B7.TIF",
+        "https://storage.googleapis.com/gcp-public-data-landsat/LC08/PRE/"
+        "044/034/LC80440342016259LGN00/LC80440342016259LGN00_B7.TIF"
+      ],
+      "return_code": 0,
+      "run_time": 22.89448094367981,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "/bin/mv",
+      "parameter": [
+        "/actinia/workspace/temp_db/gisdbase_4e879f3951334a559612abab435"
+        "2b069/.tmp/LC80440342016259LGN00_B7.TIF",
+        "/actinia/workspace/download_cache/superadmin/LC80440342016259L"
+        "GN00_B7.TIF"
+      ],
+      "return_code": 0,
+      "run_time": 0.051961421966552734,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "/usr/bin/wget",
+      "parameter": [
+        "-t5",
+        "-c",
+        "-q",
+        "-O",
+        "/actinia/workspace/temp_db/gisdbase_4e879f3951334a559612abab4352"
+        "b069/.tmp/LC80440342016259LGN00_B8.TIF",
+        "https://storage.googleapis.com/gcp-public-data-landsat/LC08/PRE/"
+        "044/034/LC80440342016259LGN00/LC80440342016259LGN00_B8.TIF"
+      ],
+      "return_code": 0,
+      "run_time": 83.04966020584106,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "/bin/mv",
+      "parameter": [
+        "/actinia/workspace/temp_db/gisdbase_4e879f3951334a559612abab4352"
+        "b069/.tmp/LC80440342016259LGN00_B8.TIF",
+        "/actinia/workspace/download_cache/superadmin/LC80440342016259LG"
+        "N00_B8.TIF"
+      ],
+      "return_code": 0,
+      "run_time": 0.05012321472167969,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "/usr/bin/wget",
+      "parameter": [
+        "-t5",
+        "-c",
+        "-q",
+        "-O",
+        "/actinia/workspace/temp_db/gisdbase_4e879f3951334a559612abab4352b"
+        "069/.tmp/LC80440342016259LGN00_B9.TIF",
+        "https://storage.googleapis.com/gcp-public-data-landsat/LC08/PRE/"
+        "044/034/LC80440342016259LGN00/LC80440342016259LGN00_B9.TIF"
+      ],
+      "return_code": 0,
+      "run_time": 11.948487043380737,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "/bin/mv",
+      "parameter": [
+        "/actinia/workspace/temp_db/gisdbase_4e879f3951334a559612abab4352b"
+        "069/.tmp/LC80440342016259LGN00_B9.TIF",
+        "/actinia/workspace/download_cache/superadmin/LC80440342016259LG"
+        "N00_B9.TIF"
+      ],
+      "return_code": 0,
+      "run_time": 0.05081939697265625,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "/usr/bin/wget",
+      "parameter": [
+        "-t5",
+        "-c",
+        "-q",
+        "-O",
+        "/actinia/workspace/temp_db/gisdbase_4e879f3951334a559612abab4352"
+        "b069/.tmp/LC80440342016259LGN00_B10.TIF",
+        "https://storage.googleapis.com/gcp-public-data-landsat/LC08/PRE/"
+        "044/034/LC80440342016259LGN00/LC80440342016259LGN00_B10.TIF"
+      ],
+      "return_code": 0,
+      "run_time": 15.688527345657349,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "/bin/mv",
+      "parameter": [
+        "/actinia/workspace/temp_db/gisdbase_4e879f3951334a559612abab4352"
+        "b069/.tmp/LC80440342016259LGN00_B10.TIF",
+        "/actinia/workspace/download_cache/superadmin/LC80440342016259LG"
+        "N00_B10.TIF"
+      ],
+      "return_code": 0,
+      "run_time": 0.05163097381591797,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "/usr/bin/wget",
+      "parameter": [
+        "-t5",
+        "-c",
+        "-q",
+        "-O",
+        "/actinia/workspace/temp_db/gisdbase_4e879f3951334a559612abab4352"
+        "b069/.tmp/LC80440342016259LGN00_B11.TIF",
+        "https://storage.googleapis.com/gcp-public-data-landsat/LC08/PRE/"
+        "044/034/LC80440342016259LGN00/LC80440342016259LGN00_B11.TIF"
+      ],
+      "return_code": 0,
+      "run_time": 15.100370645523071,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "/bin/mv",
+      "parameter": [
+        "/actinia/workspace/temp_db/gisdbase_4e879f3951334a559612abab4352"
+        "b069/.tmp/LC80440342016259LGN00_B11.TIF",
+        "/actinia/workspace/download_cache/superadmin/LC80440342016259LG"
+        "N00_B11.TIF"
+      ],
+      "return_code": 0,
+      "run_time": 0.05057358741760254,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "/usr/bin/wget",
+      "parameter": [
+        "-t5",
+        "-c",
+        "-q",
+        "-O",
+        "/actinia/workspace/temp_db/gisdbase_4e879f3951334a559612abab4352"
+        "b069/.tmp/LC80440342016259LGN00_MTL.txt",
+        "https://storage.googleapis.com/gcp-public-data-landsat/LC08/PRE/"
+        "044/034/LC80440342016259LGN00/LC80440342016259LGN00_MTL.txt"
+      ],
+      "return_code": 0,
+      "run_time": 0.25395917892456055,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "/bin/mv",
+      "parameter": [
+        "/actinia/workspace/temp_db/gisdbase_4e879f3951334a559612abab4352"
+        "b069/.tmp/LC80440342016259LGN00_MTL.txt",
+        "/actinia/workspace/download_cache/superadmin/LC80440342016259LG"
+        "N00_MTL.txt"
+      ],
+      "return_code": 0,
+      "run_time": 0.05015206336975098,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "python3",
+      "parameter": [
+        "/usr/local/bin/grass",
+        "-e",
+        "-c",
+        "/actinia/workspace/download_cache/superadmin/LC80440342016259LG"
+        "N00_B1.TIF",
+        "/actinia/workspace/temp_db/gisdbase_4e879f3951334a559612abab4352b"
+        "069/Landsat"
+      ],
+      "return_code": 0,
+      "run_time": 0.15161657333374023,
+      "stderr": [
+        "Default locale settings are missing. GRASS running with C locale."
+        "WARNING: Searched for a web browser, but none found",
+        "Creating new GRASS GIS project/mapset...",
+        "Cleaning up temporary files...",
+        ""
+      ],
+      "stdout": "Default locale not found, using UTF-8\n"
+    },
+    {
+      "executable": "r.import",
+      "parameter": [
+        "input=/actinia/workspace/download_cache/superadmin/LC804403420162"
+        "59LGN00_B1.TIF",
+        "output=LC80440342016259LGN00.1",
+        "--q"
+      ],
+      "return_code": 0,
+      "run_time": 3.093010902404785,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "r.import",
+      "parameter": [
+        "input=/actinia/workspace/download_cache/superadmin/LC804403420162"
+        "59LGN00_B2.TIF",
+        "output=LC80440342016259LGN00.2",
+        "--q"
+      ],
+      "return_code": 0,
+      "run_time": 3.020535707473755,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "r.import",
+      "parameter": [
+        "input=/actinia/workspace/download_cache/superadmin/LC80440342016"
+        "259LGN00_B3.TIF",
+        "output=LC80440342016259LGN00.3",
+        "--q"
+      ],
+      "return_code": 0,
+      "run_time": 2.9988090991973877,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "r.import",
+      "parameter": [
+        "input=/actinia/workspace/download_cache/superadmin/LC8044034201"
+        "6259LGN00_B4.TIF",
+        "output=LC80440342016259LGN00.4",
+        "--q"
+      ],
+      "return_code": 0,
+      "run_time": 3.0504379272460938,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "r.import",
+      "parameter": [
+        "input=/actinia/workspace/download_cache/superadmin/LC80440342016"
+        "259LGN00_B5.TIF",
+        "output=LC80440342016259LGN00.5",
+        "--q"
+      ],
+      "return_code": 0,
+      "run_time": 3.0378293991088867,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "r.import",
+      "parameter": [
+        "input=/actinia/workspace/download_cache/superadmin/LC80440342016"
+        "259LGN00_B6.TIF",
+        "output=LC80440342016259LGN00.6",
+        "--q"
+      ],
+      "return_code": 0,
+      "run_time": 3.1231300830841064,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "r.import",
+      "parameter": [
+        "input=/actinia/workspace/download_cache/superadmin/LC80440342016"
+        "259LGN00_B7.TIF",
+        "output=LC80440342016259LGN00.7",
+        "--q"
+      ],
+      "return_code": 0,
+      "run_time": 3.0385892391204834,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "r.import",
+      "parameter": [
+        "input=/actinia/workspace/download_cache/superadmin/LC80440342016"
+        "259LGN00_B8.TIF",
+        "output=LC80440342016259LGN00.8",
+        "--q"
+      ],
+      "return_code": 0,
+      "run_time": 11.727607488632202,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "r.import",
+      "parameter": [
+        "input=/actinia/workspace/download_cache/superadmin/LC8044034201"
+        "6259LGN00_B9.TIF",
+        "output=LC80440342016259LGN00.9",
+        "--q"
+      ],
+      "return_code": 0,
+      "run_time": 3.531238317489624,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "r.import",
+      "parameter": [
+        "input=/actinia/workspace/download_cache/superadmin/LC80440342016"
+        "259LGN00_B10.TIF",
+        "output=LC80440342016259LGN00.10",
+        "--q"
+      ],
+      "return_code": 0,
+      "run_time": 3.1895594596862793,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "r.import",
+      "parameter": [
+        "input=/actinia/workspace/download_cache/superadmin/LC80440342016"
+        "259LGN00_B11.TIF",
+        "output=LC80440342016259LGN00.11",
+        "--q"
+      ],
+      "return_code": 0,
+      "run_time": 3.1583566665649414,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "i.landsat.toar",
+      "parameter": [
+        "input=LC80440342016259LGN00.",
+        "metfile=/actinia/workspace/download_cache/superadmin/LC80440342"
+        "016259LGN00_MTL.txt",
+        "method=uncorrected",
+        "output=LC80440342016259LGN00_TOAR.",
+        "--q"
+      ],
+      "return_code": 0,
+      "run_time": 101.34896063804626,
+      "stderr": [
+        "WARNING: ESUN evaluated from REFLECTANCE_MAXIMUM_BAND",
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "i.vi",
+      "parameter": [
+        "red=LC80440342016259LGN00_TOAR.4",
+        "nir=LC80440342016259LGN00_TOAR.5",
+        "green=LC80440342016259LGN00_TOAR.3",
+        "blue=LC80440342016259LGN00_TOAR.2",
+        "band5=LC80440342016259LGN00_TOAR.7",
+        "band7=LC80440342016259LGN00_TOAR.8",
+        "viname=ndvi",
+        "output=LC80440342016259LGN00_TOAR_NDVI"
+      ],
+      "return_code": 0,
+      "run_time": 45.43833112716675,
+      "stderr": [
+        "0..3..6..9..12..15..18..21..24..27..30..33..36..39..42..45..48."
+        ".51..54..57..60..63..66..69..72..75..78..81..84..87..90..93..96."
+        ".99..100",
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "r.colors",
+      "parameter": [
+        "map=LC80440342016259LGN00_TOAR_NDVI",
+        "color=ndvi"
+      ],
+      "return_code": 0,
+      "run_time": 0.050219058990478516,
+      "stderr": [
+        "Color table for raster map <LC80440342016259LGN00_TOAR_NDVI> set"
+        " to 'ndvi'",
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "r.univar",
+      "parameter": [
+        "map=LC80440342016259LGN00_TOAR_NDVI",
+        "output=/actinia/workspace/temp_db/gisdbase_4e879f3951334a559612a"
+        "bab4352b069/.tmp/tmpkiv0uv6z.univar",
+        "-g"
+      ],
+      "return_code": 0,
+      "run_time": 2.5560226440429688,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "d.rast",
+      "parameter": [
+        "map=LC80440342016259LGN00_TOAR_NDVI",
+        "-n"
+      ],
+      "return_code": 0,
+      "run_time": 1.2287390232086182,
+      "stderr": [
+        "0..3..6..9..12..15..18..21..24..27..30..33..36..39..42..45..48.."
+        "51..54..57..60..63..66..69..72..75..78..81..84..87..90..93..96.."
+        "99..100",
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "d.legend",
+      "parameter": [
+        "raster=LC80440342016259LGN00_TOAR_NDVI",
+        "at=8,92,0,7",
+        "-n"
+      ],
+      "return_code": 0,
+      "run_time": 0.37291598320007324,
+      "stderr": [
+        ""
+      ],
+      "stdout": ""
+    },
+    {
+      "executable": "g.region",
+      "parameter": [
+        "raster=LC80440342016259LGN00_TOAR_NDVI",
+        "-g"
+      ],
+      "return_code": 0,
+      "run_time": 0.051508188247680664,
+      "stderr": [
+        ""
+      ],
+      "stdout": "projection=1\nzone=10\nn=4264515\ns=4030185\nw=464385\ne"
+      "=694515\nnsres=30\newres=30\nrows=7811\ncols=7671\ncells=59918181\n"
+    },
+    {
+      "executable": "r.out.gdal",
+      "parameter": [
+        "-fm",
+        "input=LC80440342016259LGN00_TOAR_NDVI",
+        "format=GTiff",
+        "createopt=COMPRESS=LZW",
+        "output=/actinia/workspace/temp_db/gisdbase_4e879f3951334a559612ab"
+        "ab4352b069/.tmp/LC80440342016259LGN00_TOAR_NDVI.tiff"
+      ],
+      "return_code": 0,
+      "run_time": 8.784564018249512,
+      "stderr": [
+        "Checking GDAL data type and nodata value...",
+        "2..5..8..11..14..17..20..23..26..29..32..35..38..41..44..47..50."
+        ".53..56..59..62..65..68..71..74..77..80..83..86..89..92..95..98."
+        ".100",
+        "Using GDAL data type <Float64>",
+        "Input raster map contains cells with NULL-value (no-data). The "
+        "value -nan will be used to represent no-data values in the input"
+        " map. You can specify a nodata value with the nodata option.",
+        "Exporting raster data to GTiff format...",
+        "ERROR 6: SetColorTable() only supported for Byte or UInt16 bands"
+        " in TIFF format.",
+        "2..5..8..11..14..17..20..23..26..29..32..35..38..41..44..47..50."
+        ".53..56..59..62..65..68..71..74..77..80..83..86..89..92..95..98."
+        ".100",
+        "r.out.gdal complete. File </actinia/workspace/temp_db/gisdbase_"
+        "4e879f3951334a559612abab4352b069/.tmp/LC80440342016259LGN00_TOAR"
+        "_NDVI.tiff> created.",
+        ""
+      ],
+      "stdout": ""
+    }
+  ],
+  "process_results": [
+    {
+      "cells": 59918181.0,
+      "coeff_var": 125.4796560716,
+      "max": 1.31488464218245,
+      "mean": 0.215349514428788,
+      "mean_of_abs": 0.272685223860196,
+      "min": -1.35084534300324,
+      "n": 41612094.0,
+      "name": "LC80440342016259LGN00_TOAR_NDVI",
+      "null_cells": 18306087.0,
+      "range": 2.6657299851857,
+      "stddev": 0.270219830057103,
+      "sum": 8961144.23726506,
+      "variance": 0.0730187565560894
+    }
+  ],
+  "progress": {
+    "num_of_steps": 35,
+    "step": 34
+  },
+  "resource_id": "resource_id-6282c634-42e1-417c-a092-c9b21c3283cc",
+  "status": "finished",
+  "time_delta": 415.2818741798401,
+  "timestamp": 1527679378.31516,
+  "urls": {
+    "resources": [
+      f"http://localhost:5000{URL_PREFIX}/resource/superadmin/resource_id"
+      "-6282c634-42e1-417c-a092-c9b21c3283cc/tmp80apvh0h.png",
+      f"http://localhost:5000{URL_PREFIX}/resource/superadmin/resource_id-"
+      "6282c634-42e1-417c-a092-c9b21c3283cc/LC80440342016259LGN00_TOAR_"
+      "NDVI.tiff"
+    ],
+    "status": f"http://localhost:5000{URL_PREFIX}/resources/superadmin/"
+    "resource_id-6282c634-42e1-417c-a092-c9b21c3283cc"
+  },
+  "user_id": "superadmin"
+}
+
+# The example of the SentinelNDVIResponseModel
+SENTINEL2_NDVI_RESPONSE_EXAMPLE = {
+    "accept_datetime": "2018-05-30 12:25:43.987713",
+    "accept_timestamp": 1527683143.9877105,
+    "api_info": {
+        "endpoint": "asyncephemeralsentinel2processingresource",
+        "method": "POST",
+        "path": f"{URL_PREFIX}/sentinel2_process/ndvi/S2A_MSIL1C_20161206"
+        "T030112_N0204_R032_T50RKR_20161206T030749",
+        "request_url": f"http://localhost:8080{URL_PREFIX}/sentinel2_"
+        "process/ndvi/S2A_MSIL1C_20161206T030112_N0204_R032_T50RKR_"
+        "20161206T030749",
+    },
+    "datetime": "2018-05-30 12:29:11.800608",
+    "http_code": 200,
+    "message": "Processing successfully finished",
+    "process_chain_list": [
+        {
+            "1": {
+                "flags": "g",
+                "inputs": {"map": "ndvi"},
+                "module": "r.univar",
+                "outputs": {
+                    "output": {
+                        "name": "/actinia/workspace/temp_db/gisdbase_"
+                                "103a050c380e4f50b36efd3f77bd1419/.tmp/"
+                                "tmp7il3n0jk.univar"
+                    }
+                },
+            }
+        },
+        {
+            "1": {"inputs": {"map": "ndvi"}, "module": "d.rast"},
+            "2": {
+                "flags": "n",
+                "inputs": {"at": "8,92,0,7", "raster": "ndvi"},
+                "module": "d.legend",
+            },
+            "3": {
+                "inputs": {"at": "20,4", "style": "line"},
+                "module": "d.barscale",
+            },
+        },
+    ],
+    "process_log": [
+        {
+            "executable": "/usr/bin/wget",
+            "parameter": [
+                "-t5",
+                "-c",
+                "-q",
+                "https://storage.googleapis.com/gcp-public-data-sentinel-2"
+                "/tiles/50/R/KR/S2A_MSIL1C_20161206T030112_N0204_R032_"
+                "T50RKR_20161206T030749.SAFE/GRANULE/L1C_T50RKR_A007608_"
+                "20161206T030749/IMG_DATA/T50RKR_20161206T030112_B08.jp2",
+            ],
+            "return_code": 0,
+            "run_time": 49.85953092575073,
+            "stderr": [""],
+            "stdout": "",
+        },
+        {
+            "executable": "/usr/bin/wget",
+            "parameter": [
+                "-t5",
+                "-c",
+                "-q",
+                "https://storage.googleapis.com/gcp-public-data-sentinel-2"
+                "/tiles/50/R/KR/S2A_MSIL1C_20161206T030112_N0204_R032_T50"
+                "RKR_20161206T030749.SAFE/GRANULE/L1C_T50RKR_A007608_2016"
+                "1206T030749/IMG_DATA/T50RKR_20161206T030112_B04.jp2",
+            ],
+            "return_code": 0,
+            "run_time": 38.676433801651,
+            "stderr": [""],
+            "stdout": "",
+        },
+        {
+            "executable": "/bin/mv",
+            "parameter": [
+                "/actinia/workspace/temp_db/gisdbase_103a050c380e4f50b36ef"
+                "d3f77bd1419/.tmp/S2A_MSIL1C_20161206T030112_N0204_R032_"
+                "T50RKR_20161206T030749.gml",
+                "/actinia/workspace/download_cache/superadmin/S2A_MSIL1C_"
+                "20161206T030112_N0204_R032_T50RKR_20161206T030749.gml",
+            ],
+            "return_code": 0,
+            "run_time": 0.05118393898010254,
+            "stderr": [""],
+            "stdout": "",
+        },
+        {
+            "executable": "/bin/mv",
+            "parameter": [
+                "/actinia/workspace/temp_db/gisdbase_103a050c380e4f50b36e"
+                "fd3f77bd1419/.tmp/T50RKR_20161206T030112_B08.jp2",
+                "/actinia/workspace/download_cache/superadmin/S2A_MSIL1C_"
+                "20161206T030112_N0204_R032_T50RKR_20161206T030749_B08",
+            ],
+            "return_code": 0,
+            "run_time": 0.35857558250427246,
+            "stderr": [""],
+            "stdout": "",
+        },
+        {
+            "executable": "/bin/mv",
+            "parameter": [
+                "/actinia/workspace/temp_db/gisdbase_103a050c380e4f50b36e"
+                "fd3f77bd1419/.tmp/T50RKR_20161206T030112_B04.jp2",
+                "/actinia/workspace/download_cache/superadmin/S2A_MSIL1C_"
+                "20161206T030112_N0204_R032_T50RKR_20161206T030749_B04",
+            ],
+            "return_code": 0,
+            "run_time": 0.15271401405334473,
+            "stderr": [""],
+            "stdout": "",
+        },
+        {
+            "executable": "python3",
+            "parameter": [
+                "/usr/local/bin/grass",
+                "-e",
+                "-c",
+                "/actinia/workspace/download_cache/superadmin/S2A_MSIL1C_"
+                "20161206T030112_N0204_R032_T50RKR_20161206T030749_B08",
+                "/actinia/workspace/temp_db/gisdbase_103a050c380e4f50b36ef"
+                "d3f77bd1419/sentinel2",
+            ],
+            "return_code": 0,
+            "run_time": 0.36118006706237793,
+            "stderr": [
+                "Default locale settings are missing. GRASS running with C"
+                " locale.WARNING: Searched for a web browser, but none "
+                "found",
+                "Creating new GRASS GIS project/mapset...",
+                "Cleaning up temporary files...",
+                "",
+            ],
+            "stdout": "Default locale not found, using UTF-8\n",
+        },
+        {
+            "executable": "v.import",
+            "parameter": [
+                "input=/actinia/workspace/download_cache/superadmin/S2A_"
+                "MSIL1C_20161206T030112_N0204_R032_T50RKR_20161206T0307"
+                "49.gml",
+                "output=S2A_MSIL1C_20161206T030112_N0204_R032_T50RKR_2016"
+                "1206T030749",
+                "--q",
+            ],
+            "return_code": 0,
+            "run_time": 0.3551313877105713,
+            "stderr": [
+                "WARNING: Projection of dataset does not appear to match "
+                "current project.",
+                "",
+                "Project PROJ_INFO is:",
+                "name: WGS 84 / UTM zone 50N",
+                "datum: wgs84",
+                "ellps: wgs84",
+                "proj: utm",
+                "zone: 50",
+                "no_defs: defined",
+                "",
+                "Dataset PROJ_INFO is:",
+                "name: WGS 84",
+                "datum: wgs84",
+                "ellps: wgs84",
+                "proj: ll",
+                "no_defs: defined",
+                "",
+                "ERROR: proj",
+                "",
+                "WARNING: Width for column fid set to 255 (was not "
+                "specified by OGR), some strings may be truncated!",
+                "",
+            ],
+            "stdout": "",
+        },
+        {
+            "executable": "v.timestamp",
+            "parameter": [
+                "map=S2A_MSIL1C_20161206T030112_N0204_R032_T50RKR_"
+                "20161206T030749",
+                "date=06 dec 2016 03:07:49",
+            ],
+            "return_code": 0,
+            "run_time": 0.050455570220947266,
+            "stderr": [""],
+            "stdout": "",
+        },
+        {
+            "executable": "/usr/bin/gdal_translate",
+            "parameter": [
+                "-projwin",
+                "113.949663",
+                "28.011816",
+                "115.082607",
+                "27.001706",
+                "-of",
+                "vrt",
+                "-projwin_srs",
+                "EPSG:4326",
+                "/actinia/workspace/download_cache/superadmin/S2A_MSIL1C_"
+                "20161206T030112_N0204_R032_T50RKR_20161206T030749_B08",
+                "/actinia/workspace/download_cache/superadmin/S2A_MSIL1C_2"
+                "0161206T030112_N0204_R032_T50RKR_20161206T030749_B08.vrt",
+            ],
+            "return_code": 0,
+            "run_time": 0.05114293098449707,
+            "stderr": [
+                "Warning 1: Computed -srcwin 5 -225 10971 11419 falls "
+                "partially outside raster extent. Going on however.",
+                "",
+            ],
+            "stdout": "Input file size is 10980, 10980\n",
+        },
+        {
+            "executable": "r.import",
+            "parameter": [
+                "input=/actinia/workspace/download_cache/superadmin/S2A_"
+                "MSIL1C_20161206T030112_N0204_R032_T50RKR_20161206T030749_"
+                "B08.vrt",
+                "output=S2A_MSIL1C_20161206T030112_N0204_R032_T50RKR_2016"
+                "1206T030749_B08_uncropped",
+                "--q",
+            ],
+            "return_code": 0,
+            "run_time": 16.326167583465576,
+            "stderr": [""],
+            "stdout": "",
+        },
+        {
+            "executable": "g.region",
+            "parameter": [
+                "align=S2A_MSIL1C_20161206T030112_N0204_R032_T50RKR_2016"
+                "1206T030749_B08_uncropped",
+                "vector=S2A_MSIL1C_20161206T030112_N0204_R032_T50RKR_2016"
+                "1206T030749",
+                "-g",
+            ],
+            "return_code": 0,
+            "run_time": 0.10460591316223145,
+            "stderr": [""],
+            "stdout": "projection=1\nzone=50\nn=3100030\ns=2990100\nw="
+            "199960\ne=309790\nnsres=10\newres=10\nrows=10993\ncols=10983"
+            "\ncells=120736119\n",
+        },
+        {
+            "executable": "r.mask",
+            "parameter": [
+                "vector=S2A_MSIL1C_20161206T030112_N0204_R032_T50RKR_2016"
+                "1206T030749"
+            ],
+            "return_code": 0,
+            "run_time": 7.36047887802124,
+            "stderr": [
+                "Reading areas...",
+                "0..100",
+                "Writing raster map...",
+                "0..3..6..9..12..15..18..21..24..27..30..33..36..39..42.."
+                "45..48..51..54..57..60..63..66..69..72..75..78..81..84.."
+                "87..90..93..96..99..100",
+                "Reading areas...",
+                "0..100",
+                "Writing raster map...",
+                "0..3..6..9..12..15..18..21..24..27..30..33..36..39..42.."
+                "45..48..51..54..57..60..63..66..69..72..75..78..81..84.."
+                "87..90..93..96..99..100",
+                "All subsequent raster operations will be limited to the "
+                "MASK area. Removing or renaming raster map named 'MASK' "
+                "will restore raster operations to normal.",
+                "",
+            ],
+            "stdout": "",
+        },
+        {
+            "executable": "r.mapcalc",
+            "parameter": [
+                "expression=S2A_MSIL1C_20161206T030112_N0204_R032_T50RKR_"
+                "20161206T030749_B08 = float(S2A_MSIL1C_20161206T030112_"
+                "N0204_R032_T50RKR_20161206T030749_B08_uncropped)"
+            ],
+            "return_code": 0,
+            "run_time": 10.695591926574707,
+            "stderr": [""],
+            "stdout": "",
+        },
+        {
+            "executable": "r.timestamp",
+            "parameter": [
+                "map=S2A_MSIL1C_20161206T030112_N0204_R032_T50RKR_201612"
+                "06T030749_B08",
+                "date=06 dec 2016 03:07:49",
+            ],
+            "return_code": 0,
+            "run_time": 0.053069353103637695,
+            "stderr": [""],
+            "stdout": "",
+        },
+        {
+            "executable": "g.remove",
+            "parameter": [
+                "type=raster",
+                "name=S2A_MSIL1C_20161206T030112_N0204_R032_T50RKR_201612"
+                "06T030749_B08_uncropped",
+                "-f",
+            ],
+            "return_code": 0,
+            "run_time": 0.050362348556518555,
+            "stderr": [
+                "Removing raster <S2A_MSIL1C_20161206T030112_N0204_R032_"
+                "T50RKR_20161206T030749_B08_uncropped>",
+                "",
+            ],
+            "stdout": "",
+        },
+        {
+            "executable": "r.mask",
+            "parameter": ["-r"],
+            "return_code": 0,
+            "run_time": 0.10059237480163574,
+            "stderr": ["Raster MASK removed", ""],
+            "stdout": "",
+        },
+        {
+            "executable": "/usr/bin/gdal_translate",
+            "parameter": [
+                "-projwin",
+                "113.949663",
+                "28.011816",
+                "115.082607",
+                "27.001706",
+                "-of",
+                "vrt",
+                "-projwin_srs",
+                "EPSG:4326",
+                "/actinia/workspace/download_cache/superadmin/S2A_MSIL1C_"
+                "20161206T030112_N0204_R032_T50RKR_20161206T030749_B04",
+                "/actinia/workspace/download_cache/superadmin/S2A_MSIL1C_2"
+                "0161206T030112_N0204_R032_T50RKR_20161206T030749_B04.vrt",
+            ],
+            "return_code": 0,
+            "run_time": 0.05096769332885742,
+            "stderr": [
+                "Warning 1: Computed -srcwin 5 -225 10971 11419 falls "
+                "partially outside raster extent. Going on however.",
+                "",
+            ],
+            "stdout": "Input file size is 10980, 10980\n",
+        },
+        {
+            "executable": "r.import",
+            "parameter": [
+                "input=/actinia/workspace/download_cache/superadmin/S2A_"
+                "MSIL1C_20161206T030112_N0204_R032_T50RKR_20161206T030749"
+                "_B04.vrt",
+                "output=S2A_MSIL1C_20161206T030112_N0204_R032_T50RKR_2016"
+                "1206T030749_B04_uncropped",
+                "--q",
+            ],
+            "return_code": 0,
+            "run_time": 16.76022958755493,
+            "stderr": [""],
+            "stdout": "",
+        },
+        {
+            "executable": "g.region",
+            "parameter": [
+                "align=S2A_MSIL1C_20161206T030112_N0204_R032_T50RKR_2016"
+                "1206T030749_B04_uncropped",
+                "vector=S2A_MSIL1C_20161206T030112_N0204_R032_T50RKR_2016"
+                "1206T030749",
+                "-g",
+            ],
+            "return_code": 0,
+            "run_time": 0.0505826473236084,
+            "stderr": [""],
+            "stdout": "projection=1\nzone=50\nn=3100030\ns=2990100\nw="
+            "199960\ne=309790\nnsres=10\newres=10\nrows=10993\ncols="
+            "10983\ncells=120736119\n",
+        },
+        {
+            "executable": "r.mask",
+            "parameter": [
+                "vector=S2A_MSIL1C_20161206T030112_N0204_R032_T50RKR_2016"
+                "1206T030749"
+            ],
+            "return_code": 0,
+            "run_time": 6.779608249664307,
+            "stderr": [
+                "Reading areas...",
+                "0..100",
+                "Writing raster map...",
+                "0..3..6..9..12..15..18..21..24..27..30..33..36..39..42.."
+                "45..48..51..54..57..60..63..66..69..72..75..78..81..84.."
+                "87..90..93..96..99..100",
+                "Reading areas...",
+                "0..100",
+                "Writing raster map...",
+                "0..3..6..9..12..15..18..21..24..27..30..33..36..39..42.."
+                "45..48..51..54..57..60..63..66..69..72..75..78..81..84.."
+                "87..90..93..96..99..100",
+                "All subsequent raster operations will be limited to the "
+                "MASK area. Removing or renaming raster map named 'MASK' "
+                "will restore raster operations to normal.",
+                "",
+            ],
+            "stdout": "",
+        },
+        {
+            "executable": "r.mapcalc",
+            "parameter": [
+                "expression=S2A_MSIL1C_20161206T030112_N0204_R032_T50RKR_"
+                "20161206T030749_B04 = float(S2A_MSIL1C_20161206T030112_"
+                "N0204_R032_T50RKR_20161206T030749_B04_uncropped)"
+            ],
+            "return_code": 0,
+            "run_time": 10.141529321670532,
+            "stderr": [""],
+            "stdout": "",
+        },
+        {
+            "executable": "r.timestamp",
+            "parameter": [
+                "map=S2A_MSIL1C_20161206T030112_N0204_R032_T50RKR_2016"
+                "1206T030749_B04",
+                "date=06 dec 2016 03:07:49",
+            ],
+            "return_code": 0,
+            "run_time": 0.05050253868103027,
+            "stderr": [""],
+            "stdout": "",
+        },
+        {
+            "executable": "g.remove",
+            "parameter": [
+                "type=raster",
+                "name=S2A_MSIL1C_20161206T030112_N0204_R032_T50RKR_2016"
+                "1206T030749_B04_uncropped",
+                "-f",
+            ],
+            "return_code": 0,
+            "run_time": 0.05098080635070801,
+            "stderr": [
+                "Removing raster <S2A_MSIL1C_20161206T030112_N0204_R032_"
+                "T50RKR_20161206T030749_B04_uncropped>",
+                "",
+            ],
+            "stdout": "",
+        },
+        {
+            "executable": "r.mask",
+            "parameter": ["-r"],
+            "return_code": 0,
+            "run_time": 0.10424232482910156,
+            "stderr": ["Raster MASK removed", ""],
+            "stdout": "",
+        },
+        {
+            "executable": "r.mapcalc",
+            "parameter": [
+                "expression=ndvi = (float(S2A_MSIL1C_20161206T030112_"
+                "N0204_R032_T50RKR_20161206T030749_B08) - float(S2A_MSIL1C"
+                "_20161206T030112_N0204_R032_T50RKR_20161206T030749_B04))"
+                "/(float(S2A_MSIL1C_20161206T030112_N0204_R032_T50RKR_"
+                "20161206T030749_B08) + float(S2A_MSIL1C_20161206T030112"
+                "_N0204_R032_T50RKR_20161206T030749_B04))"
+            ],
+            "return_code": 0,
+            "run_time": 20.28681755065918,
+            "stderr": [""],
+            "stdout": "",
+        },
+        {
+            "executable": "r.colors",
+            "parameter": ["color=ndvi", "map=ndvi"],
+            "return_code": 0,
+            "run_time": 0.05031251907348633,
+            "stderr": [
+                "Color table for raster map <ndvi> set to 'ndvi'",
+                "",
+            ],
+            "stdout": "",
+        },
+        {
+            "executable": "r.univar",
+            "parameter": [
+                "map=ndvi",
+                "output=/actinia/workspace/temp_db/gisdbase_103a050c380e4f"
+                "50b36efd3f77bd1419/.tmp/tmp7il3n0jk.univar",
+                "-g",
+            ],
+            "return_code": 0,
+            "run_time": 4.54892897605896,
+            "stderr": [""],
+            "stdout": "",
+        },
+        {
+            "executable": "d.rast",
+            "parameter": ["map=ndvi"],
+            "return_code": 0,
+            "run_time": 2.0198700428009033,
+            "stderr": [
+                "0..3..6..9..12..15..18..21..24..27..30..33..36..39..42.."
+                "45..48..51..54..57..60..63..66..69..72..75..78..81..84.."
+                "87..90..93..96..99..100",
+                "",
+            ],
+            "stdout": "",
+        },
+        {
+            "executable": "d.legend",
+            "parameter": ["raster=ndvi", "at=8,92,0,7", "-n"],
+            "return_code": 0,
+            "run_time": 0.4614551067352295,
+            "stderr": [""],
+            "stdout": "",
+        },
+        {
+            "executable": "d.barscale",
+            "parameter": ["style=line", "at=20,4"],
+            "return_code": 0,
+            "run_time": 0.416748046875,
+            "stderr": [""],
+            "stdout": "",
+        },
+        {
+            "executable": "g.region",
+            "parameter": ["raster=ndvi", "-g"],
+            "return_code": 0,
+            "run_time": 0.051720619201660156,
+            "stderr": [""],
+            "stdout": "projection=1\nzone=50\nn=3100030\ns=2990100\nw=1999"
+            "60\ne=309790\nnsres=10\newres=10\nrows=10993\ncols=10983\n"
+            "cells=120736119\n",
+        },
+        {
+            "executable": "r.out.gdal",
+            "parameter": [
+                "-fm",
+                "input=ndvi",
+                "format=GTiff",
+                "createopt=COMPRESS=LZW",
+                "output=/actinia/workspace/temp_db/gisdbase_103a050c380e4f"
+                "50b36efd3f77bd1419/.tmp/ndvi.tiff",
+            ],
+            "return_code": 0,
+            "run_time": 12.550397157669067,
+            "stderr": [
+                "Checking GDAL data type and nodata value...",
+                "2..5..8..11..14..17..20..23..26..29..32..35..38..41..44.."
+                "47..50..53..56..59..62..65..68..71..74..77..80..83..86.."
+                "89..92..95..98..100",
+                "Using GDAL data type <Float32>",
+                "Input raster map contains cells with NULL-value (no-data)"
+                ". The value -nan will be used to represent no-data values"
+                " in the input map. You can specify a nodata value with "
+                "the nodata option.",
+                "Exporting raster data to GTiff format...",
+                "ERROR 6: SetColorTable() only supported for Byte or "
+                "UInt16 bands in TIFF format.",
+                "2..5..8..11..14..17..20..23..26..29..32..35..38..41..44."
+                ".47..50..53..56..59..62..65..68..71..74..77..80..83..86."
+                ".89..92..95..98..100",
+                "r.out.gdal complete. File </actinia/workspace/temp_db/gis"
+                "dbase_103a050c380e4f50b36efd3f77bd1419/.tmp/ndvi.tiff> "
+                "created.",
+                "",
+            ],
+            "stdout": "",
+        },
+    ],
+    "process_results": [
+        {
+            "cells": 120736119.0,
+            "coeff_var": 39.2111992829072,
+            "max": 0.80298912525177,
+            "mean": 0.345280366103636,
+            "mean_of_abs": 0.347984182813063,
+            "min": -0.96863466501236,
+            "n": 120371030.0,
+            "name": "ndvi",
+            "null_cells": 365089.0,
+            "range": 1.77162379026413,
+            "stddev": 0.135388572437648,
+            "sum": 41561753.3066718,
+            "variance": 0.0183300655467043,
+        }
+    ],
+    "progress": {"num_of_steps": 33, "step": 32},
+    "resource_id": "resource_id-6b849585-576f-40b5-a514-34a7cf1f97ce",
+    "status": "finished",
+    "time_delta": 207.813636302948,
+    "timestamp": 1527683351.8002071,
+    "urls": {
+        "resources": [
+            f"http://localhost:8080{URL_PREFIX}/resource/superadmin/"
+            "resource_id-6b849585-576f-40b5-a514-34a7cf1f97ce/"
+            "tmpsaeegg0q.png",
+            f"http://localhost:8080{URL_PREFIX}/resource/superadmin/"
+            "resource_id-6b849585-576f-40b5-a514-34a7cf1f97ce/ndvi.tiff",
+        ],
+        "status": f"http://localhost:8080{URL_PREFIX}/resources/superadmin"
+        "/resource_id-6b849585-576f-40b5-a514-34a7cf1f97ce",
+    },
+    "user_id": "superadmin",
+}
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Bulk registration of satellite scenes in space-time raster datasets
+
+The time series creators write a registration specification as JSON file
+and run this module as script in the GRASS environment of the temporary
+mapset. All STRDS are created and all maps are registered in a single
+process with a single connection to the temporal database, instead of a
+t.create and t.register call for each band. Existing STRDS are reused, so
+new scenes can be appended to an existing time series:
+
+    python3 temporal_registration.py <specification.json>
+
+The specification has the following structure:
+
+    {"strds": [{"name": "Landsat_B1",
+                "title": "Landsat time series for band B1",
+                "description": "Landsat time series for band B1",
+                "maps": [["LC80440342016259LGN00_TOAR.1",
+                          "2016-09-15 18:47:59", "2016-09-15 18:48:00"]]}]}
+"""
+
+import json
+import os
+import sqlite3
+import sys
+from datetime import timedelta
+import dateutil.parser as dtparser
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+def get_scene_time_intervals(query_result):
+    """Parse the acquisition time of each scene once
+
+    A time interval of one second is created for each scene, otherwise the
+    temporal algebra will not work.
+
+    Args:
+        query_result (dict): The query result with a timestamp for each scene
+
+    Returns:
+        (dict)
+        The start and end time strings for each scene id
+
+    """
+    intervals = {}
+    for scene_id in query_result:
+        start_time = dtparser.parse(
+            query_result[scene_id]["timestamp"].split(".")[0]
+        )
+        end_time = start_time + timedelta(seconds=1)
+        intervals[scene_id] = (str(start_time), str(end_time))
+    return intervals
+
+
+def write_registration_spec(strds_list, file_path):
+    """Write the registration specification
+
+    Args:
+        strds_list (list): A list of dicts with name, title, description and
+                           the list of [map_name, start_time, end_time]
+        file_path (str): The path of the specification file
+
+    Returns:
+        (str)
+        The path of the specification file
+
+    """
+    with open(file_path, "w") as spec_file:
+        json.dump({"strds": strds_list}, spec_file)
+    return file_path
+
+
+def get_registered_maps(tgis_db, strds_id):
+    """Read the names of the maps that are registered in a STRDS
+
+    The temporal database is read directly, so no GRASS session is required.
+
+    Args:
+        tgis_db (str): The path to the sqlite temporal database of a mapset
+        strds_id (str): The id of the STRDS with mapset, e.g. "B04@sentinel"
+
+    Returns:
+        (set)
+        The names of the registered maps without mapset, empty if the
+        STRDS does not exist
+
+    """
+    if not os.path.isfile(tgis_db):
+        return set()
+
+    con = sqlite3.connect(tgis_db)
+    try:
+        row = con.execute(
+            "SELECT raster_register FROM strds_metadata WHERE id = ?",
+            (strds_id,),
+        ).fetchone()
+        if not row or not row[0]:
+            return set()
+        return set(
+            map_id.split("@")[0]
+            for (map_id,) in con.execute('SELECT id FROM "%s"' % row[0])
+        )
+    except sqlite3.Error:
+        return set()
+    finally:
+        con.close()
+
+
+def get_registration_process(spec_file):
+    """Create the process that runs the bulk registration
+
+    Args:
+        spec_file (str): The path of the specification file
+
+    Returns:
+        (Process)
+        The process that runs this module as script
+
+    """
+    # This module runs also as standalone script in the GRASS environment,
+    # where only the registration is required
+    from actinia_core.core.common.process_object import Process
+
+    return Process(
+        exec_type="exec",
+        executable="python3",
+        executable_params=[os.path.abspath(__file__), spec_file],
+        id="temporal_registration",
+        skip_permission_check=True,
+    )
+
+
+def register_strds(spec):
+    """Create all STRDS and register all maps of a specification
+
+    STRDS that already exist in the current mapset are reused and updated.
+    This function must be called in a GRASS session.
+
+    The registration is not atomic. Only the inserts of the new maps are
+    batched in a single transaction; the STRDS are created, and the maps
+    are registered with stds.register_map() and
+    update_from_registered_maps(), one statement at a time. A failure
+    partway through leaves a partly registered temporal database. The
+    time series creators run the registration in the temporary mapset and
+    replace the temporal database of the target mapset only after the
+    registration succeeded, so the target mapset is never left partly
+    registered. Running the registration again reuses the existing STRDS
+    and maps.
+
+    Args:
+        spec (dict): The registration specification
+
+    """
+    import grass.temporal as tgis
+
+    tgis.init()
+    mapset = tgis.get_current_mapset()
+    dbif = tgis.SQLDatabaseInterfaceConnection()
+    dbif.connect()
+
+    try:
+        registrations = []
+        statement = ""
+        for entry in spec["strds"]:
+            stds = tgis.SpaceTimeRasterDataset(
+                "%s@%s" % (entry["name"], mapset)
+            )
+            if stds.is_in_db(dbif):
+                stds.select(dbif)
+            else:
+                stds = tgis.open_new_stds(
+                    entry["name"],
+                    "strds",
+                    "absolute",
+                    entry["title"],
+                    entry["description"],
+                    "mean",
+                    dbif=dbif,
+                )
+            map_list = []
+            for name, start_time, end_time in entry["maps"]:
+                map_object = tgis.RasterDataset("%s@%s" % (name, mapset))
+                if map_object.is_in_db(dbif, mapset):
+                    map_object.select(dbif)
+                else:
+                    # Read the metadata of the raster map and insert it with
+                    # all other new maps in a single transaction
+                    map_object.load()
+                    map_object.set_absolute_time(
+                        dtparser.parse(start_time), dtparser.parse(end_time)
+                    )
+                    statement += map_object.insert(dbif=dbif, execute=False)
+                map_list.append(map_object)
+            registrations.append((stds, map_list))
+
+        if statement:
+            dbif.execute_transaction(statement)
+
+        for stds, map_list in registrations:
+            for map_object in map_list:
+                stds.register_map(map=map_object, dbif=dbif)
+            stds.update_from_registered_maps(dbif=dbif)
+    finally:
+        dbif.close()
+
+
+def main(argv):
+    with open(argv[1], "r") as spec_file:
+        spec = json.load(spec_file)
+    register_strds(spec)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
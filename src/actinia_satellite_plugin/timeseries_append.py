@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Append new scenes to the time series of an existing mapset
+"""
+
+import os
+import shutil
+import subprocess
+from actinia_processing_lib.exceptions import AsyncProcessError
+from .mapset_merge import is_same_file_system, move_directory_content
+from .temporal_registration import get_registered_maps
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+# The mapset directories that contain the imported raster maps and the
+# temporal database
+APPEND_DIRECTORIES = [
+    "cell",
+    "fcell",
+    "cats",
+    "cellhd",
+    "cell_misc",
+    "colr",
+    "colr2",
+    "hist",
+    "misc",
+    "tgis",
+]
+
+
+class TimeSeriesAppendMixin(object):
+    """Append mode of the persistent time series creators
+
+    The temporary mapset has the same name as the existing target mapset.
+    The temporal database of the target mapset is copied into it, so that
+    only the scenes that are not yet registered are imported and registered
+    in the existing STRDS. The new raster maps and the updated temporal
+    database are then moved or copied into the target mapset, the existing
+    maps are neither copied nor imported again.
+
+    Only PERMANENT is linked into the temporary project, since the
+    temporary mapset would otherwise be created inside the linked target
+    mapset and the import would write directly into the target mapset.
+    """
+
+    def _create_temp_database(self, mapsets=None):
+        mapsets = [
+            mapset
+            for mapset in (mapsets or [])
+            if mapset != self.target_mapset_name
+        ]
+        return super()._create_temp_database(mapsets or ["PERMANENT"])
+
+    def _get_target_tgis_db(self):
+        return os.path.join(
+            self.user_project_path,
+            self.target_mapset_name,
+            "tgis",
+            "sqlite.db",
+        )
+
+    def _copy_target_temporal_database(self):
+        """Copy the temporal database of the target into the temp mapset"""
+        tgis_db = self._get_target_tgis_db()
+        if not os.path.isfile(tgis_db):
+            return
+        tgis_path = os.path.join(self.temp_mapset_path, "tgis")
+        os.makedirs(tgis_path, exist_ok=True)
+        shutil.copyfile(tgis_db, os.path.join(tgis_path, "sqlite.db"))
+
+    def _get_registered_maps(self, strds):
+        """Return the names of the maps registered in a STRDS of the target"""
+        return get_registered_maps(
+            self._get_target_tgis_db(),
+            "%s@%s" % (strds, self.target_mapset_name),
+        )
+
+    def _append_tmp_mapset_to_target_mapset(self):
+        """Copy the new raster maps and the temporal database into the
+        existing target mapset
+        """
+        # Extent the mapset lock for an hour, since copying can take long
+        if self.target_mapset_lock_set is True:
+            ret = self.lock_interface.extend(
+                resource_id=self.target_mapset_lock_id, expiration=3600
+            )
+            if ret == 0:
+                raise AsyncProcessError(
+                    "Unable to extend lock for mapset <%s>"
+                    % self.target_mapset_name
+                )
+
+        self._send_resource_update(
+            "Append temporary mapset <%s> to target mapset <%s>"
+            % (self.temp_mapset_name, self.target_mapset_name)
+        )
+
+        target_path = os.path.join(
+            self.user_project_path, self.target_mapset_name
+        )
+        # Move the new maps if no copy is required
+        move = is_same_file_system(self.temp_mapset_path, target_path)
+
+        for directory in APPEND_DIRECTORIES:
+            source_path = os.path.join(self.temp_mapset_path, directory)
+            if not os.path.exists(source_path):
+                continue
+
+            if move is True:
+                move_directory_content(
+                    source_path, os.path.join(target_path, directory)
+                )
+                continue
+
+            p = subprocess.Popen(
+                ["/bin/cp", "-fr", source_path, target_path + "/."],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+            (stdout_buff, stderr_buff) = p.communicate()
+            if p.returncode != 0:
+                raise AsyncProcessError(
+                    "Unable to append temporary mapset to target mapset. "
+                    "Copy error stdout: %s stderr: %s returncode: %i"
+                    % (stdout_buff, stderr_buff, p.returncode)
+                )
@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Warm pool of initialized GRASS projects for ephemeral satellite jobs
+"""
+
+import fcntl
+import json
+import os
+import shutil
+import time
+import uuid
+from .config import satellite_config
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Sören Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+# The name of the initialized mapset in a warm project
+WARM_MAPSET_NAME = "warm_mapset"
+
+# The vector database connection that is set by actinia with db.connect
+DB_CONNECT_VAR = (
+    "DB_DRIVER: sqlite\n"
+    "DB_DATABASE: $GISDBASE/$LOCATION_NAME/$MAPSET/vector/$MAP/sqlite.db\n"
+)
+
+
+class WarmProjectPool(object):
+    """A pool of initialized GRASS projects, one directory for each EPSG code
+
+    Each job of the ephemeral processors runs in a forked worker process,
+    hence the pool is stored on disk: each entry is a complete project
+    with a PERMANENT mapset and an initialized mapset, that is leased by
+    a job with an atomic rename into its temporary database. The pool
+    directory must be located on the same file system as the temporary
+    GRASS database.
+
+    The lease latency and the reuse rate, the share of jobs that got a warm
+    project from the pool, are recorded in a statistics file.
+    """
+
+    def __init__(self, pool_path, size):
+        """
+        Args:
+            pool_path (str): The directory of the pool
+            size (int): The number of warm projects for each EPSG code
+
+        """
+        self.pool_path = pool_path
+        self.size = size
+        self.stats_file = os.path.join(pool_path, "stats.json")
+
+    def _epsg_path(self, epsg):
+        return os.path.join(self.pool_path, "epsg_%i" % epsg)
+
+    def _ready_entries(self, epsg):
+        epsg_path = self._epsg_path(epsg)
+        if not os.path.isdir(epsg_path):
+            return []
+        return sorted(
+            os.path.join(epsg_path, name)
+            for name in os.listdir(epsg_path)
+            if name.startswith("ready_")
+        )
+
+    def available(self, epsg):
+        """Return the number of warm projects for an EPSG code"""
+        return len(self._ready_entries(epsg))
+
+    def fill(self, epsg, template_path):
+        """Fill the pool of an EPSG code up to the pool size
+
+        A warm project is a copy of the project template with an additional
+        mapset that contains the region and the vector database connection
+        settings. It is built in a hidden directory and published with an
+        atomic rename.
+
+        Args:
+            epsg (int): The EPSG code
+            template_path (str): The path to the project template
+
+        Returns:
+            (int)
+            The number of created warm projects
+
+        """
+        epsg_path = self._epsg_path(epsg)
+        os.makedirs(epsg_path, exist_ok=True)
+
+        count = 0
+        for _ in range(self.size - self.available(epsg)):
+            name = uuid.uuid4().hex
+            build_path = os.path.join(epsg_path, ".build_%s" % name)
+            try:
+                shutil.copytree(template_path, build_path)
+                mapset_path = os.path.join(build_path, WARM_MAPSET_NAME)
+                os.mkdir(mapset_path)
+                shutil.copyfile(
+                    os.path.join(build_path, "PERMANENT", "DEFAULT_WIND"),
+                    os.path.join(mapset_path, "WIND"),
+                )
+                with open(os.path.join(mapset_path, "VAR"), "w") as f:
+                    f.write(DB_CONNECT_VAR)
+                os.rename(
+                    build_path, os.path.join(epsg_path, "ready_%s" % name)
+                )
+                count += 1
+            except Exception:
+                shutil.rmtree(build_path, ignore_errors=True)
+                raise
+        return count
+
+    def lease(self, epsg, project_path):
+        """Lease a warm project and move it to the project path of a job
+
+        Args:
+            epsg (int): The EPSG code
+            project_path (str): The path of the project in the temporary
+                                database of the job
+
+        Returns:
+            (bool)
+            True if a warm project was leased, False if the pool is empty
+
+        """
+        start = time.perf_counter()
+        leased = False
+        for entry in self._ready_entries(epsg):
+            try:
+                os.rename(entry, project_path)
+                leased = True
+                break
+            except OSError:
+                # Leased by another job in the meantime
+                continue
+        self._record_lease(leased, time.perf_counter() - start)
+        return leased
+
+    def _record_lease(self, leased, latency):
+        os.makedirs(self.pool_path, exist_ok=True)
+        with open(self.stats_file + ".lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            stats = self._read_stats()
+            stats["leases"] += 1
+            if leased:
+                stats["hits"] += 1
+            else:
+                stats["misses"] += 1
+            stats["lease_seconds_total"] += latency
+            stats["lease_seconds_max"] = max(
+                stats["lease_seconds_max"], latency
+            )
+            with open(self.stats_file + ".new", "w") as f:
+                json.dump(stats, f)
+            os.rename(self.stats_file + ".new", self.stats_file)
+
+    def _read_stats(self):
+        stats = {
+            "leases": 0,
+            "hits": 0,
+            "misses": 0,
+            "lease_seconds_total": 0.0,
+            "lease_seconds_max": 0.0,
+        }
+        if os.path.isfile(self.stats_file):
+            with open(self.stats_file, "r") as f:
+                stats.update(json.load(f))
+        return stats
+
+    def get_stats(self):
+        """Return the lease statistics of the pool
+
+        Returns:
+            (dict)
+            The number of leases, hits and misses, the reuse rate and the
+            mean and maximum lease latency in seconds
+
+        """
+        stats = self._read_stats()
+        leases = stats["leases"]
+        return {
+            "leases": leases,
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "reuse_rate": stats["hits"] / leases if leases else 0.0,
+            "lease_seconds_mean": (
+                stats["lease_seconds_total"] / leases if leases else 0.0
+            ),
+            "lease_seconds_max": stats["lease_seconds_max"],
+        }
+
+
+class WarmProjectPoolMixin(object):
+    """Lease warm projects in the ephemeral processors
+
+    If the project was leased from the warm pool, the temporary mapset is
+    created by renaming the initialized mapset and switching the GRASS
+    environment into it, without running g.mapset and db.connect.
+    """
+
+    warm_project_leased = False
+
+    def _get_warm_project_pool(self):
+        """Return the warm project pool or None if it is disabled"""
+        if not satellite_config.WARM_POOL:
+            return None
+        pool_path = satellite_config.WARM_POOL_PATH or os.path.join(
+            self.config.GRASS_TMP_DATABASE, "satellite_warm_pool"
+        )
+        return WarmProjectPool(pool_path, satellite_config.WARM_POOL_SIZE)
+
+    def _refill_warm_project_pool(self, epsg, template_path):
+        """Refill the warm project pool for the next jobs"""
+        pool = self._get_warm_project_pool()
+        if pool is None or epsg is None or not os.path.isdir(template_path):
+            return
+        try:
+            pool.fill(epsg, template_path)
+        except Exception as e:
+            self.message_logger.info(
+                "Unable to refill the warm project pool for EPSG:%i, "
+                "Exception: %s" % (epsg, str(e))
+            )
+
+    def _lease_warm_project(self, pool, epsg, project_path):
+        """Try to lease a warm project for the EPSG code of the scene"""
+        self.warm_project_leased = pool.lease(epsg, project_path)
+        stats = pool.get_stats()
+        self.message_logger.info(
+            "Warm project pool EPSG:%i: leased=%s reuse_rate=%.2f "
+            "lease_seconds_mean=%.6f"
+            % (
+                epsg,
+                self.warm_project_leased,
+                stats["reuse_rate"],
+                stats["lease_seconds_mean"],
+            )
+        )
+        return self.warm_project_leased
+
+    def _create_temporary_mapset(
+        self,
+        temp_mapset_name,
+        source_mapset_name=None,
+        interim_result_mapset=None,
+        interim_result_file_path=None,
+    ):
+        warm_mapset_path = os.path.join(
+            self.temp_project_path, WARM_MAPSET_NAME
+        )
+        if (
+            not self.warm_project_leased
+            or interim_result_mapset is not None
+            or interim_result_file_path is not None
+            or self.required_mapsets
+            or not os.path.isdir(warm_mapset_path)
+        ):
+            return super()._create_temporary_mapset(
+                temp_mapset_name=temp_mapset_name,
+                source_mapset_name=source_mapset_name,
+                interim_result_mapset=interim_result_mapset,
+                interim_result_file_path=interim_result_file_path,
+            )
+
+        self.temp_mapset_path = os.path.join(
+            self.temp_project_path, temp_mapset_name
+        )
+        os.rename(warm_mapset_path, self.temp_mapset_path)
+
+        # Switch the GRASS environment into the temporary mapset
+        self.ginit.mapset_name = temp_mapset_name
+        self.ginit.mapset_path = self.temp_mapset_path
+        self.ginit.gisrc.mapset = temp_mapset_name
+        self.ginit.gisrc.rewrite_file()
+
+        if source_mapset_name is not None:
+            source_wind = os.path.join(
+                self.temp_project_path, source_mapset_name, "WIND"
+            )
+            if os.path.exists(source_wind):
+                shutil.copyfile(
+                    source_wind, os.path.join(self.temp_mapset_path, "WIND")
+                )
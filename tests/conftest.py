@@ -1,12 +1,59 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-    Dummy conftest.py for actinia_satellite_plugin.
+    conftest.py for actinia_satellite_plugin.
+
+    Provides local HTTP server fixtures that serve files from a temporary
+    directory, with and without support for HTTP range requests. The range
+    requests are served by the object server of the local backend.
 
-    If you don't know what this is for, just leave it empty.
     Read more about conftest.py under:
     https://pytest.org/latest/plugins.html
 """
 from __future__ import print_function, absolute_import, division
 
-# import pytest
+import functools
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from actinia_satellite_plugin.local_backend import ObjectStoreRequestHandler
+
+
+class PlainHTTPRequestHandler(SimpleHTTPRequestHandler):
+    """HTTP request handler that ignores range requests"""
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _serve(handler_class, directory):
+    handler = functools.partial(handler_class, directory=str(directory))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, "http://127.0.0.1:%i" % server.server_address[1]
+
+
+@pytest.fixture
+def range_http_server(tmp_path):
+    """Serve tmp_path with HTTP range request support
+
+    Yields the directory that is served and the base URL of the server.
+    """
+    server, url = _serve(ObjectStoreRequestHandler, tmp_path)
+    yield tmp_path, url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def plain_http_server(tmp_path):
+    """Serve tmp_path without HTTP range request support
+
+    Yields the directory that is served and the base URL of the server.
+    """
+    server, url = _serve(PlainHTTPRequestHandler, tmp_path)
+    yield tmp_path, url
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Test the area of interest support
+"""
+
+import unittest
+import pytest
+from actinia_core.core.common.process_object import Process
+from actinia_satellite_plugin.aoi import (
+    AOI_VECTOR_NAME,
+    create_aoi_feature_collection,
+    get_aoi_bbox,
+    is_rectangular_aoi,
+    limit_import_process_list_to_aoi,
+    relocate_vrt_files,
+)
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Soeren Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+BBOX = {"north": 50.4, "south": 50.3, "east": 7.2, "west": 7.0}
+
+POLYGON = {
+    "type": "Polygon",
+    "coordinates": [
+        [[7.0, 50.3], [7.2, 50.3], [7.1, 50.4], [7.0, 50.3]],
+    ],
+}
+
+
+@pytest.mark.unittest
+class AOITestCase(unittest.TestCase):
+    def test_no_aoi(self):
+        self.assertIsNone(create_aoi_feature_collection(None))
+        self.assertIsNone(create_aoi_feature_collection({}))
+
+    def test_bbox(self):
+        aoi = create_aoi_feature_collection({"bbox": BBOX})
+        self.assertEqual(aoi["type"], "FeatureCollection")
+        self.assertEqual(len(aoi["features"]), 1)
+        self.assertEqual(get_aoi_bbox(aoi), (7.0, 50.3, 7.2, 50.4))
+        self.assertTrue(is_rectangular_aoi({"bbox": BBOX}))
+
+    def test_geojson(self):
+        feature = {"type": "Feature", "properties": {}, "geometry": POLYGON}
+        collection = {"type": "FeatureCollection", "features": [feature]}
+        for geojson in [POLYGON, feature, collection]:
+            aoi = create_aoi_feature_collection({"geojson": geojson})
+            self.assertEqual(len(aoi["features"]), 1)
+            self.assertEqual(get_aoi_bbox(aoi), (7.0, 50.3, 7.2, 50.4))
+        self.assertFalse(is_rectangular_aoi({"geojson": POLYGON}))
+
+    def test_invalid_aoi(self):
+        invalid = [
+            {"bbox": BBOX, "geojson": POLYGON},
+            {"bbox": {"north": 50.4, "south": 50.3}},
+            {"bbox": {"north": 50.3, "south": 50.4, "east": 7.2, "west": 7}},
+            {"bbox": {"north": 95, "south": 50.4, "east": 7.2, "west": 7}},
+            {"geojson": {"type": "Point", "coordinates": [7.0, 50.3]}},
+            {"geojson": {"type": "Polygon", "coordinates": [[[7, 50]]]}},
+            {"geojson": {"type": "FeatureCollection", "features": []}},
+        ]
+        for request_data in invalid:
+            self.assertRaises(
+                ValueError, create_aoi_feature_collection, request_data
+            )
+
+    def test_limit_import_process_list(self):
+        process_list = [
+            Process(
+                exec_type="exec",
+                executable="/usr/bin/gdal_translate",
+                executable_params=[
+                    "-projwin", "6.9", "50.5", "7.1", "50.0",
+                    "-of", "vrt", "-projwin_srs", "EPSG:4326",
+                    "B04.jp2", "B04.jp2.vrt",
+                ],
+            ),
+            Process(
+                exec_type="grass",
+                executable="r.import",
+                executable_params=["input=B04.jp2.vrt", "output=B04", "--q"],
+            ),
+            Process(
+                exec_type="grass",
+                executable="g.region",
+                executable_params=["align=B04", "vector=footprint", "-g"],
+            ),
+        ]
+        limit_import_process_list_to_aoi(process_list, (7.0, 50.3, 7.2, 50.4))
+
+        self.assertEqual(
+            process_list[0].executable_params[1:5],
+            ["7.000000", "50.400000", "7.100000", "50.300000"],
+        )
+        self.assertIn("extent=region", process_list[1].executable_params)
+        self.assertIn(
+            "vector=%s" % AOI_VECTOR_NAME, process_list[2].executable_params
+        )
+
+    def test_limit_import_process_list_no_intersection(self):
+        process_list = [
+            Process(
+                exec_type="exec",
+                executable="/usr/bin/gdal_translate",
+                executable_params=[
+                    "-projwin", "1.0", "45.0", "2.0", "44.0",
+                    "-of", "vrt", "-projwin_srs", "EPSG:4326",
+                    "B04.jp2", "B04.jp2.vrt",
+                ],
+            ),
+        ]
+        self.assertRaises(
+            ValueError,
+            limit_import_process_list_to_aoi,
+            process_list,
+            (7.0, 50.3, 7.2, 50.4),
+        )
+
+    def test_relocate_vrt_files(self):
+        process_list = [
+            Process(
+                exec_type="exec",
+                executable="/usr/bin/gdal_translate",
+                executable_params=[
+                    "-projwin", "6.9", "50.5", "7.1", "50.0",
+                    "-of", "vrt", "-projwin_srs", "EPSG:4326",
+                    "/cache/B04.jp2", "/cache/B04.jp2.vrt",
+                ],
+            ),
+            Process(
+                exec_type="grass",
+                executable="r.import",
+                executable_params=[
+                    "input=/cache/B04.jp2.vrt", "output=B04", "--q"
+                ],
+            ),
+        ]
+        relocate_vrt_files(process_list, "/tmp/job")
+
+        self.assertEqual(
+            process_list[0].executable_params[-2:],
+            ["/cache/B04.jp2", "/tmp/job/B04.jp2.vrt"],
+        )
+        self.assertEqual(
+            process_list[1].executable_params,
+            ["input=/tmp/job/B04.jp2.vrt", "output=B04", "--q"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
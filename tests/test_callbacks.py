@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Test the completion callbacks of the satellite jobs
+"""
+
+import json
+import pickle
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+import pytest
+from actinia_satellite_plugin import callbacks
+from actinia_satellite_plugin.callbacks import (
+    CompletionCallbackMixin,
+    check_callback_url,
+    deliver_callback,
+    get_backoff_delay,
+    start_callback_job,
+)
+from actinia_satellite_plugin.config import satellite_config
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Soeren Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+@pytest.fixture
+def callback_receiver():
+    """A local HTTP server that answers the callbacks with status codes"""
+
+    class Receiver(object):
+        status_codes = []
+        requests = []
+
+    class RequestHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            Receiver.requests.append((self.headers["Content-Type"], body))
+            code = 200
+            if Receiver.status_codes:
+                code = Receiver.status_codes.pop(0)
+            self.send_response(code)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    Receiver.url = "http://127.0.0.1:%i/callback" % server.server_address[1]
+    yield Receiver
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def resolver(monkeypatch):
+    """Resolve the host names of the tests without DNS"""
+    addresses = {
+        "example.com": ["93.184.215.14", "2606:2800:21f:cb07::1"],
+        "other.org": ["198.51.100.7"],
+        "localhost": ["127.0.0.1", "::1"],
+        "metadata": ["169.254.169.254"],
+        "kvdb": ["10.0.0.5"],
+        "mapped": ["::ffff:192.168.0.1"],
+    }
+
+    def getaddrinfo(host, port, *args, **kwargs):
+        if host not in addresses:
+            raise socket.gaierror("Name or service not known")
+        return [
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, 0))
+            for address in addresses[host]
+        ]
+
+    monkeypatch.setattr(callbacks.socket, "getaddrinfo", getaddrinfo)
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    # The local receiver must be allowed explicitly
+    monkeypatch.setattr(
+        satellite_config, "CALLBACK_ALLOWED_HOSTS", "127.0.0.1"
+    )
+    monkeypatch.setattr(satellite_config, "CALLBACK_RETRIES", 3)
+    monkeypatch.setattr(satellite_config, "CALLBACK_BACKOFF", 0.01)
+    monkeypatch.setattr(satellite_config, "CALLBACK_TIMEOUT", 2.0)
+
+
+@pytest.mark.unittest
+def test_check_callback_url(monkeypatch, resolver):
+    assert check_callback_url({}) is None
+    assert check_callback_url({"callback_url": "https://example.com"}) is None
+    assert check_callback_url({"callback_url": 1}) is not None
+    assert check_callback_url({"callback_url": "ftp://x.org"}) is not None
+    assert check_callback_url({"callback_url": "http://"}) is not None
+
+    monkeypatch.setattr(
+        satellite_config, "CALLBACK_ALLOWED_HOSTS", "orchestrator, Example.com"
+    )
+    assert check_callback_url({"callback_url": "http://example.com"}) is None
+    assert check_callback_url({"callback_url": "http://other.org"}) is not None
+
+
+@pytest.mark.unittest
+def test_internal_callback_hosts(monkeypatch, resolver):
+    for url in [
+        "http://localhost:8088/callback",
+        "http://127.0.0.1/callback",
+        "http://[::1]/callback",
+        "http://169.254.169.254/latest/meta-data",
+        "http://metadata/latest/meta-data",
+        "http://kvdb:6379",
+        "http://mapped/callback",
+        "http://unknown.host/callback",
+    ]:
+        assert check_callback_url({"callback_url": url}) is not None, url
+
+    # Internal hosts can be allowed explicitly
+    monkeypatch.setattr(satellite_config, "CALLBACK_ALLOWED_HOSTS", "kvdb")
+    assert check_callback_url({"callback_url": "http://kvdb:6379"}) is None
+
+    # The host is checked again before the delivery
+    monkeypatch.setattr(satellite_config, "CALLBACK_ALLOWED_HOSTS", "")
+    delivered, error = deliver_callback("http://metadata/", {})
+    assert delivered is False and "public address" in error
+
+
+@pytest.mark.unittest
+def test_backoff_delay(monkeypatch):
+    monkeypatch.setattr(satellite_config, "CALLBACK_BACKOFF", 1.0)
+    monkeypatch.setattr(satellite_config, "CALLBACK_MAX_BACKOFF", 10.0)
+    assert 0.5 <= get_backoff_delay(0) <= 1.0
+    assert 4.0 <= get_backoff_delay(3) <= 8.0
+    assert 5.0 <= get_backoff_delay(10) <= 10.0
+
+
+@pytest.mark.unittest
+def test_deliver_with_retries(callback_receiver, fast_retries):
+    callback_receiver.status_codes = [503, 429, 200]
+    delays = []
+    delivered, error = deliver_callback(
+        callback_receiver.url, {"status": "finished"}, sleep=delays.append
+    )
+    assert delivered is True and error is None
+    assert len(callback_receiver.requests) == 3
+    assert len(delays) == 2
+    content_type, body = callback_receiver.requests[-1]
+    assert content_type == "application/json"
+    assert json.loads(body) == {"status": "finished"}
+
+    # Client errors are not retried
+    callback_receiver.status_codes = [404]
+    delivered, error = deliver_callback(
+        callback_receiver.url, {}, sleep=delays.append
+    )
+    assert delivered is False and "404" in error
+    assert len(callback_receiver.requests) == 4
+
+    # A receiver that is not reachable
+    delivered, error = deliver_callback(
+        "http://127.0.0.1:1/callback", {}, sleep=delays.append
+    )
+    assert delivered is False and error
+
+
+@pytest.mark.unittest
+def test_callback_mixin(monkeypatch, callback_receiver, fast_retries):
+    enqueued = []
+    monkeypatch.setattr(
+        callbacks,
+        "enqueue_job",
+        lambda timeout, func, *args: enqueued.append((timeout, func, args)),
+    )
+
+    class Processing(object):
+        def _send_to_database(self, document, final=False):
+            pass
+
+    class SatelliteProcessing(CompletionCallbackMixin, Processing):
+        class rdc(object):
+            request_data = {"callback_url": callback_receiver.url}
+
+    processing = SatelliteProcessing()
+    processing._send_to_database(pickle.dumps([200, {"status": "running"}]))
+    assert callback_receiver.requests == []
+
+    document = pickle.dumps([200, {"status": "finished", "progress": 100}])
+    processing._send_to_database(document, final=True)
+    processing._send_to_database(document, final=True)
+
+    # The callback is delivered by a separate job
+    assert callback_receiver.requests == []
+    assert len(enqueued) == 1
+    timeout, func, args = enqueued[0]
+    assert func is start_callback_job
+    assert timeout >= 4 * satellite_config.CALLBACK_TIMEOUT
+    func(*args)
+    assert len(callback_receiver.requests) == 1
+    assert json.loads(callback_receiver.requests[0][1])["progress"] == 100
+
+
+@pytest.mark.unittest
+def test_callback_without_job_queue(
+    monkeypatch, callback_receiver, fast_retries
+):
+    def enqueue_job(timeout, func, *args):
+        raise ConnectionError("The job queue is not available")
+
+    monkeypatch.setattr(callbacks, "enqueue_job", enqueue_job)
+
+    class Processing(object):
+        message_logger = mock.Mock()
+
+        def _send_to_database(self, document, final=False):
+            pass
+
+    class SatelliteProcessing(CompletionCallbackMixin, Processing):
+        class rdc(object):
+            resource_id = "resource_id-1"
+            request_data = {"callback_url": callback_receiver.url}
+
+    processing = SatelliteProcessing()
+    document = pickle.dumps([200, {"status": "finished"}])
+    processing._send_to_database(document, final=True)
+    # The callback is delivered directly
+    assert len(callback_receiver.requests) == 1
+    error = processing.message_logger.error.call_args[0][0]
+    assert "job queue" in error
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Test the per-scene checkpoints of the time series creators
+"""
+
+import os
+import tempfile
+import time
+import unittest
+import pytest
+from actinia_satellite_plugin.checkpoints import (
+    SceneCheckpoints,
+    get_checkpoint_key,
+    remove_expired_checkpoints,
+)
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Soeren Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+SCENE_1 = "LC80440342016259LGN00"
+SCENE_2 = "LC80440342013106LGN01"
+
+
+def create_raster(mapset_path, name):
+    for element in ["cell", "cellhd", "fcell"]:
+        os.makedirs(os.path.join(mapset_path, element), exist_ok=True)
+        with open(os.path.join(mapset_path, element, name), "w") as f:
+            f.write(element)
+    os.makedirs(os.path.join(mapset_path, "cell_misc", name))
+    with open(os.path.join(mapset_path, "cell_misc", name, "range"), "w") as f:
+        f.write("0 255")
+
+
+@pytest.mark.unittest
+class SceneCheckpointsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.checkpoint_path = os.path.join(self.tmp_dir.name, "checkpoint")
+        self.mapset_path = os.path.join(self.tmp_dir.name, "mapset")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_checkpoint_key(self):
+        key = get_checkpoint_key("user", "project", "mapset", [SCENE_1])
+        self.assertEqual(
+            key, get_checkpoint_key("user", "project", "mapset", [SCENE_1])
+        )
+        self.assertNotEqual(
+            key, get_checkpoint_key("user", "project", "mapset", [SCENE_2])
+        )
+
+    def test_stages(self):
+        checkpoints = SceneCheckpoints(self.checkpoint_path)
+        checkpoints.set_done(SCENE_1, "downloaded")
+        checkpoints.set_done(SCENE_1, "imported")
+        checkpoints.set_done(SCENE_1, "imported")
+        self.assertRaises(ValueError, checkpoints.set_done, SCENE_1, "other")
+
+        # The state is read by a resubmitted job
+        checkpoints = SceneCheckpoints(self.checkpoint_path)
+        self.assertEqual(
+            checkpoints.get_stages(SCENE_1), ["downloaded", "imported"]
+        )
+        self.assertTrue(checkpoints.is_done(SCENE_1, "imported"))
+        self.assertFalse(checkpoints.is_done(SCENE_1, "atcor"))
+        self.assertFalse(checkpoints.is_done(SCENE_2, "downloaded"))
+
+        checkpoints.remove()
+        self.assertFalse(os.path.exists(self.checkpoint_path))
+
+    def test_save_and_restore(self):
+        create_raster(self.mapset_path, SCENE_1 + "_TOAR.1")
+        create_raster(self.mapset_path, SCENE_2 + "_TOAR.1")
+
+        checkpoints = SceneCheckpoints(self.checkpoint_path)
+        checkpoints.save_scene(SCENE_1, self.mapset_path)
+        checkpoints.set_done(SCENE_1, "atcor")
+
+        new_mapset_path = os.path.join(self.tmp_dir.name, "new_mapset")
+        self.assertEqual(checkpoints.restore(new_mapset_path), [SCENE_1])
+        self.assertTrue(
+            os.path.isfile(
+                os.path.join(new_mapset_path, "cell", SCENE_1 + "_TOAR.1")
+            )
+        )
+        self.assertTrue(
+            os.path.isfile(
+                os.path.join(
+                    new_mapset_path, "cell_misc", SCENE_1 + "_TOAR.1", "range"
+                )
+            )
+        )
+        self.assertFalse(
+            os.path.exists(
+                os.path.join(new_mapset_path, "cell", SCENE_2 + "_TOAR.1")
+            )
+        )
+
+    def test_saved_scene_is_a_copy(self):
+        create_raster(self.mapset_path, SCENE_1 + "_TOAR.1")
+        checkpoints = SceneCheckpoints(self.checkpoint_path)
+        checkpoints.save_scene(SCENE_1, self.mapset_path)
+
+        # A support file that is rewritten in place after the checkpoint
+        with open(
+            os.path.join(self.mapset_path, "cellhd", SCENE_1 + "_TOAR.1"), "w"
+        ) as f:
+            f.write("changed")
+
+        with open(
+            os.path.join(
+                self.checkpoint_path, "mapset", "cellhd", SCENE_1 + "_TOAR.1"
+            )
+        ) as f:
+            self.assertEqual(f.read(), "cellhd")
+
+    def test_remove_expired_checkpoints(self):
+        checkpoint_path = os.path.join(self.tmp_dir.name, "checkpoints")
+        for key in ["expired", "recent", "current", "empty"]:
+            checkpoints = SceneCheckpoints(
+                os.path.join(checkpoint_path, key)
+            )
+            if key == "empty":
+                os.makedirs(checkpoints.checkpoint_path)
+            else:
+                checkpoints.set_done(SCENE_1, "downloaded")
+        two_days_ago = time.time() - 2 * 86400
+        for path in [
+            os.path.join(checkpoint_path, "expired", "state.json"),
+            os.path.join(checkpoint_path, "current", "state.json"),
+            os.path.join(checkpoint_path, "empty"),
+        ]:
+            os.utime(path, (two_days_ago, two_days_ago))
+
+        self.assertEqual(
+            remove_expired_checkpoints(checkpoint_path, 0, keep="current"),
+            [],
+        )
+        removed = remove_expired_checkpoints(
+            checkpoint_path, 86400, keep="current"
+        )
+        self.assertEqual(sorted(removed), ["empty", "expired"])
+        self.assertEqual(
+            sorted(os.listdir(checkpoint_path)), ["current", "recent"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Test the dry-run plans of the import and processing resources
+"""
+
+import pytest
+from actinia_core.core.common.landsat_processing_library import (
+    SCENE_SUFFIXES,
+)
+from actinia_satellite_plugin.config import satellite_config
+from actinia_satellite_plugin.dry_run import (
+    DOWNLOAD_STEPS_PER_FILE,
+    SENTINEL2_FOOTPRINT_STEPS,
+    SENTINEL2_STEPS_PER_BAND,
+    create_dry_run_plan,
+    create_landsat_dry_run_plan,
+    create_sentinel2_dry_run_plan,
+    get_landsat_scene_files,
+    get_remote_file_size,
+)
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Soeren Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+LC08 = "LC08_L1TP_044034_20160915_20170221_01_T1"
+PRODUCT_ID = "S2A_MSIL1C_20170212T104141_N0204_R008_T31TGJ_20170212T104138"
+
+
+@pytest.mark.unittest
+def test_remote_file_size(plain_http_server):
+    directory, url = plain_http_server
+    (directory / "B04.jp2").write_bytes(b"0" * 1024)
+
+    assert get_remote_file_size(url + "/B04.jp2") == 1024
+    assert get_remote_file_size(url + "/missing.jp2") is None
+    assert get_remote_file_size("http://127.0.0.1:1/B04.jp2", 1) is None
+
+
+@pytest.mark.unittest
+def test_plan_cache_hits_and_downloads(plain_http_server, tmp_path_factory):
+    directory, url = plain_http_server
+    cache = tmp_path_factory.mktemp("cache")
+    (directory / "a_B04.jp2").write_bytes(b"0" * 1000)
+    (directory / "b_B04.jp2").write_bytes(b"0" * 3000)
+    (cache / "a_B08.jp2").write_bytes(b"0" * 500)
+
+    scenes = [
+        (
+            "a",
+            [
+                (url + "/a_B04.jp2", str(cache / "a_B04.jp2")),
+                (url + "/a_B08.jp2", str(cache / "a_B08.jp2")),
+            ],
+            4,
+        ),
+        (
+            "b",
+            [
+                (url + "/b_B04.jp2", str(cache / "b_B04.jp2")),
+                (url + "/b_B08.jp2", str(cache / "b_B08.jp2")),
+            ],
+            4,
+        ),
+    ]
+    plan = create_dry_run_plan(scenes, extra_steps=1)
+
+    assert plan["scenes"] == 2
+    assert plan["files"] == 4
+    assert plan["cache_hits"] == 1
+    assert plan["cache_misses"] == 3
+    assert plan["cached_bytes"] == 500
+    assert plan["download_bytes"] == 4000
+    # The missing file of scene b can not be resolved
+    assert plan["unresolved_files"] == [url + "/b_B08.jp2"]
+    assert plan["process_steps"] == 1 + 8 + 3 * DOWNLOAD_STEPS_PER_FILE
+    assert plan["scene_plans"][0] == {
+        "scene_id": "a",
+        "files": 2,
+        "cache_hits": 1,
+        "download_bytes": 1000,
+        "process_steps": 4 + DOWNLOAD_STEPS_PER_FILE,
+    }
+    assert plan["estimated_seconds"] == int(
+        4000 / satellite_config.DRY_RUN_DOWNLOAD_RATE
+        + plan["process_steps"] * satellite_config.DRY_RUN_SECONDS_PER_STEP
+    )
+
+
+@pytest.mark.unittest
+def test_landsat_plan_from_cache(tmp_path):
+    file_list = get_landsat_scene_files(LC08, str(tmp_path))
+    assert len(file_list) == len(SCENE_SUFFIXES["LC08"])
+    for url, cache_file in file_list:
+        assert url.startswith("https://")
+        with open(cache_file, "wb") as f:
+            f.write(b"0" * 10)
+
+    plan = create_landsat_dry_run_plan([LC08], str(tmp_path), extra_steps=1)
+    assert plan["cache_hits"] == len(file_list)
+    assert plan["cached_bytes"] == 10 * len(file_list)
+    assert plan["download_bytes"] == 0
+    # One import per band, the atmospheric correction and the registration
+    assert plan["process_steps"] == len(file_list) + 1
+
+
+@pytest.mark.unittest
+def test_sentinel2_plan_unresolved_product(plain_http_server):
+    directory, url = plain_http_server
+    (directory / "B04.jp2").write_bytes(b"0" * 100)
+    (directory / "B08.jp2").write_bytes(b"0" * 200)
+    query_result = {
+        PRODUCT_ID: {
+            band: {
+                "file": "%s_%s" % (PRODUCT_ID, band),
+                "public_url": "%s/%s.jp2" % (url, band),
+            }
+            for band in ["B04", "B08"]
+        }
+    }
+
+    plan = create_sentinel2_dry_run_plan(
+        [PRODUCT_ID, "S2B_UNKNOWN"],
+        ["B04", "B08"],
+        query_result,
+        str(directory / "cache"),
+    )
+    assert plan["scenes"] == 1
+    assert plan["unresolved_scenes"] == ["S2B_UNKNOWN"]
+    assert plan["download_bytes"] == 300
+    assert plan["process_steps"] == (
+        SENTINEL2_FOOTPRINT_STEPS
+        + 2 * SENTINEL2_STEPS_PER_BAND
+        + 2 * DOWNLOAD_STEPS_PER_FILE
+    )
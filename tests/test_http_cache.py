@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Test the conditional requests of the scene queries
+"""
+
+import os
+import pytest
+from flask import Flask, request
+from actinia_satellite_plugin.config import satellite_config
+from actinia_satellite_plugin.http_cache import (
+    get_catalog_version,
+    get_query_etag,
+    is_not_modified,
+    make_not_modified_response,
+    set_cache_headers,
+)
+from actinia_satellite_plugin.serialization import make_json_response
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Soeren Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+@pytest.fixture
+def query_app(tmp_path, monkeypatch):
+    """A flask app with a query view that counts the catalog lookups"""
+    catalog = tmp_path / "catalog.sqlite"
+    catalog.write_bytes(b"version 1")
+    monkeypatch.setattr(satellite_config, "BACKEND", "local")
+    monkeypatch.setattr(satellite_config, "LOCAL_CATALOG_PATH", str(catalog))
+    monkeypatch.setattr(satellite_config, "QUERY_CACHE_MAX_AGE", 300)
+    monkeypatch.setattr(satellite_config, "QUERY_CACHE_PUBLIC", False)
+
+    app = Flask(__name__)
+    app.lookups = 0
+
+    @app.route("/query")
+    def query():
+        etag = get_query_etag("sentinel2", dict(request.args))
+        if is_not_modified(etag):
+            return make_not_modified_response(etag)
+        app.lookups += 1
+        return set_cache_headers(make_json_response(["scene"]), etag)
+
+    return app, catalog
+
+
+@pytest.mark.unittest
+def test_query_etag(query_app, monkeypatch):
+    app, catalog = query_app
+    etag = get_query_etag("sentinel2", {"lat": "51", "lon": None})
+    assert etag == get_query_etag("sentinel2", {"lat": "51"})
+    assert etag != get_query_etag("landsat", {"lat": "51"})
+    assert etag != get_query_etag("sentinel2", {"lat": "52"})
+
+    # A modification of the catalog changes the version
+    version = get_catalog_version()
+    catalog.write_bytes(b"version 2, more scenes")
+    assert get_catalog_version() != version
+    assert get_query_etag("sentinel2", {"lat": "51"}) != etag
+
+    monkeypatch.setattr(satellite_config, "BACKEND", "google")
+    monkeypatch.setattr(
+        satellite_config, "QUERY_CATALOG_VERSION_INTERVAL", 10 ** 12
+    )
+    assert get_catalog_version() == "google-0"
+
+    monkeypatch.setattr(satellite_config, "QUERY_CACHE_MAX_AGE", 0)
+    assert get_query_etag("sentinel2", {"lat": "51"}) is None
+
+
+@pytest.mark.unittest
+def test_not_modified(query_app, monkeypatch):
+    app, catalog = query_app
+    client = app.test_client()
+
+    response = client.get("/query?lat=51")
+    assert response.status_code == 200
+    assert response.cache_control.private
+    assert response.cache_control.max_age == 300
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    response = client.get("/query?lat=51", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert app.lookups == 1
+
+    # The catalog has changed
+    catalog.write_bytes(b"version 2, more scenes")
+    os.utime(catalog, ns=(1, 1))
+    response = client.get("/query?lat=51", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert app.lookups == 2
+
+    monkeypatch.setattr(satellite_config, "QUERY_CACHE_PUBLIC", True)
+    response = client.get("/query?lat=51")
+    assert response.cache_control.public
+    assert "Authorization" in response.headers["Vary"]
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Test the link import mode
+"""
+
+import unittest
+import pytest
+from actinia_core.core.common.process_object import Process
+from actinia_satellite_plugin.aoi import relocate_vrt_files
+from actinia_satellite_plugin.import_mode import (
+    link_cropped_import_process_list,
+    link_import_process_list,
+    mask_r_mapcalc_process_list,
+)
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Soeren Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+@pytest.mark.unittest
+class LinkImportTestCase(unittest.TestCase):
+    def test_link_import_process_list(self):
+        process_list = [
+            Process(
+                exec_type="grass",
+                executable="r.import",
+                executable_params=[
+                    "input=/cache/B04.jp2.vrt",
+                    "output=B04_uncropped",
+                    "--q",
+                    "extent=region",
+                ],
+            ),
+            Process(
+                exec_type="grass",
+                executable="r.in.gdal",
+                executable_params=["input=/cache/B1.TIF", "output=B1", "-r"],
+            ),
+            Process(
+                exec_type="grass",
+                executable="g.region",
+                executable_params=["align=B04_uncropped", "vector=aoi"],
+            ),
+        ]
+        link_import_process_list(process_list)
+
+        self.assertEqual(process_list[0].executable, "r.external")
+        self.assertEqual(
+            process_list[0].executable_params,
+            ["input=/cache/B04.jp2.vrt", "output=B04_uncropped", "--q"],
+        )
+        self.assertEqual(process_list[1].executable, "r.external")
+        self.assertEqual(
+            process_list[1].executable_params,
+            ["input=/cache/B1.TIF", "output=B1"],
+        )
+        self.assertEqual(process_list[2].executable, "g.region")
+        self.assertEqual(
+            process_list[2].executable_params,
+            ["align=B04_uncropped", "vector=aoi"],
+        )
+
+
+def create_process(executable, *params):
+    return Process(
+        exec_type="grass",
+        executable=executable,
+        executable_params=list(params),
+    )
+
+
+def commands(process_list):
+    return [
+        " ".join([p.executable] + p.executable_params) for p in process_list
+    ]
+
+
+@pytest.mark.unittest
+class LinkCroppedImportTestCase(unittest.TestCase):
+    def test_link_cropped_import_process_list(self):
+        # The import of a band of a Sentinel-2 scene
+        process_list = [
+            create_process("v.import", "input=S2A.gml", "output=S2A", "--q"),
+            create_process("r.import", "input=B04.jp2.vrt", "output=B04_u"),
+            create_process("g.region", "align=B04_u", "vector=S2A", "-g"),
+            create_process("r.mask", "vector=S2A"),
+            create_process("r.mapcalc", "expression=B04 = float(B04_u)"),
+            create_process("r.timestamp", "map=B04", "date=1 jan 2018"),
+            create_process("g.remove", "type=raster", "name=B04_u", "-f"),
+            create_process("r.mask", "-r"),
+        ]
+        link_cropped_import_process_list(process_list, "S2A", "S2A_fp")
+
+        # The band file is linked with the name of the cropped map and
+        # the band data is not copied
+        self.assertEqual(
+            commands(process_list),
+            [
+                "v.import input=S2A.gml output=S2A --q",
+                "r.external input=B04.jp2.vrt output=B04",
+                "g.region align=B04 vector=S2A -g",
+                "r.timestamp map=B04 date=1 jan 2018",
+                "v.to.rast input=S2A output=S2A_fp use=val value=1 --q",
+            ],
+        )
+
+    def test_link_job_vrt_file(self):
+        # The linked VRT file must not be the one in the download cache,
+        # that another job may rewrite
+        process_list = [
+            create_process(
+                "gdal_translate",
+                "-of",
+                "vrt",
+                "/cache/B04.jp2",
+                "/cache/B04.jp2.vrt",
+            ),
+            create_process(
+                "r.import", "input=/cache/B04.jp2.vrt", "output=B04_u"
+            ),
+            create_process("r.mapcalc", "expression=B04 = float(B04_u)"),
+        ]
+        relocate_vrt_files(process_list, "/tmp/job")
+        link_cropped_import_process_list(process_list, "S2A", "S2A_fp")
+        self.assertEqual(
+            commands(process_list)[:2],
+            [
+                "gdal_translate -of vrt /cache/B04.jp2 /tmp/job/B04.jp2.vrt",
+                "r.external input=/tmp/job/B04.jp2.vrt output=B04",
+            ],
+        )
+
+    def test_mask_r_mapcalc_process_list(self):
+        process_list = [
+            create_process(
+                "r.mapcalc",
+                "expression=ndvi = (float(B08) - float(B04))/"
+                "(float(B08) + float(B04))",
+            ),
+            create_process("r.colors", "color=ndvi", "map=ndvi"),
+        ]
+        mask_r_mapcalc_process_list(process_list, "S2A_fp")
+        self.assertEqual(
+            commands(process_list),
+            [
+                "r.mapcalc expression=ndvi = if(isnull(S2A_fp), null(), "
+                "(float(B08) - float(B04))/(float(B08) + float(B04)))",
+                "r.colors color=ndvi map=ndvi",
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
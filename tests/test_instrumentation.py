@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Test the per-stage instrumentation of the satellite processing
+"""
+
+import pickle
+import subprocess
+import unittest
+import pytest
+from actinia_satellite_plugin.instrumentation import (
+    StageInstrumentationMixin,
+    get_resource_usage,
+)
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Soeren Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+class ProcessingBase(object):
+    def __init__(self):
+        self.documents = []
+
+    def _send_to_database(self, document, final=False):
+        self.documents.append((pickle.loads(document), final))
+
+
+class Processing(StageInstrumentationMixin, ProcessingBase):
+    pass
+
+
+@pytest.mark.unittest
+class StageInstrumentationTestCase(unittest.TestCase):
+    def test_resource_usage(self):
+        usage = get_resource_usage()
+        for key in [
+            "wall_time",
+            "cpu_time",
+            "bytes_read",
+            "bytes_written",
+            "peak_rss",
+        ]:
+            self.assertGreaterEqual(usage[key], 0)
+        self.assertGreater(usage["peak_rss"], 0)
+
+    def test_stages(self):
+        processing = Processing()
+        for _ in range(2):
+            with processing._stage("import"):
+                # A child process like a GRASS module
+                subprocess.run(
+                    ["python3", "-c", "sum(range(100000))"], check=True
+                )
+        with self.assertRaises(ValueError):
+            with processing._stage("index"):
+                raise ValueError()
+
+        self.assertEqual(
+            [stage["stage"] for stage in processing.stages],
+            ["import", "index"],
+        )
+        stage = processing.stages[0]
+        self.assertEqual(stage["count"], 2)
+        self.assertGreater(stage["wall_time"], 0)
+        self.assertGreater(stage["cpu_time"], 0)
+        self.assertGreater(stage["peak_rss"], 0)
+
+    def test_response_document(self):
+        processing = Processing()
+        processing._send_to_database(pickle.dumps([200, {"status": "x"}]))
+        self.assertNotIn("stages", processing.documents[0][0][1])
+
+        with processing._stage("download"):
+            pass
+        processing._send_to_database(
+            pickle.dumps([200, {"status": "finished"}]), final=True
+        )
+        (http_code, response_model), final = processing.documents[1]
+        self.assertEqual(http_code, 200)
+        self.assertTrue(final)
+        self.assertEqual(response_model["stages"][0]["stage"], "download")
+
+
+if __name__ == "__main__":
+    unittest.main()
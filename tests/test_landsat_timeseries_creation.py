@@ -167,6 +167,31 @@ class AsyncLandsatTimeSeriesCreationTestCaseAdmin(ActiniaResourceTestCaseBase):
             message_check="AsyncProcessError:",
         )
 
+    def test_missing_scene_ids(self):
+        """A request without a list of scene ids is rejected"""
+        for request_data in [
+            {"strds": "Landsat_4", "atcor_method": "TOAR"},
+            {
+                "strds": "Landsat_4",
+                "atcor_method": "TOAR",
+                "scene_ids": "LT41970251990147XXX03",
+            },
+        ]:
+            rv = self.server.post(
+                (f"{URL_PREFIX}/{self.project_url_part}/"
+                 f"LL/mapsets/A/landsat_import"),
+                headers=self.admin_auth_header,
+                data=json_dump(request_data),
+                content_type="application/json",
+            )
+            pprint(json_load(rv.data))
+            self.assertEqual(
+                rv.status_code,
+                400,
+                "HTML status code is wrong %i" % rv.status_code,
+            )
+            self.assertEqual(json_load(rv.data)["status"], "error")
+
     def test_1_error_mapset_exists(self):
         """PERMANENT mapset exists. hence an error message is expected"""
         rv = self.server.post(
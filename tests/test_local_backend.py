@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Test the local stand-in backends of the satellite archives
+"""
+
+import threading
+import requests
+import pytest
+from actinia_satellite_plugin.config import satellite_config
+from actinia_satellite_plugin.local_backend import (
+    LocalAWSSentinel2Interface,
+    LocalSatelliteCatalog,
+    create_object_server,
+    get_landsat_file_url,
+)
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Soeren Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+LC08 = "LC08_L1TP_044034_20160915_20170221_01_T1"
+PRODUCT_ID = "S2A_MSIL1C_20170212T104141_N0204_R008_T31TGJ_20170212T104138"
+BOUNDS = (41.5, 41.2, 24.7, 24.6)
+
+
+@pytest.mark.unittest
+def test_catalog_query(tmp_path):
+    catalog = LocalSatelliteCatalog(
+        path=str(tmp_path / "catalog.sqlite"),
+        object_store_url="http://127.0.0.1:8090",
+    )
+    catalog.add_landsat_scene(LC08, "2016-09-15T18:46:18.6867380Z", BOUNDS)
+    catalog.add_sentinel2_scene(
+        PRODUCT_ID, "2017-02-12T10:41:38.000000Z", BOUNDS, cloud_cover=50
+    )
+
+    result = catalog.query_landsat_archive(
+        "2016-09-01T00:00:00", "2016-10-01T00:00:00", lat=41.3, lon=24.65
+    )
+    assert [entry["scene_id"] for entry in result] == [LC08]
+    assert catalog.query_landsat_archive(
+        "2016-10-01T00:00:00", "2016-11-01T00:00:00"
+    ) == []
+    assert catalog.query_sentinel2_archive(
+        None, None, scene_id=PRODUCT_ID
+    )[0]["cloud_cover"] == 50
+    assert catalog.query_sentinel2_archive(None, None, cloud_cover=10) == []
+
+    urls = catalog.get_landsat_urls([LC08], ["B4", "MTL"])
+    assert urls[LC08]["B4"]["map"] == LC08 + ".4"
+    assert urls[LC08]["MTL"]["public_url"].startswith(
+        "http://127.0.0.1:8090/gcp-public-data-landsat/LC08/01/044/034/"
+    )
+
+    urls = catalog.get_sentinel_urls([PRODUCT_ID], ["B04"])
+    assert urls[PRODUCT_ID]["B04"]["tile"] == "T31TGJ_20170212T104141_B04.jp2"
+    assert urls[PRODUCT_ID]["B04"]["public_url"].startswith(
+        "http://127.0.0.1:8090/gcp-public-data-sentinel-2/tiles/31/T/GJ/"
+    )
+    assert urls[PRODUCT_ID]["bbox"] == (24.6, 41.5, 24.7, 41.2)
+    assert "24.6,41.5 24.7,41.5" in urls[PRODUCT_ID]["gml_footprint"]
+    with pytest.raises(Exception):
+        catalog.get_sentinel_urls([PRODUCT_ID], ["B99"])
+
+    aws = LocalAWSSentinel2Interface(
+        path=catalog.path, object_store_url=catalog.object_store_url
+    )
+    tile = aws.get_sentinel_urls([PRODUCT_ID], ["B08"])[0]["tiles"][0]
+    assert tile["B08"]["public_url"].endswith("_B08.jp2")
+
+
+@pytest.mark.unittest
+def test_landsat_file_url(monkeypatch):
+    url = get_landsat_file_url(LC08, "_B4.TIF")
+    assert url.startswith("https://storage.googleapis.com/")
+
+    monkeypatch.setattr(satellite_config, "BACKEND", "local")
+    monkeypatch.setattr(
+        satellite_config, "LOCAL_OBJECT_STORE_URL", "http://localhost:9000/"
+    )
+    assert get_landsat_file_url(LC08, "_B4.TIF") == url.replace(
+        "https://storage.googleapis.com", "http://localhost:9000"
+    )
+
+
+@pytest.mark.unittest
+def test_object_server(tmp_path):
+    path = tmp_path / "gcp-public-data-landsat" / "B4.TIF"
+    path.parent.mkdir()
+    path.write_bytes(b"II*\x00" + bytes(60))
+    server = create_object_server(str(tmp_path))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = "http://127.0.0.1:%i/gcp-public-data-landsat/B4.TIF" % (
+        server.server_address[1]
+    )
+    try:
+        response = requests.get(url, headers={"Range": "bytes=0-3"})
+        assert response.status_code == 206
+        assert response.headers["Content-Range"] == "bytes 0-3/64"
+        assert response.content == b"II*\x00"
+        assert len(requests.get(url).content) == 64
+
+        response = requests.get(url, headers={"Range": "bytes=64-"})
+        assert response.status_code == 416
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Test the zero-copy merge of mapsets
+"""
+
+import errno
+import os
+import tempfile
+import unittest
+from unittest import mock
+import pytest
+from actinia_satellite_plugin.mapset_merge import (
+    MapsetMoveMixin,
+    is_same_file_system,
+    move_directory_content,
+)
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Soeren Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+def write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def read_file(path):
+    with open(path, "r") as f:
+        return f.read()
+
+
+def raise_exdev(*args):
+    raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+
+
+class PersistentProcessing(object):
+    """The mapset copy of the persistent processing"""
+
+    def _copy_merge_tmp_mapset_to_target_mapset(self):
+        self.copied = True
+
+
+class MapsetMove(MapsetMoveMixin, PersistentProcessing):
+    def __init__(self, tmp_dir):
+        self.temp_mapset_path = os.path.join(tmp_dir, "tmp", "mapset")
+        self.user_project_path = os.path.join(tmp_dir, "user", "project")
+        self.target_mapset_name = "target"
+        self.temp_mapset_name = "mapset"
+        self.project_name = "project"
+        self.target_mapset_exists = False
+        self.target_mapset_lock_set = True
+        self.target_mapset_lock_id = "target_lock"
+        self.temp_mapset_lock_set = False
+        self.temp_mapset_lock_id = "temp_lock"
+        self.lock_interface = mock.Mock()
+        self.lock_interface.extend.return_value = 1
+        self.message_logger = mock.Mock()
+        self.copied = False
+
+    def _send_resource_update(self, message):
+        pass
+
+
+@pytest.mark.unittest
+class MapsetMergeTestCase(unittest.TestCase):
+    def test_same_file_system(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.assertTrue(
+                is_same_file_system(
+                    tmp_dir, os.path.join(tmp_dir, "missing", "mapset")
+                )
+            )
+
+    def test_move_directory_content(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source = os.path.join(tmp_dir, "source")
+            target = os.path.join(tmp_dir, "target")
+            write_file(os.path.join(source, "cell", "new_map"), "new")
+            write_file(
+                os.path.join(source, "cell_misc", "new_map", "range"), "1 2"
+            )
+            write_file(os.path.join(source, "tgis", "sqlite.db"), "updated")
+            write_file(os.path.join(target, "cell", "old_map"), "old")
+            write_file(os.path.join(target, "tgis", "sqlite.db"), "outdated")
+
+            source_inode = os.stat(
+                os.path.join(source, "cell", "new_map")
+            ).st_ino
+            move_directory_content(source, target)
+
+            # The files are renamed, not copied
+            self.assertEqual(
+                os.stat(os.path.join(target, "cell", "new_map")).st_ino,
+                source_inode,
+            )
+            self.assertEqual(
+                read_file(os.path.join(target, "cell", "old_map")), "old"
+            )
+            self.assertEqual(
+                read_file(os.path.join(target, "tgis", "sqlite.db")),
+                "updated",
+            )
+            self.assertEqual(
+                read_file(
+                    os.path.join(target, "cell_misc", "new_map", "range")
+                ),
+                "1 2",
+            )
+            self.assertEqual(os.listdir(source), [])
+
+    def test_move_directory_content_across_devices(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source = os.path.join(tmp_dir, "source")
+            target = os.path.join(tmp_dir, "target")
+            write_file(os.path.join(source, "cell", "new_map"), "new")
+            write_file(
+                os.path.join(source, "cell_misc", "new_map", "range"), "1 2"
+            )
+            write_file(os.path.join(source, "tgis", "sqlite.db"), "updated")
+            write_file(os.path.join(target, "tgis", "sqlite.db"), "outdated")
+
+            with mock.patch("os.replace", side_effect=raise_exdev):
+                move_directory_content(source, target)
+
+            self.assertEqual(
+                read_file(os.path.join(target, "cell", "new_map")), "new"
+            )
+            self.assertEqual(
+                read_file(
+                    os.path.join(target, "cell_misc", "new_map", "range")
+                ),
+                "1 2",
+            )
+            self.assertEqual(
+                read_file(os.path.join(target, "tgis", "sqlite.db")),
+                "updated",
+            )
+            self.assertEqual(os.listdir(source), [])
+
+    def test_move_mapset(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            processing = MapsetMove(tmp_dir)
+            write_file(
+                os.path.join(processing.temp_mapset_path, "cell", "map"), "1"
+            )
+            os.makedirs(processing.user_project_path)
+
+            processing._copy_merge_tmp_mapset_to_target_mapset()
+            self.assertFalse(processing.copied)
+            self.assertEqual(
+                read_file(
+                    os.path.join(
+                        processing.user_project_path, "target", "cell", "map"
+                    )
+                ),
+                "1",
+            )
+            processing.lock_interface.extend.assert_called_once_with(
+                resource_id="target_lock", expiration=3600
+            )
+
+    def test_move_mapset_falls_back_to_copy(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            processing = MapsetMove(tmp_dir)
+            os.makedirs(processing.temp_mapset_path)
+            os.makedirs(processing.user_project_path)
+
+            with mock.patch("os.rename", side_effect=raise_exdev):
+                processing._copy_merge_tmp_mapset_to_target_mapset()
+            self.assertTrue(processing.copied)
+            self.assertTrue(os.path.isdir(processing.temp_mapset_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Test the Prometheus-style metrics
+"""
+
+import json
+import os
+import unittest
+import tempfile
+import pytest
+from actinia_satellite_plugin.metrics import (
+    MetricsRegistry,
+    read_metrics,
+    render_prometheus,
+)
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Soeren Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+@pytest.mark.unittest
+class MetricsTestCase(unittest.TestCase):
+    def test_render(self):
+        registry = MetricsRegistry()
+        registry.inc("jobs_total", help="The jobs", processor="Landsat")
+        registry.inc("jobs_total", 2, processor="Landsat")
+        registry.set_max("rss_bytes", 10)
+        registry.set_max("rss_bytes", 5)
+        registry.observe("seconds", 0.7, buckets=(0.5, 1), stage="import")
+        registry.observe("seconds", 3, buckets=(0.5, 1), stage="import")
+
+        text = render_prometheus(registry)
+        self.assertIn("# HELP jobs_total The jobs\n", text)
+        self.assertIn("# TYPE jobs_total counter\n", text)
+        self.assertIn('jobs_total{processor="Landsat"} 3\n', text)
+        self.assertIn("rss_bytes 10\n", text)
+        self.assertIn('seconds_bucket{stage="import",le="0.5"} 0\n', text)
+        self.assertIn('seconds_bucket{stage="import",le="1"} 1\n', text)
+        self.assertIn('seconds_bucket{stage="import",le="+Inf"} 2\n', text)
+        self.assertIn('seconds_sum{stage="import"} 3.7\n', text)
+        self.assertIn('seconds_count{stage="import"} 2\n', text)
+
+    def test_merge_processes(self):
+        with tempfile.TemporaryDirectory() as path:
+            registry = MetricsRegistry(path)
+            registry.inc("jobs_total", 2)
+            registry.observe("seconds", 2, buckets=(1, 5))
+            registry.flush()
+
+            # A second process adds its metrics to the same file
+            other = MetricsRegistry(path)
+            other.inc("jobs_total", 3)
+            other.observe("seconds", 4, buckets=(1, 5))
+            other.flush()
+
+            merged = read_metrics(path)
+            text = render_prometheus(merged)
+            self.assertIn("jobs_total 5\n", text)
+            self.assertIn('seconds_bucket{le="5"} 2\n', text)
+            self.assertIn("seconds_sum 6\n", text)
+            self.assertEqual(os.listdir(path), ["metrics.json"])
+
+    def test_repeated_flush(self):
+        with tempfile.TemporaryDirectory() as path:
+            registry = MetricsRegistry(path)
+            registry.set_max("rss_bytes", 10)
+            # A work horse flushes at the end of each job
+            for _ in range(3):
+                registry.inc("jobs_total", 2)
+                registry.flush()
+            registry.flush()
+            text = render_prometheus(read_metrics(path))
+            self.assertIn("jobs_total 6\n", text)
+            self.assertIn("rss_bytes 10\n", text)
+            self.assertEqual(os.listdir(path), ["metrics.json"])
+
+    def test_process_files(self):
+        with tempfile.TemporaryDirectory() as path:
+            # The process files of an earlier version
+            old = MetricsRegistry()
+            old.inc("jobs_total", 4)
+            for pid in [os.getpid(), 2 ** 22 + 1]:
+                with open(
+                    os.path.join(path, "metrics_%i.json" % pid), "w"
+                ) as f:
+                    json.dump(old.snapshot(), f)
+
+            registry = MetricsRegistry(path)
+            registry.inc("jobs_total", 1)
+            registry.flush()
+
+            # The file of the process that is not running is merged and
+            # removed, the file of the running process is kept
+            self.assertEqual(
+                sorted(os.listdir(path)),
+                ["metrics.json", "metrics_%i.json" % os.getpid()],
+            )
+            text = render_prometheus(read_metrics(path))
+            self.assertIn("jobs_total 9\n", text)
+
+    def test_flush_interval(self):
+        with tempfile.TemporaryDirectory() as path:
+            registry = MetricsRegistry(path)
+            registry.inc("jobs_total")
+            registry.flush(interval=3600)
+            self.assertEqual(len(os.listdir(path)), 1)
+            registry.inc("jobs_total")
+            registry.flush(interval=3600)
+            text = render_prometheus(read_metrics(path))
+            self.assertIn("jobs_total 1\n", text)
+
+    def test_disabled(self):
+        registry = MetricsRegistry()
+        registry.inc("jobs_total")
+        registry.flush()
+        snapshot = read_metrics("/nonexistent").snapshot()
+        self.assertEqual(snapshot["counters"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
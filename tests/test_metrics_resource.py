@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Test the metrics endpoint and the request instrumentation
+"""
+
+import unittest
+import tempfile
+import pytest
+from flask import Flask, make_response
+from flask_restful import Api, Resource
+from actinia_satellite_plugin.config import satellite_config
+from actinia_satellite_plugin.metrics import lookup_timer, metrics
+from actinia_satellite_plugin.metrics_resource import (
+    PROMETHEUS_CONTENT_TYPE,
+    SatelliteMetricsResource,
+    instrument_resource,
+)
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Soeren Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+class SceneResource(Resource):
+    def get(self, code):
+        return make_response("scene", code)
+
+
+def get_request_count(resource, code):
+    for name, labels, histogram in metrics.snapshot()["histograms"]:
+        if name == "actinia_satellite_request_seconds" and labels == {
+            "resource": resource,
+            "code": str(code),
+        }:
+            return histogram["count"]
+    return 0
+
+
+@pytest.mark.unittest
+class MetricsResourceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.metrics_dir = tempfile.TemporaryDirectory()
+        self.metrics_path = satellite_config.METRICS_PATH
+        satellite_config.METRICS_PATH = self.metrics_dir.name
+        metrics.path = self.metrics_dir.name
+
+    def tearDown(self):
+        satellite_config.METRICS_PATH = self.metrics_path
+        metrics.path = self.metrics_path
+        self.metrics_dir.cleanup()
+
+    def test_request_latency(self):
+        app = Flask(__name__)
+        api = Api(app)
+        resource_class = instrument_resource(SceneResource)
+        # Instrumenting a resource twice adds a single measurement
+        self.assertEqual(len(instrument_resource(SceneResource).decorators), 1)
+        api.add_resource(resource_class, "/scene/<int:code>")
+
+        client = app.test_client()
+        ok = get_request_count("SceneResource", 200)
+        error = get_request_count("SceneResource", 400)
+        self.assertEqual(client.get("/scene/200").status_code, 200)
+        self.assertEqual(client.get("/scene/200").status_code, 200)
+        self.assertEqual(client.get("/scene/400").status_code, 400)
+        self.assertEqual(get_request_count("SceneResource", 200), ok + 2)
+        self.assertEqual(get_request_count("SceneResource", 400), error + 1)
+
+    def test_metrics_response(self):
+        with lookup_timer("bigquery", "get_sentinel_urls"):
+            pass
+
+        app = Flask(__name__)
+        with app.test_request_context("/satellite_metrics"):
+            response = SatelliteMetricsResource().get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.headers["Content-Type"], PROMETHEUS_CONTENT_TYPE
+        )
+        text = response.get_data(as_text=True)
+        self.assertIn(
+            "# TYPE actinia_satellite_lookup_seconds histogram", text
+        )
+        self.assertIn(
+            'actinia_satellite_lookup_seconds_count{operation="'
+            'get_sentinel_urls",service="bigquery"}',
+            text,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
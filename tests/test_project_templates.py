@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Test the GRASS project templates
+"""
+
+import os
+import tempfile
+import unittest
+import pytest
+from actinia_satellite_plugin.project_templates import (
+    ProjectTemplates,
+    landsat_mtl_epsg,
+    sentinel2_product_epsg,
+)
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Soeren Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+MTL = """GROUP = L1_METADATA_FILE
+  GROUP = PROJECTION_PARAMETERS
+    MAP_PROJECTION = "UTM"
+    DATUM = "WGS84"
+    ELLIPSOID = "WGS84"
+    UTM_ZONE = 10
+  END_GROUP = PROJECTION_PARAMETERS
+END_GROUP = L1_METADATA_FILE
+"""
+
+
+def create_project(path):
+    os.makedirs(os.path.join(path, "PERMANENT"))
+    for name in ["WIND", "DEFAULT_WIND", "PROJ_INFO", "PROJ_UNITS"]:
+        with open(os.path.join(path, "PERMANENT", name), "w") as f:
+            f.write(name)
+
+
+@pytest.mark.unittest
+class ProjectTemplatesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.template_path = os.path.join(self.tmp_dir.name, "templates")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_sentinel2_product_epsg(self):
+        self.assertEqual(
+            sentinel2_product_epsg(
+                "S2A_MSIL1C_20170212T104141_N0204_R008_T31TGJ_"
+                "20170212T104138"
+            ),
+            32631,
+        )
+        self.assertEqual(
+            sentinel2_product_epsg(
+                "S2B_MSIL1C_20180101T074259_N0206_R049_T35JPM_"
+                "20180101T105331"
+            ),
+            32735,
+        )
+        self.assertIsNone(sentinel2_product_epsg("S2A_invalid"))
+
+    def test_landsat_mtl_epsg(self):
+        mtl_file = os.path.join(self.tmp_dir.name, "scene_MTL.txt")
+        with open(mtl_file, "w") as f:
+            f.write(MTL)
+        self.assertEqual(landsat_mtl_epsg(mtl_file), 32610)
+        self.assertIsNone(landsat_mtl_epsg(mtl_file + ".missing"))
+
+    def test_template_cache(self):
+        templates = ProjectTemplates(self.template_path)
+        self.assertFalse(templates.has_template(32632))
+
+        p, project_path = templates.get_create_template_process(
+            "/usr/local/bin/grass", 32632
+        )
+        self.assertIn("EPSG:32632", p.executable_params)
+        self.assertEqual(p.executable_params[-1], project_path)
+
+        create_project(project_path)
+        templates.add_template(32632, project_path)
+        self.assertTrue(templates.has_template(32632))
+        self.assertFalse(os.path.exists(project_path))
+
+        # A concurrently created template is discarded
+        _, second_path = templates.get_create_template_process(
+            "/usr/local/bin/grass", 32632
+        )
+        create_project(second_path)
+        templates.add_template(32632, second_path)
+        self.assertFalse(os.path.exists(second_path))
+
+        job_project = os.path.join(self.tmp_dir.name, "gisdbase", "sentinel2")
+        templates.copy_template(32632, job_project)
+        self.assertTrue(
+            os.path.isfile(os.path.join(job_project, "PERMANENT", "WIND"))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Test the windowed remote reads of band files
+"""
+
+import pytest
+import requests
+from actinia_core.core.common.process_object import Process
+from actinia_satellite_plugin.remote_read import (
+    filter_download_process_list,
+    replace_remote_inputs,
+    supports_range_requests,
+    to_vsicurl_path,
+)
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Soeren Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+@pytest.mark.unittest
+def test_range_requests_supported(range_http_server):
+    directory, url = range_http_server
+    (directory / "B04.TIF").write_bytes(bytes(range(256)) * 16)
+
+    assert supports_range_requests(url + "/B04.TIF") is True
+
+    response = requests.get(
+        url + "/B04.TIF", headers={"Range": "bytes=256-511"}
+    )
+    assert response.status_code == 206
+    assert response.content == bytes(range(256))
+
+
+@pytest.mark.unittest
+def test_range_requests_not_supported(plain_http_server):
+    directory, url = plain_http_server
+    (directory / "B04.TIF").write_bytes(b"0" * 1024)
+
+    assert supports_range_requests(url + "/B04.TIF") is False
+    assert supports_range_requests(url + "/missing.TIF") is False
+
+
+@pytest.mark.unittest
+def test_range_requests_unreachable():
+    assert supports_range_requests("http://127.0.0.1:1/B04.TIF", 1) is False
+
+
+@pytest.mark.unittest
+def test_vsicurl_path():
+    url = "https://storage.googleapis.com/bucket/B04.TIF"
+    assert to_vsicurl_path(url) == "/vsicurl/" + url
+    assert to_vsicurl_path(to_vsicurl_path(url)) == "/vsicurl/" + url
+
+
+@pytest.mark.unittest
+def test_filter_and_replace_process_lists():
+    url = "https://storage.googleapis.com/bucket/B04.TIF"
+    download_list = [
+        Process(
+            exec_type="exec",
+            executable="/usr/bin/wget",
+            executable_params=["-t5", "-c", "-q", "-O", "/tmp/B04.TIF", url],
+        ),
+        Process(
+            exec_type="exec",
+            executable="/bin/mv",
+            executable_params=["/tmp/B04.TIF", "/cache/B04.TIF"],
+        ),
+        Process(
+            exec_type="exec",
+            executable="/bin/mv",
+            executable_params=["/tmp/MTL.txt", "/cache/MTL.txt"],
+        ),
+    ]
+    download_list = filter_download_process_list(
+        download_list, [url, "/cache/B04.TIF"]
+    )
+    assert len(download_list) == 1
+    assert download_list[0].executable_params[1] == "/cache/MTL.txt"
+
+    import_list = [
+        Process(
+            exec_type="grass",
+            executable="r.import",
+            executable_params=["input=/cache/B04.TIF", "output=B04"],
+        ),
+        Process(
+            exec_type="exec",
+            executable="/usr/bin/gdal_translate",
+            executable_params=["/cache/B04.TIF", "/cache/B04.TIF.vrt"],
+        ),
+    ]
+    replace_remote_inputs(
+        import_list, {"/cache/B04.TIF": to_vsicurl_path(url)}
+    )
+    assert import_list[0].executable_params[0] == "input=/vsicurl/" + url
+    assert import_list[1].executable_params == [
+        "/vsicurl/" + url,
+        "/cache/B04.TIF.vrt",
+    ]
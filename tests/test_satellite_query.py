@@ -184,6 +184,32 @@ class GrassModuleTestCase(ActiniaResourceTestCaseBase):
         data = json_load(rv.data)
         self.assertTrue(len(data) >= 1)
 
+    def test_z_sentinel2_query_not_modified(self):
+        url = (
+            f"{URL_PREFIX}/sentinel2_query?start_time=2017-01-01T00:00:00&"
+            "end_time=2017-01-01T00:30:00"
+        )
+        rv = self.server.get(url, headers=self.user_auth_header)
+        self.assertEqual(rv.status_code, 200)
+        etag = rv.headers["ETag"]
+        self.assertIn("max-age", rv.headers["Cache-Control"])
+
+        headers = dict(self.user_auth_header)
+        headers["If-None-Match"] = etag
+        rv = self.server.get(url, headers=headers)
+        self.assertEqual(
+            rv.status_code,
+            304,
+            "HTML status code is wrong %i" % rv.status_code,
+        )
+        self.assertEqual(rv.headers["ETag"], etag)
+        self.assertEqual(rv.data, b"")
+
+        # Other parameters have another ETag
+        rv = self.server.get(url + "&cloud_cover=10", headers=headers)
+        self.assertEqual(rv.status_code, 200)
+        self.assertNotEqual(rv.headers["ETag"], etag)
+
 
 if __name__ == "__main__":
     unittest.main()
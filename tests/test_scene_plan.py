@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Test the planning of Landsat scenes
+"""
+
+import unittest
+import pytest
+from actinia_satellite_plugin.scene_plan import (
+    get_band_key,
+    group_scenes_by_sensor,
+    normalize_scene_ids,
+)
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Soeren Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+LC08_1 = "LC08_L1GT_001004_20130910_20170502_01_T2"
+LC08_2 = "LC08_L1TP_044034_20160915_20170221_01_T1"
+LE07_1 = "LE07_L1TP_044034_20160907_20161003_01_T1"
+
+
+@pytest.mark.unittest
+class ScenePlanTestCase(unittest.TestCase):
+    def test_normalize_scene_ids(self):
+        self.assertEqual(
+            normalize_scene_ids(
+                [LC08_1, " %s " % LC08_2, LC08_1.lower(), "", LC08_2]
+            ),
+            [LC08_1, LC08_2],
+        )
+
+    def test_group_scenes_by_sensor(self):
+        groups = group_scenes_by_sensor([LC08_1, LE07_1, LC08_2])
+        self.assertEqual(list(groups), ["LC08", "LE07"])
+        self.assertEqual(groups["LC08"], [LC08_1, LC08_2])
+        self.assertEqual(groups["LE07"], [LE07_1])
+
+        self.assertRaises(
+            ValueError, group_scenes_by_sensor, ["LM41130251983244HAJ00"]
+        )
+
+    def test_band_key(self):
+        self.assertEqual(get_band_key("LC08", "B1", False), "B1")
+        self.assertEqual(get_band_key("LC08", "B1", True), "LC08_B1")
+
+
+if __name__ == "__main__":
+    unittest.main()
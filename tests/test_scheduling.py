@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Test the fair scheduling of the satellite jobs
+"""
+
+import threading
+import time
+import pytest
+from actinia_satellite_plugin import scheduling
+from actinia_satellite_plugin.config import satellite_config
+from actinia_satellite_plugin.scheduling import (
+    BULK,
+    INTERACTIVE,
+    FairScheduler,
+    add_job,
+    create_state,
+    run_scheduled_job,
+    select_jobs,
+)
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Soeren Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+class MemoryKvdb(object):
+    """The KVDB commands that are used by the fair scheduler"""
+
+    def __init__(self):
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+    def lock(self, name, timeout=None):
+        return self._lock
+
+
+CALLS = []
+
+
+def start_job(rdc, *args):
+    CALLS.append((rdc.resource_id, args))
+
+
+class ResourceDataContainer(object):
+    class config(object):
+        KVDB_RESOURCE_EXPIRE_TIME = 3600
+
+    def __init__(self, user_id, resource_id):
+        self.user_id = user_id
+        self.resource_id = resource_id
+
+
+def create_job(job_class, user_id, index, timeout=3600):
+    return {
+        "job_id": "%s_%s_%i" % (job_class, user_id, index),
+        "job_class": job_class,
+        "user_id": user_id,
+        "timeout": timeout,
+        "submitted": 0,
+    }
+
+
+def job_ids(jobs):
+    return [job["job_id"] for job in jobs]
+
+
+@pytest.fixture
+def weights(monkeypatch):
+    monkeypatch.setattr(satellite_config, "SCHEDULER_RESERVED_SLOTS", 1)
+    monkeypatch.setattr(satellite_config, "SCHEDULER_INTERACTIVE_WEIGHT", 4)
+    monkeypatch.setattr(satellite_config, "SCHEDULER_BULK_WEIGHT", 1)
+
+
+@pytest.mark.unittest
+def test_users_share_the_slots(weights):
+    state = create_state()
+    for i in range(10):
+        add_job(state, create_job(BULK, "alice", i))
+    assert job_ids(select_jobs(state, 3, now=0)) == [
+        "bulk_alice_0",
+        "bulk_alice_1",
+    ]
+
+    # The job of the second user is selected before the jobs of the first
+    add_job(state, create_job(BULK, "bob", 0))
+    del state["running"]["bulk_alice_0"]
+    assert job_ids(select_jobs(state, 3, now=0)) == ["bulk_bob_0"]
+    del state["running"]["bulk_alice_1"]
+    assert job_ids(select_jobs(state, 3, now=0)) == ["bulk_alice_2"]
+
+
+@pytest.mark.unittest
+def test_reserved_slots_and_weights(weights):
+    state = create_state()
+    for i in range(20):
+        add_job(state, create_job(BULK, "alice", i))
+    select_jobs(state, 3, now=0)
+
+    # The reserved slot is free for an interactive job
+    add_job(state, create_job(INTERACTIVE, "bob", 0))
+    assert job_ids(select_jobs(state, 3, now=0)) == ["interactive_bob_0"]
+
+    # Both classes have waiting jobs: four interactive jobs per bulk job
+    for i in range(1, 20):
+        add_job(state, create_job(INTERACTIVE, "bob", i))
+    selected = []
+    for _ in range(10):
+        state["running"].clear()
+        selected.extend(select_jobs(state, 1, now=0))
+    classes = [job["job_class"] for job in selected]
+    assert classes.count(INTERACTIVE) == 8
+    assert classes.count(BULK) == 2
+
+
+@pytest.mark.unittest
+def test_timed_out_jobs_are_released(monkeypatch, weights):
+    monkeypatch.setattr(satellite_config, "SCHEDULER_START_TIMEOUT", 1000)
+    state = create_state()
+    jobs = [create_job(INTERACTIVE, "alice", i, timeout=10) for i in range(3)]
+    for job in jobs:
+        add_job(state, job)
+    assert job_ids(select_jobs(state, 1, now=0)) == ["interactive_alice_0"]
+
+    # The time in the job queue does not count for the job timeout
+    assert select_jobs(state, 1, now=500) == []
+    scheduling.start_job(state, jobs[0], now=500)
+    assert select_jobs(state, 1, now=505) == []
+    assert job_ids(select_jobs(state, 1, now=511)) == ["interactive_alice_1"]
+
+    # A job that does not start is released after the start timeout
+    assert select_jobs(state, 1, now=1500) == []
+    assert job_ids(select_jobs(state, 1, now=1512)) == ["interactive_alice_2"]
+
+    # A released job occupies its slot again when it starts
+    scheduling.start_job(state, jobs[1], now=1520)
+    assert state["running"]["interactive_alice_1"]["deadline"] == 1530
+
+
+@pytest.mark.unittest
+def test_fair_scheduler(monkeypatch, weights):
+    enqueued = []
+    monkeypatch.setattr(
+        scheduling,
+        "enqueue_job",
+        lambda timeout, func, *args: enqueued.append((func, args)),
+    )
+    kvdb_server = MemoryKvdb()
+    monkeypatch.setattr(
+        scheduling, "get_kvdb_server", lambda config: kvdb_server
+    )
+    monkeypatch.setattr(satellite_config, "SCHEDULER_SLOTS", 2)
+    scheduler = FairScheduler(kvdb_server)
+    del CALLS[:]
+
+    for i in range(3):
+        rdc = ResourceDataContainer("alice", "resource_id-%i" % i)
+        scheduler.submit(BULK, 60, start_job, rdc, "parent")
+    assert len(enqueued) == 1
+
+    rdc = ResourceDataContainer("bob", "resource_id-3")
+    scheduler.submit(INTERACTIVE, 60, start_job, rdc)
+    assert len(enqueued) == 2
+
+    # The worker runs the job and passes the next job of the queue
+    func, args = enqueued[0]
+    assert func is run_scheduled_job
+    func(*args)
+    assert CALLS == [("resource_id-0", ("parent",))]
+    assert len(enqueued) == 3
+    assert enqueued[2][1][0].resource_id == "resource_id-1"
+    assert scheduling.SCHEDULER_JOB_PREFIX + "resource_id-1" not in (
+        kvdb_server.values
+    )
+
+
+@pytest.mark.unittest
+def test_sweep_without_submissions(monkeypatch, weights):
+    enqueued = []
+    monkeypatch.setattr(
+        scheduling,
+        "enqueue_job",
+        lambda timeout, func, *args: enqueued.append((func, args)),
+    )
+    kvdb_server = MemoryKvdb()
+    monkeypatch.setattr(satellite_config, "SCHEDULER_SLOTS", 1)
+    monkeypatch.setattr(satellite_config, "SCHEDULER_SWEEP_INTERVAL", 0.01)
+    scheduler = FairScheduler(kvdb_server)
+    for i in range(2):
+        rdc = ResourceDataContainer("alice", "resource_id-%i" % i)
+        scheduler.submit(BULK, 0.05, start_job, rdc)
+    assert len(enqueued) == 1
+
+    # The worker of the first job is killed after the start
+    func, args = enqueued[0]
+    scheduler.start(args[2])
+
+    # The sweeper passes the next job after the job timeout
+    stop = threading.Event()
+    thread = scheduling.start_sweeper(kvdb_server, stop)
+    try:
+        deadline = time.time() + 5
+        while len(enqueued) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        stop.set()
+        thread.join()
+    assert len(enqueued) == 2
+    assert enqueued[1][1][0].resource_id == "resource_id-1"
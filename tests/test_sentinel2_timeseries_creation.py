@@ -292,6 +292,27 @@ class AsyncSentielTimeSeriesCreationTestCaseAdmin(ActiniaResourceTestCaseBase):
             message_check="AsyncProcessError:",
         )
 
+    def test_error_no_json_object(self):
+        """A request body that is not a JSON object is rejected"""
+        for data, content_type in [
+            ("no json", "text/plain"),
+            (json_dump(["S2A_MSIL1C_20170212T104141_N0204_R008"]),
+             "application/json"),
+        ]:
+            rv = self.server.post(
+                (f"{URL_PREFIX}/{self.project_url_part}/"
+                 "LL/mapsets/A/sentinel2_import"),
+                headers=self.admin_auth_header,
+                data=data,
+                content_type=content_type,
+            )
+            pprint(json_load(rv.data))
+            self.assertEqual(
+                rv.status_code,
+                400,
+                "HTML status code is wrong %i" % rv.status_code,
+            )
+
     def test_2_error_wrong_product_ids(self):
         """Check for all wrong product ids
 
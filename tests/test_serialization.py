@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Test the JSON serialization and compression of the responses
+"""
+
+import datetime
+import gzip
+import json
+import pytest
+from flask import Flask
+from actinia_satellite_plugin.config import satellite_config
+from actinia_satellite_plugin.serialization import (
+    SERIALIZERS,
+    choose_encoding,
+    dumps,
+    get_accepted_encodings,
+    make_json_response,
+)
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Soeren Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+SCENES = [
+    {
+        "scene_id": "LC80440342016259LGN00_%i" % i,
+        "sensing_time": "2016-09-15T18:46:18.6867380Z",
+        "cloud_cover": 10.5,
+        "north": 41.5,
+        "south": 41.2,
+        "east": 24.7,
+        "west": 24.6,
+    }
+    for i in range(100)
+]
+
+
+@pytest.mark.unittest
+@pytest.mark.parametrize("name", sorted(SERIALIZERS))
+def test_serializers(name):
+    data = {
+        "scenes": SCENES,
+        "time": datetime.datetime(2018, 5, 30, 11, 16, 3),
+        "bands": ("B04", "B08"),
+        "big": 2 ** 70,
+    }
+    result = json.loads(dumps(data, name))
+    assert result["scenes"] == SCENES
+    assert result["time"] == "2018-05-30T11:16:03"
+    assert result["bands"] == ["B04", "B08"]
+    assert result["big"] == 2 ** 70
+    with pytest.raises(ValueError):
+        dumps(data, "unknown")
+
+
+@pytest.mark.unittest
+def test_encoding_negotiation():
+    assert get_accepted_encodings("gzip, br;q=0.5, *;q=0") == {
+        "gzip": 1.0,
+        "br": 0.5,
+        "*": 0.0,
+    }
+    assert choose_encoding("gzip;q=0.8, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0") is None
+    assert choose_encoding("identity") is None
+    assert choose_encoding("*") is not None
+    assert choose_encoding(None) is None
+
+
+@pytest.mark.unittest
+def test_json_response(monkeypatch):
+    monkeypatch.setattr(satellite_config, "RESPONSE_COMPRESSION", True)
+    monkeypatch.setattr(
+        satellite_config, "RESPONSE_COMPRESSION_MIN_SIZE", 1024
+    )
+    app = Flask(__name__)
+
+    with app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+        response = make_json_response(SCENES, 200)
+        assert response.status_code == 200
+        assert response.mimetype == "application/json"
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert json.loads(gzip.decompress(response.get_data())) == SCENES
+
+        # Small responses are not compressed
+        response = make_json_response({"status": "error"}, 400)
+        assert response.status_code == 400
+        assert "Content-Encoding" not in response.headers
+        assert response.get_json() == {"status": "error"}
+
+    with app.test_request_context():
+        response = make_json_response(SCENES)
+        assert "Content-Encoding" not in response.headers
+        assert response.get_json() == SCENES
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Test the sharded time series creation
+"""
+
+import multiprocessing
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+import pytest
+from actinia_satellite_plugin import sharding
+from actinia_satellite_plugin.sharding import (
+    ShardCoordinator,
+    check_shard_options,
+    enqueue_shard_jobs,
+    fail_expired_shard_jobs,
+    get_shard_mapset_name,
+    get_shard_state_path,
+    run_shard_job,
+    split_into_shards,
+)
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Soeren Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+def report_shard(args):
+    state_path, index = args
+    coordinator = ShardCoordinator(state_path)
+    return coordinator.report(
+        index, results={"B1": [["map_%i" % index, "start", "end"]]}
+    )
+
+
+def start_job(rdc):
+    pass
+
+
+def start_shard_job(shard_rdc, parent_rdc, job_timeout):
+    pass
+
+
+class Configuration(object):
+    def __init__(self, download_cache):
+        self.DOWNLOAD_CACHE = download_cache
+
+
+class ResourceDataContainer(object):
+    def __init__(self, download_cache, request_data):
+        self.config = Configuration(download_cache)
+        self.user_id = "user"
+        self.user_group = "group"
+        self.resource_id = "resource_id-1"
+        self.project_name = "project"
+        self.mapset_name = "landsat"
+        self.request_data = request_data
+
+    def set_request_data(self, request_data):
+        self.request_data = request_data
+
+
+class ShardProcessing(object):
+    """Run a shard of a time series import"""
+
+    def __init__(self, rdc):
+        self.rdc = rdc
+        self.run_state = {}
+        self.module_results = None
+
+    def run(self):
+        if self.rdc.request_data.get("timeout") is True:
+            raise Exception("Task exceeded maximum timeout value")
+        self.module_results = {"B1": [["map", "start", "end"]]}
+        self.run_state = {"success": "finished"}
+
+
+@pytest.mark.unittest
+class ShardingTestCase(unittest.TestCase):
+    def test_split_into_shards(self):
+        scene_ids = ["scene_%i" % i for i in range(10)]
+        shards = split_into_shards(scene_ids, 3)
+        self.assertEqual([len(shard) for shard in shards], [4, 3, 3])
+        self.assertEqual(sum(shards, []), scene_ids)
+        # Never more shards than scenes
+        self.assertEqual(len(split_into_shards(scene_ids[:2], 5)), 2)
+        self.assertEqual(
+            get_shard_mapset_name("landsat", 1), "landsat_shard_1"
+        )
+
+    def test_check_shard_options(self):
+        self.assertIsNone(check_shard_options({}))
+        self.assertIsNotNone(check_shard_options(["scene_1"]))
+        self.assertIsNotNone(check_shard_options(None))
+        self.assertIsNone(check_shard_options({"shards": 4}))
+        self.assertIsNotNone(check_shard_options({"shards": 0}))
+        self.assertIsNotNone(check_shard_options({"shards": "4"}))
+        self.assertIsNotNone(
+            check_shard_options({"shards": 2, "append": True})
+        )
+
+    def test_coordinator(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            state_path = os.path.join(tmp_dir, "shards", "resource_id-1")
+            coordinator = ShardCoordinator(state_path)
+            coordinator.start(8, time.time() + 60, (start_job, 60, None))
+
+            # The shard jobs report concurrently from worker processes,
+            # exactly one of them must start the merge
+            with multiprocessing.Pool(4) as pool:
+                merge = pool.map(
+                    report_shard, [(state_path, i) for i in range(8)]
+                )
+            self.assertEqual(merge.count(True), 1)
+
+            reports = coordinator.get_reports()
+            self.assertEqual([r["index"] for r in reports], list(range(8)))
+            self.assertEqual(reports[2]["results"]["B1"][0][0], "map_2")
+            self.assertIsNone(reports[2]["error"])
+
+            coordinator.remove()
+            self.assertFalse(os.path.exists(state_path))
+
+
+@pytest.mark.unittest
+class ShardJobsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.rdc = ResourceDataContainer(
+            self.tmp_dir.name, {"scene_ids": ["a", "b", "c"], "shards": 3}
+        )
+        self.scheduled = []
+        self.lock_interface = mock.Mock()
+        self.lock_interface.lock.return_value = 1
+        patches = [
+            mock.patch.object(
+                sharding,
+                "schedule_job",
+                lambda *args: self.scheduled.append(args),
+            ),
+            mock.patch.object(
+                sharding,
+                "get_lock_interface",
+                return_value=self.lock_interface,
+            ),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def run_shard(self, index, timeout=False):
+        job_class, job_timeout, func, shard_rdc, parent_rdc, _ = (
+            self.scheduled[index]
+        )
+        shard_rdc.request_data["timeout"] = timeout
+        run_shard_job(ShardProcessing, shard_rdc, parent_rdc, job_timeout)
+
+    def test_enqueue_shard_jobs(self):
+        error = enqueue_shard_jobs(
+            60, start_shard_job, start_job, self.rdc, "scene_ids"
+        )
+        self.assertIsNone(error)
+        # The target mapset is locked before the shards are enqueued
+        self.lock_interface.lock.assert_called_once_with(
+            resource_id="group/project/landsat", expiration=240
+        )
+        self.assertEqual(len(self.scheduled), 3)
+        shard_rdc = self.scheduled[1][3]
+        self.assertEqual(shard_rdc.mapset_name, "landsat_shard_1")
+        self.assertEqual(shard_rdc.request_data["scene_ids"], ["b"])
+
+    def test_locked_target_mapset(self):
+        self.lock_interface.lock.return_value = 0
+        error = enqueue_shard_jobs(
+            60, start_shard_job, start_job, self.rdc, "scene_ids"
+        )
+        self.assertIn("already locked", error)
+        self.assertEqual(self.scheduled, [])
+
+    def test_merge_job_is_enqueued(self):
+        enqueue_shard_jobs(
+            60, start_shard_job, start_job, self.rdc, "scene_ids"
+        )
+        self.run_shard(0)
+        # A shard that exceeds the job timeout reports its error
+        with self.assertRaises(Exception):
+            self.run_shard(1, timeout=True)
+        self.assertEqual(len(self.scheduled), 3)
+        self.run_shard(2)
+
+        # The merge runs as its own job with the parent data container
+        self.assertEqual(len(self.scheduled), 4)
+        job_class, job_timeout, func, rdc = self.scheduled[3]
+        self.assertEqual(job_timeout, 60)
+        self.assertIs(func, start_job)
+        self.assertEqual(rdc.resource_id, "resource_id-1")
+
+        reports = ShardCoordinator(get_shard_state_path(rdc)).get_reports()
+        self.assertIsNone(reports[0]["error"])
+        self.assertIn("maximum timeout", reports[1]["error"])
+
+    def test_expired_shard_jobs(self):
+        enqueue_shard_jobs(
+            60, start_shard_job, start_job, self.rdc, "scene_ids"
+        )
+        self.run_shard(0)
+        # The other shard jobs were killed and never report
+        fail_expired_shard_jobs(self.tmp_dir.name, now=time.time() + 100)
+        self.assertEqual(len(self.scheduled), 3)
+
+        fail_expired_shard_jobs(self.tmp_dir.name, now=time.time() + 200)
+        self.assertEqual(len(self.scheduled), 4)
+        self.assertIs(self.scheduled[3][2], start_job)
+        coordinator = ShardCoordinator(get_shard_state_path(self.rdc))
+        errors = [r["error"] for r in coordinator.get_reports()]
+        self.assertIsNone(errors[0])
+        self.assertIn("deadline", errors[1])
+        self.assertIn("deadline", errors[2])
+
+        # The merge job is enqueued only once
+        fail_expired_shard_jobs(self.tmp_dir.name, now=time.time() + 300)
+        self.run_shard(1)
+        self.assertEqual(len(self.scheduled), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
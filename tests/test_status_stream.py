@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Test the status versions and notifications of the satellite jobs
+"""
+
+import json
+import pickle
+import threading
+import time
+import pytest
+from actinia_satellite_plugin.status_stream import (
+    StatusNotificationMixin,
+    get_status_version,
+    publish_status_version,
+    wait_for_status_version,
+)
+from actinia_satellite_plugin.status_stream_resource import format_event
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Soeren Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+RESOURCE_ID = "resource_id-6282c634-42e1-417c-a092-c9b21c3283cc"
+
+
+class MemoryKvdb(object):
+    """The KVDB commands that are used by the status notifications"""
+
+    def __init__(self):
+        self.values = {}
+        self.expiration = {}
+        self.condition = threading.Condition()
+        self.messages = []
+
+    def pipeline(self):
+        kvdb = self
+
+        class Pipeline(object):
+            def __init__(self):
+                self.commands = []
+
+            def incr(self, key):
+                self.commands.append(lambda: kvdb.incr(key))
+
+            def expire(self, key, seconds):
+                self.commands.append(lambda: kvdb.expire(key, seconds))
+
+            def execute(self):
+                return [command() for command in self.commands]
+
+        return Pipeline()
+
+    def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+    def expire(self, key, seconds):
+        self.expiration[key] = seconds
+        return True
+
+    def get(self, key):
+        value = self.values.get(key)
+        return None if value is None else str(value).encode()
+
+    def publish(self, channel, message):
+        with self.condition:
+            self.messages.append((channel, message))
+            self.condition.notify_all()
+        return 1
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        kvdb = self
+
+        class PubSub(object):
+            def subscribe(self, channel):
+                self.channel = channel
+                self.position = len(kvdb.messages)
+
+            def get_message(self, timeout=0):
+                with kvdb.condition:
+                    kvdb.condition.wait_for(
+                        lambda: len(kvdb.messages) > self.position, timeout
+                    )
+                    for channel, message in kvdb.messages[self.position:]:
+                        self.position += 1
+                        if channel == self.channel:
+                            return {"type": "message", "data": message}
+                return None
+
+            def close(self):
+                pass
+
+        return PubSub()
+
+
+@pytest.mark.unittest
+def test_publish_and_wait():
+    kvdb = MemoryKvdb()
+    assert get_status_version(kvdb, "user", RESOURCE_ID) == 0
+    assert publish_status_version(kvdb, "user", RESOURCE_ID, 60) == 1
+    assert publish_status_version(kvdb, "user", "other", 60) == 1
+    assert get_status_version(kvdb, "user", RESOURCE_ID) == 1
+
+    # A newer version is returned immediately
+    assert wait_for_status_version(kvdb, "user", RESOURCE_ID, 0, 10) == 1
+
+    # The timeout is reached without an update
+    start = time.monotonic()
+    assert wait_for_status_version(kvdb, "user", RESOURCE_ID, 1, 0.2) == 1
+    assert time.monotonic() - start >= 0.2
+
+    # The waiting client is woken up by the update
+    timer = threading.Timer(
+        0.1, publish_status_version, (kvdb, "user", RESOURCE_ID, 60)
+    )
+    timer.start()
+    start = time.monotonic()
+    assert wait_for_status_version(kvdb, "user", RESOURCE_ID, 1, 10) == 2
+    assert time.monotonic() - start < 5
+    timer.join()
+
+
+@pytest.mark.unittest
+def test_notification_mixin():
+    kvdb = MemoryKvdb()
+
+    class Processing(object):
+        def __init__(self):
+            self.documents = []
+
+        def _send_to_database(self, document, final=False):
+            self.documents.append(document)
+
+    class SatelliteProcessing(StatusNotificationMixin, Processing):
+        user_id = "user"
+        resource_id = RESOURCE_ID
+
+        class config(object):
+            KVDB_RESOURCE_EXPIRE_TIME = 600
+
+        class resource_logger(object):
+            class db(object):
+                kvdb_server = kvdb
+
+    processing = SatelliteProcessing()
+    processing._send_to_database(pickle.dumps([200, {}]))
+    processing._send_to_database(pickle.dumps([200, {}]), final=True)
+    assert len(processing.documents) == 2
+    assert get_status_version(kvdb, "user", RESOURCE_ID) == 2
+    assert list(kvdb.expiration.values()) == [600]
+
+
+@pytest.mark.unittest
+def test_format_event():
+    event = format_event(3, 200, {"status": "running", "progress": 50})
+    lines = event.split("\n")
+    assert lines[0] == "id: 3"
+    assert lines[1] == "event: status"
+    assert json.loads(lines[2][len("data: "):]) == {
+        "http_code": 200,
+        "status": {"status": "running", "progress": 50},
+    }
+    assert event.endswith("\n\n")
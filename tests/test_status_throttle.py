@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Test the throttling of the running status updates of the satellite jobs
+"""
+
+import pickle
+import time
+import pytest
+from actinia_satellite_plugin.config import satellite_config
+from actinia_satellite_plugin.status_throttle import StatusUpdateThrottleMixin
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Soeren Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+class Processing(object):
+    """The status updates of the processing base class"""
+
+    def __init__(self):
+        self.progress = {"step": 0, "num_of_steps": 10}
+        self.documents = []
+
+    def _send_resource_update(self, message, results=None):
+        document = pickle.dumps(
+            [200, {"status": "running", "message": message}]
+        )
+        self._send_to_database(document, final=False)
+
+    def _send_resource_finished(self, message):
+        document = pickle.dumps(
+            [200, {"status": "finished", "message": message}]
+        )
+        self._send_to_database(document, final=True)
+
+    def _send_to_database(self, document, final=False):
+        self.documents.append(pickle.loads(document)[1])
+
+
+class SatelliteProcessing(StatusUpdateThrottleMixin, Processing):
+    pass
+
+
+def messages(processing):
+    return [document["message"] for document in processing.documents]
+
+
+@pytest.mark.unittest
+def test_updates_without_interval(monkeypatch):
+    monkeypatch.setattr(satellite_config, "STATUS_UPDATE_MIN_INTERVAL", 0)
+    processing = SatelliteProcessing()
+    for i in range(5):
+        processing._send_resource_update("Download %i" % i)
+    assert messages(processing) == ["Download %i" % i for i in range(5)]
+
+
+@pytest.mark.unittest
+def test_coalesced_updates(monkeypatch):
+    monkeypatch.setattr(satellite_config, "STATUS_UPDATE_MIN_INTERVAL", 0.2)
+    processing = SatelliteProcessing()
+    processing._send_resource_update("Download 0")
+    processing._send_resource_update("Download 0")
+    for i in range(1, 100):
+        processing._send_resource_update("Download %i" % i)
+    # The first update is written, the others are coalesced
+    assert messages(processing) == ["Download 0"]
+
+    # The latest update is written at the end of the interval
+    time.sleep(0.4)
+    assert messages(processing) == ["Download 0", "Download 99"]
+
+    # The progress is part of the status
+    time.sleep(0.2)
+    processing.progress["step"] += 1
+    processing._send_resource_update("Download 99")
+    assert len(processing.documents) == 3
+
+
+@pytest.mark.unittest
+def test_final_status_is_written(monkeypatch):
+    monkeypatch.setattr(satellite_config, "STATUS_UPDATE_MIN_INTERVAL", 0.2)
+    processing = SatelliteProcessing()
+    processing._send_resource_update("Download 0")
+    processing._send_resource_update("Download 1")
+    processing._send_resource_finished("Finished")
+    assert messages(processing) == ["Download 0", "Finished"]
+
+    # Neither the coalesced nor later updates overwrite the final status
+    time.sleep(0.4)
+    processing._send_resource_update("Download 2")
+    assert processing.documents[-1]["status"] == "finished"
+    assert len(processing.documents) == 2
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Test the deferred swagger documentation of the resources
+"""
+
+import pytest
+from flask import Flask
+from flask_restful_swagger_2 import Api, Resource, Schema
+from actinia_satellite_plugin.swagger_docs import (
+    SWAGGER_OPERATION_ATTRIBUTE,
+    add_resource,
+    lazy_doc,
+    lazy_example,
+    load_example,
+)
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Soeren Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+@lazy_example("SENTINEL2_NDVI_RESPONSE_EXAMPLE")
+class SceneModel(Schema):
+    type = "object"
+    properties = {"status": {"type": "string"}}
+
+
+OPERATION = {
+    "tags": ["Satellite Image Algorithms"],
+    "responses": {"200": {"description": "The scene", "schema": SceneModel}},
+}
+
+
+class SceneResource(Resource):
+    @lazy_doc(OPERATION)
+    def get(self):
+        """Return a scene."""
+        return {"status": "finished"}
+
+
+class OtherSceneResource(Resource):
+    @lazy_doc(OPERATION)
+    def get(self):
+        """Return another scene."""
+        return {"status": "finished"}
+
+
+@pytest.mark.unittest
+def test_examples():
+    for name in [
+        "LANDSAT_NDVI_RESPONSE_EXAMPLE",
+        "SENTINEL2_NDVI_RESPONSE_EXAMPLE",
+    ]:
+        assert load_example(name)["status"] == "finished"
+    assert load_example(name) is load_example(name)
+
+
+@pytest.mark.unittest
+def test_add_resource():
+    # Nothing is built before the resource is registered
+    assert "example" not in SceneModel.__dict__
+    assert SWAGGER_OPERATION_ATTRIBUTE not in SceneResource.get.__dict__
+
+    api = Api(Flask(__name__))
+    add_resource(api, SceneResource, "/scene")
+    add_resource(api, OtherSceneResource, "/other_scene")
+
+    doc = api.get_swagger_doc()
+    definition = doc["definitions"]["SceneModel"]
+    assert definition["example"]["status"] == "finished"
+    for path in ["/scene", "/other_scene"]:
+        schema = doc["paths"][path]["get"]["responses"]["200"]["schema"]
+        assert schema == {"$ref": "#/definitions/SceneModel"}
+    assert doc["paths"]["/other_scene"]["get"]["summary"] == (
+        "Return another scene."
+    )
+    # The shared operation object is not modified by the registration
+    assert OPERATION["responses"]["200"]["schema"] is SceneModel
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Test the synthetic archive of the local stand-in backends
+"""
+
+import os
+import struct
+import sys
+import threading
+import requests
+import pytest
+from actinia_satellite_plugin.local_backend import (
+    LocalSatelliteCatalog,
+    create_object_server,
+)
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), os.pardir, "benchmarks")
+)
+from synthetic_archive import (  # noqa: E402
+    create_synthetic_archive,
+    write_synthetic_geotiff,
+)
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Soeren Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+@pytest.mark.unittest
+def test_synthetic_geotiff(tmp_path):
+    path = tmp_path / "band.tif"
+    write_synthetic_geotiff(str(path), 300, 32632, 500000, 5500000, 10)
+    data = path.read_bytes()
+
+    assert data[:4] == b"II*\x00"
+    ifd_offset = struct.unpack("<I", data[4:8])[0]
+    count = struct.unpack("<H", data[ifd_offset:ifd_offset + 2])[0]
+    tags = {}
+    for i in range(count):
+        offset = ifd_offset + 2 + i * 12
+        tag, type_, length, value = struct.unpack(
+            "<HHII", data[offset:offset + 12]
+        )
+        tags[tag] = value
+    assert tags[256] == 300 and tags[257] == 300
+    # The 16 bit image data and the EPSG code in the GeoKey directory
+    assert len(data) > 300 * 300 * 2
+    geo_keys = struct.unpack("<16H", data[tags[34735]:tags[34735] + 32])
+    assert geo_keys[-1] == 32632
+
+
+@pytest.mark.unittest
+def test_synthetic_archive_and_object_server(tmp_path):
+    catalog = LocalSatelliteCatalog(path=str(tmp_path / "catalog.sqlite"))
+    store = tmp_path / "store"
+    server = create_object_server(str(store))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    catalog.object_store_url = "http://127.0.0.1:%i" % (
+        server.server_address[1]
+    )
+    try:
+        result = create_synthetic_archive(
+            catalog, str(store), landsat=1, sentinel2=2, size=64
+        )
+        assert len(result["sentinel2"]) == 2
+
+        scene_id = result["landsat"][0]
+        urls = catalog.get_landsat_urls([scene_id], ["B4", "MTL"])
+        response = requests.get(urls[scene_id]["MTL"]["public_url"])
+        assert 'MAP_PROJECTION = "UTM"' in response.text
+
+        product_id = result["sentinel2"][1]
+        url = catalog.get_sentinel_urls([product_id])[product_id]["B08"][
+            "public_url"
+        ]
+        response = requests.get(url, headers={"Range": "bytes=0-3"})
+        assert response.status_code == 206
+        assert response.content == b"II*\x00"
+    finally:
+        server.shutdown()
+        server.server_close()
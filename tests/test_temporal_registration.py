@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Test the bulk registration of satellite scenes
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+import pytest
+from actinia_satellite_plugin.temporal_registration import (
+    get_registered_maps,
+    get_scene_time_intervals,
+    write_registration_spec,
+)
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Soeren Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+@pytest.mark.unittest
+class TemporalRegistrationTestCase(unittest.TestCase):
+    def test_scene_time_intervals(self):
+        query_result = {
+            "LC80440342016259LGN00": {
+                "timestamp": "2016-09-15T18:47:59.2010000Z"
+            },
+            "LC80440342013106LGN01": {"timestamp": "2013-04-16T18:53:02Z"},
+        }
+        intervals = get_scene_time_intervals(query_result)
+        self.assertEqual(
+            intervals["LC80440342016259LGN00"],
+            ("2016-09-15 18:47:59", "2016-09-15 18:48:00"),
+        )
+        self.assertEqual(
+            intervals["LC80440342013106LGN01"],
+            ("2013-04-16 18:53:02+00:00", "2013-04-16 18:53:03+00:00"),
+        )
+
+    def test_write_registration_spec(self):
+        strds_list = [
+            {
+                "name": "Landsat_B1",
+                "title": "Landsat time series for band B1",
+                "description": "Landsat time series for band B1",
+                "maps": [
+                    [
+                        "LC80440342016259LGN00_TOAR.1",
+                        "2016-09-15 18:47:59",
+                        "2016-09-15 18:48:00",
+                    ]
+                ],
+            }
+        ]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            spec_file = write_registration_spec(
+                strds_list, os.path.join(tmp_dir, "registration.json")
+            )
+            with open(spec_file, "r") as f:
+                self.assertEqual(json.load(f), {"strds": strds_list})
+
+    def test_registered_maps(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tgis_db = os.path.join(tmp_dir, "sqlite.db")
+            self.assertEqual(get_registered_maps(tgis_db, "B04@s2"), set())
+
+            con = sqlite3.connect(tgis_db)
+            con.execute(
+                "CREATE TABLE strds_metadata "
+                "(id VARCHAR NOT NULL, raster_register VARCHAR)"
+            )
+            con.execute(
+                "INSERT INTO strds_metadata VALUES "
+                "('B04@s2', 'B04_s2_raster_register')"
+            )
+            con.execute(
+                "CREATE TABLE B04_s2_raster_register (id VARCHAR NOT NULL)"
+            )
+            con.executemany(
+                "INSERT INTO B04_s2_raster_register VALUES (?)",
+                [("S2A_T31TGJ_B04@s2",), ("S2A_T32UNE_B04@s2",)],
+            )
+            con.commit()
+            con.close()
+
+            self.assertEqual(
+                get_registered_maps(tgis_db, "B04@s2"),
+                {"S2A_T31TGJ_B04", "S2A_T32UNE_B04"},
+            )
+            self.assertEqual(get_registered_maps(tgis_db, "B08@s2"), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
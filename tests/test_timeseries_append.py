@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Test the append mode of the time series creators
+"""
+
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+import pytest
+from actinia_processing_lib.persistent_processing import PersistentProcessing
+from actinia_satellite_plugin import (
+    persistent_sentinel2_timeseries_processing,
+    timeseries_append,
+)
+from actinia_satellite_plugin.timeseries_append import TimeSeriesAppendMixin
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Soeren Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+Sentinel2TimeSeriesCreator = (
+    persistent_sentinel2_timeseries_processing.AsyncSentinel2TimeSeriesCreator
+)
+
+
+def write_file(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def read_file(path):
+    with open(path, "r") as f:
+        return f.read()
+
+
+def create_tgis_db(tgis_db, strds_id, map_ids):
+    """Create a temporal database with a single STRDS"""
+    os.makedirs(os.path.dirname(tgis_db), exist_ok=True)
+    register = strds_id.replace("@", "_") + "_raster_register"
+    con = sqlite3.connect(tgis_db)
+    con.execute(
+        "CREATE TABLE strds_metadata "
+        "(id VARCHAR NOT NULL, raster_register VARCHAR)"
+    )
+    con.execute(
+        "INSERT INTO strds_metadata VALUES (?, ?)", (strds_id, register)
+    )
+    con.execute('CREATE TABLE "%s" (id VARCHAR NOT NULL)' % register)
+    con.executemany(
+        'INSERT INTO "%s" VALUES (?)' % register,
+        [(map_id,) for map_id in map_ids],
+    )
+    con.commit()
+    con.close()
+
+
+def setup_processing(processing, tmp_dir):
+    processing.user_project_path = os.path.join(tmp_dir, "user", "project")
+    processing.temp_mapset_path = os.path.join(tmp_dir, "tmp", "s2")
+    processing.target_mapset_name = "s2"
+    processing.temp_mapset_name = "s2"
+    processing.target_mapset_lock_set = True
+    processing.target_mapset_lock_id = "target_lock"
+    processing.lock_interface = mock.Mock()
+    processing.lock_interface.extend.return_value = 1
+    processing._send_resource_update = mock.Mock()
+    return processing
+
+
+class TimeSeriesAppend(TimeSeriesAppendMixin):
+    def __init__(self, tmp_dir):
+        setup_processing(self, tmp_dir)
+        self.target_path = os.path.join(self.user_project_path, "s2")
+        # The existing target mapset
+        write_file(os.path.join(self.target_path, "cell", "old_map"), "old")
+        write_file(
+            os.path.join(self.target_path, "tgis", "sqlite.db"), "outdated"
+        )
+        # The imported scenes and the updated temporal database
+        write_file(
+            os.path.join(self.temp_mapset_path, "cell", "new_map"), "new"
+        )
+        write_file(
+            os.path.join(self.temp_mapset_path, "cellhd", "new_map"), "hd"
+        )
+        write_file(
+            os.path.join(self.temp_mapset_path, "tgis", "sqlite.db"),
+            "updated",
+        )
+
+
+@pytest.mark.unittest
+class TimeSeriesAppendTestCase(unittest.TestCase):
+    def check_target_mapset(self, processing):
+        target_path = processing.target_path
+        self.assertEqual(
+            read_file(os.path.join(target_path, "cell", "old_map")), "old"
+        )
+        self.assertEqual(
+            read_file(os.path.join(target_path, "cell", "new_map")), "new"
+        )
+        self.assertEqual(
+            read_file(os.path.join(target_path, "cellhd", "new_map")), "hd"
+        )
+        # The temporal database of the target is replaced
+        self.assertEqual(
+            read_file(os.path.join(target_path, "tgis", "sqlite.db")),
+            "updated",
+        )
+        processing.lock_interface.extend.assert_called_once_with(
+            resource_id="target_lock", expiration=3600
+        )
+
+    def test_copy_target_temporal_database(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            processing = TimeSeriesAppend(tmp_dir)
+            os.remove(
+                os.path.join(processing.temp_mapset_path, "tgis", "sqlite.db")
+            )
+            processing._copy_target_temporal_database()
+            self.assertEqual(
+                read_file(
+                    os.path.join(
+                        processing.temp_mapset_path, "tgis", "sqlite.db"
+                    )
+                ),
+                "outdated",
+            )
+
+    def test_copy_missing_target_temporal_database(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            processing = TimeSeriesAppend(tmp_dir)
+            os.remove(
+                os.path.join(processing.target_path, "tgis", "sqlite.db")
+            )
+            processing._copy_target_temporal_database()
+            self.assertEqual(
+                read_file(
+                    os.path.join(
+                        processing.temp_mapset_path, "tgis", "sqlite.db"
+                    )
+                ),
+                "updated",
+            )
+
+    def test_append_by_move(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            processing = TimeSeriesAppend(tmp_dir)
+            source_inode = os.stat(
+                os.path.join(processing.temp_mapset_path, "cell", "new_map")
+            ).st_ino
+
+            processing._append_tmp_mapset_to_target_mapset()
+            self.check_target_mapset(processing)
+            # The maps are renamed, not copied
+            self.assertEqual(
+                os.stat(
+                    os.path.join(processing.target_path, "cell", "new_map")
+                ).st_ino,
+                source_inode,
+            )
+            self.assertFalse(
+                os.path.exists(
+                    os.path.join(
+                        processing.temp_mapset_path, "cell", "new_map"
+                    )
+                )
+            )
+
+    def test_append_by_copy(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            processing = TimeSeriesAppend(tmp_dir)
+            with mock.patch.object(
+                timeseries_append, "is_same_file_system", return_value=False
+            ):
+                processing._append_tmp_mapset_to_target_mapset()
+            self.check_target_mapset(processing)
+            # The temporary mapset is removed later by the cleanup
+            self.assertTrue(
+                os.path.exists(
+                    os.path.join(
+                        processing.temp_mapset_path, "cell", "new_map"
+                    )
+                )
+            )
+
+
+class PersistentTimeSeriesAppend(TimeSeriesAppendMixin, PersistentProcessing):
+    def __init__(self, tmp_dir):
+        self.user_project_path = os.path.join(tmp_dir, "user", "project")
+        self.temp_project_path = os.path.join(tmp_dir, "tmp", "project")
+        self.project_name = "project"
+        self.target_mapset_name = "s2"
+        self.is_global_database = False
+        os.makedirs(os.path.dirname(self.temp_project_path))
+        for mapset in ["PERMANENT", "s2", "landsat"]:
+            write_file(
+                os.path.join(self.user_project_path, mapset, "WIND"), "wind"
+            )
+        write_file(
+            os.path.join(self.user_project_path, "s2", "tgis", "sqlite.db"),
+            "target",
+        )
+
+
+@pytest.mark.unittest
+class TemporaryDatabaseTestCase(unittest.TestCase):
+    def test_target_mapset_is_not_linked(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            processing = PersistentTimeSeriesAppend(tmp_dir)
+            # The time series creators pass the empty required mapsets
+            processing._create_temp_database([])
+            self.assertEqual(
+                os.listdir(processing.temp_project_path), ["PERMANENT"]
+            )
+
+            # The temporary mapset is a separate directory, the temporal
+            # database of the target is copied and not changed by the import
+            processing.temp_mapset_path = os.path.join(
+                processing.temp_project_path, "s2"
+            )
+            os.mkdir(processing.temp_mapset_path)
+            processing._copy_target_temporal_database()
+            tmp_tgis_db = os.path.join(
+                processing.temp_mapset_path, "tgis", "sqlite.db"
+            )
+            with open(tmp_tgis_db, "w") as f:
+                f.write("updated")
+            self.assertEqual(
+                read_file(processing._get_target_tgis_db()), "target"
+            )
+
+    def test_required_target_mapset_is_not_linked(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            processing = PersistentTimeSeriesAppend(tmp_dir)
+            processing._create_temp_database(["s2", "landsat"])
+            self.assertEqual(
+                sorted(os.listdir(processing.temp_project_path)),
+                ["PERMANENT", "landsat"],
+            )
+
+
+@pytest.mark.unittest
+class RegisteredScenesTestCase(unittest.TestCase):
+    def create_processing(self, tmp_dir):
+        processing = setup_processing(
+            Sentinel2TimeSeriesCreator.__new__(Sentinel2TimeSeriesCreator),
+            tmp_dir,
+        )
+        processing.target_mapset_exists = True
+        processing.required_bands = ["B04", "B08"]
+        processing.strds_ids = ["red", "nir"]
+        processing.product_ids = ["S2A_1", "S2A_2"]
+        processing._setup_checkpoints = mock.Mock()
+        processing._restore_checkpoints = mock.Mock()
+        processing._import_sentinel2_scenes = mock.Mock(return_value={})
+
+        def prepare_download():
+            processing.query_result = {
+                product_id: {
+                    band: {"file": "%s_%s" % (product_id, band)}
+                    for band in processing.required_bands
+                }
+                for product_id in processing.product_ids
+            }
+
+        processing._prepare_sentinel2_download = prepare_download
+
+        target_tgis = os.path.join(
+            processing.user_project_path, "s2", "tgis", "sqlite.db"
+        )
+        create_tgis_db(target_tgis, "red@s2", ["S2A_1_B04@s2", "S2A_2_B04@s2"])
+        con = sqlite3.connect(target_tgis)
+        con.execute(
+            "INSERT INTO strds_metadata VALUES ('nir@s2', 'nir_s2_register')"
+        )
+        con.execute('CREATE TABLE "nir_s2_register" (id VARCHAR NOT NULL)')
+        con.execute("INSERT INTO nir_s2_register VALUES ('S2A_1_B08@s2')")
+        con.commit()
+        con.close()
+        return processing
+
+    def test_remove_registered_scenes(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            processing = self.create_processing(tmp_dir)
+            processing._import_target_scenes()
+
+            # S2A_2 is not registered in the nir STRDS
+            self.assertEqual(list(processing.query_result), ["S2A_2"])
+            processing._import_sentinel2_scenes.assert_called_once_with()
+            # The temporal database of the target is used for the import
+            self.assertTrue(
+                os.path.isfile(
+                    os.path.join(
+                        processing.temp_mapset_path, "tgis", "sqlite.db"
+                    )
+                )
+            )
+
+    def test_all_scenes_registered(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            processing = self.create_processing(tmp_dir)
+            processing.product_ids = ["S2A_1"]
+
+            self.assertIsNone(processing._import_target_scenes())
+            self.assertEqual(processing.query_result, {})
+            self.assertEqual(processing.module_results, {})
+            processing._import_sentinel2_scenes.assert_not_called()
+            processing._send_resource_update.assert_called_once_with(
+                "All scenes are already registered in mapset <s2>"
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""SPDX-FileCopyrightText: (c) 2016 Sören Gebbert & mundialis GmbH & Co. KG.
+
+SPDX-License-Identifier: GPL-3.0-or-later
+
+Test the warm pool of initialized GRASS projects
+"""
+
+import os
+import tempfile
+import unittest
+import pytest
+from actinia_satellite_plugin.warm_pool import (
+    WARM_MAPSET_NAME,
+    WarmProjectPool,
+)
+
+__license__ = "GPL-3.0-or-later"
+__author__ = "Sören Gebbert"
+__copyright__ = "Copyright 2016, Sören Gebbert"
+__maintainer__ = "Soeren Gebbert"
+__email__ = "soerengebbert@googlemail.com"
+
+
+@pytest.mark.unittest
+class WarmProjectPoolTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.template_path = os.path.join(self.tmp_dir.name, "epsg_32632")
+        os.makedirs(os.path.join(self.template_path, "PERMANENT"))
+        for name in ["WIND", "DEFAULT_WIND", "PROJ_INFO"]:
+            with open(
+                os.path.join(self.template_path, "PERMANENT", name), "w"
+            ) as f:
+                f.write(name)
+        self.pool = WarmProjectPool(
+            os.path.join(self.tmp_dir.name, "pool"), size=2
+        )
+        self.job_path = os.path.join(self.tmp_dir.name, "gisdbase")
+        os.mkdir(self.job_path)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_fill_and_lease(self):
+        self.assertEqual(self.pool.fill(32632, self.template_path), 2)
+        self.assertEqual(self.pool.available(32632), 2)
+        # The pool is already full
+        self.assertEqual(self.pool.fill(32632, self.template_path), 0)
+
+        project_path = os.path.join(self.job_path, "sentinel2")
+        self.assertTrue(self.pool.lease(32632, project_path))
+        self.assertEqual(self.pool.available(32632), 1)
+        mapset_path = os.path.join(project_path, WARM_MAPSET_NAME)
+        with open(os.path.join(mapset_path, "WIND")) as f:
+            self.assertEqual(f.read(), "DEFAULT_WIND")
+        with open(os.path.join(mapset_path, "VAR")) as f:
+            self.assertIn("DB_DRIVER: sqlite", f.read())
+
+        # Another EPSG code has no warm projects
+        self.assertFalse(
+            self.pool.lease(32633, os.path.join(self.job_path, "landsat"))
+        )
+
+        stats = self.pool.get_stats()
+        self.assertEqual(stats["leases"], 2)
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["reuse_rate"], 0.5)
+        self.assertGreaterEqual(stats["lease_seconds_max"], 0.0)
+
+    def test_empty_stats(self):
+        stats = self.pool.get_stats()
+        self.assertEqual(stats["leases"], 0)
+        self.assertEqual(stats["reuse_rate"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()